@@ -0,0 +1,121 @@
+# JWKS cache - keeps Keycloak signing keys in memory, indexed by key ID
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from jose import jwk
+
+# How long fetched keys are trusted before they are refreshed
+JWKS_CACHE_TTL_SECONDS = int(os.environ.get("JWKS_CACHE_TTL_SECONDS", 300))
+# Minimum time between refreshes triggered by unknown key IDs or failed fetches,
+# so bogus tokens or a Keycloak outage cannot turn every request into a fetch
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = int(
+    os.environ.get("JWKS_MIN_REFRESH_INTERVAL_SECONDS", 30)
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _start_daemon_thread(target: Callable[[], None]):
+    threading.Thread(target=target, name="jwks-refresh", daemon=True).start()
+
+
+class JWKSCache:
+    """
+    Process-wide cache of constructed JWT signing keys, indexed by kid.
+
+    Known keys are served straight away; once the TTL has passed they are
+    refreshed on a background thread while the stale keys keep being served.
+    Only a token naming an unknown kid (Keycloak key rotation, or a cold
+    cache) waits for a fetch. Concurrent refreshes are collapsed into one
+    fetch, unknown kids are not retried until the minimum refresh interval
+    has passed, and if a refresh fails the previously fetched keys keep
+    being served.
+    """
+
+    def __init__(
+        self,
+        fetch_jwks: Callable[[], Optional[Dict[str, Any]]],
+        ttl: float = JWKS_CACHE_TTL_SECONDS,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        run_in_background: Optional[Callable[[Callable[[], None]], Any]] = None,
+    ):
+        self._fetch_jwks = fetch_jwks
+        self._ttl = ttl
+        self._min_refresh_interval = min_refresh_interval
+        self._clock = clock
+        self._run_in_background = run_in_background or _start_daemon_thread
+
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = float("-inf")
+        self._last_attempt = float("-inf")
+        self._refresh_lock = threading.Lock()
+
+    def get_key(self, kid: str) -> Optional[Any]:
+        """Return the constructed key for kid, refreshing the key set if needed"""
+        key = self._keys.get(kid)
+        if key is not None:
+            if self._clock() >= self._expires_at:
+                self._refresh_in_background()
+            return key
+
+        attempt_seen = self._last_attempt
+        with self._refresh_lock:
+            # Another request may have refreshed while we waited for the lock.
+            # Otherwise refresh at most once per interval: this negative-caches
+            # unknown kids and backs off while Keycloak is unreachable.
+            if (
+                self._last_attempt == attempt_seen
+                and self._clock() - self._last_attempt >= self._min_refresh_interval
+            ):
+                self._refresh()
+
+        # Falls back to stale keys if the refresh failed
+        return self._keys.get(kid)
+
+    def _refresh_in_background(self):
+        """Start a refresh unless one is running or the interval has not passed"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        if self._clock() - self._last_attempt < self._min_refresh_interval:
+            self._refresh_lock.release()
+            return
+
+        def refresh():
+            try:
+                self._refresh()
+            finally:
+                self._refresh_lock.release()
+
+        try:
+            self._run_in_background(refresh)
+        except Exception:
+            self._refresh_lock.release()
+            raise
+
+    def _refresh(self):
+        now = self._clock()
+        self._last_attempt = now
+
+        jwks = self._fetch_jwks()
+        if not jwks:
+            logger.error("Could not refresh Keycloak public keys, keeping cached keys")
+            return
+
+        keys = {}
+        for key_data in jwks.get("keys", []):
+            kid = key_data.get("kid")
+            if not kid or key_data.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = jwk.construct(key_data)
+            except Exception as e:
+                logger.warning(f"Skipping unusable JWKS key {kid}: {e}")
+
+        self._keys = keys
+        self._expires_at = now + self._ttl
+        logger.info(f"Refreshed Keycloak public keys: {len(keys)} signing keys")
@@ -3,11 +3,14 @@ import logging
 import os
 from typing import Optional, Union
 
+import anyio.to_thread
 import requests
+from auth.jwks import JWKSCache
+from auth.token_cache import TokenCache
 from domain.models import ServiceAccount, User
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import jwk, jwt
+from jose import jwt
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
 
 # Keycloak configuration
@@ -54,6 +57,10 @@ def get_keycloak_public_keys():
         return None
 
 
+# Process-wide cache of Keycloak signing keys
+jwks_cache = JWKSCache(get_keycloak_public_keys)
+
+
 def verify_jwt_token(token: str):
     """Verify and parse JWT token with proper signature validation"""
     logger = logging.getLogger(__name__)
@@ -61,12 +68,6 @@ def verify_jwt_token(token: str):
     logger.info(f"Verifying JWT token (first 50 chars): {token[:50]}...")
 
     try:
-        # Get Keycloak public keys
-        jwks = get_keycloak_public_keys()
-        if not jwks:
-            logger.error("Could not fetch Keycloak public keys")
-            return None
-
         # Decode token header to get key ID
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
@@ -74,12 +75,9 @@ def verify_jwt_token(token: str):
             logger.error("JWT token missing key ID")
             return None
 
-        # Find the matching public key
-        public_key = None
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                public_key = jwk.construct(key)
-                break
+        # Look up the matching public key; only a new key ID waits for a
+        # fetch, stale keys are refreshed in the background
+        public_key = jwks_cache.get_key(kid)
 
         if not public_key:
             logger.error(f"Could not find public key for kid: {kid}")
@@ -132,37 +130,29 @@ def verify_jwt_token(token: str):
         return None
 
 
-async def get_current_user(
-    token: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
-) -> User:
-    """Get the current user from the JWT token"""
+def _parse_collections(token_payload: dict) -> dict:
+    """Extract and parse collections from custom claim"""
     logger = logging.getLogger(__name__)
 
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    # Handle missing authentication (401)
-    if token is None:
-        logger.error("No authorization header provided")
-        raise credentials_exception
-
-    logger.info(
-        f"get_current_user called with token: {token.credentials[:50] if token else 'None'}..."
-    )
-
-    token_payload = verify_jwt_token(token.credentials)
+    collections = {}
+    collections_claim = token_payload.get("collections")
+    if collections_claim:
+        try:
+            if isinstance(collections_claim, str):
+                collections = json.loads(collections_claim)
+            else:
+                collections = collections_claim  # Already parsed
+            logger.debug(f"Parsed collections: {collections}")
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.warning(f"Failed to parse collections claim: {e}")
+    return collections
 
-    if not token_payload:
-        logger.error("JWT verification failed - token_payload is None")
-        raise credentials_exception
 
-    # Audience and issuer are already validated in verify_jwt_token()
-    logger.debug(
-        f"JWT verification successful. Payload keys: {list(token_payload.keys())}"
-    )
+def _user_from_payload(
+    token_payload: dict, credentials_exception: HTTPException
+) -> User:
+    """Build a User from a verified token payload"""
+    logger = logging.getLogger(__name__)
 
     # Extract user information from JWT - try multiple username fields
     username = (
@@ -180,18 +170,7 @@ async def get_current_user(
     realm_access = token_payload.get("realm_access", {})
     roles = realm_access.get("roles", [])
 
-    # Extract and parse collections from custom claim
-    collections = {}
-    collections_claim = token_payload.get("collections")
-    if collections_claim:
-        try:
-            if isinstance(collections_claim, str):
-                collections = json.loads(collections_claim)
-            else:
-                collections = collections_claim  # Already parsed
-            logger.debug(f"Parsed collections: {collections}")
-        except (json.JSONDecodeError, TypeError) as e:
-            logger.warning(f"Failed to parse collections claim: {e}")
+    collections = _parse_collections(token_payload)
 
     logger.info(
         f"Successfully authenticated user: {username} with roles: {roles}, collections: {collections}"
@@ -219,33 +198,10 @@ async def get_current_user(
     )
 
 
-async def get_current_service_account(
-    token: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
-) -> ServiceAccount:
-    """Get the current service account from the JWT token"""
+def _service_account_from_payload(token_payload: dict) -> ServiceAccount:
+    """Build a ServiceAccount from a verified token payload"""
     logger = logging.getLogger(__name__)
 
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate service account credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    # Handle missing authentication (401)
-    if token is None:
-        logger.error("No authorization header provided")
-        raise credentials_exception
-
-    logger.info(
-        f"get_current_service_account called with token: {token.credentials[:50] if token else 'None'}..."
-    )
-
-    token_payload = verify_jwt_token(token.credentials)
-
-    if not token_payload:
-        logger.error("JWT verification failed - token_payload is None")
-        raise credentials_exception
-
     # Extract client ID for service account
     client_id = token_payload.get("azp") or token_payload.get("client_id")
     if not client_id:
@@ -260,18 +216,7 @@ async def get_current_service_account(
     realm_access = token_payload.get("realm_access", {})
     roles = realm_access.get("roles", [])
 
-    # Extract and parse collections from custom claim
-    collections = {}
-    collections_claim = token_payload.get("collections")
-    if collections_claim:
-        try:
-            if isinstance(collections_claim, str):
-                collections = json.loads(collections_claim)
-            else:
-                collections = collections_claim  # Already parsed
-            logger.debug(f"Parsed collections: {collections}")
-        except (json.JSONDecodeError, TypeError) as e:
-            logger.warning(f"Failed to parse collections claim: {e}")
+    collections = _parse_collections(token_payload)
 
     # Extract scopes
     scopes = (
@@ -293,6 +238,77 @@ async def get_current_service_account(
     )
 
 
+async def get_current_user(
+    token: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> User:
+    """Get the current user from the JWT token"""
+    logger = logging.getLogger(__name__)
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    # Handle missing authentication (401)
+    if token is None:
+        logger.error("No authorization header provided")
+        raise credentials_exception
+
+    logger.info(
+        f"get_current_user called with token: {token.credentials[:50] if token else 'None'}..."
+    )
+
+    # Verification may wait for Keycloak's keys; keep that off the event loop
+    token_payload = await anyio.to_thread.run_sync(verify_jwt_token, token.credentials)
+
+    if not token_payload:
+        logger.error("JWT verification failed - token_payload is None")
+        raise credentials_exception
+
+    # Audience and issuer are already validated in verify_jwt_token()
+    logger.debug(
+        f"JWT verification successful. Payload keys: {list(token_payload.keys())}"
+    )
+
+    return _user_from_payload(token_payload, credentials_exception)
+
+
+async def get_current_service_account(
+    token: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> ServiceAccount:
+    """Get the current service account from the JWT token"""
+    logger = logging.getLogger(__name__)
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate service account credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    # Handle missing authentication (401)
+    if token is None:
+        logger.error("No authorization header provided")
+        raise credentials_exception
+
+    logger.info(
+        f"get_current_service_account called with token: {token.credentials[:50] if token else 'None'}..."
+    )
+
+    # Verification may wait for Keycloak's keys; keep that off the event loop
+    token_payload = await anyio.to_thread.run_sync(verify_jwt_token, token.credentials)
+
+    if not token_payload:
+        logger.error("JWT verification failed - token_payload is None")
+        raise credentials_exception
+
+    return _service_account_from_payload(token_payload)
+
+
+# Principals of recently verified tokens, valid until each token's exp
+token_cache: TokenCache[Union[User, ServiceAccount]] = TokenCache()
+
+
 async def get_current_principal(
     token: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
 ) -> Union[User, ServiceAccount]:
@@ -310,11 +326,17 @@ async def get_current_principal(
         logger.error("No authorization header provided")
         raise credentials_exception
 
+    # Tokens seen before were already verified; skip straight to the principal
+    cached_principal = token_cache.get(token.credentials)
+    if cached_principal is not None:
+        return cached_principal
+
     logger.info(
         f"get_current_principal called with token: {token.credentials[:50] if token else 'None'}..."
     )
 
-    token_payload = verify_jwt_token(token.credentials)
+    # Verification may wait for Keycloak's keys; keep that off the event loop
+    token_payload = await anyio.to_thread.run_sync(verify_jwt_token, token.credentials)
 
     if not token_payload:
         logger.error("JWT verification failed - token_payload is None")
@@ -344,22 +366,31 @@ async def get_current_principal(
         and "email" not in scope  # Service accounts usually don't have email scope
     )
 
+    # Build the principal from the payload verified above rather than
+    # verifying the token a second time
     if has_user_fields and not has_service_indicators:
         # Token has user-specific fields → User token
         logger.debug(f"Detected user token (has user-specific fields)")
-        return await get_current_user(token)
+        principal = _user_from_payload(token_payload, credentials_exception)
     elif has_service_indicators and not has_user_fields:
         # Token has service indicators and no user fields → Service account token
         logger.debug(
             f"Detected service account token (service indicators, no user fields)"
         )
-        return await get_current_service_account(token)
+        principal = _service_account_from_payload(token_payload)
     else:
         logger.error(
             f"Cannot determine token type - has_user_fields: {bool(has_user_fields)}, has_service_indicators: {bool(has_service_indicators)}"
         )
         raise credentials_exception
 
+    # exp was checked by verify_jwt_token; tokens without it are not cached
+    expires_at = token_payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_cache.put(token.credentials, principal, expires_at)
+
+    return principal
+
 
 def require_role(required_role: str):
     """Dependency to check if the principal has a specific role"""
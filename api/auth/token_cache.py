@@ -0,0 +1,83 @@
+# Verified-token cache - remembers principals built from already verified JWTs
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+# Maximum number of distinct tokens remembered; least recently used go first
+TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get("TOKEN_CACHE_MAX_ENTRIES", 10000))
+
+T = TypeVar("T")
+
+
+class TokenCache(Generic[T]):
+    """
+    Bounded LRU cache from bearer token to the principal it authenticates.
+
+    Entries are keyed by a SHA-256 digest of the token, so raw tokens are
+    never kept in memory, and expire at the token's own exp claim. A hit
+    replaces signature verification and claim parsing with a dictionary
+    lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = TOKEN_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[T, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[T]:
+        """Return the cached principal for token, if present and unexpired"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() < entry[1]:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, token: str, principal: T, expires_at: float):
+        """Remember principal for token until expires_at (epoch seconds)"""
+        if self._max_entries <= 0 or expires_at <= self._clock():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (principal, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Forget all cached tokens"""
+        with self._lock:
+            self._entries.clear()
+
+    def statistics(self) -> Dict[str, int]:
+        """Snapshot of size, capacity and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
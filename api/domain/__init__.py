@@ -1,37 +1,102 @@
 # Domain layer - contains all business logic and rules
 # This package defines the core domain objects, services, and interfaces
 
+from .archives import ARCHIVE_FORMATS, iter_archive_members, member_filename
 from .exceptions import (
+    ContentNotFoundError,
     DomainError,
     FileDeleteError,
     FileDownloadError,
+    FileIntegrityError,
     FileListingError,
     FileNotFoundError,
     FileUploadError,
     InsufficientPermissionsError,
+    InvalidArchiveError,
+    InvalidCursorError,
     InvalidMetadataError,
+    InvalidQueryError,
+    InvalidUploadSessionError,
+    MetadataIndexUnavailableError,
+    RangeNotSatisfiableError,
+    UnsupportedArchiveError,
+    UploadSessionNotFoundError,
+)
+from .models import (
+    AuthenticatedPrincipal,
+    ByteRange,
+    File,
+    FilePage,
+    FileQuery,
+    ServiceAccount,
+    UploadedChunk,
+    UploadSession,
+    User,
 )
-from .models import AuthenticatedPrincipal, File, ServiceAccount, User
 from .protocols import FileUpload
-from .repositories import StorageRepository
-from .services import FileMetadataService, FileParsingService, FilePathService
+from .repositories import (
+    AsyncMetadataIndexRepository,
+    AsyncStorageRepository,
+    MetadataIndexRepository,
+    StorageRepository,
+    UploadSessionRepository,
+)
+from .services import (
+    FileMetadataService,
+    FileParsingService,
+    FilePathService,
+    ListingCursorService,
+)
+from .streams import (
+    DEFAULT_CHUNK_SIZE,
+    AsyncUploadStream,
+    UploadStream,
+    content_digest,
+)
 
 __all__ = [
     "User",
     "ServiceAccount",
     "AuthenticatedPrincipal",
     "File",
+    "ByteRange",
+    "FilePage",
+    "FileQuery",
+    "UploadSession",
+    "UploadedChunk",
     "StorageRepository",
+    "AsyncStorageRepository",
+    "UploadSessionRepository",
+    "MetadataIndexRepository",
+    "AsyncMetadataIndexRepository",
     "FileUpload",
     "FilePathService",
     "FileMetadataService",
     "FileParsingService",
+    "ListingCursorService",
+    "UploadStream",
+    "AsyncUploadStream",
+    "DEFAULT_CHUNK_SIZE",
+    "content_digest",
+    "ARCHIVE_FORMATS",
+    "iter_archive_members",
+    "member_filename",
     "DomainError",
     "InsufficientPermissionsError",
     "InvalidMetadataError",
+    "InvalidCursorError",
+    "InvalidQueryError",
+    "MetadataIndexUnavailableError",
     "FileUploadError",
     "FileListingError",
     "FileDownloadError",
     "FileDeleteError",
     "FileNotFoundError",
+    "FileIntegrityError",
+    "ContentNotFoundError",
+    "UploadSessionNotFoundError",
+    "InvalidUploadSessionError",
+    "RangeNotSatisfiableError",
+    "InvalidArchiveError",
+    "UnsupportedArchiveError",
 ]
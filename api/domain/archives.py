@@ -0,0 +1,249 @@
+# Domain Archives - Read tar and zip archives member by member from a stream
+#
+# Archives arrive as a one-pass stream of body chunks; nothing here seeks, so
+# an archive is never held whole in memory or on disk. Tar (plain, gzip, bzip2,
+# xz and, with the zstandard package installed, zstd) is read in tarfile's
+# stream mode. Zip keeps its index at the end, so zip members are read from
+# their local headers instead; entries stored uncompressed must then record
+# their size up front, which every zip writer does unless it was itself
+# writing to a pipe. Deflated entries are inflated at most a chunk at a time,
+# however far a small input expands.
+
+import struct
+import tarfile
+import zlib
+from pathlib import PurePosixPath
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .exceptions import InvalidArchiveError, UnsupportedArchiveError
+from .streams import DEFAULT_CHUNK_SIZE
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for zstd-compressed tar
+    zstandard = None
+
+# Archive formats by request content type
+ARCHIVE_FORMATS = {
+    "application/x-tar": "tar",
+    "application/gzip": "tar",
+    "application/x-gzip": "tar",
+    "application/x-gtar": "tar",
+    "application/x-bzip2": "tar",
+    "application/x-xz": "tar",
+    "application/zstd": "tar.zst",
+    "application/zip": "zip",
+    "application/x-zip-compressed": "zip",
+}
+
+_ZIP_LOCAL_HEADER = b"PK\x03\x04"
+_ZIP_CENTRAL_HEADERS = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06")
+_ZIP_DATA_DESCRIPTOR = b"PK\x07\x08"
+_ZIP_LOCAL_FIELDS = struct.Struct("<HHHHHIIIHH")
+_ZIP64_EXTRA_ID = 0x0001
+_ZIP_STORED, _ZIP_DEFLATED = 0, 8
+_ZIP_FLAG_ENCRYPTED, _ZIP_FLAG_DESCRIPTOR, _ZIP_FLAG_UTF8 = 0x1, 0x8, 0x800
+
+# An archive member: its path inside the archive and an iterator over its
+# content, which must be consumed before moving on to the next member
+ArchiveMember = Tuple[str, Iterator[bytes]]
+
+
+class ChunkReader:
+    """Blocking file-like reader over an iterable of byte chunks"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        # A bytearray appends and drops its front in amortized constant time
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.read(size)
+        if len(data) != size:
+            raise InvalidArchiveError("Archive ended unexpectedly")
+        return data
+
+    def unread(self, data: bytes):
+        """Push bytes read past the end of a member back onto the stream"""
+        self._buffer[:0] = data
+
+
+def member_filename(path: str) -> Optional[str]:
+    """
+    Filename to store an archive member under: its path inside the archive
+    with directories joined by underscores, since object names keep the
+    filename in a single path segment. None for paths with nothing left.
+    """
+    parts = [p for p in PurePosixPath(path).parts if p not in ("/", ".", "..")]
+    return "_".join(parts) or None
+
+
+def iter_archive_members(
+    chunks: Iterable[bytes], archive_format: str
+) -> Iterator[ArchiveMember]:
+    """Regular files of an archive, in archive order, read from its chunks"""
+    reader = ChunkReader(chunks)
+    if archive_format == "zip":
+        return _iter_zip_members(reader)
+    if archive_format == "tar.zst":
+        if zstandard is None:
+            raise UnsupportedArchiveError(
+                "zstd archives need the zstandard package on the server"
+            )
+        return _iter_tar_members(zstandard.ZstdDecompressor().stream_reader(reader))
+    if archive_format == "tar":
+        return _iter_tar_members(reader)
+    raise UnsupportedArchiveError(f"Unsupported archive format: {archive_format}")
+
+
+def _iter_tar_members(source) -> Iterator[ArchiveMember]:
+    try:
+        # "r|*" reads a non-seekable stream, detecting its compression
+        with tarfile.open(fileobj=source, mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                content = archive.extractfile(member)
+                yield member.name, iter(lambda: content.read(DEFAULT_CHUNK_SIZE), b"")
+    except (tarfile.TarError, EOFError, zlib.error, OSError) as e:
+        raise InvalidArchiveError(f"Invalid tar archive: {e}")
+
+
+def _zip64_sizes(
+    extra: bytes, compressed: int, uncompressed: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Sizes from the ZIP64 extra field, for those the header left at
+    0xFFFFFFFF, or None if the entry has no ZIP64 field
+    """
+    while len(extra) >= 4:
+        field_id, length = struct.unpack("<HH", extra[:4])
+        data, extra = extra[4 : 4 + length], extra[4 + length :]
+        if field_id != _ZIP64_EXTRA_ID:
+            continue
+        values = list(struct.unpack(f"<{len(data) // 8}Q", data[: len(data) // 8 * 8]))
+        if uncompressed == 0xFFFFFFFF and values:
+            uncompressed = values.pop(0)
+        if compressed == 0xFFFFFFFF and values:
+            compressed = values.pop(0)
+        return compressed, uncompressed
+    return None
+
+
+def _iter_zip_members(reader: ChunkReader) -> Iterator[ArchiveMember]:
+    while True:
+        signature = reader.read(4)
+        if not signature or signature in _ZIP_CENTRAL_HEADERS:
+            # The central directory repeats what the local headers said
+            return
+        if signature != _ZIP_LOCAL_HEADER:
+            raise InvalidArchiveError("Invalid zip archive: bad local header")
+
+        fields = _ZIP_LOCAL_FIELDS.unpack(reader.read_exact(_ZIP_LOCAL_FIELDS.size))
+        flags, method = fields[1:3]
+        crc, compressed, uncompressed, name_length, extra_len = fields[5:]
+        name = reader.read_exact(name_length).decode(
+            "utf-8" if flags & _ZIP_FLAG_UTF8 else "cp437"
+        )
+        extra = reader.read_exact(extra_len)
+        zip64 = _zip64_sizes(extra, compressed, uncompressed)
+        if zip64 is not None:
+            compressed, uncompressed = zip64
+
+        if flags & _ZIP_FLAG_ENCRYPTED:
+            raise InvalidArchiveError(f"Encrypted zip entry: {name}")
+        if method not in (_ZIP_STORED, _ZIP_DEFLATED):
+            raise InvalidArchiveError(f"Unsupported zip compression for {name}")
+        descriptor = bool(flags & _ZIP_FLAG_DESCRIPTOR)
+        if method == _ZIP_STORED and descriptor:
+            raise InvalidArchiveError(
+                f"Zip entry {name} is stored without its size and cannot be streamed"
+            )
+
+        state = {"crc": 0, "size": 0}
+        content = _zip_entry_content(
+            reader, method, None if descriptor else compressed, state
+        )
+        if name.endswith("/"):
+            for _ in content:
+                pass
+        else:
+            yield name, content
+            # Skip whatever the consumer left unread
+            for _ in content:
+                pass
+
+        if descriptor:
+            size_format = "<II" if zip64 is None else "<QQ"
+            head = reader.read_exact(4)
+            crc = struct.unpack("<I", head)[0]
+            if head == _ZIP_DATA_DESCRIPTOR:
+                crc = struct.unpack("<I", reader.read_exact(4))[0]
+            _, uncompressed = struct.unpack(
+                size_format, reader.read_exact(struct.calcsize(size_format))
+            )
+        if state["crc"] != crc or state["size"] != uncompressed:
+            raise InvalidArchiveError(f"Zip entry {name} is corrupt")
+
+
+def _zip_entry_content(
+    reader: ChunkReader, method: int, compressed: Optional[int], state: dict
+) -> Iterator[bytes]:
+    """
+    Content of one zip entry. Without a known compressed size (sizes in a
+    trailing data descriptor), reads until the deflate stream ends.
+    """
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    remaining = compressed
+
+    while remaining is None or remaining > 0:
+        size = (
+            DEFAULT_CHUNK_SIZE
+            if remaining is None
+            else min(remaining, DEFAULT_CHUNK_SIZE)
+        )
+        raw = reader.read(size)
+        if not raw:
+            raise InvalidArchiveError("Archive ended unexpectedly")
+        if remaining is not None:
+            remaining -= len(raw)
+
+        pieces = [raw] if method == _ZIP_STORED else _inflate(decompressor, raw)
+        for data in pieces:
+            state["crc"] = zlib.crc32(data, state["crc"])
+            state["size"] += len(data)
+            yield data
+        if method == _ZIP_DEFLATED and decompressor.eof:
+            reader.unread(decompressor.unused_data)
+            return
+
+
+def _inflate(decompressor, raw: bytes) -> Iterator[bytes]:
+    """
+    Inflate one read of deflate data in pieces of at most DEFAULT_CHUNK_SIZE,
+    since a small input can expand a thousandfold
+    """
+    try:
+        data = decompressor.decompress(raw, DEFAULT_CHUNK_SIZE)
+        while data:
+            yield data
+            # A full piece may leave input unconsumed or output pending
+            if len(data) < DEFAULT_CHUNK_SIZE and not decompressor.unconsumed_tail:
+                return
+            data = decompressor.decompress(
+                decompressor.unconsumed_tail, DEFAULT_CHUNK_SIZE
+            )
+    except zlib.error as e:
+        raise InvalidArchiveError(f"Invalid zip archive: {e}")
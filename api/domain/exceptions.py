@@ -47,3 +47,63 @@ class FileNotFoundError(DomainError):
     """Raised when requested file is not found"""
 
     pass
+
+
+class ContentNotFoundError(DomainError):
+    """Raised when a collection holds no stored content with a given digest"""
+
+    pass
+
+
+class FileIntegrityError(DomainError):
+    """Raised when stored content does not match its recorded checksum"""
+
+    pass
+
+
+class InvalidArchiveError(DomainError):
+    """Raised when an uploaded archive is malformed or cannot be streamed"""
+
+    pass
+
+
+class UnsupportedArchiveError(DomainError):
+    """Raised when an uploaded archive's format is not supported"""
+
+    pass
+
+
+class InvalidCursorError(DomainError):
+    """Raised when a listing continuation cursor is malformed or foreign"""
+
+    pass
+
+
+class InvalidQueryError(DomainError):
+    """Raised when file query filters are malformed"""
+
+    pass
+
+
+class MetadataIndexUnavailableError(DomainError):
+    """Raised when an operation needs the metadata index but none is configured"""
+
+    pass
+
+
+class RangeNotSatisfiableError(DomainError):
+    """Raised when none of the requested byte ranges lie within the file"""
+
+    pass
+
+
+class UploadSessionNotFoundError(DomainError):
+    """Raised when a resumable upload session does not exist or has expired"""
+
+    pass
+
+
+class InvalidUploadSessionError(DomainError):
+    """Raised when a resumable upload session cannot accept the operation"""
+
+    pass
@@ -1,7 +1,7 @@
 # Using Pydantic for domain objects provides runtime validation,
 # serialization, and immutable behavior without architectural coupling.
 
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, List, Literal, Optional, Protocol, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -122,6 +122,10 @@ class File(BaseModel):
     upload_time: str = Field(..., description="ISO timestamp when file was uploaded")
     content_type: str = Field(..., description="MIME type of the file")
     size: Optional[int] = Field(None, description="File size in bytes")
+    etag: Optional[str] = Field(None, description="Entity tag of the stored content")
+    sha256: Optional[str] = Field(
+        None, description="SHA-256 digest of the content, hex encoded"
+    )
     metadata: Dict[str, Any] = Field(
         default_factory=dict, description="Additional file metadata"
     )
@@ -142,3 +146,102 @@ class File(BaseModel):
             "size": self.size,
             "metadata": self.metadata,
         }
+
+
+class FilePage(BaseModel):
+    """One page of a collection listing"""
+
+    files: List[File] = Field(default_factory=list, description="Files in this page")
+    next_start_after: Optional[str] = Field(
+        None, description="Object name to continue after; None on the last page"
+    )
+
+
+# File fields a query can be sorted by
+FileSortField = Literal[
+    "object_name", "original_filename", "owner", "upload_time", "content_type", "size"
+]
+
+
+class FileQuery(BaseModel):
+    """Filters and sort order for querying the files of a collection"""
+
+    collection: str = Field(..., description="Collection to query")
+    owner: Optional[str] = Field(None, description="Only files owned by this owner")
+    content_type: Optional[str] = Field(None, description="Only files of this type")
+    uploaded_after: Optional[str] = Field(
+        None, description="Only files uploaded at or after this upload_time"
+    )
+    uploaded_before: Optional[str] = Field(
+        None, description="Only files uploaded before this upload_time"
+    )
+    min_size: Optional[int] = Field(None, description="Minimum size in bytes")
+    max_size: Optional[int] = Field(None, description="Maximum size in bytes")
+    metadata: Dict[str, str] = Field(
+        default_factory=dict,
+        description="User metadata values that must match exactly, by key",
+    )
+    sort: FileSortField = Field("object_name", description="File field to sort by")
+    descending: bool = Field(False, description="Sort in descending order")
+
+    def sort_value(self, file: File) -> Any:
+        """The value of the sort field for a file, as the index orders it"""
+        value = getattr(file, self.sort)
+        if value is None and self.sort == "size":
+            return 0  # Unknown sizes sort as empty files
+        return value
+
+
+class ByteRange(BaseModel):
+    """
+    A range of bytes within a file, with HTTP Range semantics.
+
+    Positions are inclusive. Without a start, the range is the last `end`
+    bytes of the file; without an end, it runs to the end of the file.
+    """
+
+    start: Optional[int] = Field(None, ge=0, description="First byte position")
+    end: Optional[int] = Field(None, ge=0, description="Last byte position")
+
+    def resolve(self, size: int) -> Optional[Tuple[int, int]]:
+        """Absolute (first, last) positions in a file of the given size, or None if unsatisfiable"""
+        if self.start is None:
+            if not self.end or size == 0:
+                return None
+            return max(size - self.end, 0), size - 1
+        if self.start >= size:
+            return None
+        last = size - 1 if self.end is None else min(self.end, size - 1)
+        return self.start, last
+
+    def to_header(self) -> str:
+        """Format as an HTTP Range header value"""
+        start = "" if self.start is None else self.start
+        end = "" if self.end is None else self.end
+        return f"bytes={start}-{end}"
+
+
+class UploadedChunk(BaseModel):
+    """A chunk received as part of a resumable upload session"""
+
+    chunk_number: int = Field(..., description="1-based position of the chunk")
+    size: int = Field(..., description="Chunk size in bytes")
+    etag: str = Field(..., description="Storage ETag of the received chunk")
+
+
+class UploadSession(BaseModel):
+    """
+    Domain model for a resumable upload in progress.
+
+    The target File is fixed when the session is created; chunks are then
+    received in any order and assembled into that file on completion.
+    """
+
+    session_id: str = Field(..., description="Opaque session identifier")
+    upload_id: str = Field(..., description="Storage multipart upload ID")
+    file: File = Field(..., description="File that will be created on completion")
+    created_at: str = Field(..., description="ISO timestamp of session creation")
+
+    def is_owned_by(self, principal: "AuthenticatedPrincipal") -> bool:
+        """Check if the session was started by the given principal"""
+        return self.file.owner == principal.get_identifier()
@@ -1,6 +1,6 @@
 # Domain Protocols - Define contracts that external systems must implement
 
-from typing import Protocol, Optional, runtime_checkable
+from typing import BinaryIO, Optional, Protocol, runtime_checkable
 
 
 @runtime_checkable
@@ -14,9 +14,10 @@ class FileUpload(Protocol):
 
     filename: Optional[str]
     content_type: Optional[str]
+    file: BinaryIO
 
-    async def read(self) -> bytes:
-        """Read the complete file content"""
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes of file content (all remaining if negative)"""
         ...
 
     def seek(self, offset: int) -> None:
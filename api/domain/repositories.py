@@ -1,5 +1,17 @@
-from typing import Protocol, List, Tuple, runtime_checkable, TYPE_CHECKING
-from io import BytesIO
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+    runtime_checkable,
+)
 
 # TYPE_CHECKING Pattern for Circular Import Prevention:
 #
@@ -20,7 +32,14 @@ from io import BytesIO
 # This pattern is the Python-recommended solution for circular type dependencies.
 
 if TYPE_CHECKING:
-    from .models import File
+    from .models import (
+        ByteRange,
+        File,
+        FilePage,
+        FileQuery,
+        UploadedChunk,
+        UploadSession,
+    )
 
 
 @runtime_checkable
@@ -33,12 +52,17 @@ class StorageRepository(Protocol):
     boundaries. All implementations must be runtime_checkable.
     """
 
-    def store_file(self, file_content: BytesIO, file: "File") -> bool:
+    def store_file(
+        self, file_content: Union[BinaryIO, Iterable[bytes]], file: "File"
+    ) -> bool:
         """
         Store a file with its metadata.
 
         Args:
-            file_content: Binary content of the file
+            file_content: Binary content of the file, either as a file-like
+                object or as an iterable of byte chunks. Chunk iterables are
+                streamed to storage without knowing the total size up front,
+                so implementations must not buffer the whole content.
             file: Domain File object containing metadata and storage path
 
         Returns:
@@ -49,18 +73,25 @@ class StorageRepository(Protocol):
         """
         ...
 
-    def retrieve_file(self, object_name: str) -> Tuple[BytesIO, "File"]:
+    def retrieve_file(
+        self, object_name: str, byte_range: Optional["ByteRange"] = None
+    ) -> Tuple[BinaryIO, "File"]:
         """
         Retrieve a file and its metadata.
 
         Args:
             object_name: Storage path/key for the file
+            byte_range: Only stream this part of the file. The returned
+                File still describes the whole file (size is the total size).
 
         Returns:
-            Tuple of (file_content, file_metadata)
+            Tuple of (file_content, file_metadata). file_content is a
+            file-like stream read from storage on demand; the caller must
+            close() it to release the underlying connection.
 
         Raises:
             FileNotFoundError: If file doesn't exist
+            StorageRangeNotSatisfiableError: If byte_range lies outside the file
             StorageError: If retrieval operation fails
         """
         ...
@@ -80,10 +111,32 @@ class StorageRepository(Protocol):
         """
         ...
 
+    def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> "FilePage":
+        """
+        List one page of files in a collection, in object name order.
+
+        Only the requested page is fetched from storage, so the cost is
+        proportional to limit rather than to the size of the collection.
+
+        Args:
+            collection: Collection name to list files from
+            limit: Maximum number of files in the page
+            start_after: Object name to continue after (from the previous page)
+
+        Raises:
+            StorageError: If listing operation fails
+        """
+        ...
+
     def delete_file(self, object_name: str) -> bool:
         """
         Delete a file from storage.
 
+        Deletes are idempotent: implementations should not check for the
+        file first, and deleting a file that doesn't exist may succeed.
+
         Args:
             object_name: Storage path/key for the file
 
@@ -91,11 +144,27 @@ class StorageRepository(Protocol):
             bool: True if successful
 
         Raises:
-            FileNotFoundError: If file doesn't exist
+            StorageFileNotFoundError: If storage reports the file doesn't exist
             StorageError: If deletion operation fails
         """
         ...
 
+    def stat_file(self, object_name: str) -> "File":
+        """
+        Retrieve a file's metadata without its content.
+
+        Args:
+            object_name: Storage path/key for the file
+
+        Returns:
+            File domain object with size, content type and user metadata
+
+        Raises:
+            StorageFileNotFoundError: If file doesn't exist
+            StorageError: If the operation fails
+        """
+        ...
+
     def file_exists(self, object_name: str) -> bool:
         """
         Check if a file exists in storage.
@@ -111,6 +180,444 @@ class StorageRepository(Protocol):
         """
         ...
 
+    def content_exists(self, collection: str, sha256: str, size: int) -> bool:
+        """
+        Check whether a collection already holds content with this digest.
+
+        Args:
+            collection: Collection whose files may reference the content
+            sha256: Hex SHA-256 digest of the content
+            size: Size of the content in bytes
+
+        Returns:
+            bool: True if store_reference() can store a file with this content
+
+        Raises:
+            StorageError: If check operation fails
+        """
+        ...
+
+    def store_reference(self, file: "File") -> bool:
+        """
+        Store a file whose content is already held by its collection.
+
+        Args:
+            file: Domain File object with sha256 and size of the content
+
+        Returns:
+            bool: True if successful
+
+        Raises:
+            StorageFileNotFoundError: If the collection holds no such content
+            StorageError: If storage operation fails
+        """
+        ...
+
+    def update_metadata(self, file: "File") -> bool:
+        """
+        Replace the content type and user metadata stored with a file.
+
+        Args:
+            file: Domain File object carrying the new content type and metadata
+
+        Returns:
+            bool: True if successful
+
+        Raises:
+            StorageFileNotFoundError: If file doesn't exist
+            StorageError: If storage operation fails
+        """
+        ...
+
+
+@runtime_checkable
+class AsyncStorageRepository(Protocol):
+    """
+    Asynchronous storage repository protocol for file operations.
+
+    Mirrors StorageRepository for use on the event loop. Implementations
+    either talk to storage natively with non-blocking I/O or adapt a
+    synchronous StorageRepository onto bounded worker threads.
+    """
+
+    async def store_file(
+        self,
+        file_content: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+        file: "File",
+    ) -> bool:
+        """
+        Store a file with its metadata.
+
+        Args:
+            file_content: Binary content of the file as a file-like object,
+                an iterable of byte chunks or an async iterable of byte chunks
+            file: Domain File object containing metadata and storage path
+
+        Returns:
+            bool: True if successful
+
+        Raises:
+            StorageError: If storage operation fails
+        """
+        ...
+
+    async def retrieve_file(
+        self, object_name: str, byte_range: Optional["ByteRange"] = None
+    ) -> Tuple[AsyncIterator[bytes], "File"]:
+        """
+        Retrieve a file, or byte_range of it, and its metadata.
+
+        Returns:
+            Tuple of (file_content, file_metadata). file_content yields the
+            content in chunks as it arrives from storage; the caller must
+            aclose() it if it stops iterating early.
+
+        Raises:
+            StorageFileNotFoundError: If file doesn't exist
+            StorageRangeNotSatisfiableError: If byte_range lies outside the file
+            StorageError: If retrieval operation fails
+        """
+        ...
+
+    async def list_files_in_collection(self, collection: str) -> List["File"]:
+        """
+        List all files in a collection.
+
+        Raises:
+            StorageError: If listing operation fails
+        """
+        ...
+
+    async def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> "FilePage":
+        """
+        List one page of files in a collection, in object name order.
+
+        Raises:
+            StorageError: If listing operation fails
+        """
+        ...
+
+    async def delete_file(self, object_name: str) -> bool:
+        """
+        Delete a file from storage; like StorageRepository.delete_file, idempotent.
+
+        Raises:
+            StorageFileNotFoundError: If storage reports the file doesn't exist
+            StorageError: If deletion operation fails
+        """
+        ...
+
+    async def file_exists(self, object_name: str) -> bool:
+        """
+        Check if a file exists in storage.
+
+        Raises:
+            StorageError: If check operation fails
+        """
+        ...
+
+    async def content_exists(self, collection: str, sha256: str, size: int) -> bool:
+        """
+        Check whether a collection already holds content with this digest.
+
+        Raises:
+            StorageError: If check operation fails
+        """
+        ...
+
+    async def store_reference(self, file: "File") -> bool:
+        """
+        Store a file whose content is already held by its collection.
+
+        Raises:
+            StorageFileNotFoundError: If the collection holds no such content
+            StorageError: If storage operation fails
+        """
+        ...
+
+    async def update_metadata(self, file: "File") -> bool:
+        """
+        Replace the content type and user metadata stored with a file.
+
+        Raises:
+            StorageFileNotFoundError: If file doesn't exist
+            StorageError: If storage operation fails
+        """
+        ...
+
+
+@runtime_checkable
+class UploadSessionRepository(Protocol):
+    """
+    Repository protocol for resumable, chunked upload sessions.
+
+    Session state must be durable across API restarts: implementations keep
+    it alongside the stored chunks rather than in process memory.
+    """
+
+    def create_session(self, file: "File") -> "UploadSession":
+        """
+        Start a new upload session for the given file.
+
+        Args:
+            file: Domain File object the completed session will produce
+
+        Returns:
+            The persisted UploadSession
+
+        Raises:
+            StorageError: If the session cannot be created
+        """
+        ...
+
+    def get_session(self, session_id: str) -> "UploadSession":
+        """
+        Load an existing upload session.
+
+        Raises:
+            StorageFileNotFoundError: If the session doesn't exist
+            StorageError: If the session cannot be loaded
+        """
+        ...
+
+    def store_chunk(
+        self, session: "UploadSession", chunk_number: int, data: bytes
+    ) -> "UploadedChunk":
+        """
+        Store one numbered chunk of a session, replacing any earlier attempt.
+
+        Raises:
+            StorageError: If the chunk cannot be stored
+        """
+        ...
+
+    def presign_chunk_url(
+        self, session: "UploadSession", chunk_number: int, expires: int
+    ) -> str:
+        """
+        Create a URL the client can PUT one chunk to directly, bypassing the API.
+
+        Args:
+            session: Session the chunk belongs to
+            chunk_number: 1-based position of the chunk
+            expires: URL lifetime in seconds
+
+        Raises:
+            StorageError: If the URL cannot be generated
+        """
+        ...
+
+    def list_chunks(self, session: "UploadSession") -> List["UploadedChunk"]:
+        """
+        List the chunks received so far, ordered by chunk number.
+
+        Raises:
+            StorageError: If the chunks cannot be listed
+        """
+        ...
+
+    def complete_session(
+        self, session: "UploadSession", chunks: List["UploadedChunk"]
+    ) -> "File":
+        """
+        Assemble the given chunks into the session's file and end the session.
+
+        Raises:
+            StorageError: If the file cannot be assembled
+        """
+        ...
+
+    def abort_session(self, session: "UploadSession") -> bool:
+        """
+        Discard a session and all of its chunks.
+
+        Raises:
+            StorageError: If the session cannot be aborted
+        """
+        ...
+
+
+@runtime_checkable
+class MetadataIndexRepository(Protocol):
+    """
+    Metadata index protocol for serving listings without storage calls.
+
+    Storage stays the source of truth for file content and metadata. The
+    index mirrors the metadata of every stored file so listings can return
+    content types and user metadata from a single query instead of one
+    storage stat per file. It is updated whenever a file is stored or
+    deleted, and can be rebuilt from storage at any time.
+    """
+
+    def upsert_file(self, file: "File") -> None:
+        """
+        Add a file to the index, replacing any entry with the same object name.
+
+        Raises:
+            MetadataIndexError: If the index cannot be updated
+        """
+        ...
+
+    def remove_file(self, object_name: str) -> None:
+        """
+        Remove a file from the index; removing an unknown file is a no-op.
+
+        Raises:
+            MetadataIndexError: If the index cannot be updated
+        """
+        ...
+
+    def list_files_in_collection(self, collection: str) -> List["File"]:
+        """
+        List all indexed files in a collection, in object name order.
+
+        Raises:
+            MetadataIndexError: If the index cannot be queried
+        """
+        ...
+
+    def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> "FilePage":
+        """
+        List one page of indexed files in a collection, in object name order.
+
+        Pages line up with StorageRepository.list_files_page, so cursors work
+        the same whether a listing is served from storage or the index.
+
+        Raises:
+            MetadataIndexError: If the index cannot be queried
+        """
+        ...
+
+    def query_files(
+        self,
+        query: "FileQuery",
+        limit: int,
+        after: Optional[Tuple[Any, str]] = None,
+    ) -> "FilePage":
+        """
+        Find files matching a query, in the query's sort order.
+
+        Ties in the sort field are broken by object name, so pages are
+        stable and can be continued from the last file of the previous page.
+
+        Args:
+            query: Filters and sort order
+            limit: Maximum number of files in the page
+            after: (sort value, object name) of the last file already seen
+
+        Raises:
+            MetadataIndexError: If the index cannot be queried
+        """
+        ...
+
+    def list_collections(self) -> List[str]:
+        """
+        List the collections that have indexed files.
+
+        Raises:
+            MetadataIndexError: If the index cannot be queried
+        """
+        ...
+
+    def search_files(
+        self,
+        text: str,
+        collections: List[str],
+        limit: int,
+        offset: int = 0,
+    ) -> List["File"]:
+        """
+        Full-text search over file names and user metadata values.
+
+        Args:
+            text: Free text; every word must match, the last one as a prefix
+            collections: Only search files in these collections
+            limit: Maximum number of files to return
+            offset: Number of best-ranked files to skip
+
+        Returns:
+            Matching files, best match first
+
+        Raises:
+            MetadataIndexError: If the index cannot be queried
+        """
+        ...
+
+    def replace_all(self, files: Iterable["File"]) -> int:
+        """
+        Atomically replace the whole index with the given files.
+
+        The index counts as complete afterwards.
+
+        Returns:
+            int: Number of files indexed
+
+        Raises:
+            MetadataIndexError: If the index cannot be rebuilt
+        """
+        ...
+
+    def fill(self, files: Iterable["File"]) -> int:
+        """
+        Add the given files where not indexed yet and mark the index complete.
+
+        Unlike replace_all, entries written in the meantime are kept, so a
+        new index can be filled from storage while the API serves requests.
+
+        Returns:
+            int: Number of files added
+
+        Raises:
+            MetadataIndexError: If the index cannot be updated
+        """
+        ...
+
+    def is_complete(self) -> bool:
+        """
+        Check whether the index holds every stored file, i.e. it was filled
+        from storage at least once. Until then, listings must come from storage.
+
+        Raises:
+            MetadataIndexError: If the index cannot be queried
+        """
+        ...
+
+
+@runtime_checkable
+class AsyncMetadataIndexRepository(Protocol):
+    """
+    Async counterpart of MetadataIndexRepository for the event loop.
+
+    Covers the calls async use cases make while storing, deleting and
+    listing files; implementations keep blocking index work off the loop.
+    """
+
+    async def upsert_file(self, file: "File") -> None:
+        """See MetadataIndexRepository.upsert_file"""
+        ...
+
+    async def remove_file(self, object_name: str) -> None:
+        """See MetadataIndexRepository.remove_file"""
+        ...
+
+    async def list_files_in_collection(self, collection: str) -> List["File"]:
+        """See MetadataIndexRepository.list_files_in_collection"""
+        ...
+
+    async def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> "FilePage":
+        """See MetadataIndexRepository.list_files_page"""
+        ...
+
+    async def is_complete(self) -> bool:
+        """See MetadataIndexRepository.is_complete"""
+        ...
+
 
 # Storage-specific exceptions (infrastructure layer)
 class StorageError(Exception):
@@ -125,6 +632,12 @@ class StorageFileNotFoundError(StorageError):
     pass
 
 
+class StorageRangeNotSatisfiableError(StorageError):
+    """Raised when a requested byte range lies outside the stored object"""
+
+    pass
+
+
 class FileAlreadyExistsError(StorageError):
     """Raised when trying to create a file that already exists"""
 
@@ -141,3 +654,9 @@ class InvalidFilePathError(StorageError):
     """Raised when file path is invalid"""
 
     pass
+
+
+class MetadataIndexError(StorageError):
+    """Raised when the metadata index cannot be read or updated"""
+
+    pass
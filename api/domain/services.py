@@ -1,7 +1,9 @@
 # Domain Services - Complex business logic that doesn't belong in entities
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
+import base64
+import binascii
 import json
 
 
@@ -34,6 +36,9 @@ class FilePathService:
 class FileMetadataService:
     """Domain service for handling file metadata transformations"""
 
+    # Metadata key of the hex SHA-256 checksum recorded at upload
+    CHECKSUM_KEY = "sha256"
+
     @staticmethod
     def parse_metadata_json(metadata_json: str) -> Dict[str, Any]:
         """Parse and validate metadata JSON string"""
@@ -49,15 +54,21 @@ class FileMetadataService:
         collection: str,
         original_filename: str,
         user_metadata: Dict[str, Any],
+        sha256: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Create complete upload metadata combining system and user metadata"""
-        return {
+        metadata = {
             "uploader": uploader,
             "upload_time": upload_time,
             "collection": collection,
             "original_filename": original_filename,
             **user_metadata,
         }
+        if sha256 is not None:
+            # Added last: the checksum must describe the content, whatever
+            # the user metadata says
+            metadata[FileMetadataService.CHECKSUM_KEY] = sha256
+        return metadata
 
     @staticmethod
     def to_storage_format(metadata: Dict[str, Any]) -> Dict[str, str]:
@@ -104,3 +115,64 @@ class FileParsingService:
             "timestamp": timestamp_part,
             "original_filename": filename_part,
         }
+
+
+class ListingCursorService:
+    """Domain service for the opaque continuation cursors of paginated listings"""
+
+    @staticmethod
+    def encode(object_name: str) -> str:
+        """Encode the last listed object name as a URL-safe cursor"""
+        return base64.urlsafe_b64encode(object_name.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode(cursor: str, collection: str) -> Optional[str]:
+        """
+        Decode a cursor back into the object name to continue after.
+
+        Returns None if the cursor is malformed or belongs to another collection.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            object_name = base64.urlsafe_b64decode(padded.encode()).decode()
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+        if not object_name.startswith(
+            FilePathService.get_collection_prefix(collection)
+        ):
+            return None
+        return object_name
+
+    @classmethod
+    def encode_position(cls, sort: str, value: Any, object_name: str) -> str:
+        """Encode the sort key of the last file of a sorted page as a cursor"""
+        return cls.encode(json.dumps([sort, value, object_name]))
+
+    @classmethod
+    def decode_position(
+        cls, cursor: str, collection: str, sort: str
+    ) -> Optional[Tuple[Any, str]]:
+        """
+        Decode a sorted-page cursor into the (sort value, object name) to
+        continue after.
+
+        Returns None if the cursor is malformed, belongs to another
+        collection or was issued for a different sort order.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            cursor_sort, value, object_name = json.loads(
+                base64.urlsafe_b64decode(padded.encode()).decode()
+            )
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            return None
+        if (
+            cursor_sort != sort
+            or not isinstance(object_name, str)
+            or not isinstance(value, (str, int))
+            or not object_name.startswith(
+                FilePathService.get_collection_prefix(collection)
+            )
+        ):
+            return None
+        return value, object_name
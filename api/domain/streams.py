@@ -0,0 +1,115 @@
+# Domain Streams - Chunked iteration over file content without full buffering
+
+import hashlib
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+# Size of each chunk handed from an upload to the storage layer. Peak memory
+# per upload is bounded by this (plus the storage layer's own part buffer).
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadStream:
+    """
+    Iterate over uploaded file content in fixed-size chunks.
+
+    Wraps any file-like object and yields its content chunk by chunk, keeping
+    track of how many bytes have passed through, and their SHA-256, so the
+    caller can record size and checksum once storage has consumed the stream.
+    Storage consumes it on worker threads, so hashing stays off the event loop
+    (hashlib releases the GIL for large chunks).
+    """
+
+    def __init__(self, source: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._source = source
+        self._digest = hashlib.sha256()
+        self.chunk_size = chunk_size
+        self.size = 0
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the content streamed so far"""
+        return self._digest.hexdigest()
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._source.read(self.chunk_size)
+            if not chunk:
+                return
+            self.size += len(chunk)
+            self._digest.update(chunk)
+            yield chunk
+
+
+class AsyncUploadStream:
+    """
+    UploadStream over an async iterable of chunks, such as a raw request body.
+
+    Chunks are passed through as they arrive; size and SHA-256 are tracked
+    the same way, for recording once storage has consumed the stream. The
+    hashing goes through run_sync (e.g. anyio.to_thread.run_sync) to keep it
+    off the event loop. Body chunks are small, so they are hashed in batches
+    of about chunk_size bytes, and the last batch before iteration ends.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterable[bytes],
+        run_sync: Callable[..., Awaitable[Any]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self._chunks = chunks
+        self._run_sync = run_sync
+        self._digest = hashlib.sha256()
+        self.chunk_size = chunk_size
+        self.size = 0
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the content streamed so far"""
+        return self._digest.hexdigest()
+
+    def _update(self, chunks: List[bytes]):
+        for chunk in chunks:
+            self._digest.update(chunk)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        pending: List[bytes] = []
+        pending_size = 0
+        async for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.size += len(chunk)
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= self.chunk_size:
+                await self._run_sync(self._update, pending)
+                pending, pending_size = [], 0
+            yield chunk
+        await self._run_sync(self._update, pending)
+
+
+def content_digest(
+    source: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[str, int]:
+    """SHA-256 (hex) and size of a seekable file, rewound afterwards for storage"""
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+    return digest.hexdigest(), size
@@ -0,0 +1,119 @@
+# Reclaim content blobs that no file references any more
+#
+# Usage (from the api directory):
+#     python -m infrastructure.collect_blobs
+#
+# Deleting a file removes its reference object and marker, never the blob (see
+# storage.content_addressing). This sweep walks the blob area, drops reference
+# markers whose file is gone, and deletes blobs left without markers. Objects
+# younger than the grace period are never touched: uploads write their marker
+# before checking for the blob, so an upload in flight keeps its blob alive.
+
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Iterator, List, Optional
+
+from domain.repositories import StorageFileNotFoundError, StorageRepository
+from storage.content_addressing import BLOB_PREFIX, blob_key, blob_refs_prefix
+from storage.minio import MinioClient
+from storage.minio_repository import MinioStorageRepository
+
+# Listing page size; S3 returns at most 1000 keys per request
+LIST_PAGE_SIZE = 1000
+
+DEFAULT_GRACE_HOURS = 24
+
+logger = logging.getLogger(__name__)
+
+
+def iter_blob_objects(client: MinioClient) -> Iterator[dict]:
+    """Every blob and reference marker, grouped by digest in key order"""
+    start_after = None
+    while True:
+        objects, has_more = client.list_objects_page(
+            prefix=BLOB_PREFIX, limit=LIST_PAGE_SIZE, start_after=start_after
+        )
+        yield from objects
+        if not has_more:
+            return
+        start_after = objects[-1]["name"]
+
+
+def _digest(key: str) -> str:
+    """The content digest a blob area key belongs to"""
+    return key[len(BLOB_PREFIX) :].partition("/")[0]
+
+
+def _references_blob(storage: StorageRepository, object_name: str, sha256: str) -> bool:
+    """True if object_name still exists as a reference to this blob"""
+    try:
+        return storage.stat_file(object_name).sha256 == sha256
+    except StorageFileNotFoundError:
+        return False
+
+
+def collect_blobs(
+    client: MinioClient,
+    storage: StorageRepository,
+    grace: timedelta = timedelta(hours=DEFAULT_GRACE_HOURS),
+    now: Optional[datetime] = None,
+) -> int:
+    """Delete stale reference markers and unreferenced blobs; returns blobs deleted"""
+    cutoff = (now or datetime.now(timezone.utc)) - grace
+    deleted = 0
+
+    for sha256, objects in groupby(
+        iter_blob_objects(client), lambda o: _digest(o["name"])
+    ):
+        blob = None
+        referenced = False
+        for obj in objects:
+            if obj["name"] == blob_key(sha256):
+                blob = obj
+                continue
+            object_name = obj["name"][len(blob_refs_prefix(sha256)) :]
+            if obj["last_modified"] > cutoff or _references_blob(
+                storage, object_name, sha256
+            ):
+                referenced = True
+            else:
+                client.delete_object(obj["name"])
+
+        if blob is None or referenced or blob["last_modified"] > cutoff:
+            continue
+        # An upload may have registered itself since this group was listed
+        markers, _ = client.list_objects_page(prefix=blob_refs_prefix(sha256), limit=1)
+        if markers:
+            continue
+        client.delete_object(blob["name"])
+        deleted += 1
+
+    return deleted
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Delete content blobs no file references any more"
+    )
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=DEFAULT_GRACE_HOURS,
+        help="Leave blobs and markers younger than this alone",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = MinioClient()
+    count = collect_blobs(
+        client,
+        MinioStorageRepository(client),
+        grace=timedelta(hours=args.grace_hours),
+    )
+    logger.info(f"Deleted {count} unreferenced blobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,41 @@
 # Dependency Injection Container - Wire up dependencies at application startup
 
-from typing import Optional
+from collections import Counter
+from typing import Dict, Optional
 import logging
-
-from domain.repositories import StorageRepository
+import os
+
+from fastapi import Depends
+
+from domain.repositories import (
+    AsyncMetadataIndexRepository,
+    AsyncStorageRepository,
+    MetadataIndexRepository,
+    StorageRepository,
+    UploadSessionRepository,
+)
+from infrastructure.download_cache import (
+    DOWNLOAD_CACHE_DIR,
+    CachingStorageRepository,
+    DownloadCache,
+)
+from infrastructure.executor import (
+    StorageExecutor,
+    ThreadedMetadataIndex,
+    ThreadedStorageRepository,
+)
+from infrastructure.rebuild_metadata_index import fill_metadata_index
+from infrastructure.staging import UPLOAD_STAGING_DIR, StagingStorageRepository
 from storage.minio_repository import MinioStorageRepository
 from storage.minio import MinioClient
+from storage.minio_upload_sessions import MinioUploadSessionRepository
+from storage.s3_async import AsyncS3Client
+from storage.s3_async_repository import AsyncS3StorageRepository
+from storage.sqlite_metadata_index import METADATA_INDEX_PATH, SQLiteMetadataIndex
+
+# Storage backend for file routes: "minio" runs the minio SDK on bounded worker
+# threads, "s3-async" uses the native asyncio S3 client
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "minio")
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +51,14 @@ class Container:
 
     def __init__(self):
         self._storage_repo: Optional[StorageRepository] = None
+        self._upload_session_repo: Optional[UploadSessionRepository] = None
         self._minio_client: Optional[MinioClient] = None
+        self._storage_executor: Optional[StorageExecutor] = None
+        self._async_storage_repo: Optional[AsyncStorageRepository] = None
+        self._async_s3_client: Optional[AsyncS3Client] = None
+        self._metadata_index: Optional[MetadataIndexRepository] = None
+        self._upload_staging: Optional[StagingStorageRepository] = None
+        self._download_cache: Optional[DownloadCache] = None
 
     def storage_repository(self) -> StorageRepository:
         """Get the storage repository implementation (singleton pattern)"""
@@ -31,6 +68,72 @@ class Container:
             self._storage_repo = MinioStorageRepository(minio_client)
         return self._storage_repo
 
+    def upload_session_repository(self) -> UploadSessionRepository:
+        """Get the upload session repository implementation (singleton pattern)"""
+        if self._upload_session_repo is None:
+            logger.info(
+                "Initializing UploadSessionRepository with MinIO implementation"
+            )
+            minio_client = self._get_minio_client()
+            self._upload_session_repo = MinioUploadSessionRepository(minio_client)
+        return self._upload_session_repo
+
+    def storage_executor(self) -> StorageExecutor:
+        """Get the executor for blocking storage calls (singleton pattern)"""
+        if self._storage_executor is None:
+            logger.info("Initializing StorageExecutor")
+            self._storage_executor = StorageExecutor()
+        return self._storage_executor
+
+    def async_storage_repository(self) -> AsyncStorageRepository:
+        """Get the native async storage repository (singleton pattern)"""
+        if self._async_storage_repo is None:
+            logger.info("Initializing AsyncStorageRepository with async S3 client")
+            self._async_s3_client = AsyncS3Client()
+            self._async_storage_repo = AsyncS3StorageRepository(self._async_s3_client)
+        return self._async_storage_repo
+
+    def metadata_index(self) -> Optional[MetadataIndexRepository]:
+        """Get the metadata index (singleton pattern), or None if not configured"""
+        if self._metadata_index is None and METADATA_INDEX_PATH:
+            logger.info(f"Initializing MetadataIndex at {METADATA_INDEX_PATH}")
+            self._metadata_index = SQLiteMetadataIndex(METADATA_INDEX_PATH)
+        return self._metadata_index
+
+    def upload_staging(self) -> Optional[StagingStorageRepository]:
+        """Get the write-behind upload staging (singleton pattern), or None if not configured"""
+        if self._upload_staging is None and UPLOAD_STAGING_DIR:
+            logger.info(f"Initializing upload staging in {UPLOAD_STAGING_DIR}")
+            if STORAGE_BACKEND == "s3-async":
+                storage = self.async_storage_repository()
+            else:
+                storage = ThreadedStorageRepository(
+                    self.storage_repository(), self.storage_executor()
+                )
+            self._upload_staging = StagingStorageRepository(storage, UPLOAD_STAGING_DIR)
+        return self._upload_staging
+
+    def download_cache(self) -> Optional[DownloadCache]:
+        """Get the local download cache (singleton pattern), or None if not configured"""
+        if self._download_cache is None and DOWNLOAD_CACHE_DIR:
+            logger.info(f"Initializing download cache in {DOWNLOAD_CACHE_DIR}")
+            self._download_cache = DownloadCache(DOWNLOAD_CACHE_DIR)
+        return self._download_cache
+
+    def bootstrap_metadata_index(self) -> int:
+        """Fill an incomplete metadata index from storage; blocks until done"""
+        return fill_metadata_index(
+            self._get_minio_client(), self.storage_repository(), self.metadata_index()
+        )
+
+    def storage_request_counts(self) -> Dict[str, int]:
+        """Storage API requests issued by all initialized clients, per operation"""
+        counts = Counter()
+        for client in (self._minio_client, self._async_s3_client):
+            if client is not None:
+                counts.update(client.request_counts())
+        return dict(counts)
+
     def _get_minio_client(self) -> MinioClient:
         """Get MinIO client (singleton pattern)"""
         if self._minio_client is None:
@@ -41,7 +144,14 @@ class Container:
     def reset(self):
         """Reset container - useful for testing"""
         self._storage_repo = None
+        self._upload_session_repo = None
         self._minio_client = None
+        self._storage_executor = None
+        self._async_storage_repo = None
+        self._async_s3_client = None
+        self._metadata_index = None
+        self._upload_staging = None
+        self._download_cache = None
 
 
 # Global container instance - initialized at application startup
@@ -53,6 +163,66 @@ def get_storage_repository() -> StorageRepository:
     return container.storage_repository()
 
 
+def get_upload_session_repository() -> UploadSessionRepository:
+    """Dependency injection factory for FastAPI"""
+    return container.upload_session_repository()
+
+
+def get_storage_executor() -> StorageExecutor:
+    """Dependency injection factory for FastAPI"""
+    return container.storage_executor()
+
+
+def get_metadata_index() -> Optional[MetadataIndexRepository]:
+    """Dependency injection factory for FastAPI"""
+    return container.metadata_index()
+
+
+def get_async_metadata_index(
+    index: Optional[MetadataIndexRepository] = Depends(get_metadata_index),
+    executor: StorageExecutor = Depends(get_storage_executor),
+) -> Optional[AsyncMetadataIndexRepository]:
+    """Dependency injection factory for FastAPI, running index calls on the executor"""
+    if index is None:
+        return None
+    return ThreadedMetadataIndex(index, executor)
+
+
+def get_upload_staging() -> Optional[StagingStorageRepository]:
+    """Dependency injection factory for FastAPI"""
+    return container.upload_staging()
+
+
+def get_download_cache() -> Optional[DownloadCache]:
+    """Dependency injection factory for FastAPI"""
+    return container.download_cache()
+
+
+def get_storage_request_counts() -> Dict[str, int]:
+    """Dependency injection factory for FastAPI"""
+    return container.storage_request_counts()
+
+
+def get_async_storage_repository(
+    storage_repo: StorageRepository = Depends(get_storage_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+) -> AsyncStorageRepository:
+    """
+    Dependency injection factory for FastAPI, selected by STORAGE_BACKEND,
+    staged on local disk when UPLOAD_STAGING_DIR is set and cached on local
+    disk when DOWNLOAD_CACHE_DIR is set
+    """
+    storage = container.upload_staging()
+    if storage is None and STORAGE_BACKEND == "s3-async":
+        storage = container.async_storage_repository()
+    elif storage is None:
+        storage = ThreadedStorageRepository(storage_repo, executor)
+    cache = container.download_cache()
+    if cache is not None:
+        return CachingStorageRepository(storage, cache)
+    return storage
+
+
 def reset_container():
     """Reset container - useful for testing"""
     container.reset()
@@ -0,0 +1,422 @@
+# Download cache - keep recently downloaded files on local disk
+#
+# With DOWNLOAD_CACHE_DIR set, whole-file downloads are written to that
+# directory as they stream to the client and later downloads of the same file
+# are served from disk, with sendfile where the server supports it. Entries are
+# keyed by object name and ETag; object names carry an upload timestamp and
+# are never rewritten, so entries only go stale when a file is deleted. An
+# entry is served without asking storage for DOWNLOAD_CACHE_REVALIDATE_SECONDS
+# after it was filled or last checked; after that, the next hit checks once
+# that the file still exists (DOWNLOAD_CACHE_REVALIDATE=false skips the check).
+# The least recently used entries are evicted to keep the cache within
+# DOWNLOAD_CACHE_MAX_BYTES.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import anyio
+import anyio.to_thread
+
+from domain.models import ByteRange, File, FilePage
+from domain.repositories import (
+    AsyncStorageRepository,
+    StorageError,
+    StorageRangeNotSatisfiableError,
+)
+from domain.streams import DEFAULT_CHUNK_SIZE
+
+# Directory downloads are cached in; the cache is disabled when unset
+DOWNLOAD_CACHE_DIR = os.environ.get("DOWNLOAD_CACHE_DIR", "")
+# Total size of cached files
+DOWNLOAD_CACHE_MAX_BYTES = int(
+    os.environ.get("DOWNLOAD_CACHE_MAX_BYTES", 10 * 1024 * 1024 * 1024)
+)
+# Check that a cached file still exists in storage before serving it
+DOWNLOAD_CACHE_REVALIDATE = (
+    os.environ.get("DOWNLOAD_CACHE_REVALIDATE", "true").lower() == "true"
+)
+# Seconds a cached file is served before checking again that it still exists
+DOWNLOAD_CACHE_REVALIDATE_SECONDS = float(
+    os.environ.get("DOWNLOAD_CACHE_REVALIDATE_SECONDS", 60)
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A file held in the cache, with the number of downloads reading it"""
+
+    file: File
+    path: str
+    size: int
+    readers: int = 0
+    # time.monotonic() when storage last confirmed the file, if ever
+    validated_at: Optional[float] = None
+
+
+class DownloadCache:
+    """
+    Size-bounded LRU cache of whole files on local disk.
+
+    Each entry is a data file plus a JSON sidecar with its File metadata, so
+    the cache survives restarts. Fills are written to a temporary file and
+    renamed into place before their sidecar, so neither readers nor a restart
+    see a partial entry. Entries being read are not evicted until their
+    readers release them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DOWNLOAD_CACHE_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._load()
+
+    def _entry_path(self, object_name: str, etag: str) -> str:
+        key = hashlib.sha256(f"{object_name}\0{etag}".encode()).hexdigest()
+        return os.path.join(self._directory, key)
+
+    def _load(self):
+        """Index the entries left by a previous run, oldest first"""
+        entries = []
+        names = set(os.listdir(self._directory))
+        for name in names:
+            path = os.path.join(self._directory, name)
+            if name.endswith(".tmp"):
+                os.remove(path)
+                continue
+            if not name.endswith(".json"):
+                if f"{name}.json" not in names:
+                    # Its fill was interrupted before the sidecar was written
+                    os.remove(path)
+                continue
+            data_path = path[: -len(".json")]
+            try:
+                with open(path) as sidecar:
+                    file = File(**json.load(sidecar))
+                stats = os.stat(data_path)
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Dropping unreadable cache entry {name}: {e}")
+                _remove(path)
+                _remove(data_path)
+                continue
+            entries.append((stats.st_mtime, file, data_path, stats.st_size))
+
+        for _, file, data_path, size in sorted(entries, key=lambda e: e[0]):
+            self._entries[file.object_name] = CacheEntry(file, data_path, size)
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def statistics(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def acquire(self, object_name: str) -> Optional[CacheEntry]:
+        """The cached entry for a file, held until release(), or None"""
+        with self._lock:
+            entry = self._entries.get(object_name)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            entry.readers += 1
+            self._entries.move_to_end(object_name)
+            return entry
+
+    def release(self, entry: CacheEntry):
+        with self._lock:
+            entry.readers -= 1
+            if (
+                entry.readers == 0
+                and self._entries.get(entry.file.object_name) is not entry
+            ):
+                # Replaced or invalidated while it was being read
+                self._delete_files(entry)
+            self._evict()
+
+    def accepts(self, file: File) -> bool:
+        """True if a file can be cached: its identity and size are known and fit"""
+        return bool(file.etag) and file.size is not None and file.size <= self.max_bytes
+
+    def open_fill(self) -> Tuple[str, BinaryIO]:
+        """A temporary file to write a fill to, before commit() or discard()"""
+        descriptor, path = tempfile.mkstemp(suffix=".tmp", dir=self._directory)
+        return path, os.fdopen(descriptor, "wb")
+
+    def commit(self, file: File, temporary_path: str):
+        """Move a completed fill into place as the entry for file"""
+        path = self._entry_path(file.object_name, file.etag)
+        os.replace(temporary_path, path)
+        # The sidecar marks the entry complete for _load, so it lands last and
+        # whole; a data file without one is dropped as an interrupted fill
+        descriptor, sidecar_path = tempfile.mkstemp(suffix=".tmp", dir=self._directory)
+        with os.fdopen(descriptor, "w") as sidecar:
+            json.dump(file.model_dump(), sidecar)
+        os.replace(sidecar_path, f"{path}.json")
+
+        with self._lock:
+            previous = self._entries.pop(file.object_name, None)
+            if previous is not None:
+                self._size -= previous.size
+                if previous.readers == 0 and previous.path != path:
+                    self._delete_files(previous)
+            self._entries[file.object_name] = CacheEntry(
+                file, path, file.size, validated_at=time.monotonic()
+            )
+            self._size += file.size
+            self._evict()
+
+    def discard(self, temporary_path: str):
+        _remove(temporary_path)
+
+    def invalidate(self, object_name: str):
+        """Drop the entry for a file, e.g. once it was deleted or overwritten"""
+        with self._lock:
+            entry = self._entries.pop(object_name, None)
+            if entry is None:
+                return
+            self._size -= entry.size
+            if entry.readers == 0:
+                self._delete_files(entry)
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits its budget"""
+        for object_name, entry in list(self._entries.items()):
+            if self._size <= self.max_bytes:
+                return
+            if entry.readers:
+                continue
+            del self._entries[object_name]
+            self._size -= entry.size
+            self._delete_files(entry)
+
+    @staticmethod
+    def _delete_files(entry: CacheEntry):
+        _remove(entry.path)
+        _remove(f"{entry.path}.json")
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class CachedContent:
+    """
+    Content of a cached file, as the async chunk iterator downloads expect.
+
+    Also exposes the file's path, offset and length so responses can send it
+    straight from disk. aclose() releases the cache entry.
+    """
+
+    def __init__(
+        self, cache: DownloadCache, entry: CacheEntry, offset: int, length: int
+    ):
+        self._cache = cache
+        self._entry = entry
+        self.path = entry.path
+        self.offset = offset
+        self.length = length
+        self._chunks = self._read()
+        self._released = False
+
+    async def _read(self) -> AsyncIterator[bytes]:
+        source = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            await anyio.to_thread.run_sync(source.seek, self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(
+                    source.read, min(remaining, DEFAULT_CHUNK_SIZE)
+                )
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await anyio.to_thread.run_sync(source.close)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        return await self._chunks.__anext__()
+
+    async def aclose(self):
+        try:
+            await self._chunks.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._cache.release(self._entry)
+
+
+async def _fill_while_streaming(
+    cache: DownloadCache, content: AsyncIterator[bytes], file: File
+) -> AsyncIterator[bytes]:
+    """Pass content through, writing it to the cache; kept only if complete"""
+    temporary_path, target = await anyio.to_thread.run_sync(cache.open_fill)
+    written = 0
+    try:
+        async for chunk in content:
+            await anyio.to_thread.run_sync(target.write, chunk)
+            written += len(chunk)
+            yield chunk
+        await anyio.to_thread.run_sync(target.close)
+        if written == file.size:
+            await anyio.to_thread.run_sync(cache.commit, file, temporary_path)
+            temporary_path = None
+    finally:
+        with anyio.CancelScope(shield=True):
+            await content.aclose()
+            if temporary_path is not None:
+                await anyio.to_thread.run_sync(target.close)
+                await anyio.to_thread.run_sync(cache.discard, temporary_path)
+
+
+class CachingStorageRepository:
+    """
+    AsyncStorageRepository serving repeat downloads from a DownloadCache.
+
+    Whole-file downloads that miss are cached as they stream; hits, whole or
+    ranged, are served from disk as CachedContent. Storing or deleting a file
+    through this repository drops its entry. Everything else goes straight
+    through.
+    """
+
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        cache: DownloadCache,
+        revalidate: bool = DOWNLOAD_CACHE_REVALIDATE,
+        revalidate_seconds: float = DOWNLOAD_CACHE_REVALIDATE_SECONDS,
+    ):
+        self._storage = storage
+        self._cache = cache
+        self._revalidate = revalidate
+        self._revalidate_seconds = revalidate_seconds
+
+    async def retrieve_file(
+        self, object_name: str, byte_range: Optional[ByteRange] = None
+    ) -> Tuple[AsyncIterator[bytes], File]:
+        entry = self._cache.acquire(object_name)
+        if entry is not None:
+            try:
+                content = await self._serve_cached(entry, byte_range)
+            except BaseException:
+                self._cache.release(entry)
+                raise
+            if content is not None:
+                return content, entry.file
+            self._cache.release(entry)
+
+        content, file = await self._storage.retrieve_file(object_name, byte_range)
+        if byte_range is None and self._cache.accepts(file):
+            content = _fill_while_streaming(self._cache, content, file)
+        return content, file
+
+    async def _serve_cached(
+        self, entry: CacheEntry, byte_range: Optional[ByteRange]
+    ) -> Optional[CachedContent]:
+        """Cached content for a download, or None if the entry went stale"""
+        object_name = entry.file.object_name
+        if self._revalidate and not await self._still_exists(entry):
+            self._cache.invalidate(object_name)
+            return None
+
+        offset, length = 0, entry.size
+        if byte_range is not None:
+            resolved = byte_range.resolve(entry.size)
+            if resolved is None:
+                raise StorageRangeNotSatisfiableError(
+                    f"Range {byte_range.to_header()} not satisfiable for {object_name}"
+                )
+            offset, length = resolved[0], resolved[1] - resolved[0] + 1
+        return CachedContent(self._cache, entry, offset, length)
+
+    async def _still_exists(self, entry: CacheEntry) -> bool:
+        """False once storage reports the file gone, asking at most once per interval"""
+        now = time.monotonic()
+        if (
+            entry.validated_at is not None
+            and now - entry.validated_at < self._revalidate_seconds
+        ):
+            return True
+        object_name = entry.file.object_name
+        try:
+            exists = await self._storage.file_exists(object_name)
+        except StorageError as e:
+            # Storage being unreachable says nothing about the file; keep it
+            logger.warning(f"Serving {object_name} from cache unchecked: {e}")
+            return True
+        if exists:
+            entry.validated_at = now
+        return exists
+
+    async def store_file(
+        self,
+        file_content: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+        file: File,
+    ) -> bool:
+        self._cache.invalidate(file.object_name)
+        return await self._storage.store_file(file_content, file)
+
+    async def delete_file(self, object_name: str) -> bool:
+        self._cache.invalidate(object_name)
+        return await self._storage.delete_file(object_name)
+
+    async def list_files_in_collection(self, collection: str) -> List[File]:
+        return await self._storage.list_files_in_collection(collection)
+
+    async def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> FilePage:
+        return await self._storage.list_files_page(collection, limit, start_after)
+
+    async def file_exists(self, object_name: str) -> bool:
+        return await self._storage.file_exists(object_name)
+
+    async def content_exists(self, collection: str, sha256: str, size: int) -> bool:
+        return await self._storage.content_exists(collection, sha256, size)
+
+    async def store_reference(self, file: File) -> bool:
+        self._cache.invalidate(file.object_name)
+        return await self._storage.store_reference(file)
+
+    async def update_metadata(self, file: File) -> bool:
+        self._cache.invalidate(file.object_name)
+        return await self._storage.update_metadata(file)
@@ -0,0 +1,222 @@
+# Storage Executor - Runs blocking storage calls off the asyncio event loop
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import anyio
+import anyio.from_thread
+import anyio.to_thread
+
+from domain.models import ByteRange, File, FilePage
+from domain.repositories import MetadataIndexRepository, StorageRepository
+from domain.streams import DEFAULT_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Maximum concurrent worker threads per kind of storage operation. Calls beyond
+# the limit wait in a queue instead of piling more threads onto the process.
+STORAGE_CONCURRENCY = {
+    "upload": int(os.environ.get("STORAGE_UPLOAD_CONCURRENCY", 16)),
+    "download": int(os.environ.get("STORAGE_DOWNLOAD_CONCURRENCY", 32)),
+    "list": int(os.environ.get("STORAGE_LIST_CONCURRENCY", 8)),
+    "delete": int(os.environ.get("STORAGE_DELETE_CONCURRENCY", 8)),
+}
+
+
+@dataclass
+class OperationStats:
+    """Counters for one kind of storage operation"""
+
+    completed: int = 0
+    failed: int = 0
+
+
+class StorageExecutor:
+    """
+    Bounded thread pool for blocking storage work.
+
+    The storage SDK is synchronous, so calling it from an async route blocks
+    every other request on the worker. Each operation kind gets its own
+    capacity limiter: a burst of slow uploads cannot starve downloads or
+    listings, and queue depth per operation is observable.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        limits = limits or STORAGE_CONCURRENCY
+        self._limiters = {
+            operation: anyio.CapacityLimiter(limit)
+            for operation, limit in limits.items()
+        }
+        self._stats = {operation: OperationStats() for operation in limits}
+
+    async def run(self, operation: str, func: Callable[..., T], *args: Any) -> T:
+        """Run func(*args) on a worker thread within the operation's limit"""
+        limiter = self._limiters[operation]
+        stats = self._stats[operation]
+
+        try:
+            result = await anyio.to_thread.run_sync(func, *args, limiter=limiter)
+        except BaseException:
+            stats.failed += 1
+            raise
+
+        stats.completed += 1
+        return result
+
+    async def iterate(
+        self, operation: str, source: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Read a blocking stream in chunks on worker threads, closing it when done"""
+        limiter = self._limiters[operation]
+        try:
+            while chunk := await anyio.to_thread.run_sync(
+                source.read, chunk_size, limiter=limiter
+            ):
+                yield chunk
+        finally:
+            # Release the connection even if the consumer went away mid-stream
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(source.close)
+
+    def statistics(self) -> Dict[str, Dict[str, int]]:
+        """Snapshot of limits, in-flight calls, queue depth and totals per operation"""
+        snapshot = {}
+        for operation, limiter in self._limiters.items():
+            limiter_stats = limiter.statistics()
+            snapshot[operation] = {
+                "limit": int(limiter.total_tokens),
+                "in_flight": limiter_stats.borrowed_tokens,
+                "queued": limiter_stats.tasks_waiting,
+                "completed": self._stats[operation].completed,
+                "failed": self._stats[operation].failed,
+            }
+        return snapshot
+
+
+def iterate_from_thread(chunks: AsyncIterable[bytes]) -> Iterator[bytes]:
+    """Consume an async iterable from a worker thread, one chunk at a time"""
+    iterator = chunks.__aiter__()
+    while True:
+        try:
+            yield anyio.from_thread.run(iterator.__anext__)
+        except StopAsyncIteration:
+            return
+
+
+class ThreadedStorageRepository:
+    """
+    AsyncStorageRepository over a synchronous StorageRepository.
+
+    Each call runs on the executor's bounded worker threads. Async chunk
+    iterables (e.g. a request body stream) are pulled from the event loop by
+    the worker as it uploads, so content is still never fully buffered.
+    """
+
+    def __init__(self, storage: StorageRepository, executor: StorageExecutor):
+        self._storage = storage
+        self._executor = executor
+
+    async def store_file(
+        self,
+        file_content: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+        file: File,
+    ) -> bool:
+        if hasattr(file_content, "__aiter__"):
+            file_content = iterate_from_thread(file_content)
+        return await self._executor.run(
+            "upload", self._storage.store_file, file_content, file
+        )
+
+    async def retrieve_file(
+        self, object_name: str, byte_range: Optional[ByteRange] = None
+    ) -> Tuple[AsyncIterator[bytes], File]:
+        args = (object_name,) if byte_range is None else (object_name, byte_range)
+        file_content, file = await self._executor.run(
+            "download", self._storage.retrieve_file, *args
+        )
+        return self._executor.iterate("download", file_content), file
+
+    async def list_files_in_collection(self, collection: str) -> List[File]:
+        return await self._executor.run(
+            "list", self._storage.list_files_in_collection, collection
+        )
+
+    async def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> FilePage:
+        return await self._executor.run(
+            "list", self._storage.list_files_page, collection, limit, start_after
+        )
+
+    async def delete_file(self, object_name: str) -> bool:
+        return await self._executor.run(
+            "delete", self._storage.delete_file, object_name
+        )
+
+    async def file_exists(self, object_name: str) -> bool:
+        return await self._executor.run(
+            "download", self._storage.file_exists, object_name
+        )
+
+    async def content_exists(self, collection: str, sha256: str, size: int) -> bool:
+        return await self._executor.run(
+            "download", self._storage.content_exists, collection, sha256, size
+        )
+
+    async def store_reference(self, file: File) -> bool:
+        return await self._executor.run("upload", self._storage.store_reference, file)
+
+    async def update_metadata(self, file: File) -> bool:
+        return await self._executor.run("upload", self._storage.update_metadata, file)
+
+
+class ThreadedMetadataIndex:
+    """
+    AsyncMetadataIndexRepository over a synchronous MetadataIndexRepository.
+
+    Index reads and writes run on the executor's worker threads under the
+    limit of the storage operation they accompany, like queries and searches.
+    """
+
+    def __init__(self, index: MetadataIndexRepository, executor: StorageExecutor):
+        self._index = index
+        self._executor = executor
+
+    async def upsert_file(self, file: File) -> None:
+        await self._executor.run("upload", self._index.upsert_file, file)
+
+    async def remove_file(self, object_name: str) -> None:
+        await self._executor.run("delete", self._index.remove_file, object_name)
+
+    async def list_files_in_collection(self, collection: str) -> List[File]:
+        return await self._executor.run(
+            "list", self._index.list_files_in_collection, collection
+        )
+
+    async def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> FilePage:
+        return await self._executor.run(
+            "list", self._index.list_files_page, collection, limit, start_after
+        )
+
+    async def is_complete(self) -> bool:
+        return await self._executor.run("list", self._index.is_complete)
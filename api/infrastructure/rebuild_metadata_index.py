@@ -0,0 +1,126 @@
+# Rebuild the metadata index from the storage bucket
+#
+# Usage (from the api directory):
+#     METADATA_INDEX_PATH=/data/metadata.sqlite3 python -m infrastructure.rebuild_metadata_index
+#
+# Storage listings carry no content types or user metadata, so every object
+# is stat'ed once; stats run on a small thread pool. The index is replaced in
+# a single transaction at the end, so readers see either the old or the new
+# index. Files uploaded while the rebuild runs may be missed; run it again
+# (or while uploads are paused) if that matters.
+#
+# A new, empty index is filled the same way when the API starts (see
+# fill_metadata_index); that keeps entries written while it runs.
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+from domain.models import File
+from domain.repositories import (
+    MetadataIndexRepository,
+    StorageFileNotFoundError,
+    StorageRepository,
+)
+from domain.services import FilePathService
+from storage.minio import MinioClient
+from storage.minio_repository import MinioStorageRepository
+from storage.sqlite_metadata_index import METADATA_INDEX_PATH, SQLiteMetadataIndex
+
+# Listing page size; S3 returns at most 1000 keys per request
+LIST_PAGE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _is_file_key(object_name: str) -> bool:
+    """True for {collection}/{owner}/{file} keys, false for internal objects"""
+    # Internal state (e.g. upload session records) lives under dot-prefixes
+    return not object_name.startswith(".") and (
+        len(object_name.split(FilePathService.PATH_SEPARATOR)) >= 3
+    )
+
+
+def iter_object_names(client: MinioClient) -> Iterator[str]:
+    """Every file key in the bucket, one listing page at a time"""
+    start_after = None
+    while True:
+        objects, has_more = client.list_objects_page(
+            prefix="", limit=LIST_PAGE_SIZE, start_after=start_after
+        )
+        for obj in objects:
+            if _is_file_key(obj["name"]):
+                yield obj["name"]
+        if not has_more:
+            return
+        start_after = objects[-1]["name"]
+
+
+def stat_files(
+    storage: StorageRepository, object_names: Iterable[str], workers: int
+) -> List[File]:
+    """Stat every object concurrently, skipping files deleted in the meantime"""
+
+    def stat(object_name: str) -> Optional[File]:
+        try:
+            return storage.stat_file(object_name)
+        except StorageFileNotFoundError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [file for file in pool.map(stat, object_names) if file is not None]
+
+
+def rebuild_metadata_index(
+    client: MinioClient,
+    storage: StorageRepository,
+    index: MetadataIndexRepository,
+    workers: int = 8,
+) -> int:
+    """Replace the index with the metadata of every file in the bucket"""
+    files = stat_files(storage, iter_object_names(client), workers)
+    return index.replace_all(files)
+
+
+def fill_metadata_index(
+    client: MinioClient,
+    storage: StorageRepository,
+    index: MetadataIndexRepository,
+    workers: int = 8,
+) -> int:
+    """Add every file in the bucket to an index, keeping what it already holds"""
+    files = stat_files(storage, iter_object_names(client), workers)
+    return index.fill(files)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Rebuild the metadata index from the storage bucket"
+    )
+    parser.add_argument(
+        "--path",
+        default=METADATA_INDEX_PATH,
+        help="SQLite index file (default: $METADATA_INDEX_PATH)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent stat requests"
+    )
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("--path or METADATA_INDEX_PATH is required")
+
+    logging.basicConfig(level=logging.INFO)
+    client = MinioClient()
+    index = SQLiteMetadataIndex(args.path)
+    try:
+        count = rebuild_metadata_index(
+            client, MinioStorageRepository(client), index, args.workers
+        )
+    finally:
+        index.close()
+    logger.info(f"Indexed {count} files into {args.path}")
+
+
+if __name__ == "__main__":
+    main()
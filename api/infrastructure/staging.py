@@ -0,0 +1,504 @@
+# Write-behind upload staging - acknowledge uploads once they are on local disk
+#
+# With UPLOAD_STAGING_DIR set, uploads are written to that directory and
+# recorded in an fsync'd journal before the client gets its response.
+# Background workers then copy them to storage, retrying with backoff, so
+# storage outages and latency spikes are absorbed by local disk. Uploads
+# storage still rejects after STAGING_MAX_ATTEMPTS are moved to the "failed"
+# subdirectory for an operator to look at. Until an upload is flushed it is
+# served from the staging directory; uploads still pending when the API stops
+# are flushed after it restarts.
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import anyio
+import anyio.abc
+import anyio.to_thread
+
+from domain.models import ByteRange, File, FilePage
+from domain.repositories import (
+    AsyncStorageRepository,
+    StorageError,
+    StorageRangeNotSatisfiableError,
+)
+from domain.services import FileMetadataService
+from domain.streams import DEFAULT_CHUNK_SIZE
+from infrastructure.executor import iterate_from_thread
+
+# Directory uploads are staged in; staging is disabled when unset
+UPLOAD_STAGING_DIR = os.environ.get("UPLOAD_STAGING_DIR", "")
+# Staged uploads copied to storage at the same time
+STAGING_FLUSH_WORKERS = int(os.environ.get("STAGING_FLUSH_WORKERS", 4))
+# Seconds before retrying a failed flush, doubling per attempt up to the max
+STAGING_RETRY_DELAY = 1.0
+STAGING_MAX_RETRY_DELAY = 60.0
+# Flush attempts before an upload is set aside as failed
+STAGING_MAX_ATTEMPTS = int(os.environ.get("STAGING_MAX_ATTEMPTS", 20))
+
+JOURNAL_NAME = "journal.jsonl"
+FAILED_DIR_NAME = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync_directory(directory: str):
+    """Make renames and new files in a directory durable"""
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class UploadJournal:
+    """
+    Append-only record of staged uploads and their completion.
+
+    Each record is one JSON line, fsync'd before the call returns. Replaying
+    the journal yields the uploads staged but never completed. The journal is
+    rewritten to just those on startup, and whenever its records of completed
+    or superseded entries outnumber the pending ones, so it stays bounded
+    under steady load too.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._path = os.path.join(directory, JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._pending = self._replay()
+        # Records in the journal file, live or not
+        self._records = 0
+        self._journal = self._rewrite()
+
+    def pending(self) -> Dict[str, File]:
+        """Staged uploads not yet completed, by entry id, in staging order"""
+        with self._lock:
+            return dict(self._pending)
+
+    def record_staged(self, entry_id: str, file: File):
+        with self._lock:
+            self._append({"staged": entry_id, "file": file.model_dump()})
+            self._pending[entry_id] = file
+
+    def record_done(self, entry_id: str):
+        with self._lock:
+            if self._pending.pop(entry_id, None) is None:
+                return
+            # Rewriting costs one record per pending entry, so compacting
+            # once as many records are obsolete keeps appends amortized O(1)
+            if self._records + 1 - len(self._pending) > len(self._pending):
+                self._journal.close()
+                self._journal = self._rewrite()
+            else:
+                self._append({"done": entry_id})
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+
+    def _append(self, record: dict):
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._records += 1
+
+    def _replay(self) -> Dict[str, File]:
+        pending: Dict[str, File] = {}
+        if not os.path.exists(self._path):
+            return pending
+        with open(self._path) as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A record torn by a crash was never acknowledged
+                    logger.warning(f"Skipping unreadable journal record: {line!r}")
+                    continue
+                if "staged" in record:
+                    pending[record["staged"]] = File(**record["file"])
+                else:
+                    pending.pop(record.get("done"), None)
+        return pending
+
+    def _rewrite(self):
+        """Replace the journal with the pending records; returns it for appending"""
+        temporary = f"{self._path}.tmp"
+        with open(temporary, "w") as journal:
+            for entry_id, file in self._pending.items():
+                journal.write(
+                    json.dumps({"staged": entry_id, "file": file.model_dump()})
+                )
+                journal.write("\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary, self._path)
+        _fsync_directory(self._directory)
+        self._records = len(self._pending)
+        return open(self._path, "a")
+
+
+@dataclass
+class StagedUpload:
+    """An upload held in the staging directory until storage has it"""
+
+    entry_id: str
+    file: File
+    path: str
+    deleted: bool = False
+    attempts: int = 0
+
+
+def _write_staged(
+    path: str,
+    content: Union[BinaryIO, Iterable[bytes]],
+    directory: str,
+    hash_content: bool = True,
+) -> Tuple[Optional[str], int]:
+    """
+    Write upload content to a staging file and make it durable; returns the
+    SHA-256 (hex, None unless hash_content) and size of what was written
+    """
+    if hasattr(content, "read"):
+        content = iter(lambda: content.read(DEFAULT_CHUNK_SIZE), b"")
+    digest = hashlib.sha256() if hash_content else None
+    size = 0
+    with open(path, "wb") as staged:
+        for chunk in content:
+            staged.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            size += len(chunk)
+        staged.flush()
+        os.fsync(staged.fileno())
+    _fsync_directory(directory)
+    return (digest.hexdigest() if digest else None), size
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _set_aside(entry: StagedUpload, failed_directory: str, error: Exception):
+    """Move a staged upload storage keeps rejecting out of the flush queue"""
+    os.makedirs(failed_directory, exist_ok=True)
+    with open(os.path.join(failed_directory, f"{entry.entry_id}.json"), "w") as record:
+        json.dump({"file": entry.file.model_dump(), "error": str(error)}, record)
+        record.flush()
+        os.fsync(record.fileno())
+    os.replace(entry.path, os.path.join(failed_directory, f"{entry.entry_id}.data"))
+    _fsync_directory(failed_directory)
+
+
+async def _read_staged(
+    source: BinaryIO, start: int, length: int
+) -> AsyncIterator[bytes]:
+    """Stream length bytes of an open staging file, from start"""
+    try:
+        await anyio.to_thread.run_sync(source.seek, start)
+        while length > 0:
+            chunk = await anyio.to_thread.run_sync(
+                source.read, min(length, DEFAULT_CHUNK_SIZE)
+            )
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+    finally:
+        source.close()
+
+
+class StagingStorageRepository:
+    """
+    AsyncStorageRepository that stages uploads on local disk (write-behind).
+
+    store_file returns once the content and its journal record are fsync'd;
+    run() flushes staged uploads to the wrapped repository in the background;
+    failed flushes wait for their retry outside the workers, so uploads storage
+    rejects for good only hold a worker for one attempt at a time. Reads of
+    staged files are served locally, listings include them, and deleting one
+    cancels its flush. Everything else goes straight through.
+    """
+
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        directory: str,
+        workers: int = STAGING_FLUSH_WORKERS,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self._storage = storage
+        self._directory = directory
+        self._workers = workers
+        self._journal = UploadJournal(directory)
+        self._staged: Dict[str, StagedUpload] = {}
+        self._failed_directory = os.path.join(directory, FAILED_DIR_NAME)
+        self._failed = (
+            sum(1 for n in os.listdir(self._failed_directory) if n.endswith(".json"))
+            if os.path.isdir(self._failed_directory)
+            else 0
+        )
+        self._send, self._receive = anyio.create_memory_object_stream(math.inf)
+        self._retries: Optional[anyio.abc.TaskGroup] = None
+        for entry_id, file in self._journal.pending().items():
+            self._stage(StagedUpload(entry_id, file, self._data_path(entry_id)))
+
+    def _data_path(self, entry_id: str) -> str:
+        return os.path.join(self._directory, f"{entry_id}.data")
+
+    def _stage(self, entry: StagedUpload):
+        self._staged[entry.file.object_name] = entry
+        self._send.send_nowait(entry)
+
+    def staged_count(self) -> int:
+        """Uploads acknowledged but not yet flushed to storage"""
+        return len(self._staged)
+
+    def failed_count(self) -> int:
+        """Uploads set aside after storage kept rejecting them"""
+        return self._failed
+
+    async def run(self):
+        """Flush staged uploads to storage until cancelled"""
+        async with anyio.create_task_group() as tg:
+            self._retries = tg
+            for _ in range(self._workers):
+                tg.start_soon(self._flush_worker)
+
+    async def _flush_worker(self):
+        async for entry in self._receive:
+            await self._flush(entry)
+
+    async def _flush(self, entry: StagedUpload):
+        """Copy one staged upload to storage, or schedule its next attempt"""
+        failure: Optional[Exception] = None
+        if not entry.deleted:
+            try:
+                content = await anyio.to_thread.run_sync(open, entry.path, "rb")
+            except FileNotFoundError:
+                logger.error(f"Staged content of {entry.file.object_name} is lost")
+                content = None
+            if content is not None:
+                try:
+                    file = entry.file
+                    await self._storage.store_file(content, file)
+                    if entry.deleted:
+                        # Deleted while it was being flushed
+                        await self._storage.delete_file(file.object_name)
+                    elif entry.file is not file:
+                        # Metadata replaced while it was being flushed
+                        await self._storage.update_metadata(entry.file)
+                except Exception as e:
+                    failure = e
+                finally:
+                    await anyio.to_thread.run_sync(content.close)
+
+        if failure is None:
+            await self._complete(entry)
+            return
+
+        entry.attempts += 1
+        if entry.attempts >= STAGING_MAX_ATTEMPTS:
+            logger.error(
+                f"Flushing {entry.file.object_name} failed {entry.attempts} times,"
+                f" moving it to {self._failed_directory}: {failure}"
+            )
+            await self._fail(entry, failure)
+            return
+        delay = min(
+            STAGING_RETRY_DELAY * 2 ** (entry.attempts - 1), STAGING_MAX_RETRY_DELAY
+        )
+        logger.warning(
+            f"Flushing {entry.file.object_name} failed, retrying in"
+            f" {delay:.0f}s: {failure}"
+        )
+        self._retries.start_soon(self._retry_later, entry, delay)
+
+    async def _retry_later(self, entry: StagedUpload, delay: float):
+        await anyio.sleep(delay)
+        await self._send.send(entry)
+
+    async def _fail(self, entry: StagedUpload, error: Exception):
+        if self._staged.get(entry.file.object_name) is entry:
+            del self._staged[entry.file.object_name]
+        try:
+            await anyio.to_thread.run_sync(
+                _set_aside, entry, self._failed_directory, error
+            )
+        except OSError as e:
+            # Still journaled, so the next start tries it again
+            logger.error(f"Could not set aside {entry.file.object_name}: {e}")
+            return
+        self._failed += 1
+        await anyio.to_thread.run_sync(self._journal.record_done, entry.entry_id)
+
+    async def _complete(self, entry: StagedUpload):
+        if self._staged.get(entry.file.object_name) is entry:
+            del self._staged[entry.file.object_name]
+        await anyio.to_thread.run_sync(self._journal.record_done, entry.entry_id)
+        await anyio.to_thread.run_sync(_remove, entry.path)
+
+    async def store_file(
+        self,
+        file_content: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+        file: File,
+    ) -> bool:
+        entry_id = uuid.uuid4().hex
+        path = self._data_path(entry_id)
+        # Uploads hashed before storing are not hashed again, and neither are
+        # streams that hash what passes through (UploadStream, AsyncUploadStream)
+        stream = file_content if hasattr(file_content, "sha256") else None
+        if hasattr(file_content, "__aiter__"):
+            file_content = iterate_from_thread(file_content)
+        try:
+            sha256, size = await anyio.to_thread.run_sync(
+                _write_staged,
+                path,
+                file_content,
+                self._directory,
+                file.sha256 is None and stream is None,
+            )
+            if stream is not None:
+                sha256 = stream.sha256
+            if file.sha256 is None:
+                # Raw-body uploads only know their digest once streamed; it
+                # must be journaled so flushes after a restart store it too
+                file = file.model_copy(
+                    update={
+                        "sha256": sha256,
+                        "size": size,
+                        "metadata": {
+                            **file.metadata,
+                            FileMetadataService.CHECKSUM_KEY: sha256,
+                        },
+                    }
+                )
+            await anyio.to_thread.run_sync(self._journal.record_staged, entry_id, file)
+        except OSError as e:
+            await anyio.to_thread.run_sync(_remove, path)
+            raise StorageError(f"Failed to stage file: {str(e)}")
+        self._stage(StagedUpload(entry_id, file, path))
+        return True
+
+    async def retrieve_file(
+        self, object_name: str, byte_range: Optional[ByteRange] = None
+    ) -> Tuple[AsyncIterator[bytes], File]:
+        entry = self._staged.get(object_name)
+        if entry is not None:
+            try:
+                # Once open, the content stays readable even if flushed meanwhile
+                source = await anyio.to_thread.run_sync(open, entry.path, "rb")
+            except FileNotFoundError:
+                entry = None
+        if entry is None:
+            return await self._storage.retrieve_file(object_name, byte_range)
+
+        size = os.fstat(source.fileno()).st_size
+        file = entry.file.model_copy(update={"size": size})
+        start, length = 0, size
+        if byte_range is not None:
+            resolved = byte_range.resolve(size)
+            if resolved is None:
+                source.close()
+                raise StorageRangeNotSatisfiableError(
+                    f"Range {byte_range.to_header()} not satisfiable for {object_name}"
+                )
+            start, length = resolved[0], resolved[1] - resolved[0] + 1
+        return _read_staged(source, start, length), file
+
+    def _staged_in(self, collection: str) -> List[File]:
+        prefix = f"{collection}/"
+        return [
+            entry.file
+            for name, entry in self._staged.items()
+            if name.startswith(prefix)
+        ]
+
+    async def list_files_in_collection(self, collection: str) -> List[File]:
+        files = await self._storage.list_files_in_collection(collection)
+        listed = {file.object_name for file in files}
+        staged = [f for f in self._staged_in(collection) if f.object_name not in listed]
+        return sorted(files + staged, key=lambda file: file.object_name)
+
+    async def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> FilePage:
+        page = await self._storage.list_files_page(collection, limit, start_after)
+        listed = {file.object_name for file in page.files}
+        # Staged files past this page's end belong to a later page
+        end = page.next_start_after
+        staged = [
+            file
+            for file in self._staged_in(collection)
+            if file.object_name not in listed
+            and (start_after is None or file.object_name > start_after)
+            and (end is None or file.object_name <= end)
+        ]
+        if not staged:
+            return page
+
+        files = sorted(page.files + staged, key=lambda file: file.object_name)
+        if len(files) > limit:
+            return FilePage(
+                files=files[:limit], next_start_after=files[limit - 1].object_name
+            )
+        return FilePage(files=files, next_start_after=end)
+
+    async def delete_file(self, object_name: str) -> bool:
+        entry = self._staged.pop(object_name, None)
+        if entry is None:
+            return await self._storage.delete_file(object_name)
+        entry.deleted = True
+        await anyio.to_thread.run_sync(self._journal.record_done, entry.entry_id)
+        await anyio.to_thread.run_sync(_remove, entry.path)
+        return True
+
+    async def file_exists(self, object_name: str) -> bool:
+        if object_name in self._staged:
+            return True
+        return await self._storage.file_exists(object_name)
+
+    async def content_exists(self, collection: str, sha256: str, size: int) -> bool:
+        return await self._storage.content_exists(collection, sha256, size)
+
+    async def store_reference(self, file: File) -> bool:
+        return await self._storage.store_reference(file)
+
+    async def update_metadata(self, file: File) -> bool:
+        entry = self._staged.get(file.object_name)
+        if entry is None:
+            return await self._storage.update_metadata(file)
+        if (entry.file.content_type, entry.file.metadata) == (
+            file.content_type,
+            file.metadata,
+        ):
+            return True
+        # Journaled again so the flush, also after a restart, stores it
+        updated = entry.file.model_copy(
+            update={"content_type": file.content_type, "metadata": file.metadata}
+        )
+        await anyio.to_thread.run_sync(
+            self._journal.record_staged, entry.entry_id, updated
+        )
+        entry.file = updated
+        return True
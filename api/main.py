@@ -1,15 +1,67 @@
 import logging
 import os
+from contextlib import asynccontextmanager
+from typing import Optional
 
+import anyio
+import anyio.to_thread
 import uvicorn
-from auth.middleware import get_current_principal
+from auth.middleware import get_current_principal, require_role, token_cache
 from domain.models import AuthenticatedPrincipal, ServiceAccount, User
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import files
+from infrastructure.container import (
+    container,
+    get_download_cache,
+    get_storage_executor,
+    get_storage_request_counts,
+    get_upload_staging,
+)
+from infrastructure.download_cache import DownloadCache
+from infrastructure.executor import StorageExecutor
+from infrastructure.staging import StagingStorageRepository
+from routers import files, search
+
+
+logger = logging.getLogger(__name__)
+
+
+async def bootstrap_metadata_index():
+    """Fill a new metadata index from storage; listings use storage until then"""
+    index = container.metadata_index()
+    if index is None or await anyio.to_thread.run_sync(index.is_complete):
+        return
+    logger.info("Filling the metadata index from storage")
+    try:
+        count = await anyio.to_thread.run_sync(
+            container.bootstrap_metadata_index, abandon_on_cancel=True
+        )
+    except Exception as e:
+        logger.error(f"Failed to fill the metadata index: {e}")
+        return
+    logger.info(f"Indexed {count} files")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Flush staged uploads to storage and fill a new metadata index in the
+    background while the API runs
+    """
+    staging = container.upload_staging()
+    async with anyio.create_task_group() as tg:
+        if staging is not None:
+            tg.start_soon(staging.run)
+        tg.start_soon(bootstrap_metadata_index)
+        yield
+        tg.cancel_scope.cancel()
+
 
 app = FastAPI(
-    title="STUF API", description="Secure Transfer Upload Facility API", version="0.1.0"
+    title="STUF API",
+    description="Secure Transfer Upload Facility API",
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -23,6 +75,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(files.router, prefix="/api/files", tags=["files"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 
 
 @app.get("/api/health")
@@ -39,6 +92,23 @@ def info():
     }
 
 
+@app.get("/api/metrics", dependencies=[Depends(require_role("admin"))])
+def metrics(
+    executor: StorageExecutor = Depends(get_storage_executor),
+    storage_requests: dict = Depends(get_storage_request_counts),
+    staging: Optional[StagingStorageRepository] = Depends(get_upload_staging),
+    download_cache: Optional[DownloadCache] = Depends(get_download_cache),
+):
+    return {
+        "storage_executor": executor.statistics(),
+        "storage_requests": storage_requests,
+        "token_cache": token_cache.statistics(),
+        "staged_uploads": staging.staged_count() if staging else 0,
+        "failed_uploads": staging.failed_count() if staging else 0,
+        "download_cache": download_cache.statistics() if download_cache else None,
+    }
+
+
 @app.get("/api/me")
 def get_current_principal_info(
     current_principal: AuthenticatedPrincipal = Depends(get_current_principal),
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 
@@ -21,15 +22,112 @@ class UploadFileResponse(BaseResponse):
 
     object_name: str = Field(..., description="Generated object name in storage")
     collection: str = Field(..., description="Collection the file was uploaded to")
+    sha256: Optional[str] = Field(None, description="Hex SHA-256 of the content")
     metadata: Dict[str, Any] = Field(
         ..., description="File metadata including upload info"
     )
 
 
+# Hex-encoded SHA-256 digest, as computed by sha256sum
+SHA256_PATTERN = r"^[0-9a-f]{64}$"
+
+
+class ContentDigest(BaseModel):
+    """Digest and size identifying some file content"""
+
+    sha256: str = Field(
+        ..., pattern=SHA256_PATTERN, description="Hex SHA-256 of the content"
+    )
+    size: int = Field(..., ge=0, description="Content size in bytes")
+
+
+class CheckContentRequest(BaseModel):
+    """Request model for checking which contents a collection already holds"""
+
+    collection: str = Field(..., description="Collection the files will go to")
+    files: List[ContentDigest] = Field(..., description="Contents to check")
+
+
+class CheckContentResponse(BaseResponse):
+    """Response model splitting contents into already stored and missing"""
+
+    collection: str = Field(..., description="Collection that was checked")
+    existing: List[ContentDigest] = Field(
+        ..., description="Contents that can be registered without uploading"
+    )
+    missing: List[ContentDigest] = Field(..., description="Contents to upload")
+
+
+class RegisterFileRequest(BaseModel):
+    """Request model for adding a file whose content is already stored"""
+
+    collection: str = Field(..., description="Collection to add the file to")
+    filename: str = Field(..., description="Original filename of the file")
+    content_type: Optional[str] = Field(None, description="MIME type of the file")
+    sha256: str = Field(
+        ..., pattern=SHA256_PATTERN, description="Hex SHA-256 of the content"
+    )
+    size: int = Field(..., ge=0, description="Content size in bytes")
+    metadata: str = Field(default="{}", description="JSON metadata for the file")
+
+
+class StreamUploadFileRequest(BaseModel):
+    """Request model for uploading a file sent as the raw request body"""
+
+    collection: str = Field(..., description="Collection to upload the file to")
+    filename: str = Field(..., description="Original filename of the file")
+    content_type: Optional[str] = Field(None, description="MIME type of the file")
+    metadata: str = Field(default="{}", description="JSON string with metadata")
+
+
+class BatchUploadFileRequest(BaseModel):
+    """Request model for uploading many files to a collection at once"""
+
+    collection: str = Field(..., description="Collection to upload the files to")
+    metadata: str = Field(
+        default="{}",
+        description="JSON object for every file, or array of objects per file",
+    )
+
+
+class ExpandArchiveRequest(BaseModel):
+    """Request model for storing every file of an uploaded archive"""
+
+    collection: str = Field(..., description="Collection to store the files in")
+    content_type: str = Field(..., description="Media type of the archive")
+    metadata: str = Field(default="{}", description="JSON object for every file")
+
+
+class BatchUploadResult(BaseModel):
+    """Outcome of one file of a batch upload"""
+
+    filename: Optional[str] = Field(None, description="Filename as uploaded")
+    status: str = Field(..., description="success or error")
+    object_name: Optional[str] = Field(None, description="Object name in storage")
+    sha256: Optional[str] = Field(None, description="Hex SHA-256 of the content")
+    size: Optional[int] = Field(None, description="File size in bytes")
+    detail: Optional[str] = Field(None, description="Why the file was not stored")
+
+
+class BatchUploadResponse(BaseResponse):
+    """Response model for batch uploads, with one result per file in order"""
+
+    collection: str = Field(..., description="Collection the files went to")
+    uploaded: int = Field(..., description="Number of files stored")
+    failed: int = Field(..., description="Number of files not stored")
+    files: List[BatchUploadResult] = Field(..., description="Result per file")
+
+
 class ListFilesRequest(BaseModel):
     """Request model for listing files in a collection"""
 
     collection: str = Field(..., description="Collection to list files from")
+    limit: Optional[int] = Field(
+        None, description="Maximum number of files to return; omit to list all"
+    )
+    cursor: Optional[str] = Field(
+        None, description="Cursor from a previous page to continue after"
+    )
 
 
 class ListFilesResponse(BaseResponse):
@@ -39,6 +137,50 @@ class ListFilesResponse(BaseResponse):
     files: List[Dict[str, Any]] = Field(
         ..., description="List of files in the collection"
     )
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, absent on the last page"
+    )
+
+
+class QueryFilesRequest(BaseModel):
+    """Request model for querying files in a collection by metadata"""
+
+    collection: str = Field(..., description="Collection to query")
+    owner: Optional[str] = Field(None, description="Only files owned by this owner")
+    content_type: Optional[str] = Field(None, description="Only files of this type")
+    uploaded_after: Optional[datetime] = Field(
+        None, description="Only files uploaded at or after this time"
+    )
+    uploaded_before: Optional[datetime] = Field(
+        None, description="Only files uploaded before this time"
+    )
+    min_size: Optional[int] = Field(None, description="Minimum size in bytes")
+    max_size: Optional[int] = Field(None, description="Maximum size in bytes")
+    metadata: List[str] = Field(
+        default_factory=list,
+        description="User metadata filters in key:value form, all must match",
+    )
+    sort: str = Field("object_name", description="File field to sort by")
+    order: str = Field("asc", description="Sort order, asc or desc")
+    limit: int = Field(100, description="Maximum number of files to return")
+    cursor: Optional[str] = Field(
+        None, description="Cursor from a previous page to continue after"
+    )
+
+
+class SearchFilesRequest(BaseModel):
+    """Request model for full-text search across readable collections"""
+
+    query: str = Field(..., description="Words to search file names and metadata for")
+    limit: int = Field(20, description="Maximum number of files to return")
+    offset: int = Field(0, description="Number of best matches to skip")
+
+
+class SearchFilesResponse(BaseResponse):
+    """Response model for full-text search results"""
+
+    query: str = Field(..., description="Search query that was run")
+    files: List[Dict[str, Any]] = Field(..., description="Matching files, best first")
 
 
 class DownloadFileRequest(BaseModel):
@@ -59,3 +201,79 @@ class DeleteFileResponse(BaseResponse):
     """Response model for file deletion operations"""
 
     pass  # Inherits status and message from BaseResponse
+
+
+class CreateUploadSessionRequest(BaseModel):
+    """Request model for starting a resumable upload session"""
+
+    collection: str = Field(..., description="Collection to upload the file to")
+    filename: str = Field(..., description="Original filename of the upload")
+    content_type: Optional[str] = Field(None, description="MIME type of the file")
+    metadata: str = Field(default="{}", description="JSON metadata for the file")
+
+
+class UploadSessionRequest(BaseModel):
+    """Request model for operations on an existing upload session"""
+
+    collection: str = Field(..., description="Collection the session uploads to")
+    session_id: str = Field(..., description="Upload session identifier")
+
+
+class UploadChunkRequest(UploadSessionRequest):
+    """Request model for uploading one chunk of an upload session"""
+
+    chunk_number: int = Field(
+        ..., ge=1, le=10000, description="1-based position of the chunk"
+    )
+
+
+class UploadSessionResponse(BaseResponse):
+    """Response model describing an upload session and its received chunks"""
+
+    session_id: str = Field(..., description="Upload session identifier")
+    collection: str = Field(..., description="Collection the session uploads to")
+    object_name: str = Field(..., description="Object name the upload will create")
+    chunks: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Chunks received so far"
+    )
+    received_bytes: int = Field(0, description="Total bytes received so far")
+
+
+class UploadChunkResponse(BaseResponse):
+    """Response model for a stored upload session chunk"""
+
+    chunk_number: int = Field(..., description="1-based position of the chunk")
+    size: int = Field(..., description="Chunk size in bytes")
+    etag: str = Field(..., description="Storage ETag of the chunk")
+
+
+class CreatePresignedUploadRequest(CreateUploadSessionRequest):
+    """Request model for a direct-to-storage upload via presigned chunk URLs"""
+
+    chunk_count: int = Field(
+        1, ge=1, le=10000, description="Number of chunks the file will be sent in"
+    )
+    expires: int = Field(
+        3600, ge=60, le=7 * 24 * 3600, description="URL lifetime in seconds"
+    )
+
+
+class PresignChunkRequest(UploadChunkRequest):
+    """Request model for presigning a single chunk URL of an upload session"""
+
+    expires: int = Field(
+        3600, ge=60, le=7 * 24 * 3600, description="URL lifetime in seconds"
+    )
+
+
+class PresignedUploadResponse(BaseResponse):
+    """Response model with presigned URLs for uploading chunks to storage"""
+
+    session_id: str = Field(..., description="Upload session to complete afterwards")
+    collection: str = Field(..., description="Collection the file is uploaded to")
+    object_name: str = Field(..., description="Object name the upload will create")
+    method: str = Field("PUT", description="HTTP method to use with each URL")
+    expires_in: int = Field(..., description="URL lifetime in seconds")
+    urls: List[Dict[str, Any]] = Field(
+        ..., description="Presigned URL for each chunk number"
+    )
@@ -1,41 +1,115 @@
-import io
+import base64
+import json
 import logging
+import secrets
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import anyio
 
 from auth.middleware import get_current_principal
+from domain import File as DomainFile
 from domain import (
+    AsyncMetadataIndexRepository,
+    AsyncStorageRepository,
     AuthenticatedPrincipal,
+    ByteRange,
+    ContentNotFoundError,
     FileDeleteError,
     FileDownloadError,
     FileListingError,
     FileNotFoundError,
     FileUploadError,
     InsufficientPermissionsError,
+    InvalidArchiveError,
+    InvalidCursorError,
     InvalidMetadataError,
-    StorageRepository,
+    InvalidQueryError,
+    InvalidUploadSessionError,
+    MetadataIndexRepository,
+    MetadataIndexUnavailableError,
+    RangeNotSatisfiableError,
+    UnsupportedArchiveError,
+    UploadSession,
+    UploadSessionNotFoundError,
+    UploadSessionRepository,
 )
 from fastapi import (
     APIRouter,
+    Body,
     Depends,
     File,
     Form,
+    Header,
     HTTPException,
+    Path,
+    Query,
+    Request,
     UploadFile,
     status,
 )
-from fastapi.responses import StreamingResponse
-from infrastructure.container import get_storage_repository
+from fastapi.responses import FileResponse, StreamingResponse
+from infrastructure.container import (
+    get_async_metadata_index,
+    get_async_storage_repository,
+    get_metadata_index,
+    get_storage_executor,
+    get_upload_session_repository,
+)
 from public_interfaces import (
+    SHA256_PATTERN,
+    BatchUploadFileRequest,
+    BatchUploadResponse,
+    BatchUploadResult,
+    CheckContentRequest,
+    CheckContentResponse,
+    ContentDigest,
+    CreatePresignedUploadRequest,
+    CreateUploadSessionRequest,
     DeleteFileRequest,
     DownloadFileRequest,
+    ExpandArchiveRequest,
     ListFilesRequest,
     ListFilesResponse,
+    PresignChunkRequest,
+    PresignedUploadResponse,
+    QueryFilesRequest,
+    RegisterFileRequest,
+    StreamUploadFileRequest,
+    UploadChunkRequest,
+    UploadChunkResponse,
     UploadFileRequest,
     UploadFileResponse,
+    UploadSessionRequest,
+    UploadSessionResponse,
 )
+from infrastructure.download_cache import CachedContent
+from infrastructure.executor import StorageExecutor
 from usecases.delete_file import DeleteFileUseCase
 from usecases.download_file import DownloadFileUseCase
-from usecases.list_files import ListFilesUseCase
-from usecases.upload_file import UploadFileUseCase
+from usecases.expand_archive import ExpandArchiveUseCase
+from usecases.list_files import MAX_PAGE_SIZE, ListFilesUseCase
+from usecases.query_files import QueryFilesUseCase
+from usecases.register_file import (
+    MAX_CONTENT_CHECKS,
+    CheckContentUseCase,
+    RegisterFileUseCase,
+)
+from usecases.upload_file import (
+    BatchUploadFileUseCase,
+    StreamUploadFileUseCase,
+    UploadFileUseCase,
+)
+from usecases.upload_session import (
+    MAX_CHUNK_SIZE,
+    AbortUploadSessionUseCase,
+    CompleteUploadSessionUseCase,
+    CreatePresignedUploadUseCase,
+    CreateUploadSessionUseCase,
+    GetUploadSessionUseCase,
+    PresignChunkUseCase,
+    UploadChunkUseCase,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -47,7 +121,8 @@ async def upload_file(
     file: UploadFile = File(...),
     metadata: str = Form("{}"),
     current_user: AuthenticatedPrincipal = Depends(get_current_principal),
-    storage_repo: StorageRepository = Depends(get_storage_repository),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+    index: Optional[AsyncMetadataIndexRepository] = Depends(get_async_metadata_index),
 ):
     """
     Upload a file to a specific collection
@@ -58,7 +133,7 @@ async def upload_file(
     """
     try:
         # Use dependency injection
-        use_case = UploadFileUseCase(storage_repo)
+        use_case = UploadFileUseCase(storage_repo, index)
         request = UploadFileRequest(collection=collection, metadata=metadata)
 
         # Execute use case - returns domain File object
@@ -66,6 +141,437 @@ async def upload_file(
         domain_file = await use_case.execute(request, file, current_user)
 
         # Convert domain result to API response
+        return UploadFileResponse(
+            status="success",
+            message="File uploaded successfully",
+            object_name=domain_file.object_name,
+            collection=domain_file.collection,
+            sha256=domain_file.sha256,
+            metadata=domain_file.metadata,
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidMetadataError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.put("/{collection}/{filename}", response_model=UploadFileResponse)
+async def put_file(
+    collection: str,
+    filename: str,
+    http_request: Request,
+    content_type: Optional[str] = Header(None),
+    metadata: str = Header("{}", alias="X-File-Metadata"),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+    index: Optional[AsyncMetadataIndexRepository] = Depends(get_async_metadata_index),
+):
+    """
+    Upload a file sent as the raw request body
+
+    - **collection**: The collection to upload to (must have write access)
+    - **filename**: Original filename of the file
+    - **body**: The file content, e.g. as `application/octet-stream`
+    - **Content-Type**: MIME type the file is stored with
+    - **X-File-Metadata**: JSON string with additional metadata
+
+    The body is streamed to storage as it arrives, skipping the multipart
+    parsing and spooling of the form upload. Suited to scripted uploads.
+    """
+    try:
+        use_case = StreamUploadFileUseCase(storage_repo, index)
+        request = StreamUploadFileRequest(
+            collection=collection,
+            filename=filename,
+            content_type=content_type,
+            metadata=metadata,
+        )
+        domain_file = await use_case.execute(
+            request, http_request.stream(), current_user
+        )
+        return UploadFileResponse(
+            status="success",
+            message="File uploaded successfully",
+            object_name=domain_file.object_name,
+            collection=domain_file.collection,
+            sha256=domain_file.sha256,
+            metadata=domain_file.metadata,
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidMetadataError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post("/{collection}/batch", response_model=BatchUploadResponse)
+async def upload_files(
+    collection: str,
+    files: List[UploadFile] = File(...),
+    metadata: str = Form("{}"),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+    index: Optional[AsyncMetadataIndexRepository] = Depends(get_async_metadata_index),
+):
+    """
+    Upload many files to a specific collection in one request
+
+    - **collection**: The collection to upload to (must have write access)
+    - **files**: The files to upload (up to 1000), as repeated `files` parts
+    - **metadata**: JSON object applied to every file, or a JSON array with
+      one object per file in upload order
+
+    Files are stored concurrently. One failing file does not fail the
+    batch; each file's outcome is reported in order.
+    """
+    try:
+        use_case = BatchUploadFileUseCase(storage_repo, index)
+        request = BatchUploadFileRequest(collection=collection, metadata=metadata)
+        results = await use_case.execute(request, files, current_user)
+
+        return _batch_upload_response(
+            collection,
+            [(file.filename, result) for file, result in zip(files, results)],
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidMetadataError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/{collection}/archive", response_model=BatchUploadResponse)
+async def expand_archive(
+    collection: str,
+    http_request: Request,
+    metadata: str = Query("{}"),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+    index: Optional[AsyncMetadataIndexRepository] = Depends(get_async_metadata_index),
+):
+    """
+    Upload an archive and store each file in it in a specific collection
+
+    - **collection**: The collection to upload to (must have write access)
+    - **body**: The raw archive; Content-Type selects the format: tar
+      (`application/x-tar`, `application/gzip`, `application/x-bzip2`,
+      `application/x-xz`, `application/zstd`) or `application/zip`
+    - **metadata**: JSON object applied to every file
+
+    The archive is expanded while it streams in and never stored itself.
+    Files are named after their path inside the archive, with directories
+    joined by underscores. Each file's outcome is reported in archive order.
+    """
+    try:
+        use_case = ExpandArchiveUseCase(storage_repo, index)
+        content_type = http_request.headers.get("content-type", "")
+        request = ExpandArchiveRequest(
+            collection=collection,
+            content_type=content_type.split(";")[0].strip().lower(),
+            metadata=metadata,
+        )
+        results = await use_case.execute(request, http_request.stream(), current_user)
+        return _batch_upload_response(collection, results)
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except (InvalidMetadataError, InvalidArchiveError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UnsupportedArchiveError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e)
+        )
+
+
+def _batch_upload_response(
+    collection: str, results: List[Tuple[Optional[str], object]]
+) -> BatchUploadResponse:
+    """Report each file's stored File or error, in upload order"""
+    file_results = []
+    for filename, result in results:
+        if isinstance(result, DomainFile):
+            file_results.append(
+                BatchUploadResult(
+                    filename=filename,
+                    status="success",
+                    object_name=result.object_name,
+                    sha256=result.sha256,
+                    size=result.size,
+                )
+            )
+        else:
+            file_results.append(
+                BatchUploadResult(filename=filename, status="error", detail=str(result))
+            )
+    uploaded = sum(result.status == "success" for result in file_results)
+    return BatchUploadResponse(
+        status="success" if uploaded == len(results) else "partial",
+        message=f"Uploaded {uploaded} of {len(results)} files",
+        collection=collection,
+        uploaded=uploaded,
+        failed=len(results) - uploaded,
+        files=file_results,
+    )
+
+
+@router.post("/{collection}/content-check", response_model=CheckContentResponse)
+async def check_content(
+    collection: str,
+    files: List[ContentDigest] = Body(..., embed=True, max_length=MAX_CONTENT_CHECKS),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+):
+    """
+    Check which file contents a collection already holds
+
+    - **collection**: The collection the files will be uploaded to (must have write access)
+    - **files**: Up to 1000 `{"sha256": ..., "size": ...}` entries
+
+    Contents listed as `existing` can be added with
+    `POST /{collection}/references` instead of being uploaded again.
+    """
+    try:
+        use_case = CheckContentUseCase(storage_repo)
+        request = CheckContentRequest(collection=collection, files=files)
+        existing, missing = await use_case.execute(request, current_user)
+        return CheckContentResponse(
+            status="success",
+            collection=collection,
+            existing=existing,
+            missing=missing,
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post("/{collection}/references", response_model=UploadFileResponse)
+async def register_file(
+    collection: str,
+    filename: str = Form(...),
+    sha256: str = Form(..., pattern=SHA256_PATTERN),
+    size: int = Form(..., ge=0),
+    content_type: str = Form(None),
+    metadata: str = Form("{}"),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+    index: Optional[AsyncMetadataIndexRepository] = Depends(get_async_metadata_index),
+):
+    """
+    Add a file whose content the collection already holds, without uploading it
+
+    - **collection**: The collection to add the file to (must have write access)
+    - **filename**: Original filename of the file
+    - **sha256**: Hex SHA-256 of the content
+    - **size**: Content size in bytes
+    - **content_type**: MIME type of the file
+    - **metadata**: JSON string with additional metadata
+
+    Responds 404 if the collection holds no such content; upload it instead.
+    """
+    try:
+        use_case = RegisterFileUseCase(storage_repo, index)
+        request = RegisterFileRequest(
+            collection=collection,
+            filename=filename,
+            content_type=content_type,
+            sha256=sha256,
+            size=size,
+            metadata=metadata,
+        )
+        domain_file = await use_case.execute(request, current_user)
+        return UploadFileResponse(
+            status="success",
+            message="File registered successfully",
+            object_name=domain_file.object_name,
+            collection=domain_file.collection,
+            sha256=domain_file.sha256,
+            metadata=domain_file.metadata,
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidMetadataError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ContentNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+def _session_response(
+    session: UploadSession, chunks=(), message: str = None
+) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        status="success",
+        message=message,
+        session_id=session.session_id,
+        collection=session.file.collection,
+        object_name=session.file.object_name,
+        chunks=[chunk.model_dump() for chunk in chunks],
+        received_bytes=sum(chunk.size for chunk in chunks),
+    )
+
+
+async def _read_chunk_body(request: Request) -> bytes:
+    """Read a raw chunk body, rejecting it once it exceeds MAX_CHUNK_SIZE"""
+    body = bytearray()
+    async for data in request.stream():
+        body.extend(data)
+        if len(body) > MAX_CHUNK_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Chunk exceeds maximum size of {MAX_CHUNK_SIZE} bytes",
+            )
+    return bytes(body)
+
+
+@router.post("/{collection}/upload-sessions", response_model=UploadSessionResponse)
+async def create_upload_session(
+    collection: str,
+    filename: str = Form(...),
+    content_type: str = Form(None),
+    metadata: str = Form("{}"),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    sessions: UploadSessionRepository = Depends(get_upload_session_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """
+    Start a resumable upload session
+
+    - **collection**: The collection to upload to (must have write access)
+    - **filename**: Original filename of the file being uploaded
+    - **content_type**: MIME type of the file
+    - **metadata**: JSON string with additional metadata
+
+    Chunks are then sent with PUT to
+    `/{collection}/upload-sessions/{session_id}/chunks/{chunk_number}`,
+    numbered from 1. Every chunk except the last must be at least 5 MiB.
+    """
+    try:
+        use_case = CreateUploadSessionUseCase(sessions)
+        request = CreateUploadSessionRequest(
+            collection=collection,
+            filename=filename,
+            content_type=content_type,
+            metadata=metadata,
+        )
+        session = await executor.run("upload", use_case.execute, request, current_user)
+        return _session_response(session, message="Upload session created")
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidMetadataError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.put(
+    "/{collection}/upload-sessions/{session_id}/chunks/{chunk_number}",
+    response_model=UploadChunkResponse,
+)
+async def upload_chunk(
+    collection: str,
+    session_id: str,
+    request: Request,
+    chunk_number: int = Path(..., ge=1, le=10000),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    sessions: UploadSessionRepository = Depends(get_upload_session_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """
+    Upload one chunk of a resumable upload session
+
+    The request body is the raw chunk content. Re-sending a chunk number
+    replaces the earlier attempt.
+    """
+    data = await _read_chunk_body(request)
+
+    try:
+        use_case = UploadChunkUseCase(sessions)
+        chunk_request = UploadChunkRequest(
+            collection=collection, session_id=session_id, chunk_number=chunk_number
+        )
+        chunk = await executor.run(
+            "upload", use_case.execute, chunk_request, data, current_user
+        )
+        return UploadChunkResponse(
+            status="success",
+            message="Chunk uploaded successfully",
+            chunk_number=chunk.chunk_number,
+            size=chunk.size,
+            etag=chunk.etag,
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InvalidUploadSessionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.get(
+    "/{collection}/upload-sessions/{session_id}", response_model=UploadSessionResponse
+)
+async def get_upload_session(
+    collection: str,
+    session_id: str,
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    sessions: UploadSessionRepository = Depends(get_upload_session_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """Get an upload session with the chunks received so far"""
+    try:
+        use_case = GetUploadSessionUseCase(sessions)
+        request = UploadSessionRequest(collection=collection, session_id=session_id)
+        session, chunks = await executor.run(
+            "list", use_case.execute, request, current_user
+        )
+        return _session_response(session, chunks)
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post(
+    "/{collection}/upload-sessions/{session_id}/complete",
+    response_model=UploadFileResponse,
+)
+async def complete_upload_session(
+    collection: str,
+    session_id: str,
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    sessions: UploadSessionRepository = Depends(get_upload_session_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+    index: Optional[MetadataIndexRepository] = Depends(get_metadata_index),
+):
+    """Assemble the received chunks into the final file"""
+    try:
+        use_case = CompleteUploadSessionUseCase(sessions, index)
+        request = UploadSessionRequest(collection=collection, session_id=session_id)
+        domain_file = await executor.run(
+            "upload", use_case.execute, request, current_user
+        )
         return UploadFileResponse(
             status="success",
             message="File uploaded successfully",
@@ -75,6 +581,97 @@ async def upload_file(
         )
     except InsufficientPermissionsError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InvalidUploadSessionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.delete("/{collection}/upload-sessions/{session_id}")
+async def abort_upload_session(
+    collection: str,
+    session_id: str,
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    sessions: UploadSessionRepository = Depends(get_upload_session_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """Abort an upload session and discard its chunks"""
+    try:
+        use_case = AbortUploadSessionUseCase(sessions)
+        request = UploadSessionRequest(collection=collection, session_id=session_id)
+        await executor.run("delete", use_case.execute, request, current_user)
+        return {"status": "success", "message": "Upload session aborted"}
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post("/{collection}/presigned-uploads", response_model=PresignedUploadResponse)
+async def create_presigned_upload(
+    collection: str,
+    filename: str = Form(...),
+    content_type: str = Form(None),
+    metadata: str = Form("{}"),
+    chunk_count: int = Form(1),
+    expires: int = Form(3600),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    sessions: UploadSessionRepository = Depends(get_upload_session_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """
+    Start a direct-to-storage upload
+
+    - **collection**: The collection to upload to (must have write access)
+    - **filename**: Original filename of the file being uploaded
+    - **content_type**: MIME type of the file
+    - **metadata**: JSON string with additional metadata
+    - **chunk_count**: Number of chunks the file will be sent in
+    - **expires**: URL lifetime in seconds (default: 1 hour)
+
+    Returns one presigned PUT URL per chunk. Upload each chunk straight to
+    storage, then finalize with
+    `POST /{collection}/upload-sessions/{session_id}/complete`.
+    Every chunk except the last must be at least 5 MiB.
+    """
+    try:
+        request = CreatePresignedUploadRequest(
+            collection=collection,
+            filename=filename,
+            content_type=content_type,
+            metadata=metadata,
+            chunk_count=chunk_count,
+            expires=expires,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        use_case = CreatePresignedUploadUseCase(sessions)
+        session, urls = await executor.run(
+            "upload", use_case.execute, request, current_user
+        )
+        return PresignedUploadResponse(
+            status="success",
+            message="Presigned upload created",
+            session_id=session.session_id,
+            collection=session.file.collection,
+            object_name=session.file.object_name,
+            expires_in=request.expires,
+            urls=[
+                {"chunk_number": chunk_number, "url": url} for chunk_number, url in urls
+            ],
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except InvalidMetadataError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except FileUploadError as e:
@@ -83,79 +680,424 @@ async def upload_file(
         )
 
 
+@router.get(
+    "/{collection}/upload-sessions/{session_id}/chunks/{chunk_number}/presigned-url"
+)
+async def presign_chunk_url(
+    collection: str,
+    session_id: str,
+    chunk_number: int = Path(..., ge=1, le=10000),
+    expires: int = Query(3600, ge=60, le=7 * 24 * 3600),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    sessions: UploadSessionRepository = Depends(get_upload_session_repository),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """Get a fresh presigned URL for one chunk, e.g. after the first one expired"""
+    try:
+        use_case = PresignChunkUseCase(sessions)
+        request = PresignChunkRequest(
+            collection=collection,
+            session_id=session_id,
+            chunk_number=chunk_number,
+            expires=expires,
+        )
+        url = await executor.run("upload", use_case.execute, request, current_user)
+        return {
+            "status": "success",
+            "chunk_number": chunk_number,
+            "url": url,
+            "expires_in": expires,
+        }
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except FileUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.get("/{collection}/query", response_model=ListFilesResponse)
+async def query_files(
+    collection: str,
+    owner: Optional[str] = Query(None, description="Only files owned by this owner"),
+    content_type: Optional[str] = Query(None, description="Only files of this type"),
+    uploaded_after: Optional[datetime] = Query(
+        None, description="Only files uploaded at or after this time"
+    ),
+    uploaded_before: Optional[datetime] = Query(
+        None, description="Only files uploaded before this time"
+    ),
+    min_size: Optional[int] = Query(None, ge=0, description="Minimum size in bytes"),
+    max_size: Optional[int] = Query(None, ge=0, description="Maximum size in bytes"),
+    metadata: List[str] = Query(
+        [], description="User metadata filter as key:value; repeat to combine"
+    ),
+    sort: str = Query("object_name", description="Field to sort by"),
+    order: str = Query("asc", description="asc or desc"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Files per page"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page"
+    ),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    index: Optional[MetadataIndexRepository] = Depends(get_metadata_index),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """
+    Filter and sort the files of a collection using the metadata index
+
+    - **owner**, **content_type**: exact matches
+    - **uploaded_after**, **uploaded_before**: upload time range
+    - **min_size**, **max_size**: size range in bytes
+    - **metadata**: user metadata supplied at upload, e.g. `metadata=license:CC-BY`
+    - **sort**: object_name, original_filename, owner, upload_time, content_type
+      or size; **order**: asc or desc
+    """
+    try:
+        use_case = QueryFilesUseCase(index)
+        request = QueryFilesRequest(
+            collection=collection,
+            owner=owner,
+            content_type=content_type,
+            uploaded_after=uploaded_after,
+            uploaded_before=uploaded_before,
+            min_size=min_size,
+            max_size=max_size,
+            metadata=metadata,
+            sort=sort,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+        )
+        domain_files, next_cursor = await executor.run(
+            "list", use_case.execute, request, current_user
+        )
+        return ListFilesResponse(
+            status="success",
+            collection=collection,
+            files=[file.to_api_dict() for file in domain_files],
+            next_cursor=next_cursor,
+        )
+    except InsufficientPermissionsError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except (InvalidQueryError, InvalidCursorError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except MetadataIndexUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    except FileListingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that closes its content stream even if the client disconnects"""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
+
+
+class _CachedFileResponse(FileResponse):
+    """FileResponse for a download cache hit, releasing the entry once sent"""
+
+    def __init__(self, content: CachedContent, **kwargs):
+        super().__init__(content.path, **kwargs)
+        self.content = content
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.content.aclose()
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def _ndjson_lines(files: AsyncIterator[DomainFile]) -> AsyncIterator[bytes]:
+    """Serialize files as newline-delimited JSON, one object per line"""
+    try:
+        async for file in files:
+            yield json.dumps(file.to_api_dict(), default=str).encode() + b"\n"
+    except FileListingError as e:
+        # Headers are already sent; aborting the body is all that is left
+        logger.error(f"Streaming listing failed: {e}")
+        raise
+    finally:
+        await files.aclose()
+
+
 @router.get("/{collection}", response_model=ListFilesResponse)
 async def list_files(
     collection: str,
+    http_request: Request,
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Maximum files per page"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page"
+    ),
     current_user: AuthenticatedPrincipal = Depends(get_current_principal),
-    storage_repo: StorageRepository = Depends(get_storage_repository),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+    index: Optional[AsyncMetadataIndexRepository] = Depends(get_async_metadata_index),
 ):
     """
     List files in a specific collection
 
     - **collection**: The collection to list files from (must have read access)
+    - **limit**: Return at most this many files, plus a cursor for the next page
+    - **cursor**: Continue after the page that returned this cursor
+
+    Send `Accept: application/x-ndjson` to stream every file in the collection
+    as newline-delimited JSON instead; entries are written as storage listing
+    pages arrive, and limit and cursor do not apply.
     """
     try:
         # Use dependency injection
-        use_case = ListFilesUseCase(storage_repo)
-        request = ListFilesRequest(collection=collection)
+        use_case = ListFilesUseCase(storage_repo, index)
+        request = ListFilesRequest(collection=collection, limit=limit, cursor=cursor)
+
+        if NDJSON_MEDIA_TYPE in http_request.headers.get("accept", ""):
+            files = await use_case.stream(request, current_user)
+            return _ClosingStreamingResponse(
+                _ndjson_lines(files), media_type=NDJSON_MEDIA_TYPE
+            )
 
-        # Execute use case - returns list of domain File objects
-        domain_files = use_case.execute(request, current_user)
+        # Execute use case - returns domain File objects and the next cursor
+        domain_files, next_cursor = await use_case.execute(request, current_user)
 
         # Convert domain results to API response
         files_data = [file.to_api_dict() for file in domain_files]
         return ListFilesResponse(
-            status="success", collection=collection, files=files_data
+            status="success",
+            collection=collection,
+            files=files_data,
+            next_cursor=next_cursor,
         )
     except InsufficientPermissionsError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except FileListingError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
 
 
+# Requests with more ranges than this are served as a whole file
+MAX_RANGES = 16
+
+
+def _parse_range_header(value: str) -> Optional[List[ByteRange]]:
+    """Parse a bytes Range header; None means it should be ignored"""
+    unit, _, specs = value.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        start, separator, end = spec.strip().partition("-")
+        if not separator or not (start or end):
+            return None
+        if (start and not start.isdigit()) or (end and not end.isdigit()):
+            return None
+        byte_range = ByteRange(
+            start=int(start) if start else None, end=int(end) if end else None
+        )
+        if start and end and byte_range.end < byte_range.start:
+            return None
+        ranges.append(byte_range)
+
+    return ranges if len(ranges) <= MAX_RANGES else None
+
+
+def _download_headers(file: DomainFile, object_name: str) -> Dict[str, str]:
+    # Extract original filename from metadata or use fallback
+    original_filename = (
+        file.metadata.get("original_filename")
+        or file.original_filename
+        or object_name.split("/")[-1]
+        or "download"
+    )
+    headers = {
+        "Content-Disposition": f"attachment; filename={original_filename}",
+        "Accept-Ranges": "bytes",
+    }
+    if file.etag:
+        headers["ETag"] = f'"{file.etag}"'
+    if file.sha256:
+        # RFC 3230 instance digest: base64 of the whole file's SHA-256
+        digest = base64.b64encode(bytes.fromhex(file.sha256)).decode()
+        headers["Digest"] = f"sha-256={digest}"
+    return headers
+
+
+async def _partial_content_response(
+    fetch, ranges: List[ByteRange], if_range: Optional[str], object_name: str
+) -> Optional[StreamingResponse]:
+    """
+    Build a 206 response for the requested ranges.
+
+    Returns None when the whole file should be served instead, i.e. when an
+    If-Range validator no longer matches. Only entity tags are supported as
+    validators; a date never matches, which also means "send everything".
+    """
+    if if_range is not None and not if_range.strip().startswith('"'):
+        return None
+
+    # Open the first satisfiable range; it also tells us the total size
+    for index, byte_range in enumerate(ranges):
+        try:
+            content, file = await fetch(byte_range)
+            break
+        except RangeNotSatisfiableError:
+            continue
+    else:
+        raise RangeNotSatisfiableError("None of the requested ranges are satisfiable")
+
+    if file.size is None or (
+        if_range is not None and if_range.strip() != f'"{file.etag}"'
+    ):
+        await content.aclose()
+        return None
+
+    resolved = [
+        (byte_range, positions)
+        for byte_range in ranges[index:]
+        if (positions := byte_range.resolve(file.size)) is not None
+    ]
+    if not resolved:
+        await content.aclose()
+        raise RangeNotSatisfiableError("None of the requested ranges are satisfiable")
+
+    headers = _download_headers(file, object_name)
+
+    if len(resolved) == 1:
+        first, last = resolved[0][1]
+        headers["Content-Range"] = f"bytes {first}-{last}/{file.size}"
+        headers["Content-Length"] = str(last - first + 1)
+        return _ClosingStreamingResponse(
+            content,
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=file.content_type,
+            headers=headers,
+        )
+
+    boundary = secrets.token_hex(16)
+    part_headers = [
+        (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {file.content_type}\r\n"
+            f"Content-Range: bytes {first}-{last}/{file.size}\r\n\r\n"
+        ).encode()
+        for _, (first, last) in resolved
+    ]
+    closing = f"\r\n--{boundary}--\r\n".encode()
+    headers["Content-Length"] = str(
+        sum(len(part) for part in part_headers)
+        + sum(last - first + 1 for _, (first, last) in resolved)
+        + len(closing)
+    )
+
+    async def multipart_body():
+        stream = content
+        try:
+            for number, (_, (first, last)) in enumerate(resolved):
+                if number:
+                    # One ranged storage read per part, opened as it is reached
+                    stream, _ = await fetch(ByteRange(start=first, end=last))
+                yield part_headers[number]
+                async for chunk in stream:
+                    yield chunk
+                await stream.aclose()
+            yield closing
+        finally:
+            await stream.aclose()
+
+    return _ClosingStreamingResponse(
+        multipart_body(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+    )
+
+
 @router.get("/{collection}/{object_name:path}")
 async def download_file(
     collection: str,
     object_name: str,
+    http_request: Request,
+    verify: bool = Query(
+        False, description="Check whole-file downloads against their checksum"
+    ),
     current_user: AuthenticatedPrincipal = Depends(get_current_principal),
-    storage_repo: StorageRepository = Depends(get_storage_repository),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
 ):
     """
     Download a file from a specific collection
 
     - **collection**: The collection the file belongs to (must have read access)
     - **object_name**: The object name in storage
+    - **verify**: Verify content against the SHA-256 recorded at upload while
+      streaming; a mismatch aborts the response before its last chunk
+
+    Supports `Range` (including multiple ranges) and `If-Range` for resuming
+    downloads and reading parts of large files. The `Digest` header carries
+    the SHA-256 of the whole file when one was recorded.
     """
     try:
         # Use dependency injection
         use_case = DownloadFileUseCase(storage_repo)
         request = DownloadFileRequest(collection=collection, object_name=object_name)
 
-        # Execute use case - returns content and domain File object
-        file_content, file_metadata = use_case.execute(request, current_user)
+        def fetch(byte_range: Optional[ByteRange] = None):
+            return use_case.execute(request, current_user, byte_range)
+
+        range_header = http_request.headers.get("range")
+        ranges = _parse_range_header(range_header) if range_header else None
+        if ranges:
+            response = await _partial_content_response(
+                fetch, ranges, http_request.headers.get("if-range"), object_name
+            )
+            if response is not None:
+                return response
 
-        # Extract original filename from metadata or use fallback
-        original_filename = (
-            file_metadata.metadata.get("original_filename")
-            or file_metadata.original_filename
-            or object_name.split("/")[-1]
-            or "download"
+        # Execute use case - returns content and domain File object
+        file_content, file_metadata = await use_case.execute(
+            request, current_user, verify=verify
         )
 
-        # Create StreamingResponse from domain objects
-        return StreamingResponse(
-            io.BytesIO(file_content.read()),
-            media_type=file_metadata.content_type,
-            headers={
-                "Content-Disposition": f"attachment; filename={original_filename}"
-            },
+        headers = _download_headers(file_metadata, object_name)
+        if file_metadata.size is not None:
+            headers["Content-Length"] = str(file_metadata.size)
+
+        if isinstance(file_content, CachedContent) and range_header is None:
+            # Sent from the local copy, by the server itself where it supports
+            # the ASGI pathsend extension
+            return _CachedFileResponse(
+                file_content, media_type=file_metadata.content_type, headers=headers
+            )
+
+        # Stream content from storage as the client reads it
+        return _ClosingStreamingResponse(
+            file_content, media_type=file_metadata.content_type, headers=headers
         )
     except InsufficientPermissionsError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except FileNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except RangeNotSatisfiableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, detail=str(e)
+        )
     except FileDownloadError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -209,7 +1151,8 @@ async def delete_file(
     collection: str,
     object_name: str,
     current_user: AuthenticatedPrincipal = Depends(get_current_principal),
-    storage_repo: StorageRepository = Depends(get_storage_repository),
+    storage_repo: AsyncStorageRepository = Depends(get_async_storage_repository),
+    index: Optional[AsyncMetadataIndexRepository] = Depends(get_async_metadata_index),
 ):
     """Delete a file from a specific collection"""
 
@@ -223,11 +1166,11 @@ async def delete_file(
     try:
         # Use dependency injection
         # Execute delete operation
-        use_case = DeleteFileUseCase(storage_repo)
+        use_case = DeleteFileUseCase(storage_repo, index)
         delete_request = DeleteFileRequest(
             collection=collection, object_name=object_name
         )
-        use_case.execute(delete_request, current_user)
+        await use_case.execute(delete_request, current_user)
 
         return {"status": "success", "message": "File deleted successfully"}
 
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from auth.middleware import get_current_principal
+from domain import (
+    AuthenticatedPrincipal,
+    FileListingError,
+    MetadataIndexRepository,
+    MetadataIndexUnavailableError,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from infrastructure.container import get_metadata_index, get_storage_executor
+from infrastructure.executor import StorageExecutor
+from public_interfaces import SearchFilesRequest, SearchFilesResponse
+from usecases.search_files import SearchFilesUseCase
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchFilesResponse)
+async def search_files(
+    q: str = Query(..., min_length=1, max_length=256, description="Search words"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of files"),
+    offset: int = Query(0, ge=0, le=1000, description="Best matches to skip"),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
+    index: Optional[MetadataIndexRepository] = Depends(get_metadata_index),
+    executor: StorageExecutor = Depends(get_storage_executor),
+):
+    """
+    Search file names and upload metadata in every collection you can read
+
+    Every word must match (the last one as a prefix); results are ranked
+    with file name matches weighted above metadata matches.
+    """
+    try:
+        use_case = SearchFilesUseCase(index)
+        request = SearchFilesRequest(query=q, limit=limit, offset=offset)
+        domain_files = await executor.run(
+            "list", use_case.execute, request, current_user
+        )
+        return SearchFilesResponse(
+            status="success",
+            query=q,
+            files=[file.to_api_dict() for file in domain_files],
+        )
+    except MetadataIndexUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+    except FileListingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
@@ -0,0 +1,95 @@
+# Content-addressed storage - identical uploads share one stored blob
+#
+# Each distinct content is stored once, under a key derived from its SHA-256:
+#
+#     .blobs/sha256/{digest}/data                  the content
+#     .blobs/sha256/{digest}/refs/{object name}    one empty marker per reference
+#
+# The object at the file's own path ({collection}/{owner}/{timestamp}-{name})
+# becomes an empty reference carrying the file's content type and metadata,
+# plus the digest and size of the blob it points to. Deleting a file removes
+# its reference and marker but leaves the blob; blobs without markers, and
+# markers a failed delete left behind, are reclaimed by
+# infrastructure.collect_blobs.
+
+import os
+from typing import Dict, NamedTuple, Optional
+
+from domain.services import FileMetadataService
+
+# Set to "false" to store every upload as a plain object again. References
+# written while enabled keep working either way.
+CONTENT_DEDUP_ENABLED = (
+    os.environ.get("CONTENT_DEDUP_ENABLED", "true").lower() == "true"
+)
+
+BLOB_PREFIX = ".blobs/sha256/"
+
+# Reference metadata keys, in storage (x-amz-meta-*) form
+CONTENT_SHA256_KEY = "content-sha256"
+CONTENT_SIZE_KEY = "content-size"
+
+
+class ContentReference(NamedTuple):
+    """The blob a reference object points to"""
+
+    sha256: str
+    size: int
+
+
+def blob_key(sha256: str) -> str:
+    """Key of the blob holding the content with this digest"""
+    return f"{BLOB_PREFIX}{sha256}/data"
+
+
+def blob_refs_prefix(sha256: str) -> str:
+    """Prefix under which the references to a blob are recorded"""
+    return f"{BLOB_PREFIX}{sha256}/refs/"
+
+
+def collection_refs_prefix(sha256: str, collection: str) -> str:
+    """Prefix of the references to a blob from files of one collection"""
+    return f"{blob_refs_prefix(sha256)}{collection}/"
+
+
+def blob_ref_key(sha256: str, object_name: str) -> str:
+    """Marker recording that object_name references the blob"""
+    return f"{blob_refs_prefix(sha256)}{object_name}"
+
+
+def reference_metadata(reference: ContentReference) -> Dict[str, str]:
+    """Metadata that turns an object into a reference to a blob"""
+    return {
+        CONTENT_SHA256_KEY: reference.sha256,
+        CONTENT_SIZE_KEY: str(reference.size),
+    }
+
+
+def content_reference(metadata: Optional[dict]) -> Optional[ContentReference]:
+    """The blob an object references, from its user metadata, or None"""
+    metadata = {key.lower(): value for key, value in (metadata or {}).items()}
+    sha256 = metadata.get(CONTENT_SHA256_KEY)
+    size = metadata.get(CONTENT_SIZE_KEY)
+    if not sha256 or size is None:
+        return None
+    try:
+        return ContentReference(sha256, int(size))
+    except ValueError:
+        return None
+
+
+def content_sha256(metadata: Optional[dict]) -> Optional[str]:
+    """Checksum of an object's content: its blob digest, or the one from upload"""
+    reference = content_reference(metadata)
+    if reference is not None:
+        return reference.sha256
+    return (metadata or {}).get(FileMetadataService.CHECKSUM_KEY)
+
+
+def without_reference_metadata(metadata: Optional[dict]) -> dict:
+    """User metadata as the file was uploaded, without the reference keys"""
+    return {
+        key: value
+        for key, value in (metadata or {}).items()
+        if key.lower() not in (CONTENT_SHA256_KEY, CONTENT_SIZE_KEY)
+    }
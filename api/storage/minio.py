@@ -1,10 +1,19 @@
 import logging
 import os
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import timedelta
-from typing import List, BinaryIO
+from itertools import chain, islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from minio import Minio
+import certifi
+import urllib3
+from minio import Minio, time
+from minio.commonconfig import REPLACE, CopySource
+from minio.datatypes import Object, Part
 from minio.error import S3Error
+from minio.helpers import genheaders
 
 # MinIO configuration
 MINIO_ENDPOINT = os.environ.get("MINIO_ENDPOINT", "localhost:9000")
@@ -12,21 +21,332 @@ MINIO_ACCESS_KEY = os.environ.get("MINIO_ROOT_USER", "minioadmin")
 MINIO_SECRET_KEY = os.environ.get("MINIO_ROOT_PASSWORD", "minioadmin")
 MINIO_SECURE = os.environ.get("MINIO_SECURE", "false").lower() == "true"
 
+# Endpoint clients use to reach MinIO directly (presigned URLs). Signatures
+# cover the host, so this must be the address clients see, not the internal one.
+MINIO_PUBLIC_ENDPOINT = os.environ.get("MINIO_PUBLIC_ENDPOINT", MINIO_ENDPOINT)
+MINIO_PUBLIC_SECURE = (
+    os.environ.get("MINIO_PUBLIC_SECURE", str(MINIO_SECURE)).lower() == "true"
+)
+# Region used for signing; set explicitly so presigning needs no network call
+MINIO_REGION = os.environ.get("MINIO_REGION", "us-east-1")
+
 # Default bucket name
 MINIO_BUCKET_NAME = os.environ.get("MINIO_BUCKET_NAME", "stuf-uploads")
 
+# Multipart part size for streamed uploads of unknown length (S3 minimum is 5 MiB)
+MINIO_PART_SIZE = int(os.environ.get("MINIO_PART_SIZE", 16 * 1024 * 1024))
+
+# Uploads larger than this send their parts over several connections at once
+MINIO_PARALLEL_UPLOAD_THRESHOLD = int(
+    os.environ.get("MINIO_PARALLEL_UPLOAD_THRESHOLD", 64 * 1024 * 1024)
+)
+# Parts of one upload in flight at once; each holds one part in memory
+MINIO_UPLOAD_PARALLELISM = int(os.environ.get("MINIO_UPLOAD_PARALLELISM", 4))
+# Downloads larger than this fetch several ranges of the object at once
+MINIO_PARALLEL_DOWNLOAD_THRESHOLD = int(
+    os.environ.get("MINIO_PARALLEL_DOWNLOAD_THRESHOLD", 64 * 1024 * 1024)
+)
+# Size of each range a parallel download fetches
+MINIO_DOWNLOAD_SEGMENT_SIZE = int(
+    os.environ.get("MINIO_DOWNLOAD_SEGMENT_SIZE", 8 * 1024 * 1024)
+)
+# Ranges of one download fetched ahead of the reader; each is held in memory
+MINIO_DOWNLOAD_PARALLELISM = int(os.environ.get("MINIO_DOWNLOAD_PARALLELISM", 4))
+
+# Worker threads shared by the parallel transfers of every request; parts and
+# ranges beyond this wait in a queue instead of adding threads
+MINIO_TRANSFER_THREADS = int(os.environ.get("MINIO_TRANSFER_THREADS", 32))
+
+# Most parts S3 accepts in one multipart upload
+MAX_PARTS = 10000
+# Connections kept open to MinIO (the SDK default of 10 is too few for
+# concurrent uploads each sending several parts)
+MINIO_MAX_CONNECTIONS = int(os.environ.get("MINIO_MAX_CONNECTIONS", 64))
+
 
 logger = logging.getLogger(__name__)
 
 
+def _http_client() -> urllib3.PoolManager:
+    """The SDK's default connection pool, sized to MINIO_MAX_CONNECTIONS"""
+    timeout = timedelta(minutes=5).seconds
+    return urllib3.PoolManager(
+        timeout=urllib3.util.Timeout(connect=timeout, read=timeout),
+        maxsize=MINIO_MAX_CONNECTIONS,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+        ),
+    )
+
+
+_transfer_pool: Optional[ThreadPoolExecutor] = None
+_transfer_pool_lock = threading.Lock()
+
+
+def _get_transfer_pool() -> ThreadPoolExecutor:
+    """The process-wide pool parallel part uploads and ranged GETs run on"""
+    global _transfer_pool
+    with _transfer_pool_lock:
+        if _transfer_pool is None:
+            _transfer_pool = ThreadPoolExecutor(
+                MINIO_TRANSFER_THREADS, thread_name_prefix="minio-transfer"
+            )
+        return _transfer_pool
+
+
+def _read_part(reader, size: int) -> bytes:
+    """Read size bytes, or up to the end of the stream, across short reads"""
+    data = reader.read(size)
+    if not data or len(data) >= size:
+        return data
+    # Short reads are joined once at the end, not concatenated one by one
+    pieces = [data]
+    remaining = size - len(data)
+    while remaining > 0:
+        more = reader.read(remaining)
+        if not more:
+            break
+        pieces.append(more)
+        remaining -= len(more)
+    return b"".join(pieces)
+
+
+def _iter_parts(reader, part_size: int) -> Iterator[bytes]:
+    """Consecutive parts of a stream; only the last may be shorter"""
+    while True:
+        part = _read_part(reader, part_size)
+        if part:
+            yield part
+        if len(part) < part_size:
+            return
+
+
+class _IterableReader:
+    """
+    File-like adapter over an iterable of byte chunks.
+
+    put_object() only accepts objects with a read() method; this lets a chunk
+    iterator be streamed into it while holding at most one chunk of leftover
+    data between reads.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        # Appending and consuming from the front are amortized O(1) on a
+        # bytearray, so assembling a part costs one copy per byte
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            for chunk in self._chunks:
+                self._buffer += chunk
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            return data
+
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            if not self._buffer and len(chunk) == size:
+                return chunk
+            self._buffer += chunk
+
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+METADATA_HEADER_PREFIX = "x-amz-meta-"
+
+
+def _user_metadata(headers) -> Dict[str, str]:
+    """User metadata (x-amz-meta-*) from object response headers"""
+    return {
+        key[len(METADATA_HEADER_PREFIX) :].lower(): value
+        for key, value in headers.items()
+        if key.lower().startswith(METADATA_HEADER_PREFIX)
+    }
+
+
+def _object_from_headers(bucket_name: str, object_name: str, headers) -> Object:
+    """Object stats from GET response headers, as stat_object would return them"""
+    # Partial responses report the total size after the slash
+    content_range = headers.get("content-range")
+    size = (
+        content_range.rpartition("/")[2]
+        if content_range
+        else headers.get("content-length", "0")
+    )
+    last_modified = headers.get("last-modified")
+
+    return Object(
+        bucket_name,
+        object_name,
+        last_modified=time.from_http_header(last_modified) if last_modified else None,
+        etag=headers.get("etag", "").replace('"', ""),
+        size=int(size),
+        content_type=headers.get("content-type"),
+        metadata=_user_metadata(headers),
+    )
+
+
+def _listing_entry(obj: Object) -> dict:
+    """Listing entry for an object, with its user metadata if listed"""
+    return {
+        "name": obj.object_name,
+        "size": obj.size,
+        "last_modified": obj.last_modified,
+        "metadata": _user_metadata(obj.metadata or {}),
+    }
+
+
+class ObjectStream:
+    """
+    File-like reader over a streaming GET response.
+
+    Content is read from the socket as the caller consumes it. close() must
+    be called to return the connection to the pool, whether or not the
+    stream was read to the end.
+    """
+
+    def __init__(self, response):
+        self._response = response
+
+    def read(self, size: int = -1) -> bytes:
+        return self._response.read(None if size is None or size < 0 else size)
+
+    def close(self):
+        self._response.close()
+        self._response.release_conn()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParallelRangeReader:
+    """
+    File-like reader over a span of an object fetched as concurrent ranged GETs.
+
+    The span is split into MINIO_DOWNLOAD_SEGMENT_SIZE segments. The first is
+    read from a stream the caller already opened at the span's start; the
+    others are fetched with ranged GETs pinned to the object's ETag, up to
+    MINIO_DOWNLOAD_PARALLELISM segments ahead of the reader, on the transfer
+    pool shared with part uploads. Segments are handed out in order, so the
+    reorder buffer never holds more than that many. close() stops fetching,
+    whether or not the span was read to the end.
+    """
+
+    def __init__(
+        self,
+        client: "MinioClient",
+        object_name: str,
+        first_stream,
+        start: int,
+        end: int,
+        etag: Optional[str],
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ):
+        self._client = client
+        self._object_name = object_name
+        self._first_stream = first_stream
+        self._etag = etag
+        self._bucket_name = bucket_name
+        self._segments = (
+            (offset, min(MINIO_DOWNLOAD_SEGMENT_SIZE, end + 1 - offset))
+            for offset in range(start, end + 1, MINIO_DOWNLOAD_SEGMENT_SIZE)
+        )
+        self._pool = _get_transfer_pool()
+        self._pending = deque()
+        self._current = memoryview(b"")
+
+        _, first_length = next(self._segments)
+        self._first = self._pool.submit(self._read_first, first_length)
+        self._pending.append(self._first)
+        self._fill()
+
+    def _read_first(self, length: int) -> bytes:
+        """The first segment, from the stream opened by the caller"""
+        try:
+            data = _read_part(self._first_stream, length)
+        finally:
+            # The rest of the span comes from ranged GETs
+            self._first_stream.close()
+        if len(data) != length:
+            raise IOError(f"Expected {length} bytes of {self._object_name}")
+        return data
+
+    def _fetch(self, offset: int, length: int) -> bytes:
+        headers = {"If-Match": f'"{self._etag}"'} if self._etag else None
+        stream, _ = self._client.open_object(
+            self._object_name,
+            offset=offset,
+            length=length,
+            request_headers=headers,
+            bucket_name=self._bucket_name,
+        )
+        with stream:
+            data = _read_part(stream, length)
+        if len(data) != length:
+            raise IOError(f"Expected {length} bytes of {self._object_name}")
+        return data
+
+    def _fill(self):
+        """Fetch segments until MINIO_DOWNLOAD_PARALLELISM are in flight or ready"""
+        while len(self._pending) < MINIO_DOWNLOAD_PARALLELISM:
+            segment = next(self._segments, None)
+            if segment is None:
+                return
+            self._pending.append(self._pool.submit(self._fetch, *segment))
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(MINIO_DOWNLOAD_SEGMENT_SIZE), b""))
+
+        if not self._current:
+            if not self._pending:
+                return b""
+            self._current = memoryview(self._pending.popleft().result())
+            self._fill()
+
+        data = bytes(self._current[:size])
+        self._current = self._current[size:]
+        return data
+
+    def close(self):
+        self._segments = iter(())
+        if self._first.cancel():
+            self._first_stream.close()
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._current = memoryview(b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 class MinioClient:
     """MinIO client for S3 storage operations"""
 
     def __init__(self, ensure_bucket: bool = True):
         # The actual Minio client instance, initially None for lazy loading
         self.client = None
+        # Client bound to the public endpoint, only used for presigning URLs
+        self.presign_client = None
         # Store the flag to ensure bucket for lazy initialization
         self._should_ensure_bucket = ensure_bucket
+        # Storage API calls issued, per operation
+        self._request_counts: Counter = Counter()
+        self._request_counts_lock = threading.Lock()
 
     def _ensure_client(self) -> Minio:
         """
@@ -39,6 +359,7 @@ class MinioClient:
                 access_key=MINIO_ACCESS_KEY,
                 secret_key=MINIO_SECRET_KEY,
                 secure=MINIO_SECURE,
+                http_client=_http_client(),
             )
             # Only ensure bucket if the flag was set during MinioClient instantiation
             if self._should_ensure_bucket:
@@ -50,6 +371,27 @@ class MinioClient:
                     )
         return self.client
 
+    def _record_request(self, operation: str):
+        with self._request_counts_lock:
+            self._request_counts[operation] += 1
+
+    def request_counts(self) -> Dict[str, int]:
+        """Number of storage API calls issued so far, per operation"""
+        with self._request_counts_lock:
+            return dict(self._request_counts)
+
+    def _ensure_presign_client(self) -> Minio:
+        """Ensures the presigning client for the public endpoint is instantiated"""
+        if self.presign_client is None:
+            self.presign_client = Minio(
+                MINIO_PUBLIC_ENDPOINT,
+                access_key=MINIO_ACCESS_KEY,
+                secret_key=MINIO_SECRET_KEY,
+                secure=MINIO_PUBLIC_SECURE,
+                region=MINIO_REGION,
+            )
+        return self.presign_client
+
     def _ensure_bucket_exists(self, bucket_name: str):
         """Ensure the bucket exists, create it if it doesn't"""
         # This method assumes self.client is already instantiated by _ensure_client
@@ -65,58 +407,362 @@ class MinioClient:
 
     def upload_file(
         self,
-        file_data: BinaryIO,
+        file_data: Union[BinaryIO, Iterable[bytes]],
         object_name: str,
         content_type: str,
         metadata: dict = None,
         bucket_name: str = MINIO_BUCKET_NAME,
+        length: Optional[int] = None,
     ) -> str:
-        """Upload a file to MinIO storage"""
+        """
+        Upload a file to MinIO storage.
+
+        The upload's length is taken from seekable file objects, or from
+        length when the caller already knows it. Content beyond
+        MINIO_PARALLEL_UPLOAD_THRESHOLD is uploaded in parts sent
+        concurrently (see _upload_parts), anything else with a single
+        put_object. Either way parts are read from the source as they are
+        sent, never collected up front.
+
+        Without a length (chunk iterables, non-seekable streams), the first
+        part decides: content that fits in it is streamed with put_object,
+        anything longer goes up in concurrent parts. One part is held in
+        memory before that choice is made.
+        """
         client = self._ensure_client()  # Get the client instance
         try:
-            # Get file size
-            file_data.seek(0, os.SEEK_END)
-            file_size = file_data.tell()
-            file_data.seek(0)
+            if hasattr(file_data, "seek") and hasattr(file_data, "tell"):
+                # Get file size
+                file_data.seek(0, os.SEEK_END)
+                length = file_data.tell()
+                file_data.seek(0)
+            reader = (
+                file_data if hasattr(file_data, "read") else _IterableReader(file_data)
+            )
+
+            if length is None:
+                head = _read_part(reader, MINIO_PART_SIZE)
+                if len(head) == MINIO_PART_SIZE:
+                    self._upload_parts(
+                        chain([head], _iter_parts(reader, MINIO_PART_SIZE)),
+                        object_name,
+                        content_type,
+                        metadata,
+                        bucket_name,
+                    )
+                    return object_name
+
+                # Unknown length that fits in one part
+                self._record_request("put_object")
+                client.put_object(
+                    bucket_name=bucket_name,
+                    object_name=object_name,
+                    data=_IterableReader([head]),
+                    length=-1,
+                    part_size=MINIO_PART_SIZE,
+                    num_parallel_uploads=1,
+                    content_type=content_type,
+                    metadata=metadata,
+                )
+                return object_name
+
+            if length > MINIO_PARALLEL_UPLOAD_THRESHOLD:
+                # Grow parts if needed to stay within S3's 10000 parts
+                part_size = max(MINIO_PART_SIZE, -(-length // MAX_PARTS))
+                self._upload_parts(
+                    _iter_parts(reader, part_size),
+                    object_name,
+                    content_type,
+                    metadata,
+                    bucket_name,
+                )
+                return object_name
 
             # Upload the file
+            self._record_request("put_object")
             client.put_object(
                 bucket_name=bucket_name,
                 object_name=object_name,
-                data=file_data,
-                length=file_size,
+                data=reader,
+                length=length,
                 content_type=content_type,
                 metadata=metadata,
             )
-
             return object_name
         except S3Error as err:
             logger.error(f"Error uploading file: {err}")
             raise
 
-    def download_file(
-        self, object_name: str, bucket_name: str = MINIO_BUCKET_NAME
-    ) -> tuple:
-        """Download a file from MinIO storage"""
+    def _upload_parts(
+        self,
+        parts: Iterable[bytes],
+        object_name: str,
+        content_type: str,
+        metadata: Optional[dict],
+        bucket_name: str,
+    ):
+        """
+        Multipart upload with up to MINIO_UPLOAD_PARALLELISM parts in flight.
+
+        Parts are read one after another, but the next one is only read once
+        a slot is free, so memory stays bounded by the number of slots. Parts
+        are sent from the shared transfer pool, so concurrent uploads cannot
+        add threads beyond MINIO_TRANSFER_THREADS. The upload is aborted if
+        any part fails.
+
+        The SDK's own parallel put_object queues every part it reads without
+        a limit, so it is not used here.
+        """
+        upload_id = self.create_multipart_upload(
+            object_name, content_type, metadata, bucket_name
+        )
+        slots = threading.BoundedSemaphore(MINIO_UPLOAD_PARALLELISM)
+        failed = threading.Event()
+        futures = []
+
+        def part_done(future):
+            if future.exception() is not None:
+                failed.set()
+            slots.release()
+
+        pool = _get_transfer_pool()
+        try:
+            try:
+                for part_number, data in enumerate(parts, start=1):
+                    slots.acquire()
+                    if failed.is_set():
+                        # Stop reading; the failure is raised below
+                        slots.release()
+                        break
+                    future = pool.submit(
+                        self.upload_part,
+                        object_name,
+                        upload_id,
+                        part_number,
+                        data,
+                        bucket_name,
+                    )
+                    future.add_done_callback(part_done)
+                    futures.append(future)
+            finally:
+                # No part may still be in flight when the upload is aborted
+                wait(futures)
+
+            # Raises the first part failure, if any
+            etags = [future.result() for future in futures]
+            self.complete_multipart_upload(
+                object_name,
+                upload_id,
+                [
+                    {"part_number": number, "etag": etag}
+                    for number, etag in enumerate(etags, start=1)
+                ],
+                bucket_name,
+            )
+        except Exception:
+            try:
+                self.abort_multipart_upload(object_name, upload_id, bucket_name)
+            except Exception as abort_err:
+                logger.warning(f"Could not abort upload of {object_name}: {abort_err}")
+            raise
+
+    # Multipart upload primitives. The minio SDK only exposes these as private
+    # methods used by put_object(); resumable uploads need to drive them
+    # directly so parts can arrive in separate requests.
+
+    def create_multipart_upload(
+        self,
+        object_name: str,
+        content_type: str,
+        metadata: dict = None,
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ) -> str:
+        """Start a multipart upload and return its upload ID"""
+        client = self._ensure_client()  # Get the client instance
+        try:
+            headers = genheaders(metadata, None, None, None, False)
+            headers["Content-Type"] = content_type or "application/octet-stream"
+            self._record_request("create_multipart_upload")
+            return client._create_multipart_upload(bucket_name, object_name, headers)
+        except S3Error as err:
+            logger.error(f"Error creating multipart upload: {err}")
+            raise
+
+    def upload_part(
+        self,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ) -> str:
+        """Upload a single part of a multipart upload and return its ETag"""
+        client = self._ensure_client()  # Get the client instance
+        try:
+            self._record_request("upload_part")
+            return client._upload_part(
+                bucket_name, object_name, data, None, upload_id, part_number
+            )
+        except S3Error as err:
+            logger.error(f"Error uploading part {part_number}: {err}")
+            raise
+
+    def get_presigned_part_url(
+        self,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        expires: int = 3600,
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ) -> str:
+        """Generate a presigned URL for uploading one part of a multipart upload"""
+        client = self._ensure_presign_client()
+        try:
+            return client.get_presigned_url(
+                "PUT",
+                bucket_name,
+                object_name,
+                expires=timedelta(seconds=expires),
+                extra_query_params={
+                    "uploadId": upload_id,
+                    "partNumber": str(part_number),
+                },
+            )
+        except S3Error as err:
+            logger.error(f"Error generating presigned part URL: {err}")
+            raise
+
+    def list_parts(
+        self, object_name: str, upload_id: str, bucket_name: str = MINIO_BUCKET_NAME
+    ) -> List[dict]:
+        """List the parts received so far for a multipart upload"""
         client = self._ensure_client()  # Get the client instance
         try:
-            # Get object data
-            response = client.get_object(bucket_name, object_name)
+            parts = []
+            marker = None
+            while True:
+                self._record_request("list_parts")
+                result = client._list_parts(
+                    bucket_name, object_name, upload_id, part_number_marker=marker
+                )
+                parts.extend(
+                    {
+                        "part_number": int(part.part_number),
+                        "etag": part.etag,
+                        "size": part.size,
+                        "last_modified": part.last_modified,
+                    }
+                    for part in result.parts
+                )
+                if not result.is_truncated:
+                    return parts
+                marker = result.next_part_number_marker
+        except S3Error as err:
+            logger.error(f"Error listing parts: {err}")
+            raise
 
-            # Get object stats for metadata
-            stats = client.stat_object(bucket_name, object_name)
+    def complete_multipart_upload(
+        self,
+        object_name: str,
+        upload_id: str,
+        parts: List[dict],
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ) -> str:
+        """Assemble uploaded parts into the final object"""
+        client = self._ensure_client()  # Get the client instance
+        try:
+            self._record_request("complete_multipart_upload")
+            client._complete_multipart_upload(
+                bucket_name,
+                object_name,
+                upload_id,
+                [Part(part["part_number"], part["etag"]) for part in parts],
+            )
+            return object_name
+        except S3Error as err:
+            logger.error(f"Error completing multipart upload: {err}")
+            raise
 
+    def abort_multipart_upload(
+        self, object_name: str, upload_id: str, bucket_name: str = MINIO_BUCKET_NAME
+    ) -> bool:
+        """Abort a multipart upload, discarding any uploaded parts"""
+        client = self._ensure_client()  # Get the client instance
+        try:
+            self._record_request("abort_multipart_upload")
+            client._abort_multipart_upload(bucket_name, object_name, upload_id)
+            return True
+        except S3Error as err:
+            logger.error(f"Error aborting multipart upload: {err}")
+            raise
+
+    def download_file(
+        self, object_name: str, bucket_name: str = MINIO_BUCKET_NAME
+    ) -> tuple:
+        """Download a small file from MinIO storage into memory"""
+        stream, stats = self.open_object(object_name, bucket_name=bucket_name)
+        with stream:
             # Return the data and metadata
-            return response.data, stats.metadata, stats.content_type
+            return stream.read(), stats.metadata, stats.content_type
+
+    def open_object(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+        request_headers: Optional[dict] = None,
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ) -> Tuple[ObjectStream, Object]:
+        """
+        Start streaming an object, or length bytes of it from offset.
+
+        Returns the open stream and the stats of the whole object, taken from
+        the GET response headers rather than a separate stat_object call.
+        """
+        client = self._ensure_client()  # Get the client instance
+        try:
+            self._record_request("get_object")
+            response = client.get_object(
+                bucket_name,
+                object_name,
+                offset=offset,
+                length=length,
+                request_headers=request_headers,
+            )
         except S3Error as err:
             logger.error(f"Error downloading file: {err}")
             raise
 
+        return ObjectStream(response), _object_from_headers(
+            bucket_name, object_name, response.headers
+        )
+
+    def stat_object(
+        self, object_name: str, bucket_name: str = MINIO_BUCKET_NAME
+    ) -> Object:
+        """Get an object's stats and user metadata without its content"""
+        client = self._ensure_client()  # Get the client instance
+        self._record_request("stat_object")
+        stats = client.stat_object(bucket_name, object_name)
+        # Report user metadata only, as open_object does
+        return Object(
+            bucket_name,
+            object_name,
+            last_modified=stats.last_modified,
+            etag=stats.etag,
+            size=stats.size,
+            content_type=stats.content_type,
+            metadata=_user_metadata(stats.metadata or {}),
+        )
+
     def get_presigned_url(
-        self, object_name: str, expires: int = 3600, bucket_name: str = MINIO_BUCKET_NAME
+        self,
+        object_name: str,
+        expires: int = 3600,
+        bucket_name: str = MINIO_BUCKET_NAME,
     ) -> str:
         """Generate a presigned URL for object download"""
-        client = self._ensure_client()  # Get the client instance
+        client = self._ensure_presign_client()
         try:
             return client.presigned_get_object(
                 bucket_name=bucket_name,
@@ -133,25 +779,80 @@ class MinioClient:
         """List objects in the bucket with optional prefix"""
         client = self._ensure_client()  # Get the client instance
         try:
-            objects = client.list_objects(bucket_name, prefix=prefix, recursive=True)
-            return [
-                {
-                    "name": obj.object_name,
-                    "size": obj.size,
-                    "last_modified": obj.last_modified,
-                }
-                for obj in objects
-            ]
+            self._record_request("list_objects")
+            # User metadata (a MinIO listing extension) marks content references
+            objects = client.list_objects(
+                bucket_name, prefix=prefix, recursive=True, include_user_meta=True
+            )
+            return [_listing_entry(obj) for obj in objects]
         except S3Error as err:
             logger.error(f"Error listing objects: {err}")
             raise
 
+    def list_objects_page(
+        self,
+        prefix: str,
+        limit: int,
+        start_after: Optional[str] = None,
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ) -> Tuple[List[dict], bool]:
+        """
+        List up to limit objects under prefix after start_after.
+
+        Fetches a single page of limit + 1 keys from storage; returns the
+        objects and whether more remain.
+        """
+        client = self._ensure_client()  # Get the client instance
+        try:
+            self._record_request("list_objects")
+            objects = client._list_objects(
+                bucket_name,
+                prefix=prefix,
+                start_after=start_after,
+                max_keys=limit + 1,
+                include_user_meta=True,
+            )
+            page = [_listing_entry(obj) for obj in islice(objects, limit + 1)]
+            return page[:limit], len(page) > limit
+        except S3Error as err:
+            logger.error(f"Error listing objects: {err}")
+            raise
+
+    def replace_metadata(
+        self,
+        object_name: str,
+        content_type: str,
+        metadata: Optional[dict] = None,
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ):
+        """
+        Replace an object's content type and user metadata by copying it
+        onto itself server-side; the SDK composes objects over 5 GiB in parts
+        """
+        client = self._ensure_client()  # Get the client instance
+        try:
+            self._record_request("copy_object")
+            client.copy_object(
+                bucket_name,
+                object_name,
+                CopySource(bucket_name, object_name),
+                metadata={
+                    "Content-Type": content_type or "application/octet-stream",
+                    **(metadata or {}),
+                },
+                metadata_directive=REPLACE,
+            )
+        except S3Error as err:
+            logger.error(f"Error replacing metadata: {err}")
+            raise
+
     def delete_object(
         self, object_name: str, bucket_name: str = MINIO_BUCKET_NAME
     ) -> bool:
         """Delete an object from the bucket"""
         client = self._ensure_client()  # Get the client instance
         try:
+            self._record_request("remove_object")
             client.remove_object(bucket_name, object_name)
             return True
         except S3Error as err:
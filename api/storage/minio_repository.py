@@ -1,11 +1,26 @@
-from typing import List, Tuple
-from io import BytesIO
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+import io
 import logging
 
-from domain.models import File
+from domain.models import ByteRange, File, FilePage
 from domain.services import FileParsingService, FileMetadataService
-from domain.repositories import StorageError, StorageFileNotFoundError
-from .minio import MinioClient
+from domain.repositories import (
+    StorageError,
+    StorageFileNotFoundError,
+    StorageRangeNotSatisfiableError,
+)
+from .content_addressing import (
+    CONTENT_DEDUP_ENABLED,
+    ContentReference,
+    blob_key,
+    blob_ref_key,
+    collection_refs_prefix,
+    content_reference,
+    content_sha256,
+    reference_metadata,
+    without_reference_metadata,
+)
+from .minio import MINIO_PARALLEL_DOWNLOAD_THRESHOLD, MinioClient, ParallelRangeReader
 
 logger = logging.getLogger(__name__)
 
@@ -22,29 +37,218 @@ class MinioStorageRepository:
     def __init__(self, minio_client: MinioClient):
         self._client = minio_client
 
-    def store_file(self, file_content: BytesIO, file: File) -> bool:
-        """Store a file with its metadata using MinIO"""
+    def store_file(
+        self, file_content: Union[BinaryIO, Iterable[bytes]], file: File
+    ) -> bool:
+        """Store a file with its metadata using MinIO, streaming chunk iterables"""
         try:
             # Convert file metadata using domain service
             storage_metadata = FileMetadataService.to_storage_format(file.metadata)
 
+            if CONTENT_DEDUP_ENABLED and file.sha256 and file.size is not None:
+                self._store_reference(file_content, file, storage_metadata)
+                return True
+
             self._client.upload_file(
                 file_data=file_content,
                 object_name=file.object_name,  # Storage path already set in domain
                 content_type=file.content_type,
                 metadata=storage_metadata,
+                length=file.size,
             )
             return True
         except Exception as e:
             logger.error(f"Failed to store file {file.object_name}: {e}")
             raise StorageError(f"Failed to store file: {str(e)}")
 
-    def retrieve_file(self, object_name: str) -> Tuple[BytesIO, File]:
-        """Retrieve a file and reconstruct File domain object from MinIO metadata"""
+    def store_reference(self, file: File) -> bool:
+        """Store a file as a reference to content its collection already holds"""
+        if not (CONTENT_DEDUP_ENABLED and file.sha256 and file.size is not None):
+            raise StorageFileNotFoundError(f"Content not stored: {file.sha256}")
+        try:
+            storage_metadata = FileMetadataService.to_storage_format(file.metadata)
+            self._store_reference(None, file, storage_metadata)
+            return True
+        except StorageFileNotFoundError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to store reference {file.object_name}: {e}")
+            raise StorageError(f"Failed to store file: {str(e)}")
+
+    def update_metadata(self, file: File) -> bool:
+        """Replace the content type and user metadata stored with a file"""
+        try:
+            storage_metadata = FileMetadataService.to_storage_format(file.metadata)
+            # References keep pointing at their blob
+            reference = content_reference(
+                self._client.stat_object(file.object_name).metadata
+            )
+            if reference is not None:
+                storage_metadata.update(reference_metadata(reference))
+            self._client.replace_metadata(
+                file.object_name, file.content_type, storage_metadata
+            )
+            return True
+        except Exception as e:
+            if "NoSuchKey" in str(e):
+                raise StorageFileNotFoundError(f"File not found: {file.object_name}")
+            logger.error(f"Failed to update metadata of {file.object_name}: {e}")
+            raise StorageError(f"Failed to update metadata: {str(e)}")
+
+    def content_exists(self, collection: str, sha256: str, size: int) -> bool:
+        """Check whether files of a collection reference content with this digest"""
+        if not CONTENT_DEDUP_ENABLED:
+            return False
+        try:
+            return self._collection_has_content(
+                collection, ContentReference(sha256, size)
+            )
+        except Exception as e:
+            logger.error(f"Failed to check content {sha256}: {e}")
+            raise StorageError(f"Failed to check content: {str(e)}")
+
+    def _store_reference(
+        self,
+        file_content: Optional[Union[BinaryIO, Iterable[bytes]]],
+        file: File,
+        storage_metadata: dict,
+    ):
+        """
+        Store content once per digest and the file as a reference to it.
+
+        Without file_content, the content must already be referenced from the
+        file's collection; knowing a digest alone never grants access to it.
+        """
+        reference = ContentReference(file.sha256, file.size)
+        marker = blob_ref_key(reference.sha256, file.object_name)
+
+        # Mark the blob as referenced before relying on it, so blob
+        # collection never sees it unused while this upload is in flight
+        self._client.upload_file(io.BytesIO(b""), marker, "application/octet-stream")
+        if file_content is None:
+            if not self._collection_has_content(file.collection, reference, marker):
+                self._client.delete_object(marker)
+                raise StorageFileNotFoundError(
+                    f"Content not stored in {file.collection}: {reference.sha256}"
+                )
+        elif not self._blob_exists(reference):
+            self._client.upload_file(
+                file_content,
+                blob_key(reference.sha256),
+                "application/octet-stream",
+                length=reference.size,
+            )
+        self._client.upload_file(
+            io.BytesIO(b""),
+            file.object_name,
+            file.content_type,
+            metadata={**storage_metadata, **reference_metadata(reference)},
+        )
+
+    def _collection_has_content(
+        self,
+        collection: str,
+        reference: ContentReference,
+        exclude_marker: Optional[str] = None,
+    ) -> bool:
+        """Check whether a collection references a stored blob, besides one marker"""
+        markers, _ = self._client.list_objects_page(
+            prefix=collection_refs_prefix(reference.sha256, collection), limit=2
+        )
+        if not any(marker["name"] != exclude_marker for marker in markers):
+            return False
+        return self._blob_exists(reference)
+
+    def _blob_exists(self, reference: ContentReference) -> bool:
+        """Check whether the referenced content is already stored"""
         try:
-            data, storage_metadata, content_type = self._client.download_file(
-                object_name
+            return self._client.stat_object(blob_key(reference.sha256)).size == (
+                reference.size
             )
+        except Exception as e:
+            if "NoSuchKey" in str(e):
+                return False
+            raise
+
+    def _open_object(
+        self, object_name: str, byte_range: Optional[ByteRange]
+    ) -> Tuple[BinaryIO, Any]:
+        """Open an object, or the requested range of it"""
+        if byte_range is None:
+            return self._client.open_object(object_name)
+        if byte_range.start is None:
+            # Suffix ranges have no offset form; pass the header through
+            return self._client.open_object(
+                object_name, request_headers={"Range": byte_range.to_header()}
+            )
+        length = (
+            byte_range.end - byte_range.start + 1 if byte_range.end is not None else 0
+        )
+        return self._client.open_object(
+            object_name, offset=byte_range.start, length=length
+        )
+
+    def _open_range(
+        self, object_name: str, byte_range: ByteRange
+    ) -> Tuple[Optional[BinaryIO], Any, Optional[ContentReference]]:
+        """
+        Open a range of an object, or find the blob it references instead.
+
+        Plain objects answer in one request. References are empty, so storage
+        refuses the range (or, on stores that ignore ranges on empty objects,
+        answers with the reference itself); only then is the object stat'ed.
+        Returns the open stream, or None for a reference, its stats and the
+        reference.
+        """
+        try:
+            stream, stats = self._open_object(object_name, byte_range)
+        except Exception as e:
+            if "InvalidRange" not in str(e):
+                raise
+            stats = self._client.stat_object(object_name)
+            reference = content_reference(stats.metadata)
+            if reference is None:
+                raise e
+            return None, stats, reference
+
+        reference = content_reference(stats.metadata)
+        if reference is not None:
+            stream.close()
+            return None, stats, reference
+        return stream, stats, None
+
+    def retrieve_file(
+        self, object_name: str, byte_range: Optional[ByteRange] = None
+    ) -> Tuple[BinaryIO, File]:
+        """Open a file for streaming and reconstruct File domain object from MinIO metadata"""
+        try:
+            if byte_range is None:
+                stream, stats = self._client.open_object(object_name)
+                opened = stats
+                reference = content_reference(stats.metadata)
+                if reference is not None:
+                    stream.close()
+                    stream, opened = self._client.open_object(
+                        blob_key(reference.sha256)
+                    )
+            else:
+                stream, stats, reference = self._open_range(object_name, byte_range)
+                opened = stats
+                if reference is not None:
+                    stream, opened = self._open_object(
+                        blob_key(reference.sha256), byte_range
+                    )
+
+            source = blob_key(reference.sha256) if reference else object_name
+            size = reference.size if reference else opened.size
+            etag = opened.etag
+
+            # Large spans are fetched as several ranges at once
+            span = (0, size - 1) if byte_range is None else byte_range.resolve(size)
+            if span and span[1] - span[0] + 1 > MINIO_PARALLEL_DOWNLOAD_THRESHOLD:
+                stream = ParallelRangeReader(
+                    self._client, source, stream, span[0], span[1], etag
+                )
 
             # Parse storage path using domain service
             parsed_info = FileParsingService.parse_storage_path(object_name)
@@ -56,92 +260,152 @@ class MinioStorageRepository:
                 owner=parsed_info["owner"],
                 original_filename=parsed_info["original_filename"],
                 upload_time=parsed_info["timestamp"],
-                content_type=content_type,
-                size=len(data),
-                metadata=storage_metadata or {},
+                content_type=stats.content_type,
+                size=size,
+                etag=etag,
+                sha256=content_sha256(stats.metadata),
+                metadata=without_reference_metadata(stats.metadata),
             )
 
-            return BytesIO(data), file
+            return stream, file
 
         except Exception as e:
             if "NoSuchKey" in str(e) or "not found" in str(e).lower():
                 raise StorageFileNotFoundError(f"File not found: {object_name}")
+            if "InvalidRange" in str(e):
+                raise StorageRangeNotSatisfiableError(
+                    f"Range not satisfiable: {object_name}"
+                )
             logger.error(f"Failed to retrieve file {object_name}: {e}")
             raise StorageError(f"Failed to retrieve file: {str(e)}")
 
+    @staticmethod
+    def _files_from_listing(storage_objects: Iterable[dict]) -> Iterator[File]:
+        """Build File objects from listing entries, skipping unparseable ones"""
+        for storage_obj in storage_objects:
+            try:
+                # Parse storage path using domain service
+                object_name = storage_obj.get("name", "")
+                parsed_info = FileParsingService.parse_storage_path(object_name)
+
+                # References list as empty objects; report the content size
+                reference = content_reference(storage_obj.get("metadata"))
+
+                # Create File object from parsed information
+                yield File(
+                    object_name=object_name,
+                    collection=parsed_info["collection"],
+                    owner=parsed_info["owner"],
+                    original_filename=parsed_info["original_filename"],
+                    upload_time=parsed_info["timestamp"],
+                    content_type="application/octet-stream",  # MinIO list doesn't include content type
+                    size=reference.size if reference else storage_obj.get("size"),
+                    metadata={
+                        "last_modified": (
+                            storage_obj.get("last_modified").isoformat()
+                            if hasattr(storage_obj.get("last_modified"), "isoformat")
+                            else str(storage_obj.get("last_modified"))
+                        )
+                        if storage_obj.get("last_modified")
+                        else None
+                    },
+                )
+            except Exception as e:
+                # Log but continue - don't fail entire listing for one bad file
+                logger.warning(
+                    f"Failed to parse file {storage_obj.get('name', 'unknown')}: {e}"
+                )
+                continue
+
     def list_files_in_collection(self, collection: str) -> List[File]:
         """List all files in a collection using MinIO prefix listing"""
         try:
             prefix = f"{collection}/"
             storage_objects = self._client.list_objects(prefix=prefix)
+            return list(self._files_from_listing(storage_objects))
 
-            files = []
-            for storage_obj in storage_objects:
-                try:
-                    # Parse storage path using domain service
-                    object_name = storage_obj.get("name", "")
-                    parsed_info = FileParsingService.parse_storage_path(object_name)
-
-                    # Create File object from parsed information
-                    domain_file = File(
-                        object_name=object_name,
-                        collection=parsed_info["collection"],
-                        owner=parsed_info["owner"],
-                        original_filename=parsed_info["original_filename"],
-                        upload_time=parsed_info["timestamp"],
-                        content_type="application/octet-stream",  # MinIO list doesn't include content type
-                        size=storage_obj.get("size"),
-                        metadata={
-                            "last_modified": (
-                                storage_obj.get("last_modified").isoformat()
-                                if hasattr(
-                                    storage_obj.get("last_modified"), "isoformat"
-                                )
-                                else str(storage_obj.get("last_modified"))
-                            )
-                            if storage_obj.get("last_modified")
-                            else None
-                        },
-                    )
-                    files.append(domain_file)
-                except Exception as e:
-                    # Log but continue - don't fail entire listing for one bad file
-                    logger.warning(
-                        f"Failed to parse file {storage_obj.get('name', 'unknown')}: {e}"
-                    )
-                    continue
+        except Exception as e:
+            logger.error(f"Failed to list files in collection {collection}: {e}")
+            raise StorageError(f"Failed to list files: {str(e)}")
 
-            return files
+    def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> FilePage:
+        """List one page of a collection using MinIO start_after pagination"""
+        try:
+            storage_objects, has_more = self._client.list_objects_page(
+                prefix=f"{collection}/", limit=limit, start_after=start_after
+            )
+            return FilePage(
+                files=list(self._files_from_listing(storage_objects)),
+                # Continue after the last key, even if that entry was skipped
+                next_start_after=storage_objects[-1]["name"] if has_more else None,
+            )
 
         except Exception as e:
             logger.error(f"Failed to list files in collection {collection}: {e}")
             raise StorageError(f"Failed to list files: {str(e)}")
 
     def delete_file(self, object_name: str) -> bool:
-        """Delete a file from MinIO storage"""
-        try:
-            # First check if file exists to provide better error handling
-            if not self.file_exists(object_name):
-                raise StorageFileNotFoundError(f"File not found: {object_name}")
+        """
+        Delete a file from MinIO storage, and its blob marker if it is a reference.
 
-            result = self._client.delete_object(object_name)
-            return result
+        S3 deletes of missing keys succeed, so one stat first both reports a
+        missing file and finds the marker a reference leaves behind.
+        """
+        try:
+            stats = self._client.stat_object(object_name)
+            reference = content_reference(stats.metadata)
+            deleted = self._client.delete_object(object_name)
+            if reference is not None:
+                # A leftover marker would keep the collection's access to the
+                # content, and the blob, until the next collection sweep
+                self._client.delete_object(blob_ref_key(reference.sha256, object_name))
+            return deleted
 
-        except StorageFileNotFoundError:
-            raise  # Re-raise storage exception
         except Exception as e:
+            if "NoSuchKey" in str(e) or "not found" in str(e).lower():
+                raise StorageFileNotFoundError(f"File not found: {object_name}")
             logger.error(f"Failed to delete file {object_name}: {e}")
             raise StorageError(f"Failed to delete file: {str(e)}")
 
+    def stat_file(self, object_name: str) -> File:
+        """Reconstruct a File domain object from MinIO stats, without its content"""
+        try:
+            stats = self._client.stat_object(object_name)
+            parsed_info = FileParsingService.parse_storage_path(object_name)
+            metadata = without_reference_metadata(stats.metadata)
+            reference = content_reference(stats.metadata)
+
+            # Prefer the upload metadata stored with the object; the path
+            # alone cannot tell timestamp and filename apart reliably
+            return File(
+                object_name=object_name,
+                collection=parsed_info["collection"],
+                owner=metadata.get("uploader", parsed_info["owner"]),
+                original_filename=metadata.get(
+                    "original_filename", parsed_info["original_filename"]
+                ),
+                upload_time=metadata.get("upload_time", parsed_info["timestamp"]),
+                content_type=stats.content_type or "application/octet-stream",
+                size=reference.size if reference else stats.size,
+                etag=stats.etag,
+                sha256=content_sha256(stats.metadata),
+                metadata=metadata,
+            )
+        except Exception as e:
+            if "NoSuchKey" in str(e) or "not found" in str(e).lower():
+                raise StorageFileNotFoundError(f"File not found: {object_name}")
+            logger.error(f"Failed to stat file {object_name}: {e}")
+            raise StorageError(f"Failed to stat file: {str(e)}")
+
     def file_exists(self, object_name: str) -> bool:
         """Check if a file exists in MinIO storage"""
-        from .minio import MINIO_BUCKET_NAME
-
         try:
             # Use stat_object to check existence
-            client = self._client._ensure_client()
-            client.stat_object(MINIO_BUCKET_NAME, object_name)
+            self._client.stat_object(object_name)
             return True
-        except Exception:
-            # Any exception means file doesn't exist or isn't accessible
-            return False
+        except Exception as e:
+            if "NoSuchKey" in str(e) or "not found" in str(e).lower():
+                return False
+            raise StorageError(f"Failed to check file: {str(e)}")
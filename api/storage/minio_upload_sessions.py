@@ -0,0 +1,257 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from typing import List
+
+from domain.models import File, UploadedChunk, UploadSession
+from domain.repositories import StorageError, StorageFileNotFoundError
+from domain.services import FileMetadataService
+from .minio import MinioClient
+
+# Session state objects live under this prefix, outside every collection
+UPLOAD_SESSION_PREFIX = ".upload-sessions/"
+
+# Sessions with no activity for this long are aborted by garbage collection
+UPLOAD_SESSION_TTL_SECONDS = int(
+    os.environ.get("UPLOAD_SESSION_TTL_SECONDS", 24 * 60 * 60)
+)
+# Minimum time between opportunistic garbage collection runs
+UPLOAD_SESSION_GC_INTERVAL_SECONDS = int(
+    os.environ.get("UPLOAD_SESSION_GC_INTERVAL_SECONDS", 60 * 60)
+)
+
+_SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+logger = logging.getLogger(__name__)
+
+
+class MinioUploadSessionRepository:
+    """
+    MinIO implementation of UploadSessionRepository protocol.
+
+    Each session maps onto an S3 multipart upload. The session record is kept
+    as a small JSON object in the bucket and received chunks are read back from
+    the multipart upload itself, so sessions survive API restarts and any API
+    instance can serve any session.
+    """
+
+    def __init__(self, minio_client: MinioClient):
+        self._client = minio_client
+        self._gc_lock = threading.Lock()
+        self._last_gc = 0.0
+
+    def create_session(self, file: File) -> UploadSession:
+        """Start a multipart upload for the file and persist the session record"""
+        self._maybe_collect_expired_sessions()
+
+        try:
+            upload_id = self._client.create_multipart_upload(
+                object_name=file.object_name,
+                content_type=file.content_type,
+                metadata=FileMetadataService.to_storage_format(file.metadata),
+            )
+            session = UploadSession(
+                session_id=uuid.uuid4().hex,
+                upload_id=upload_id,
+                file=file,
+                created_at=datetime.now(timezone.utc).isoformat(),
+            )
+            self._save_session(session)
+            return session
+        except Exception as e:
+            logger.error(f"Failed to create upload session for {file.object_name}: {e}")
+            raise StorageError(f"Failed to create upload session: {str(e)}")
+
+    def get_session(self, session_id: str) -> UploadSession:
+        """Load a session record from the bucket"""
+        if not _SESSION_ID_PATTERN.match(session_id):
+            raise StorageFileNotFoundError(f"Upload session not found: {session_id}")
+
+        try:
+            data, _, _ = self._client.download_file(self._session_key(session_id))
+            return UploadSession.model_validate_json(data)
+        except Exception as e:
+            if "NoSuchKey" in str(e) or "not found" in str(e).lower():
+                raise StorageFileNotFoundError(
+                    f"Upload session not found: {session_id}"
+                )
+            logger.error(f"Failed to load upload session {session_id}: {e}")
+            raise StorageError(f"Failed to load upload session: {str(e)}")
+
+    def store_chunk(
+        self, session: UploadSession, chunk_number: int, data: bytes
+    ) -> UploadedChunk:
+        """Upload a chunk as the matching multipart part"""
+        try:
+            etag = self._client.upload_part(
+                object_name=session.file.object_name,
+                upload_id=session.upload_id,
+                part_number=chunk_number,
+                data=data,
+            )
+            return UploadedChunk(chunk_number=chunk_number, size=len(data), etag=etag)
+        except Exception as e:
+            logger.error(
+                f"Failed to store chunk {chunk_number} of session {session.session_id}: {e}"
+            )
+            raise StorageError(f"Failed to store chunk: {str(e)}")
+
+    def presign_chunk_url(
+        self, session: UploadSession, chunk_number: int, expires: int
+    ) -> str:
+        """Presign a direct-to-storage PUT URL for the matching multipart part"""
+        try:
+            return self._client.get_presigned_part_url(
+                object_name=session.file.object_name,
+                upload_id=session.upload_id,
+                part_number=chunk_number,
+                expires=expires,
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to presign chunk {chunk_number} of session {session.session_id}: {e}"
+            )
+            raise StorageError(f"Failed to presign chunk URL: {str(e)}")
+
+    def list_chunks(self, session: UploadSession) -> List[UploadedChunk]:
+        """List received chunks from the multipart upload's parts"""
+        try:
+            parts = self._client.list_parts(session.file.object_name, session.upload_id)
+            return sorted(
+                (
+                    UploadedChunk(
+                        chunk_number=part["part_number"],
+                        size=part["size"] or 0,
+                        etag=part["etag"],
+                    )
+                    for part in parts
+                ),
+                key=lambda chunk: chunk.chunk_number,
+            )
+        except Exception as e:
+            logger.error(f"Failed to list chunks of session {session.session_id}: {e}")
+            raise StorageError(f"Failed to list chunks: {str(e)}")
+
+    def complete_session(
+        self, session: UploadSession, chunks: List[UploadedChunk]
+    ) -> File:
+        """Complete the multipart upload and remove the session record"""
+        try:
+            self._client.complete_multipart_upload(
+                object_name=session.file.object_name,
+                upload_id=session.upload_id,
+                parts=[
+                    {"part_number": chunk.chunk_number, "etag": chunk.etag}
+                    for chunk in chunks
+                ],
+            )
+            self._delete_session_record(session.session_id)
+
+            file = session.file.model_copy()
+            file.size = sum(chunk.size for chunk in chunks)
+            return file
+        except Exception as e:
+            logger.error(f"Failed to complete upload session {session.session_id}: {e}")
+            raise StorageError(f"Failed to complete upload session: {str(e)}")
+
+    def abort_session(self, session: UploadSession) -> bool:
+        """Abort the multipart upload and remove the session record"""
+        try:
+            try:
+                self._client.abort_multipart_upload(
+                    session.file.object_name, session.upload_id
+                )
+            except Exception as e:
+                # Already gone upstream (e.g. bucket lifecycle rule) - still
+                # drop our record so the session does not linger
+                if "NoSuchUpload" not in str(e):
+                    raise
+            self._delete_session_record(session.session_id)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to abort upload session {session.session_id}: {e}")
+            raise StorageError(f"Failed to abort upload session: {str(e)}")
+
+    def collect_expired_sessions(self) -> int:
+        """
+        Abort sessions with no activity within the TTL.
+
+        Activity is the most recent of the session creation time and the
+        last-modified time of any received chunk.
+
+        Returns:
+            Number of sessions aborted
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=UPLOAD_SESSION_TTL_SECONDS
+        )
+        aborted = 0
+
+        for record in self._client.list_objects(prefix=UPLOAD_SESSION_PREFIX):
+            session_id = record["name"][len(UPLOAD_SESSION_PREFIX) :].removesuffix(
+                ".json"
+            )
+            try:
+                session = self.get_session(session_id)
+                last_activity = datetime.fromisoformat(session.created_at)
+                if last_activity >= cutoff:
+                    continue
+
+                parts = self._client.list_parts(
+                    session.file.object_name, session.upload_id
+                )
+                if any(
+                    p["last_modified"] and p["last_modified"] >= cutoff for p in parts
+                ):
+                    continue
+
+                self.abort_session(session)
+                aborted += 1
+                logger.info(f"Aborted expired upload session {session_id}")
+            except Exception as e:
+                # Log but continue - one broken record must not block cleanup
+                logger.warning(f"Failed to expire upload session {session_id}: {e}")
+
+        return aborted
+
+    def _maybe_collect_expired_sessions(self):
+        """Run garbage collection in the background at most once per interval"""
+        now = time.monotonic()
+        with self._gc_lock:
+            if (
+                self._last_gc
+                and now - self._last_gc < UPLOAD_SESSION_GC_INTERVAL_SECONDS
+            ):
+                return
+            self._last_gc = now
+
+        threading.Thread(
+            target=self._collect_expired_sessions_safely,
+            name="upload-session-gc",
+            daemon=True,
+        ).start()
+
+    def _collect_expired_sessions_safely(self):
+        try:
+            self.collect_expired_sessions()
+        except Exception as e:
+            logger.warning(f"Upload session garbage collection failed: {e}")
+
+    def _save_session(self, session: UploadSession):
+        self._client.upload_file(
+            file_data=BytesIO(session.model_dump_json().encode()),
+            object_name=self._session_key(session.session_id),
+            content_type="application/json",
+        )
+
+    def _delete_session_record(self, session_id: str):
+        self._client.delete_object(self._session_key(session_id))
+
+    @staticmethod
+    def _session_key(session_id: str) -> str:
+        return f"{UPLOAD_SESSION_PREFIX}{session_id}.json"
@@ -0,0 +1,456 @@
+# Async S3 client - native asyncio access to S3-compatible storage (MinIO)
+#
+# The minio SDK is synchronous, so every call needs a worker thread. This
+# client speaks the S3 REST API directly over a pooled httpx.AsyncClient and
+# signs requests itself (AWS Signature Version 4), letting a single worker
+# keep thousands of transfers in flight without a thread per transfer.
+
+import hashlib
+import hmac
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from xml.etree import ElementTree as ET
+
+import httpx
+
+from .minio import (
+    MINIO_ACCESS_KEY,
+    MINIO_BUCKET_NAME,
+    MINIO_ENDPOINT,
+    MINIO_REGION,
+    MINIO_SECRET_KEY,
+    MINIO_SECURE,
+)
+
+# Connection pool size shared by all in-flight requests of a worker
+S3_MAX_CONNECTIONS = int(os.environ.get("S3_MAX_CONNECTIONS", 256))
+S3_TIMEOUT_SECONDS = float(os.environ.get("S3_TIMEOUT_SECONDS", 60))
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+EMPTY_PAYLOAD_SHA256 = hashlib.sha256(b"").hexdigest()
+METADATA_HEADER_PREFIX = "x-amz-meta-"
+
+_S3_XMLNS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+# Largest object S3 copies in a single request; larger ones are copied in parts
+MAX_COPY_OBJECT_SIZE = 5 * 1024**3
+
+logger = logging.getLogger(__name__)
+
+
+class S3AsyncError(Exception):
+    """Error response returned by the S3 API"""
+
+    def __init__(self, code: str, message: str, status_code: int):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.status_code = status_code
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    """URI-encode a value as required by SigV4 canonical requests"""
+    return quote(value, safe=safe)
+
+
+def _hmac_sha256(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def sign_request(
+    method: str,
+    host: str,
+    path: str,
+    query: str,
+    headers: Dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: datetime,
+) -> Dict[str, str]:
+    """
+    Sign a request with AWS Signature Version 4.
+
+    Args:
+        method: HTTP method
+        host: Host header value the request will be sent with
+        path: URI-encoded request path
+        query: Canonical (sorted, URI-encoded) query string
+        headers: Headers to sign in addition to host/date/content hash
+        payload_hash: Hex SHA-256 of the body, or UNSIGNED-PAYLOAD
+
+    Returns:
+        All headers to send, including Authorization
+    """
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = now.strftime("%Y%m%d")
+    signed = {
+        **{key.lower(): str(value) for key, value in headers.items()},
+        "host": host,
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+    }
+
+    canonical_headers = sorted(
+        (key, " ".join(value.split())) for key, value in signed.items()
+    )
+    signed_headers = ";".join(key for key, _ in canonical_headers)
+    canonical_request = "\n".join(
+        [
+            method,
+            path or "/",
+            query,
+            "".join(f"{key}:{value}\n" for key, value in canonical_headers),
+            signed_headers,
+            payload_hash,
+        ]
+    )
+
+    scope = f"{date}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+
+    signing_key = ("AWS4" + secret_key).encode()
+    for part in (date, region, "s3", "aws4_request"):
+        signing_key = _hmac_sha256(signing_key, part)
+    signature = hmac.new(
+        signing_key, string_to_sign.encode(), hashlib.sha256
+    ).hexdigest()
+
+    signed["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return signed
+
+
+def canonical_query_string(params: Optional[Dict[str, str]]) -> str:
+    """Build the sorted, URI-encoded query string used for signing and sending"""
+    return "&".join(
+        f"{_uri_encode(key)}={_uri_encode(value)}"
+        for key, value in sorted((params or {}).items())
+    )
+
+
+class AsyncS3Client:
+    """Async S3 client for storage operations over a pooled HTTP client"""
+
+    def __init__(
+        self,
+        endpoint: str = MINIO_ENDPOINT,
+        access_key: str = MINIO_ACCESS_KEY,
+        secret_key: str = MINIO_SECRET_KEY,
+        secure: bool = MINIO_SECURE,
+        region: str = MINIO_REGION,
+        bucket_name: str = MINIO_BUCKET_NAME,
+    ):
+        self._host = endpoint
+        self._base_url = f"{'https' if secure else 'http'}://{endpoint}"
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._region = region
+        self.bucket_name = bucket_name
+        # Created lazily so the pool binds to the running event loop
+        self._http: Optional[httpx.AsyncClient] = None
+        # Storage API requests issued, per operation
+        self._request_counts: Counter = Counter()
+
+    def _ensure_http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=S3_MAX_CONNECTIONS,
+                    max_keepalive_connections=S3_MAX_CONNECTIONS,
+                ),
+                timeout=S3_TIMEOUT_SECONDS,
+            )
+        return self._http
+
+    async def aclose(self):
+        """Close the connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def request_counts(self) -> Dict[str, int]:
+        """Number of storage API requests issued so far, per operation"""
+        return dict(self._request_counts)
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        object_name: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        content: Optional[bytes] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """Send a signed request, raising S3AsyncError for error responses"""
+        path = f"/{_uri_encode(self.bucket_name)}"
+        if object_name:
+            path += f"/{_uri_encode(object_name, safe='-_.~/')}"
+        query = canonical_query_string(params)
+
+        if content is None:
+            payload_hash = EMPTY_PAYLOAD_SHA256
+        elif len(content) <= 64 * 1024:
+            payload_hash = hashlib.sha256(content).hexdigest()
+        else:
+            # Hashing large parts on the event loop would stall it; TLS (or the
+            # private network to MinIO) protects the body instead
+            payload_hash = UNSIGNED_PAYLOAD
+
+        signed_headers = sign_request(
+            method,
+            self._host,
+            path,
+            query,
+            headers or {},
+            payload_hash,
+            self._access_key,
+            self._secret_key,
+            self._region,
+            datetime.now(timezone.utc),
+        )
+
+        self._request_counts[operation] += 1
+        http = self._ensure_http()
+        request = http.build_request(
+            method,
+            f"{self._base_url}{path}" + (f"?{query}" if query else ""),
+            headers=signed_headers,
+            content=content,
+        )
+        response = await http.send(request, stream=stream)
+
+        if response.status_code >= 300:
+            body = await response.aread()
+            await response.aclose()
+            raise self._error(response, body)
+        return response
+
+    @staticmethod
+    def _error(response: httpx.Response, body: bytes) -> S3AsyncError:
+        code, message = None, response.reason_phrase
+        if body:
+            try:
+                element = ET.fromstring(body)
+                code = element.findtext("Code")
+                message = element.findtext("Message") or message
+            except ET.ParseError:
+                pass
+        if code is None:
+            # HEAD responses carry no body
+            code = "NoSuchKey" if response.status_code == 404 else "UnknownError"
+        return S3AsyncError(code, message, response.status_code)
+
+    @staticmethod
+    def _metadata_headers(content_type: str, metadata: Optional[dict]) -> dict:
+        headers = {"Content-Type": content_type or "application/octet-stream"}
+        for key, value in (metadata or {}).items():
+            headers[f"{METADATA_HEADER_PREFIX}{key}"] = value
+        return headers
+
+    @staticmethod
+    def user_metadata(headers: httpx.Headers) -> Dict[str, str]:
+        """Extract user metadata (x-amz-meta-*) from response headers"""
+        return {
+            key[len(METADATA_HEADER_PREFIX) :]: value
+            for key, value in headers.items()
+            if key.lower().startswith(METADATA_HEADER_PREFIX)
+        }
+
+    @staticmethod
+    def _listed_user_metadata(item: ET.Element) -> Dict[str, str]:
+        """User metadata of a listing entry, keyed as user_metadata() keys it"""
+        metadata = {}
+        for child in item.find(f"{_S3_XMLNS}UserMetadata") or []:
+            key = child.tag.rpartition("}")[2].lower()
+            if key.startswith(METADATA_HEADER_PREFIX):
+                metadata[key[len(METADATA_HEADER_PREFIX) :]] = child.text or ""
+        return metadata
+
+    async def put_object(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str,
+        metadata: Optional[dict] = None,
+    ) -> str:
+        """Upload an object in a single request and return its ETag"""
+        response = await self._request(
+            "put_object",
+            "PUT",
+            object_name,
+            headers=self._metadata_headers(content_type, metadata),
+            content=data,
+        )
+        return response.headers.get("etag", "").strip('"')
+
+    async def create_multipart_upload(
+        self, object_name: str, content_type: str, metadata: Optional[dict] = None
+    ) -> str:
+        """Start a multipart upload and return its upload ID"""
+        response = await self._request(
+            "create_multipart_upload",
+            "POST",
+            object_name,
+            params={"uploads": ""},
+            headers=self._metadata_headers(content_type, metadata),
+        )
+        element = ET.fromstring(response.content)
+        return element.findtext(f"{_S3_XMLNS}UploadId")
+
+    async def upload_part(
+        self, object_name: str, upload_id: str, part_number: int, data: bytes
+    ) -> str:
+        """Upload one part of a multipart upload and return its ETag"""
+        response = await self._request(
+            "upload_part",
+            "PUT",
+            object_name,
+            params={"partNumber": str(part_number), "uploadId": upload_id},
+            content=data,
+        )
+        return response.headers.get("etag", "").strip('"')
+
+    async def complete_multipart_upload(
+        self, object_name: str, upload_id: str, parts: List[Tuple[int, str]]
+    ):
+        """Assemble uploaded parts into the final object"""
+        body = "".join(
+            f'<Part><PartNumber>{number}</PartNumber><ETag>"{etag}"</ETag></Part>'
+            for number, etag in parts
+        )
+        await self._request(
+            "complete_multipart_upload",
+            "POST",
+            object_name,
+            params={"uploadId": upload_id},
+            headers={"Content-Type": "application/xml"},
+            content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+        )
+
+    async def abort_multipart_upload(self, object_name: str, upload_id: str):
+        """Abort a multipart upload, discarding any uploaded parts"""
+        await self._request(
+            "abort_multipart_upload",
+            "DELETE",
+            object_name,
+            params={"uploadId": upload_id},
+        )
+
+    async def replace_metadata(
+        self,
+        object_name: str,
+        content_type: str,
+        metadata: Optional[dict],
+        size: int,
+    ):
+        """
+        Replace an object's content type and user metadata by copying it onto
+        itself; objects over MAX_COPY_OBJECT_SIZE are copied as a multipart
+        upload of ranges, which S3 allows to target the source key
+        """
+        source = (
+            f"/{_uri_encode(self.bucket_name)}/"
+            f"{_uri_encode(object_name, safe='-_.~/')}"
+        )
+        if size <= MAX_COPY_OBJECT_SIZE:
+            headers = self._metadata_headers(content_type, metadata)
+            headers["x-amz-copy-source"] = source
+            headers["x-amz-metadata-directive"] = "REPLACE"
+            await self._request("copy_object", "PUT", object_name, headers=headers)
+            return
+
+        upload_id = await self.create_multipart_upload(
+            object_name, content_type, metadata
+        )
+        try:
+            parts = []
+            for offset in range(0, size, MAX_COPY_OBJECT_SIZE):
+                last = min(offset + MAX_COPY_OBJECT_SIZE, size) - 1
+                response = await self._request(
+                    "upload_part_copy",
+                    "PUT",
+                    object_name,
+                    params={"partNumber": str(len(parts) + 1), "uploadId": upload_id},
+                    headers={
+                        "x-amz-copy-source": source,
+                        "x-amz-copy-source-range": f"bytes={offset}-{last}",
+                    },
+                )
+                etag = ET.fromstring(response.content).findtext(f"{_S3_XMLNS}ETag")
+                parts.append((len(parts) + 1, (etag or "").strip('"')))
+            await self.complete_multipart_upload(object_name, upload_id, parts)
+        except BaseException:
+            await self.abort_multipart_upload(object_name, upload_id)
+            raise
+
+    async def get_object(
+        self, object_name: str, range_header: Optional[str] = None
+    ) -> httpx.Response:
+        """Start downloading an object, or a Range of it; the caller must close the response"""
+        headers = {"Range": range_header} if range_header else None
+        return await self._request(
+            "get_object", "GET", object_name, headers=headers, stream=True
+        )
+
+    async def head_object(self, object_name: str) -> httpx.Headers:
+        """Fetch object headers (size, content type, ETag, user metadata)"""
+        response = await self._request("stat_object", "HEAD", object_name)
+        return response.headers
+
+    async def delete_object(self, object_name: str):
+        """Delete an object from the bucket"""
+        await self._request("remove_object", "DELETE", object_name)
+
+    async def list_objects(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        max_keys: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Iterate over objects under prefix, fetching one page at a time"""
+        token = None
+        while True:
+            params = {"list-type": "2", "prefix": prefix}
+            if start_after:
+                params["start-after"] = start_after
+            if max_keys:
+                params["max-keys"] = str(max_keys)
+            if token:
+                params["continuation-token"] = token
+            # MinIO extension: include user metadata, which marks references
+            params["metadata"] = "true"
+            response = await self._request("list_objects", "GET", params=params)
+            element = ET.fromstring(response.content)
+
+            for item in element.iter(f"{_S3_XMLNS}Contents"):
+                last_modified = item.findtext(f"{_S3_XMLNS}LastModified")
+                yield {
+                    "name": item.findtext(f"{_S3_XMLNS}Key"),
+                    "size": int(item.findtext(f"{_S3_XMLNS}Size") or 0),
+                    "last_modified": (
+                        datetime.fromisoformat(last_modified.replace("Z", "+00:00"))
+                        if last_modified
+                        else None
+                    ),
+                    "metadata": self._listed_user_metadata(item),
+                }
+
+            if element.findtext(f"{_S3_XMLNS}IsTruncated") != "true":
+                return
+            token = element.findtext(f"{_S3_XMLNS}NextContinuationToken")
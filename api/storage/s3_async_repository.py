@@ -0,0 +1,470 @@
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import logging
+import os
+
+import anyio.to_thread
+
+from domain.models import ByteRange, File, FilePage
+from domain.services import FileParsingService, FileMetadataService
+from domain.repositories import (
+    StorageError,
+    StorageFileNotFoundError,
+    StorageRangeNotSatisfiableError,
+)
+from domain.streams import DEFAULT_CHUNK_SIZE
+from .content_addressing import (
+    CONTENT_DEDUP_ENABLED,
+    ContentReference,
+    blob_key,
+    blob_ref_key,
+    collection_refs_prefix,
+    content_reference,
+    content_sha256,
+    reference_metadata,
+    without_reference_metadata,
+)
+from .s3_async import AsyncS3Client, S3AsyncError
+
+# Multipart part size; content larger than one part (or of unknown size) is
+# uploaded in parts of this size
+S3_PART_SIZE = int(os.environ.get("S3_PART_SIZE", 16 * 1024 * 1024))
+
+logger = logging.getLogger(__name__)
+
+
+async def _aiter_chunks(
+    content: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+) -> AsyncIterator[bytes]:
+    """Iterate over any supported content type without blocking the event loop"""
+    if hasattr(content, "__aiter__"):
+        async for chunk in content:
+            yield chunk
+    elif hasattr(content, "read"):
+        while chunk := await anyio.to_thread.run_sync(content.read, DEFAULT_CHUNK_SIZE):
+            yield chunk
+    else:
+        iterator = iter(content)
+        while (
+            chunk := await anyio.to_thread.run_sync(next, iterator, None)
+        ) is not None:
+            yield chunk
+
+
+async def _iter_response(response) -> AsyncIterator[bytes]:
+    """Yield a streaming response body in chunks, closing it when done"""
+    try:
+        async for chunk in response.aiter_bytes(DEFAULT_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+class _PartReader:
+    """Regroups a chunk stream into fixed-size parts"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._buffer = bytearray()
+        self._exhausted = False
+
+    async def read(self, size: int) -> bytes:
+        while len(self._buffer) < size and not self._exhausted:
+            try:
+                self._buffer += await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self._exhausted = True
+        part = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return part
+
+
+class AsyncS3StorageRepository:
+    """
+    Native asyncio implementation of AsyncStorageRepository.
+
+    Talks to S3-compatible storage through AsyncS3Client, so transfers wait on
+    sockets rather than occupying worker threads.
+    """
+
+    def __init__(self, client: AsyncS3Client, part_size: int = S3_PART_SIZE):
+        self._client = client
+        self._part_size = part_size
+
+    async def store_file(
+        self,
+        file_content: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+        file: File,
+    ) -> bool:
+        """Store a file, switching to a multipart upload beyond one part"""
+        try:
+            storage_metadata = FileMetadataService.to_storage_format(file.metadata)
+
+            if CONTENT_DEDUP_ENABLED and file.sha256 and file.size is not None:
+                await self._store_reference(file_content, file, storage_metadata)
+            else:
+                await self._upload(
+                    file.object_name, file_content, file.content_type, storage_metadata
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to store file {file.object_name}: {e}")
+            raise StorageError(f"Failed to store file: {str(e)}")
+
+    async def _upload(
+        self,
+        object_name: str,
+        content: Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]],
+        content_type: str,
+        metadata: Optional[dict] = None,
+    ):
+        """Upload an object, switching to a multipart upload beyond one part"""
+        reader = _PartReader(_aiter_chunks(content))
+
+        part = await reader.read(self._part_size)
+        next_part = await reader.read(self._part_size)
+        if not next_part:
+            await self._client.put_object(object_name, part, content_type, metadata)
+            return
+
+        upload_id = await self._client.create_multipart_upload(
+            object_name, content_type, metadata
+        )
+        try:
+            parts = []
+            while part:
+                part_number = len(parts) + 1
+                etag = await self._client.upload_part(
+                    object_name, upload_id, part_number, part
+                )
+                parts.append((part_number, etag))
+                part, next_part = next_part, await reader.read(self._part_size)
+            await self._client.complete_multipart_upload(object_name, upload_id, parts)
+        except BaseException:
+            await self._client.abort_multipart_upload(object_name, upload_id)
+            raise
+
+    async def store_reference(self, file: File) -> bool:
+        """Store a file as a reference to content its collection already holds"""
+        if not (CONTENT_DEDUP_ENABLED and file.sha256 and file.size is not None):
+            raise StorageFileNotFoundError(f"Content not stored: {file.sha256}")
+        try:
+            storage_metadata = FileMetadataService.to_storage_format(file.metadata)
+            await self._store_reference(None, file, storage_metadata)
+            return True
+        except StorageFileNotFoundError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to store reference {file.object_name}: {e}")
+            raise StorageError(f"Failed to store file: {str(e)}")
+
+    async def update_metadata(self, file: File) -> bool:
+        """Replace the content type and user metadata stored with a file"""
+        try:
+            storage_metadata = FileMetadataService.to_storage_format(file.metadata)
+            headers = await self._client.head_object(file.object_name)
+            # References keep pointing at their blob
+            reference = content_reference(AsyncS3Client.user_metadata(headers))
+            if reference is not None:
+                storage_metadata.update(reference_metadata(reference))
+            await self._client.replace_metadata(
+                file.object_name,
+                file.content_type,
+                storage_metadata,
+                int(headers.get("content-length", 0)),
+            )
+            return True
+        except S3AsyncError as e:
+            if e.code == "NoSuchKey":
+                raise StorageFileNotFoundError(f"File not found: {file.object_name}")
+            logger.error(f"Failed to update metadata of {file.object_name}: {e}")
+            raise StorageError(f"Failed to update metadata: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to update metadata of {file.object_name}: {e}")
+            raise StorageError(f"Failed to update metadata: {str(e)}")
+
+    async def content_exists(self, collection: str, sha256: str, size: int) -> bool:
+        """Check whether files of a collection reference content with this digest"""
+        if not CONTENT_DEDUP_ENABLED:
+            return False
+        try:
+            return await self._collection_has_content(
+                collection, ContentReference(sha256, size)
+            )
+        except Exception as e:
+            logger.error(f"Failed to check content {sha256}: {e}")
+            raise StorageError(f"Failed to check content: {str(e)}")
+
+    async def _store_reference(
+        self,
+        file_content: Optional[Union[BinaryIO, Iterable[bytes], AsyncIterable[bytes]]],
+        file: File,
+        storage_metadata: dict,
+    ):
+        """
+        Store content once per digest and the file as a reference to it.
+
+        Without file_content, the content must already be referenced from the
+        file's collection; knowing a digest alone never grants access to it.
+        """
+        reference = ContentReference(file.sha256, file.size)
+        marker = blob_ref_key(reference.sha256, file.object_name)
+
+        # Mark the blob as referenced before relying on it, so blob
+        # collection never sees it unused while this upload is in flight
+        await self._client.put_object(marker, b"", "application/octet-stream")
+        if file_content is None:
+            if not await self._collection_has_content(
+                file.collection, reference, marker
+            ):
+                await self._client.delete_object(marker)
+                raise StorageFileNotFoundError(
+                    f"Content not stored in {file.collection}: {reference.sha256}"
+                )
+        elif not await self._blob_exists(reference):
+            await self._upload(
+                blob_key(reference.sha256), file_content, "application/octet-stream"
+            )
+        await self._client.put_object(
+            file.object_name,
+            b"",
+            file.content_type,
+            {**storage_metadata, **reference_metadata(reference)},
+        )
+
+    async def _collection_has_content(
+        self,
+        collection: str,
+        reference: ContentReference,
+        exclude_marker: Optional[str] = None,
+    ) -> bool:
+        """Check whether a collection references a stored blob, besides one marker"""
+        listing = self._client.list_objects(
+            prefix=collection_refs_prefix(reference.sha256, collection), max_keys=2
+        )
+        found = False
+        try:
+            async for marker in listing:
+                if marker["name"] != exclude_marker:
+                    found = True
+                    break
+        finally:
+            await listing.aclose()
+        return found and await self._blob_exists(reference)
+
+    async def _blob_exists(self, reference: ContentReference) -> bool:
+        """Check whether the referenced content is already stored"""
+        try:
+            headers = await self._client.head_object(blob_key(reference.sha256))
+        except S3AsyncError as e:
+            if e.code == "NoSuchKey":
+                return False
+            raise
+        return int(headers.get("content-length", -1)) == reference.size
+
+    async def _get_range(self, object_name: str, range_header: str):
+        """
+        GET a range of an object, or the headers of the reference it is.
+
+        Plain objects answer in one request. References are empty, so storage
+        refuses the range (or, on stores that ignore ranges on empty objects,
+        answers with the reference itself); only then is the object HEAD'ed.
+        Returns the open response, or None for a reference, and its headers.
+        """
+        try:
+            response = await self._client.get_object(object_name, range_header)
+        except S3AsyncError as e:
+            if e.code != "InvalidRange":
+                raise
+            headers = await self._client.head_object(object_name)
+            if content_reference(AsyncS3Client.user_metadata(headers)) is None:
+                raise e
+            return None, headers
+
+        headers = response.headers
+        if content_reference(AsyncS3Client.user_metadata(headers)) is not None:
+            await response.aclose()
+            return None, headers
+        return response, headers
+
+    async def retrieve_file(
+        self, object_name: str, byte_range: Optional[ByteRange] = None
+    ) -> Tuple[AsyncIterator[bytes], File]:
+        """Open a file for streaming and reconstruct File domain object from its headers"""
+        try:
+            parsed_info = FileParsingService.parse_storage_path(object_name)
+            range_header = byte_range.to_header() if byte_range else None
+            if range_header is None:
+                response = await self._client.get_object(object_name)
+                headers = response.headers
+                metadata = AsyncS3Client.user_metadata(headers)
+                reference = content_reference(metadata)
+                if reference is not None:
+                    await response.aclose()
+                    response = await self._client.get_object(blob_key(reference.sha256))
+            else:
+                response, headers = await self._get_range(object_name, range_header)
+                metadata = AsyncS3Client.user_metadata(headers)
+                reference = content_reference(metadata)
+                if reference is not None:
+                    response = await self._client.get_object(
+                        blob_key(reference.sha256), range_header
+                    )
+
+            # Partial responses report the total size after the slash
+            content_range = response.headers.get("content-range")
+            content_length = (
+                content_range.rpartition("/")[2]
+                if content_range
+                else response.headers.get("content-length")
+            )
+            if reference is not None:
+                content_length = reference.size
+            file = File(
+                object_name=object_name,
+                collection=parsed_info["collection"],
+                owner=parsed_info["owner"],
+                original_filename=parsed_info["original_filename"],
+                upload_time=parsed_info["timestamp"],
+                content_type=headers.get("content-type", "application/octet-stream"),
+                size=int(content_length) if content_length else None,
+                etag=response.headers.get("etag", "").strip('"') or None,
+                sha256=content_sha256(metadata),
+                metadata=without_reference_metadata(metadata),
+            )
+            return _iter_response(response), file
+
+        except S3AsyncError as e:
+            if e.code == "NoSuchKey":
+                raise StorageFileNotFoundError(f"File not found: {object_name}")
+            if e.code == "InvalidRange":
+                raise StorageRangeNotSatisfiableError(
+                    f"Range not satisfiable: {object_name}"
+                )
+            logger.error(f"Failed to retrieve file {object_name}: {e}")
+            raise StorageError(f"Failed to retrieve file: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to retrieve file {object_name}: {e}")
+            raise StorageError(f"Failed to retrieve file: {str(e)}")
+
+    @staticmethod
+    def _file_from_listing(storage_obj: dict) -> Optional[File]:
+        """Build a File from a listing entry, or None if it cannot be parsed"""
+        try:
+            object_name = storage_obj["name"]
+            parsed_info = FileParsingService.parse_storage_path(object_name)
+            last_modified = storage_obj["last_modified"]
+            # References list as empty objects; report the content size
+            reference = content_reference(storage_obj.get("metadata"))
+            return File(
+                object_name=object_name,
+                collection=parsed_info["collection"],
+                owner=parsed_info["owner"],
+                original_filename=parsed_info["original_filename"],
+                upload_time=parsed_info["timestamp"],
+                content_type="application/octet-stream",  # S3 list doesn't include content type
+                size=reference.size if reference else storage_obj["size"],
+                metadata={
+                    "last_modified": last_modified.isoformat()
+                    if last_modified
+                    else None
+                },
+            )
+        except Exception as e:
+            # Log but continue - don't fail entire listing for one bad file
+            logger.warning(
+                f"Failed to parse file {storage_obj.get('name', 'unknown')}: {e}"
+            )
+            return None
+
+    async def list_files_in_collection(self, collection: str) -> List[File]:
+        """List all files in a collection using prefix listing"""
+        try:
+            files = []
+            async for storage_obj in self._client.list_objects(prefix=f"{collection}/"):
+                domain_file = self._file_from_listing(storage_obj)
+                if domain_file is not None:
+                    files.append(domain_file)
+            return files
+
+        except Exception as e:
+            logger.error(f"Failed to list files in collection {collection}: {e}")
+            raise StorageError(f"Failed to list files: {str(e)}")
+
+    async def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> FilePage:
+        """List one page of a collection using ListObjectsV2 start-after"""
+        try:
+            storage_objects = []
+            listing = self._client.list_objects(
+                prefix=f"{collection}/", start_after=start_after, max_keys=limit + 1
+            )
+            try:
+                async for storage_obj in listing:
+                    storage_objects.append(storage_obj)
+                    if len(storage_objects) > limit:
+                        break
+            finally:
+                await listing.aclose()
+
+            has_more = len(storage_objects) > limit
+            storage_objects = storage_objects[:limit]
+            files = [self._file_from_listing(obj) for obj in storage_objects]
+            return FilePage(
+                files=[f for f in files if f is not None],
+                # Continue after the last key, even if that entry was skipped
+                next_start_after=storage_objects[-1]["name"] if has_more else None,
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to list files in collection {collection}: {e}")
+            raise StorageError(f"Failed to list files: {str(e)}")
+
+    async def delete_file(self, object_name: str) -> bool:
+        """
+        Delete a file from storage, and its blob marker if it is a reference.
+
+        S3 deletes of missing keys succeed, so one HEAD first both reports a
+        missing file and finds the marker a reference leaves behind.
+        """
+        try:
+            headers = await self._client.head_object(object_name)
+            reference = content_reference(AsyncS3Client.user_metadata(headers))
+            await self._client.delete_object(object_name)
+            if reference is not None:
+                # A leftover marker would keep the collection's access to the
+                # content, and the blob, until the next collection sweep
+                await self._client.delete_object(
+                    blob_ref_key(reference.sha256, object_name)
+                )
+            return True
+
+        except S3AsyncError as e:
+            if e.code == "NoSuchKey":
+                raise StorageFileNotFoundError(f"File not found: {object_name}")
+            logger.error(f"Failed to delete file {object_name}: {e}")
+            raise StorageError(f"Failed to delete file: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to delete file {object_name}: {e}")
+            raise StorageError(f"Failed to delete file: {str(e)}")
+
+    async def file_exists(self, object_name: str) -> bool:
+        """Check if a file exists in storage"""
+        try:
+            await self._client.head_object(object_name)
+            return True
+        except S3AsyncError as e:
+            if e.code == "NoSuchKey":
+                return False
+            raise StorageError(f"Failed to check file: {str(e)}")
+        except Exception as e:
+            raise StorageError(f"Failed to check file: {str(e)}")
@@ -0,0 +1,486 @@
+# Metadata index - SQLite mirror of stored file metadata for fast listings
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from domain.models import File, FilePage, FileQuery
+from domain.repositories import MetadataIndexError
+from domain.services import FileMetadataService
+
+# Path of the SQLite database file; the index is disabled when unset
+METADATA_INDEX_PATH = os.environ.get("METADATA_INDEX_PATH", "")
+
+_COLUMNS = (
+    "object_name, collection, owner, original_filename, upload_time, "
+    "content_type, size, etag, metadata"
+)
+_QUALIFIED_COLUMNS = ", ".join(f"files.{column}" for column in _COLUMNS.split(", "))
+_INSERT = (
+    f"INSERT OR REPLACE INTO files ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Metadata written by the API itself rather than the uploader; not searched.
+# Uploaders are found through the owner filter, and checksums are not words.
+_NOT_SEARCHED_KEYS = (
+    "collection",
+    "upload_time",
+    "original_filename",
+    "uploader",
+    FileMetadataService.CHECKSUM_KEY,
+)
+# Migrations run through executescript, which binds no parameters, so they
+# spell the keys out as an SQL list
+_NOT_SEARCHED_SQL = ", ".join(f"'{key}'" for key in _NOT_SEARCHED_KEYS)
+# Search documents for every indexed file, as migrations fill them
+_SEARCH_BACKFILL = f"""
+    INSERT INTO files_fts (rowid, original_filename, metadata)
+        SELECT search_documents.id, files.original_filename,
+            (SELECT IFNULL(group_concat(value, ' '), '')
+             FROM json_each(files.metadata)
+             WHERE key NOT IN ({_NOT_SEARCHED_SQL}))
+        FROM files JOIN search_documents USING (object_name);
+"""
+# Relative BM25 weight of file name matches over user metadata matches
+FILENAME_SEARCH_WEIGHT = 10.0
+# Words beyond this are ignored in search queries
+MAX_SEARCH_WORDS = 16
+_WORD_PATTERN = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+
+def _index_metadata(metadata: Dict[str, Any]) -> Dict[str, str]:
+    """Metadata as storage keeps it: string values under lowercase keys"""
+    return {
+        key.lower(): value
+        for key, value in FileMetadataService.to_storage_format(metadata).items()
+    }
+
+
+def _file_from_row(row: sqlite3.Row) -> File:
+    return File(
+        object_name=row["object_name"],
+        collection=row["collection"],
+        owner=row["owner"],
+        original_filename=row["original_filename"],
+        upload_time=row["upload_time"],
+        content_type=row["content_type"],
+        size=row["size"],
+        etag=row["etag"],
+        metadata=json.loads(row["metadata"]),
+    )
+
+
+class SQLiteMetadataIndex:
+    """
+    SQLite implementation of MetadataIndexRepository protocol.
+
+    One embedded database file, no extra service. Metadata is stored the way
+    storage returns it (string values, lowercase keys), so a listing served
+    from the index matches what a download of the same file reports.
+
+    The connection is shared by the event loop and storage worker threads
+    behind a lock. WAL mode keeps commits cheap enough to run inline with
+    uploads, and rows are clustered by object name so a collection page is
+    a single index range scan.
+    """
+
+    def __init__(self, path: str = METADATA_INDEX_PATH):
+        try:
+            self._conn = sqlite3.connect(
+                path, check_same_thread=False, isolation_level=None
+            )
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._migrate()
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to open metadata index {path}: {e}")
+        self._lock = threading.Lock()
+        # Once complete, an index stays complete; only the first check queries
+        self._complete = False
+
+    def _migrate(self):
+        """Create or upgrade the schema; its version is kept in user_version"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self._conn.executescript(
+                """
+                BEGIN;
+                CREATE TABLE IF NOT EXISTS files (
+                    object_name TEXT PRIMARY KEY,
+                    collection TEXT NOT NULL,
+                    owner TEXT NOT NULL,
+                    original_filename TEXT NOT NULL,
+                    upload_time TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    size INTEGER,
+                    etag TEXT,
+                    metadata TEXT NOT NULL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS files_by_collection
+                    ON files (collection, object_name);
+                PRAGMA user_version = 1;
+                COMMIT;
+                """
+            )
+        if version < 2:
+            # Query support: one row per user metadata value, and indexes for
+            # every sortable field (ties broken by object name)
+            self._conn.executescript(
+                """
+                BEGIN;
+                CREATE TABLE IF NOT EXISTS file_metadata (
+                    object_name TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (object_name, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS file_metadata_by_value
+                    ON file_metadata (key, value, object_name);
+                INSERT OR REPLACE INTO file_metadata (object_name, key, value)
+                    SELECT files.object_name, entry.key, entry.value
+                    FROM files, json_each(files.metadata) AS entry;
+                CREATE INDEX IF NOT EXISTS files_by_owner
+                    ON files (collection, owner, object_name);
+                CREATE INDEX IF NOT EXISTS files_by_upload_time
+                    ON files (collection, upload_time, object_name);
+                CREATE INDEX IF NOT EXISTS files_by_content_type
+                    ON files (collection, content_type, object_name);
+                CREATE INDEX IF NOT EXISTS files_by_original_filename
+                    ON files (collection, original_filename, object_name);
+                CREATE INDEX IF NOT EXISTS files_by_size
+                    ON files (collection, IFNULL(size, 0), object_name);
+                PRAGMA user_version = 2;
+                COMMIT;
+                """
+            )
+        if version < 3:
+            # Full-text search: an FTS5 inverted index over file names and
+            # user metadata values. FTS rows are addressed by the integer id
+            # in search_documents so updates never scan the FTS table.
+            self._conn.executescript(
+                f"""
+                BEGIN;
+                CREATE TABLE IF NOT EXISTS search_documents (
+                    id INTEGER PRIMARY KEY,
+                    object_name TEXT NOT NULL UNIQUE
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                    original_filename,
+                    metadata,
+                    tokenize = 'porter unicode61 remove_diacritics 2'
+                );
+                INSERT INTO files_fts (files_fts, rank)
+                    VALUES ('rank', 'bm25({FILENAME_SEARCH_WEIGHT}, 1.0)');
+                INSERT OR IGNORE INTO search_documents (object_name)
+                    SELECT object_name FROM files;
+                {_SEARCH_BACKFILL}
+                PRAGMA user_version = 3;
+                COMMIT;
+                """
+            )
+        if version < 4:
+            # Whether the index was filled from storage. Indexes that already
+            # hold files were built before this was tracked and count as
+            # filled; a new, empty one is not until it is rebuilt or filled.
+            self._conn.executescript(
+                """
+                BEGIN;
+                CREATE TABLE IF NOT EXISTS index_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                ) WITHOUT ROWID;
+                INSERT OR IGNORE INTO index_state (key, value)
+                    SELECT 'complete', '1' WHERE EXISTS (SELECT 1 FROM files);
+                PRAGMA user_version = 4;
+                COMMIT;
+                """
+            )
+        if version < 5:
+            # Uploader names and checksums were searchable; index the
+            # metadata of existing files again without them
+            self._conn.executescript(
+                f"""
+                BEGIN;
+                DELETE FROM files_fts;
+                {_SEARCH_BACKFILL}
+                PRAGMA user_version = 5;
+                COMMIT;
+                """
+            )
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _row(file: File) -> tuple:
+        return (
+            file.object_name,
+            file.collection,
+            file.owner,
+            file.original_filename,
+            file.upload_time,
+            file.content_type,
+            file.size,
+            file.etag,
+            json.dumps(_index_metadata(file.metadata), sort_keys=True),
+        )
+
+    def _delete(self, object_name: str):
+        self._conn.execute("DELETE FROM files WHERE object_name = ?", (object_name,))
+        self._conn.execute(
+            "DELETE FROM file_metadata WHERE object_name = ?", (object_name,)
+        )
+        document = self._conn.execute(
+            "SELECT id FROM search_documents WHERE object_name = ?", (object_name,)
+        ).fetchone()
+        if document is not None:
+            self._conn.execute("DELETE FROM files_fts WHERE rowid = ?", (document[0],))
+            self._conn.execute(
+                "DELETE FROM search_documents WHERE id = ?", (document[0],)
+            )
+
+    def _write(self, file: File):
+        self._delete(file.object_name)
+        row = self._row(file)
+        metadata = json.loads(row[-1])
+        self._conn.execute(_INSERT, row)
+        self._conn.executemany(
+            "INSERT INTO file_metadata (object_name, key, value) VALUES (?, ?, ?)",
+            [(file.object_name, key, value) for key, value in metadata.items()],
+        )
+        document_id = self._conn.execute(
+            "INSERT INTO search_documents (object_name) VALUES (?)",
+            (file.object_name,),
+        ).lastrowid
+        self._conn.execute(
+            "INSERT INTO files_fts (rowid, original_filename, metadata) "
+            "VALUES (?, ?, ?)",
+            (
+                document_id,
+                file.original_filename,
+                " ".join(
+                    value
+                    for key, value in metadata.items()
+                    if key not in _NOT_SEARCHED_KEYS
+                ),
+            ),
+        )
+
+    def upsert_file(self, file: File) -> None:
+        """Add or replace the index entry for a file"""
+        try:
+            with self._lock, self._transaction():
+                self._write(file)
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to index {file.object_name}: {e}")
+
+    def remove_file(self, object_name: str) -> None:
+        """Remove the index entry for a file, if any"""
+        try:
+            with self._lock, self._transaction():
+                self._delete(object_name)
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to unindex {object_name}: {e}")
+
+    def _query(self, sql: str, parameters: tuple) -> List[File]:
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, parameters).fetchall()
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to query metadata index: {e}")
+        return [_file_from_row(row) for row in rows]
+
+    def list_files_in_collection(self, collection: str) -> List[File]:
+        """List all indexed files in a collection, in object name order"""
+        return self._query(
+            f"SELECT {_COLUMNS} FROM files WHERE collection = ? "
+            "ORDER BY object_name",
+            (collection,),
+        )
+
+    def list_files_page(
+        self, collection: str, limit: int, start_after: Optional[str] = None
+    ) -> FilePage:
+        """List one page of a collection, fetching limit + 1 rows to detect more"""
+        files = self._query(
+            f"SELECT {_COLUMNS} FROM files WHERE collection = ? AND object_name > ? "
+            "ORDER BY object_name LIMIT ?",
+            (collection, start_after or "", limit + 1),
+        )
+        has_more = len(files) > limit
+        files = files[:limit]
+        return FilePage(
+            files=files,
+            next_start_after=files[-1].object_name if has_more else None,
+        )
+
+    def query_files(
+        self,
+        query: FileQuery,
+        limit: int,
+        after: Optional[Tuple[Any, str]] = None,
+    ) -> FilePage:
+        """Find matching files with one indexed query, keyset-paginated"""
+        conditions = ["collection = ?"]
+        parameters: List[Any] = [query.collection]
+        for condition, value in (
+            ("owner = ?", query.owner),
+            ("content_type = ?", query.content_type),
+            ("upload_time >= ?", query.uploaded_after),
+            ("upload_time < ?", query.uploaded_before),
+            ("IFNULL(size, 0) >= ?", query.min_size),
+            ("IFNULL(size, 0) <= ?", query.max_size),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        for key, value in query.metadata.items():
+            conditions.append(
+                "object_name IN (SELECT object_name FROM file_metadata "
+                "WHERE key = ? AND value = ?)"
+            )
+            parameters.extend((key.lower(), value))
+
+        # query.sort is validated against a fixed set of field names
+        sort = "IFNULL(size, 0)" if query.sort == "size" else query.sort
+        direction = "DESC" if query.descending else "ASC"
+        if after is not None:
+            conditions.append(
+                f"({sort}, object_name) {'<' if query.descending else '>'} (?, ?)"
+            )
+            parameters.extend(after)
+
+        files = self._query(
+            f"SELECT {_COLUMNS} FROM files WHERE {' AND '.join(conditions)} "
+            f"ORDER BY {sort} {direction}, object_name {direction} LIMIT ?",
+            (*parameters, limit + 1),
+        )
+        has_more = len(files) > limit
+        files = files[:limit]
+        return FilePage(
+            files=files,
+            next_start_after=files[-1].object_name if has_more else None,
+        )
+
+    def list_collections(self) -> List[str]:
+        """Distinct collections, found by skipping through the collection index"""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    """
+                    WITH RECURSIVE collections(name) AS (
+                        SELECT MIN(collection) FROM files
+                        UNION ALL
+                        SELECT (SELECT MIN(collection) FROM files
+                                WHERE collection > collections.name)
+                        FROM collections WHERE collections.name IS NOT NULL
+                    )
+                    SELECT name FROM collections WHERE name IS NOT NULL
+                    """
+                ).fetchall()
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to query metadata index: {e}")
+        return [row[0] for row in rows]
+
+    def search_files(
+        self,
+        text: str,
+        collections: List[str],
+        limit: int,
+        offset: int = 0,
+    ) -> List[File]:
+        """Rank files matching every word of text by BM25"""
+        words = _WORD_PATTERN.findall(text.lower())[:MAX_SEARCH_WORDS]
+        if not words or not collections:
+            return []
+        # Quote words so user input is never parsed as FTS5 query syntax;
+        # the last word matches as a prefix for search-as-you-type
+        match = " ".join(f'"{word}"' for word in words) + "*"
+
+        placeholders = ", ".join("?" * len(collections))
+        return self._query(
+            f"SELECT {_QUALIFIED_COLUMNS} FROM files_fts "
+            "JOIN search_documents ON search_documents.id = files_fts.rowid "
+            "JOIN files ON files.object_name = search_documents.object_name "
+            f"WHERE files_fts MATCH ? AND files.collection IN ({placeholders}) "
+            "ORDER BY files_fts.rank LIMIT ? OFFSET ?",
+            (match, *collections, limit, offset),
+        )
+
+    def replace_all(self, files: Iterable[File]) -> int:
+        """Replace every index entry in one transaction"""
+        count = 0
+        try:
+            with self._lock, self._transaction():
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute("DELETE FROM file_metadata")
+                self._conn.execute("DELETE FROM search_documents")
+                self._conn.execute("DELETE FROM files_fts")
+                for file in files:
+                    self._write(file)
+                    count += 1
+                self._mark_complete()
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to rebuild metadata index: {e}")
+        logger.info(f"Rebuilt metadata index with {count} files")
+        return count
+
+    def fill(self, files: Iterable[File]) -> int:
+        """Add files not indexed yet in one transaction, keeping existing entries"""
+        count = 0
+        try:
+            with self._lock, self._transaction():
+                for file in files:
+                    indexed = self._conn.execute(
+                        "SELECT 1 FROM files WHERE object_name = ?",
+                        (file.object_name,),
+                    ).fetchone()
+                    if indexed is None:
+                        self._write(file)
+                        count += 1
+                self._mark_complete()
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to fill metadata index: {e}")
+        logger.info(f"Filled metadata index with {count} files")
+        return count
+
+    def _mark_complete(self):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO index_state (key, value) VALUES ('complete', '1')"
+        )
+        self._complete = True
+
+    def is_complete(self) -> bool:
+        """True once the index was rebuilt or filled from storage"""
+        if self._complete:
+            return True
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT 1 FROM index_state WHERE key = 'complete'"
+                ).fetchone()
+        except sqlite3.Error as e:
+            raise MetadataIndexError(f"Failed to query metadata index: {e}")
+        self._complete = row is not None
+        return self._complete
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
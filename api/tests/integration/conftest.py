@@ -3,9 +3,13 @@ import time
 from unittest.mock import MagicMock, patch
 
 import pytest
-from domain.repositories import StorageRepository
+from auth.middleware import token_cache
+from domain.repositories import StorageRepository, UploadSessionRepository
 from fastapi.testclient import TestClient
-from infrastructure.container import get_storage_repository
+from infrastructure.container import (
+    get_storage_repository,
+    get_upload_session_repository,
+)
 
 from api.main import app  # Import app here for dependency override
 from api.tests.fixtures.test_data import (
@@ -41,6 +45,7 @@ def integration_client(mock_keycloak_requests, mock_jwt_verification):
 
         # Configure the mock to return appropriate values for each protocol method
         storage_repo_mock.store_file.return_value = True
+        storage_repo_mock.update_metadata.return_value = True
         storage_repo_mock.list_files_in_collection.return_value = [
             # Mock File objects using the sample data
             MagicMock(
@@ -93,11 +98,18 @@ def integration_client(mock_keycloak_requests, mock_jwt_verification):
         storage_repo_mock.delete_file.return_value = True
         storage_repo_mock.file_exists.return_value = True
 
-        # Override dependencies for StorageRepository
+        # Create mock UploadSessionRepository; tests configure sessions as needed
+        upload_session_repo_mock = MagicMock(spec=UploadSessionRepository)
+
+        # Override dependencies for StorageRepository and UploadSessionRepository
         app.dependency_overrides[get_storage_repository] = lambda: storage_repo_mock
+        app.dependency_overrides[get_upload_session_repository] = (
+            lambda: upload_session_repo_mock
+        )
 
         with TestClient(app) as client:
             client.storage_repo_mock = storage_repo_mock
+            client.upload_session_repo_mock = upload_session_repo_mock
             client.keycloak_post_mock = mock_keycloak_requests
             yield client
 
@@ -213,8 +225,11 @@ def mock_jwt_verification():
             }
         return None
 
+    # Principals cached by earlier tests must not bypass this test's mock
+    token_cache.clear()
     with patch("auth.middleware.verify_jwt_token", side_effect=mock_verify_jwt_token):
         yield
+    token_cache.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,135 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+FILES = {"report.csv": b"a,b\n1,2\n", "data/2024/items.json": b'{"items": []}'}
+
+
+def _tar_gz(files):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+        directory = tarfile.TarInfo("data")
+        directory.type = tarfile.DIRTYPE
+        tar.addfile(directory)
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return archive.getvalue()
+
+
+def _zip(files):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in files.items():
+            zip_file.writestr(name, content)
+    return archive.getvalue()
+
+
+@pytest.mark.integration
+class TestArchiveUploadAPIIntegration:
+    """Integration tests for POST /api/files/{collection}/archive"""
+
+    def test_tar_members_stored_with_shared_metadata(
+        self, integration_client, service_account_headers
+    ):
+        """Test every regular file of a tar.gz is stored with the given metadata"""
+        response = integration_client.post(
+            "/api/files/test/archive?metadata=%7B%22batch%22%3A%20%227%22%7D",
+            content=_tar_gz(FILES),
+            headers={**service_account_headers, "Content-Type": "application/gzip"},
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert (result["uploaded"], result["failed"]) == (2, 0)
+        assert [f["filename"] for f in result["files"]] == list(FILES)
+        stored = {
+            call.args[1].original_filename: call.args[1]
+            for call in integration_client.storage_repo_mock.store_file.call_args_list
+        }
+        assert set(stored) == {"report.csv", "data_2024_items.json"}
+        assert all(f.metadata["batch"] == "7" for f in stored.values())
+        assert stored["data_2024_items.json"].content_type == "application/json"
+        assert stored["report.csv"].size == len(FILES["report.csv"])
+
+    def test_zip_members_streamed_to_storage(
+        self, integration_client, service_account_headers
+    ):
+        """Test zip archives are expanded from their local headers"""
+        stored = {}
+
+        def store_file(content, file):
+            stored[file.original_filename] = b"".join(content)
+            return True
+
+        integration_client.storage_repo_mock.store_file.side_effect = store_file
+
+        response = integration_client.post(
+            "/api/files/test/archive",
+            content=_zip(FILES),
+            headers={**service_account_headers, "Content-Type": "application/zip"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["uploaded"] == 2
+        assert stored == {
+            "report.csv": FILES["report.csv"],
+            "data_2024_items.json": FILES["data/2024/items.json"],
+        }
+
+    def test_corrupt_archive_rejected(
+        self, integration_client, service_account_headers
+    ):
+        """Test archives that do not parse are rejected"""
+        response = integration_client.post(
+            "/api/files/test/archive",
+            content=_tar_gz(FILES)[:40],
+            headers={**service_account_headers, "Content-Type": "application/gzip"},
+        )
+
+        assert response.status_code == 400
+
+    def test_archive_expanding_past_limit_rejected(
+        self, integration_client, service_account_headers, monkeypatch
+    ):
+        """Test archives are refused once their files exceed the expanded limit"""
+        from usecases import expand_archive
+
+        monkeypatch.setattr(expand_archive, "MAX_ARCHIVE_BYTES", 10)
+
+        response = integration_client.post(
+            "/api/files/test/archive",
+            content=_zip(FILES),
+            headers={**service_account_headers, "Content-Type": "application/zip"},
+        )
+
+        assert response.status_code == 400
+        assert "expands to at most" in response.json()["detail"]
+
+    def test_unsupported_archive_type_rejected(
+        self, integration_client, service_account_headers
+    ):
+        """Test bodies that are not a known archive type are refused"""
+        response = integration_client.post(
+            "/api/files/test/archive",
+            content=b"{}",
+            headers={**service_account_headers, "Content-Type": "application/json"},
+        )
+
+        assert response.status_code == 415
+
+    def test_archive_requires_write_permission(
+        self, integration_client, limited_user_headers
+    ):
+        """Test archives to collections without write access are refused"""
+        response = integration_client.post(
+            "/api/files/test/archive",
+            content=_zip(FILES),
+            headers={**limited_user_headers, "Content-Type": "application/zip"},
+        )
+
+        assert response.status_code == 403
+        integration_client.storage_repo_mock.store_file.assert_not_called()
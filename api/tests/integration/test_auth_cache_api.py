@@ -0,0 +1,41 @@
+import pytest
+from auth import middleware
+
+
+@pytest.mark.integration
+class TestTokenCacheIntegration:
+    """Integration tests for the verified-token cache"""
+
+    def test_repeated_requests_verify_token_once(
+        self, integration_client, authenticated_headers, admin_headers
+    ):
+        """Test a token is verified on first use and served from cache after"""
+        for _ in range(3):
+            response = integration_client.get(
+                "/api/files/test", headers=authenticated_headers
+            )
+            assert response.status_code == 200
+
+        assert middleware.verify_jwt_token.call_count == 1
+        metrics = integration_client.get("/api/metrics", headers=admin_headers).json()
+        assert metrics["token_cache"]["hits"] == 2
+
+    def test_invalid_tokens_are_not_cached(self, integration_client):
+        """Test failed verification is retried rather than remembered"""
+        for _ in range(2):
+            response = integration_client.get(
+                "/api/files/test", headers={"Authorization": "Bearer bogus"}
+            )
+            assert response.status_code == 401
+
+        assert middleware.verify_jwt_token.call_count == 2
+
+    def test_metrics_require_admin(
+        self, integration_client, authenticated_headers, admin_headers
+    ):
+        """Test only admins can read the service metrics"""
+        assert integration_client.get("/api/metrics").status_code in (401, 403)
+        response = integration_client.get("/api/metrics", headers=authenticated_headers)
+        assert response.status_code == 403
+        response = integration_client.get("/api/metrics", headers=admin_headers)
+        assert response.status_code == 200
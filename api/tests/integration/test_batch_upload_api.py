@@ -0,0 +1,92 @@
+import io
+
+import pytest
+
+
+def _files(*names):
+    return [
+        ("files", (name, io.BytesIO(f"content of {name}".encode()), "text/plain"))
+        for name in names
+    ]
+
+
+@pytest.mark.integration
+class TestBatchUploadAPIIntegration:
+    """Integration tests for POST /api/files/{collection}/batch"""
+
+    def test_batch_stores_every_file_with_its_metadata(
+        self, integration_client, service_account_headers
+    ):
+        """Test each file is stored with the metadata at its position"""
+        response = integration_client.post(
+            "/api/files/test/batch",
+            files=_files("a.txt", "b.txt"),
+            data={"metadata": '[{"part": "1"}, {"part": "2"}]'},
+            headers=service_account_headers,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert (result["uploaded"], result["failed"]) == (2, 0)
+        assert [f["filename"] for f in result["files"]] == ["a.txt", "b.txt"]
+        assert all(f["object_name"].startswith("test/") for f in result["files"])
+        stored = {
+            call.args[1].original_filename: call.args[1].metadata["part"]
+            for call in integration_client.storage_repo_mock.store_file.call_args_list
+        }
+        assert stored == {"a.txt": "1", "b.txt": "2"}
+
+    def test_failed_file_does_not_fail_batch(
+        self, integration_client, authenticated_headers
+    ):
+        """Test per-file storage errors are reported next to the successes"""
+
+        def store_file(content, file):
+            if file.original_filename == "bad.txt":
+                raise Exception("disk full")
+            return True
+
+        integration_client.storage_repo_mock.store_file.side_effect = store_file
+
+        response = integration_client.post(
+            "/api/files/test/batch",
+            files=_files("good.txt", "bad.txt", "good.txt"),
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["status"] == "partial"
+        assert [f["status"] for f in result["files"]] == [
+            "success",
+            "error",
+            "error",
+        ]
+        assert "Duplicate filename" in result["files"][2]["detail"]
+
+    @pytest.mark.parametrize("metadata", ["[{}]", "not json", '["a", "b"]'])
+    def test_mismatched_metadata_rejected(
+        self, integration_client, authenticated_headers, metadata
+    ):
+        """Test metadata arrays must hold one object per file"""
+        response = integration_client.post(
+            "/api/files/test/batch",
+            files=_files("a.txt", "b.txt"),
+            data={"metadata": metadata},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 400
+        integration_client.storage_repo_mock.store_file.assert_not_called()
+
+    def test_batch_requires_write_permission(
+        self, integration_client, limited_user_headers
+    ):
+        """Test batches to collections without write access are refused"""
+        response = integration_client.post(
+            "/api/files/test/batch",
+            files=_files("a.txt"),
+            headers=limited_user_headers,
+        )
+
+        assert response.status_code == 403
@@ -0,0 +1,105 @@
+import hashlib
+
+import pytest
+from domain.repositories import StorageFileNotFoundError
+
+CONTENT_SHA256 = hashlib.sha256(b"nightly backup").hexdigest()
+OTHER_SHA256 = hashlib.sha256(b"changed file").hexdigest()
+
+
+@pytest.mark.integration
+class TestContentCheckAPIIntegration:
+    """Integration tests for POST /api/files/{collection}/content-check"""
+
+    def test_check_splits_existing_and_missing(
+        self, integration_client, service_account_headers
+    ):
+        """Test contents are reported as existing or missing, in request order"""
+        integration_client.storage_repo_mock.content_exists.side_effect = (
+            lambda collection, sha256, size: sha256 == CONTENT_SHA256
+        )
+
+        response = integration_client.post(
+            "/api/files/test/content-check",
+            json={
+                "files": [
+                    {"sha256": OTHER_SHA256, "size": 12},
+                    {"sha256": CONTENT_SHA256, "size": 14},
+                ]
+            },
+            headers=service_account_headers,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["existing"] == [{"sha256": CONTENT_SHA256, "size": 14}]
+        assert result["missing"] == [{"sha256": OTHER_SHA256, "size": 12}]
+        integration_client.storage_repo_mock.content_exists.assert_any_call(
+            "test", CONTENT_SHA256, 14
+        )
+
+    def test_check_rejects_malformed_digest(
+        self, integration_client, authenticated_headers
+    ):
+        """Test digests must be lowercase hex SHA-256"""
+        response = integration_client.post(
+            "/api/files/test/content-check",
+            json={"files": [{"sha256": "not-a-digest", "size": 1}]},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 422
+
+    def test_check_requires_write_permission(
+        self, integration_client, limited_user_headers
+    ):
+        """Test only principals that could upload may probe a collection"""
+        response = integration_client.post(
+            "/api/files/test/content-check",
+            json={"files": [{"sha256": CONTENT_SHA256, "size": 14}]},
+            headers=limited_user_headers,
+        )
+
+        assert response.status_code == 403
+        integration_client.storage_repo_mock.content_exists.assert_not_called()
+
+
+@pytest.mark.integration
+class TestRegisterFileAPIIntegration:
+    """Integration tests for POST /api/files/{collection}/references"""
+
+    def test_register_stores_reference(self, integration_client, authenticated_headers):
+        """Test registering creates a new file without transferring content"""
+        response = integration_client.post(
+            "/api/files/test/references",
+            data={
+                "filename": "backup.tar",
+                "sha256": CONTENT_SHA256,
+                "size": "14",
+                "metadata": '{"night": "2024-06-01"}',
+            },
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["object_name"].endswith("-backup.tar")
+        (stored,) = integration_client.storage_repo_mock.store_reference.call_args.args
+        assert (stored.sha256, stored.size) == (CONTENT_SHA256, 14)
+        assert stored.metadata["night"] == "2024-06-01"
+        integration_client.storage_repo_mock.store_file.assert_not_called()
+
+    def test_register_unknown_content_is_not_found(
+        self, integration_client, authenticated_headers
+    ):
+        """Test contents the collection does not hold must be uploaded"""
+        integration_client.storage_repo_mock.store_reference.side_effect = (
+            StorageFileNotFoundError("missing")
+        )
+
+        response = integration_client.post(
+            "/api/files/test/references",
+            data={"filename": "backup.tar", "sha256": CONTENT_SHA256, "size": "14"},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,68 @@
+from io import BytesIO
+
+import pytest
+from domain.models import File
+from infrastructure.container import container
+from infrastructure.download_cache import DownloadCache
+
+CONTENT = b"0123456789abcdefghij" * 100
+
+
+def _retrieve(object_name, byte_range=None):
+    return BytesIO(CONTENT), File(
+        object_name=object_name,
+        collection="test",
+        owner="user",
+        original_filename="test.txt",
+        upload_time="20250101-120000",
+        content_type="text/plain",
+        size=len(CONTENT),
+        etag="abc123",
+    )
+
+
+@pytest.fixture
+def download_cache(monkeypatch, tmp_path):
+    cache = DownloadCache(str(tmp_path))
+    monkeypatch.setattr(container, "_download_cache", cache)
+    return cache
+
+
+@pytest.mark.integration
+class TestDownloadCacheAPIIntegration:
+    """Integration tests for downloads served from the local download cache"""
+
+    def test_repeat_download_is_served_from_cache(
+        self, integration_client, authenticated_headers, download_cache
+    ):
+        """Test the second download and ranges on it skip storage"""
+        integration_client.storage_repo_mock.retrieve_file.side_effect = _retrieve
+        url = "/api/files/test/user/test.txt"
+
+        first = integration_client.get(url, headers=authenticated_headers)
+        second = integration_client.get(url, headers=authenticated_headers)
+        ranged = integration_client.get(
+            url, headers={**authenticated_headers, "Range": "bytes=2-5"}
+        )
+
+        assert first.content == second.content == CONTENT
+        assert second.headers["content-length"] == str(len(CONTENT))
+        assert second.headers["etag"] == '"abc123"'
+        assert second.headers["content-disposition"] == "attachment; filename=test.txt"
+        assert ranged.status_code == 206
+        assert ranged.content == b"2345"
+        assert integration_client.storage_repo_mock.retrieve_file.call_count == 1
+        assert download_cache.statistics()["hits"] == 2
+
+    def test_deleted_file_leaves_cache(
+        self, integration_client, authenticated_headers, download_cache
+    ):
+        """Test deleting a file through the API drops its cached copy"""
+        integration_client.storage_repo_mock.retrieve_file.side_effect = _retrieve
+        url = "/api/files/test/user/test.txt"
+
+        integration_client.get(url, headers=authenticated_headers)
+        response = integration_client.delete(url, headers=authenticated_headers)
+
+        assert response.status_code == 200
+        assert len(download_cache) == 0
@@ -0,0 +1,88 @@
+import base64
+import hashlib
+from io import BytesIO
+
+import pytest
+from domain import FileIntegrityError
+from domain.models import File
+
+CONTENT = b"0123456789abcdefghij"
+CONTENT_SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+def _retriever(data: bytes):
+    """Fake storage read returning data for a file recorded with CONTENT's checksum"""
+
+    def retrieve(object_name, byte_range=None):
+        return BytesIO(data), File(
+            object_name=object_name,
+            collection="test",
+            owner="user",
+            original_filename="test.txt",
+            upload_time="20250101-120000",
+            content_type="text/plain",
+            size=len(data),
+            sha256=CONTENT_SHA256,
+        )
+
+    return retrieve
+
+
+@pytest.mark.integration
+class TestDownloadIntegrityAPIIntegration:
+    """Integration tests for checksums on upload and download"""
+
+    def test_upload_records_checksum(self, integration_client, authenticated_headers):
+        """Test uploads return and store the SHA-256 of their content"""
+        response = integration_client.post(
+            "/api/files/test",
+            files={"file": ("test.txt", BytesIO(CONTENT), "text/plain")},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["sha256"] == CONTENT_SHA256
+        stored = integration_client.storage_repo_mock.store_file.call_args.args[1]
+        assert stored.metadata["sha256"] == CONTENT_SHA256
+
+    def test_download_sends_digest(self, integration_client, authenticated_headers):
+        """Test downloads carry the recorded checksum as an RFC 3230 Digest"""
+        integration_client.storage_repo_mock.retrieve_file.side_effect = _retriever(
+            CONTENT
+        )
+
+        response = integration_client.get(
+            "/api/files/test/user/test.txt", headers=authenticated_headers
+        )
+
+        expected = base64.b64encode(hashlib.sha256(CONTENT).digest()).decode()
+        assert response.headers["digest"] == f"sha-256={expected}"
+
+    def test_verified_download_passes_intact_content(
+        self, integration_client, authenticated_headers
+    ):
+        """Test verify=true serves content matching its checksum unchanged"""
+        integration_client.storage_repo_mock.retrieve_file.side_effect = _retriever(
+            CONTENT
+        )
+
+        response = integration_client.get(
+            "/api/files/test/user/test.txt?verify=true", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_verified_download_aborts_on_corruption(
+        self, integration_client, authenticated_headers
+    ):
+        """Test verify=true aborts the response when content does not match"""
+        integration_client.storage_repo_mock.retrieve_file.side_effect = _retriever(
+            b"0123456789abcdefghiX"
+        )
+
+        with pytest.raises(FileIntegrityError):
+            integration_client.get(
+                "/api/files/test/user/test.txt?verify=true",
+                headers=authenticated_headers,
+            )
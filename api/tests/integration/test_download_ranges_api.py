@@ -0,0 +1,139 @@
+from io import BytesIO
+
+import pytest
+from domain.models import File
+from domain.repositories import StorageRangeNotSatisfiableError
+
+CONTENT = b"0123456789abcdefghij"
+
+
+def _retrieve(object_name, byte_range=None):
+    """Fake storage read honouring byte ranges like S3 does"""
+    data = CONTENT
+    if byte_range is not None:
+        positions = byte_range.resolve(len(CONTENT))
+        if positions is None:
+            raise StorageRangeNotSatisfiableError("InvalidRange")
+        data = CONTENT[positions[0] : positions[1] + 1]
+    return BytesIO(data), File(
+        object_name=object_name,
+        collection="test",
+        owner="user",
+        original_filename="test.txt",
+        upload_time="20250101-120000",
+        content_type="text/plain",
+        size=len(CONTENT),
+        etag="abc123",
+    )
+
+
+@pytest.mark.integration
+class TestDownloadRangesAPIIntegration:
+    """Integration tests for Range/If-Range handling on downloads"""
+
+    def _get(self, client, headers, **extra):
+        client.storage_repo_mock.retrieve_file.side_effect = _retrieve
+        return client.get("/api/files/test/user/test.txt", headers={**headers, **extra})
+
+    def test_full_download_advertises_ranges(
+        self, integration_client, authenticated_headers
+    ):
+        """Test whole-file downloads advertise range support and the ETag"""
+        response = self._get(integration_client, authenticated_headers)
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == '"abc123"'
+
+    @pytest.mark.parametrize(
+        "range_header,expected,content_range",
+        [
+            ("bytes=2-5", b"2345", "bytes 2-5/20"),
+            ("bytes=15-", b"fghij", "bytes 15-19/20"),
+            ("bytes=-3", b"hij", "bytes 17-19/20"),
+            ("bytes=18-100", b"ij", "bytes 18-19/20"),
+        ],
+    )
+    def test_single_range(
+        self,
+        integration_client,
+        authenticated_headers,
+        range_header,
+        expected,
+        content_range,
+    ):
+        """Test a single range returns 206 with Content-Range"""
+        response = self._get(
+            integration_client, authenticated_headers, Range=range_header
+        )
+
+        assert response.status_code == 206
+        assert response.content == expected
+        assert response.headers["content-range"] == content_range
+        assert response.headers["content-length"] == str(len(expected))
+
+    def test_multiple_ranges_return_multipart(
+        self, integration_client, authenticated_headers
+    ):
+        """Test several ranges are returned as multipart/byteranges"""
+        response = self._get(
+            integration_client, authenticated_headers, Range="bytes=0-1, 30-40, -2"
+        )
+
+        assert response.status_code == 206
+        content_type = response.headers["content-type"]
+        assert content_type.startswith("multipart/byteranges; boundary=")
+        boundary = content_type.split("boundary=")[1]
+        assert (
+            response.content
+            == (
+                f"\r\n--{boundary}\r\nContent-Type: text/plain\r\n"
+                f"Content-Range: bytes 0-1/20\r\n\r\n01"
+                f"\r\n--{boundary}\r\nContent-Type: text/plain\r\n"
+                f"Content-Range: bytes 18-19/20\r\n\r\nij"
+                f"\r\n--{boundary}--\r\n"
+            ).encode()
+        )
+        assert response.headers["content-length"] == str(len(response.content))
+
+    def test_unsatisfiable_range(self, integration_client, authenticated_headers):
+        """Test ranges outside the file are rejected with 416"""
+        response = self._get(
+            integration_client, authenticated_headers, Range="bytes=50-"
+        )
+
+        assert response.status_code == 416
+
+    @pytest.mark.parametrize(
+        "if_range,status_code",
+        [
+            ('"abc123"', 206),
+            ('"stale"', 200),
+            ("Wed, 01 Jan 2025 12:00:00 GMT", 200),
+        ],
+    )
+    def test_if_range(
+        self, integration_client, authenticated_headers, if_range, status_code
+    ):
+        """Test If-Range only allows a partial response for the current ETag"""
+        response = self._get(
+            integration_client,
+            authenticated_headers,
+            Range="bytes=0-3",
+            **{"If-Range": if_range},
+        )
+
+        assert response.status_code == status_code
+        assert response.content == (CONTENT[:4] if status_code == 206 else CONTENT)
+
+    def test_malformed_range_is_ignored(
+        self, integration_client, authenticated_headers
+    ):
+        """Test syntactically invalid Range headers fall back to the whole file"""
+        response = self._get(
+            integration_client, authenticated_headers, Range="bytes=5-2"
+        )
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
@@ -1,3 +1,4 @@
+import hashlib
 import io
 import logging
 
@@ -52,6 +53,47 @@ class TestFilesAPIIntegration:
         # Verify storage repository was called
         integration_client.storage_repo_mock.store_file.assert_called_once()
 
+    def test_upload_file_is_hashed_before_storing(
+        self, integration_client, authenticated_headers
+    ):
+        """Test uploads reach storage with their digest and size already known"""
+        test_content = b"This is integration test content"
+
+        response = integration_client.post(
+            "/api/files/test",
+            files={"file": ("test.txt", io.BytesIO(test_content), "text/plain")},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        content, stored = integration_client.storage_repo_mock.store_file.call_args.args
+        assert stored.sha256 == hashlib.sha256(test_content).hexdigest()
+        assert stored.size == len(test_content)
+        # The hashed spool is stored as is rather than hashed again on the way
+        assert hasattr(content, "seek")
+
+    def test_unseekable_upload_checksum_is_stored(
+        self, integration_client, authenticated_headers, monkeypatch
+    ):
+        """Test uploads hashed as they stream get their checksum stored after"""
+        from usecases import upload_file
+
+        monkeypatch.setattr(upload_file, "_is_seekable", lambda source: False)
+        storage = integration_client.storage_repo_mock
+        storage.store_file.side_effect = lambda content, file: bool(list(content))
+        test_content = b"This is integration test content"
+
+        response = integration_client.post(
+            "/api/files/test",
+            files={"file": ("test.txt", io.BytesIO(test_content), "text/plain")},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        (updated,) = storage.update_metadata.call_args.args
+        assert updated.metadata["sha256"] == hashlib.sha256(test_content).hexdigest()
+        assert updated.size == len(test_content)
+
     def test_upload_file_without_auth(self, integration_client):
         """Test file upload without authentication"""
         test_file = ("test.txt", io.BytesIO(b"content"), "text/plain")
@@ -199,6 +241,22 @@ class TestFilesAPIIntegration:
         # Ensure storage repository was *not* called because of permission error
         integration_client.storage_repo_mock.delete_file.assert_not_called()
 
+    def test_delete_missing_file_returns_404(
+        self, integration_client, authenticated_headers
+    ):
+        """Test deleting a file storage does not hold reports it as not found"""
+        from domain.repositories import StorageFileNotFoundError
+
+        integration_client.storage_repo_mock.delete_file.side_effect = (
+            StorageFileNotFoundError("File not found: test/user/missing.txt")
+        )
+
+        response = integration_client.delete(
+            "/api/files/test/user/missing.txt", headers=authenticated_headers
+        )
+
+        assert response.status_code == 404
+
     @pytest.mark.parametrize("auth_fixture", AUTH_FIXTURES)
     def test_delete_file_storage_error(self, integration_client, request, auth_fixture):
         """Test file deletion with storage error (both user and service account)"""
@@ -0,0 +1,163 @@
+import json
+
+import pytest
+from domain.models import File, FilePage
+from domain.repositories import StorageError
+from domain.services import ListingCursorService
+
+
+def _file(name):
+    return File(
+        object_name=f"test/user/20250101-120000_{name}",
+        collection="test",
+        owner="user",
+        original_filename=name,
+        upload_time="20250101-120000",
+        content_type="application/octet-stream",
+        size=10,
+    )
+
+
+@pytest.mark.integration
+class TestListPaginationAPIIntegration:
+    """Integration tests for cursor-paginated collection listing"""
+
+    def test_unpaginated_listing_has_no_cursor(
+        self, integration_client, authenticated_headers
+    ):
+        """Test listing without limit keeps returning every file"""
+        integration_client.storage_repo_mock.list_files_in_collection.return_value = [
+            _file("a.txt")
+        ]
+
+        response = integration_client.get(
+            "/api/files/test", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] is None
+        integration_client.storage_repo_mock.list_files_page.assert_not_called()
+
+    def test_first_page_returns_cursor(self, integration_client, authenticated_headers):
+        """Test a limited listing returns an opaque cursor for the next page"""
+        last = _file("b.txt")
+        integration_client.storage_repo_mock.list_files_page.return_value = FilePage(
+            files=[_file("a.txt"), last], next_start_after=last.object_name
+        )
+
+        response = integration_client.get(
+            "/api/files/test?limit=2", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["files"]) == 2
+        assert data["next_cursor"] == ListingCursorService.encode(last.object_name)
+        integration_client.storage_repo_mock.list_files_page.assert_called_once_with(
+            "test", 2, None
+        )
+
+    def test_cursor_continues_after_last_key(
+        self, integration_client, authenticated_headers
+    ):
+        """Test the cursor is turned back into the storage start-after key"""
+        integration_client.storage_repo_mock.list_files_page.return_value = FilePage(
+            files=[_file("c.txt")], next_start_after=None
+        )
+        cursor = ListingCursorService.encode("test/user/20250101-120000_b.txt")
+
+        response = integration_client.get(
+            f"/api/files/test?limit=2&cursor={cursor}", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] is None
+        integration_client.storage_repo_mock.list_files_page.assert_called_once_with(
+            "test", 2, "test/user/20250101-120000_b.txt"
+        )
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ["!!!not-base64", ListingCursorService.encode("other/user/file.txt")],
+    )
+    def test_invalid_cursor_rejected(
+        self, integration_client, authenticated_headers, cursor
+    ):
+        """Test malformed cursors and cursors from other collections are rejected"""
+        response = integration_client.get(
+            f"/api/files/test?limit=2&cursor={cursor}", headers=authenticated_headers
+        )
+
+        assert response.status_code == 400
+        integration_client.storage_repo_mock.list_files_page.assert_not_called()
+
+    def test_limit_out_of_bounds_rejected(
+        self, integration_client, authenticated_headers
+    ):
+        """Test page sizes outside the allowed bounds fail validation"""
+        response = integration_client.get(
+            "/api/files/test?limit=0", headers=authenticated_headers
+        )
+
+        assert response.status_code == 422
+
+
+@pytest.mark.integration
+class TestListStreamingAPIIntegration:
+    """Integration tests for NDJSON streaming of collection listings"""
+
+    def test_ndjson_streams_every_page(self, integration_client, authenticated_headers):
+        """Test NDJSON walks all listing pages and writes one object per line"""
+        pages = {
+            None: FilePage(
+                files=[_file("a.txt"), _file("b.txt")],
+                next_start_after="test/user/20250101-120000_b.txt",
+            ),
+            "test/user/20250101-120000_b.txt": FilePage(files=[_file("c.txt")]),
+        }
+        integration_client.storage_repo_mock.list_files_page.side_effect = (
+            lambda collection, limit, start_after: pages[start_after]
+        )
+
+        response = integration_client.get(
+            "/api/files/test",
+            headers={**authenticated_headers, "Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["original_filename"] for line in lines] == [
+            "a.txt",
+            "b.txt",
+            "c.txt",
+        ]
+        assert integration_client.storage_repo_mock.list_files_page.call_count == 2
+        integration_client.storage_repo_mock.list_files_in_collection.assert_not_called()
+
+    def test_ndjson_checks_permissions_before_streaming(
+        self, integration_client, limited_user_headers
+    ):
+        """Test a forbidden NDJSON listing fails with 403 instead of an empty stream"""
+        response = integration_client.get(
+            "/api/files/test",
+            headers={**limited_user_headers, "Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 403
+        integration_client.storage_repo_mock.list_files_page.assert_not_called()
+
+    def test_ndjson_first_page_failure_is_an_error_response(
+        self, integration_client, authenticated_headers
+    ):
+        """Test storage failures on the first page still produce a 500"""
+        integration_client.storage_repo_mock.list_files_page.side_effect = StorageError(
+            "boom"
+        )
+
+        response = integration_client.get(
+            "/api/files/test",
+            headers={**authenticated_headers, "Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 500
@@ -0,0 +1,251 @@
+import io
+
+import pytest
+from domain.models import File
+from infrastructure.container import get_metadata_index
+from storage.sqlite_metadata_index import SQLiteMetadataIndex
+
+from api.main import app
+
+
+@pytest.fixture
+def metadata_index(integration_client):
+    """In-memory metadata index wired into the app for one test"""
+    index = SQLiteMetadataIndex(":memory:")
+    # Built from an empty bucket, so listings are served from it
+    index.replace_all([])
+    app.dependency_overrides[get_metadata_index] = lambda: index
+    yield index
+    index.close()
+
+
+def _upload(client, headers, name="report.pdf", metadata='{"License": "CC-BY"}'):
+    return client.post(
+        "/api/files/test",
+        files={"file": (name, io.BytesIO(b"content"), "application/pdf")},
+        data={"metadata": metadata},
+        headers=headers,
+    )
+
+
+@pytest.mark.integration
+class TestMetadataIndexAPIIntegration:
+    """Integration tests for listings served from the metadata index"""
+
+    def test_upload_is_listed_with_full_metadata(
+        self, integration_client, metadata_index, authenticated_headers
+    ):
+        """Test uploaded files are listed from the index with type and metadata"""
+        object_name = _upload(integration_client, authenticated_headers).json()[
+            "object_name"
+        ]
+
+        response = integration_client.get(
+            "/api/files/test", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        (listed,) = response.json()["files"]
+        assert listed["object_name"] == object_name
+        assert listed["content_type"] == "application/pdf"
+        assert listed["original_filename"] == "report.pdf"
+        assert listed["metadata"]["license"] == "CC-BY"
+        integration_client.storage_repo_mock.list_files_in_collection.assert_not_called()
+
+    def test_pagination_is_served_from_index(
+        self, integration_client, metadata_index, authenticated_headers
+    ):
+        """Test limit and cursor page through the index without listing storage"""
+        for name in ("a.txt", "b.txt", "c.txt"):
+            _upload(integration_client, authenticated_headers, name=name)
+
+        first = integration_client.get(
+            "/api/files/test?limit=2", headers=authenticated_headers
+        ).json()
+        second = integration_client.get(
+            f"/api/files/test?limit=2&cursor={first['next_cursor']}",
+            headers=authenticated_headers,
+        ).json()
+
+        names = [f["original_filename"] for f in first["files"] + second["files"]]
+        assert names == ["a.txt", "b.txt", "c.txt"]
+        assert second["next_cursor"] is None
+        integration_client.storage_repo_mock.list_files_page.assert_not_called()
+
+    def test_incomplete_index_falls_back_to_storage(
+        self, integration_client, authenticated_headers
+    ):
+        """Test a new index not yet filled from storage is not used for listings"""
+        index = SQLiteMetadataIndex(":memory:")
+        app.dependency_overrides[get_metadata_index] = lambda: index
+        _upload(integration_client, authenticated_headers)
+        integration_client.storage_repo_mock.list_files_in_collection.return_value = []
+
+        response = integration_client.get(
+            "/api/files/test", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        integration_client.storage_repo_mock.list_files_in_collection.assert_called_once_with(
+            "test"
+        )
+        index.close()
+
+    def test_delete_removes_index_entry(
+        self, integration_client, metadata_index, authenticated_headers
+    ):
+        """Test deleted files disappear from index-backed listings"""
+        object_name = _upload(integration_client, authenticated_headers).json()[
+            "object_name"
+        ]
+
+        response = integration_client.delete(
+            f"/api/files/{object_name}", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        assert metadata_index.list_files_in_collection("test") == []
+
+    def test_failed_upload_is_not_indexed(
+        self, integration_client, metadata_index, authenticated_headers
+    ):
+        """Test files are only indexed once storage accepted them"""
+        integration_client.storage_repo_mock.store_file.side_effect = Exception("boom")
+
+        response = _upload(integration_client, authenticated_headers)
+
+        assert response.status_code == 500
+        assert metadata_index.list_files_in_collection("test") == []
+
+
+@pytest.mark.integration
+class TestQueryFilesAPIIntegration:
+    """Integration tests for GET /api/files/{collection}/query"""
+
+    def test_query_filters_by_user_metadata(
+        self, integration_client, metadata_index, authenticated_headers
+    ):
+        """Test uploads can be found by the user metadata they were given"""
+        _upload(integration_client, authenticated_headers, name="a.pdf")
+        _upload(
+            integration_client,
+            authenticated_headers,
+            name="b.pdf",
+            metadata='{"License": "MIT"}',
+        )
+
+        response = integration_client.get(
+            "/api/files/test/query?metadata=license:MIT",
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        assert [f["original_filename"] for f in response.json()["files"]] == ["b.pdf"]
+
+    def test_query_pages_with_cursor(
+        self, integration_client, metadata_index, authenticated_headers
+    ):
+        """Test sorted query results page through with next_cursor"""
+        for name in ("a.txt", "b.txt", "c.txt"):
+            _upload(integration_client, authenticated_headers, name=name)
+
+        params = "sort=original_filename&order=desc&limit=2"
+        first = integration_client.get(
+            f"/api/files/test/query?{params}", headers=authenticated_headers
+        ).json()
+        second = integration_client.get(
+            f"/api/files/test/query?{params}&cursor={first['next_cursor']}",
+            headers=authenticated_headers,
+        ).json()
+
+        names = [f["original_filename"] for f in first["files"] + second["files"]]
+        assert names == ["c.txt", "b.txt", "a.txt"]
+        assert second["next_cursor"] is None
+
+    @pytest.mark.parametrize(
+        "params", ["sort=etag", "order=up", "metadata=license", "cursor=bogus"]
+    )
+    def test_invalid_query_rejected(
+        self, integration_client, metadata_index, authenticated_headers, params
+    ):
+        """Test malformed sort, order, metadata filters and cursors are rejected"""
+        response = integration_client.get(
+            f"/api/files/test/query?{params}", headers=authenticated_headers
+        )
+
+        assert response.status_code == 400
+
+    def test_query_requires_read_permission(
+        self, integration_client, metadata_index, limited_user_headers
+    ):
+        """Test querying a collection requires read access"""
+        response = integration_client.get(
+            "/api/files/test/query", headers=limited_user_headers
+        )
+
+        assert response.status_code == 403
+
+    def test_query_without_index_is_unavailable(
+        self, integration_client, authenticated_headers
+    ):
+        """Test queries report 503 when no metadata index is configured"""
+        response = integration_client.get(
+            "/api/files/test/query", headers=authenticated_headers
+        )
+
+        assert response.status_code == 503
+
+
+@pytest.mark.integration
+class TestSearchAPIIntegration:
+    """Integration tests for GET /api/search"""
+
+    def test_search_finds_readable_files(
+        self, integration_client, metadata_index, authenticated_headers
+    ):
+        """Test search matches file names and metadata in readable collections"""
+        _upload(integration_client, authenticated_headers, name="agreement.pdf")
+        metadata_index.upsert_file(
+            File(
+                object_name="secret/other/20250101-120000-agreement.pdf",
+                collection="secret",
+                owner="other",
+                original_filename="agreement.pdf",
+                upload_time="20250101-120000",
+                content_type="application/pdf",
+            )
+        )
+
+        response = integration_client.get(
+            "/api/search?q=agreement", headers=authenticated_headers
+        )
+
+        assert response.status_code == 200
+        assert [f["collection"] for f in response.json()["files"]] == ["test"]
+
+    def test_search_without_readable_collections_is_empty(
+        self,
+        integration_client,
+        metadata_index,
+        authenticated_headers,
+        limited_user_headers,
+    ):
+        """Test principals without read access get no results"""
+        _upload(integration_client, authenticated_headers, name="agreement.pdf")
+
+        response = integration_client.get(
+            "/api/search?q=agreement", headers=limited_user_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["files"] == []
+
+    def test_search_without_index_is_unavailable(
+        self, integration_client, authenticated_headers
+    ):
+        """Test search reports 503 when no metadata index is configured"""
+        response = integration_client.get(
+            "/api/search?q=agreement", headers=authenticated_headers
+        )
+
+        assert response.status_code == 503
@@ -0,0 +1,84 @@
+import hashlib
+
+import pytest
+
+CONTENT = b"raw body " * 10000
+
+
+@pytest.mark.integration
+class TestStreamUploadAPIIntegration:
+    """Integration tests for PUT /api/files/{collection}/{filename}"""
+
+    def test_raw_body_streamed_to_storage(
+        self, integration_client, service_account_headers
+    ):
+        """Test the body is stored as sent, with type and metadata from headers"""
+        stored = {}
+
+        def store_file(content, file):
+            stored["content"] = b"".join(content)
+            stored["file"] = file
+            return True
+
+        integration_client.storage_repo_mock.store_file.side_effect = store_file
+
+        response = integration_client.put(
+            "/api/files/test/export.csv",
+            content=CONTENT,
+            headers={
+                **service_account_headers,
+                "Content-Type": "text/csv",
+                "X-File-Metadata": '{"source": "exporter"}',
+            },
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["object_name"].endswith("-export.csv")
+        assert result["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+        assert stored["content"] == CONTENT
+        assert stored["file"].content_type == "text/csv"
+        assert stored["file"].metadata["source"] == "exporter"
+        (updated,) = integration_client.storage_repo_mock.update_metadata.call_args.args
+        assert updated.metadata["sha256"] == result["sha256"]
+        assert updated.metadata["source"] == "exporter"
+
+    def test_invalid_metadata_header_rejected(
+        self, integration_client, service_account_headers
+    ):
+        """Test malformed metadata headers are rejected before storing"""
+        response = integration_client.put(
+            "/api/files/test/export.csv",
+            content=CONTENT,
+            headers={**service_account_headers, "X-File-Metadata": "not json"},
+        )
+
+        assert response.status_code == 400
+        integration_client.storage_repo_mock.store_file.assert_not_called()
+
+    def test_put_requires_write_permission(
+        self, integration_client, limited_user_headers
+    ):
+        """Test raw uploads to collections without write access are refused"""
+        response = integration_client.put(
+            "/api/files/test/export.csv",
+            content=CONTENT,
+            headers=limited_user_headers,
+        )
+
+        assert response.status_code == 403
+        integration_client.storage_repo_mock.store_file.assert_not_called()
+
+    def test_storage_failure_reported(
+        self, integration_client, service_account_headers
+    ):
+        """Test storage errors surface as 500"""
+        integration_client.storage_repo_mock.store_file.side_effect = Exception("down")
+
+        response = integration_client.put(
+            "/api/files/test/export.csv",
+            content=CONTENT,
+            headers=service_account_headers,
+        )
+
+        assert response.status_code == 500
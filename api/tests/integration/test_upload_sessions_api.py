@@ -0,0 +1,210 @@
+import pytest
+from domain.models import File, UploadedChunk, UploadSession
+
+MIB = 1024 * 1024
+
+
+def _session(owner="testuser", collection="test"):
+    return UploadSession(
+        session_id="0123456789abcdef0123456789abcdef",
+        upload_id="upload-1",
+        file=File(
+            object_name=f"{collection}/{owner}/20250101-120000-big.bin",
+            collection=collection,
+            owner=owner,
+            original_filename="big.bin",
+            upload_time="20250101-120000",
+            content_type="application/octet-stream",
+            metadata={"original_filename": "big.bin"},
+        ),
+        created_at="2025-01-01T12:00:00+00:00",
+    )
+
+
+@pytest.mark.integration
+class TestUploadSessionsAPIIntegration:
+    """Integration tests for resumable upload sessions"""
+
+    def test_create_session(self, integration_client, authenticated_headers):
+        """Test starting a session records the target file for the principal"""
+        sessions = integration_client.upload_session_repo_mock
+        sessions.create_session.side_effect = lambda file: _session().model_copy(
+            update={"file": file}
+        )
+
+        response = integration_client.post(
+            "/api/files/test/upload-sessions",
+            data={"filename": "big.bin", "metadata": '{"licence": "CC-BY"}'},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["session_id"] == _session().session_id
+        assert result["object_name"].startswith("test/testuser/")
+        assert result["object_name"].endswith("-big.bin")
+        created_file = sessions.create_session.call_args.args[0]
+        assert created_file.metadata["licence"] == "CC-BY"
+
+    def test_create_session_wrong_collection(
+        self, integration_client, limited_user_headers
+    ):
+        """Test sessions cannot be started without write access"""
+        response = integration_client.post(
+            "/api/files/test/upload-sessions",
+            data={"filename": "big.bin"},
+            headers=limited_user_headers,
+        )
+
+        assert response.status_code == 403
+        integration_client.upload_session_repo_mock.create_session.assert_not_called()
+
+    def test_upload_chunk(self, integration_client, authenticated_headers):
+        """Test a raw chunk body is stored as the numbered chunk"""
+        sessions = integration_client.upload_session_repo_mock
+        sessions.get_session.return_value = _session()
+        sessions.store_chunk.return_value = UploadedChunk(
+            chunk_number=3, size=5, etag="etag-3"
+        )
+
+        response = integration_client.put(
+            f"/api/files/test/upload-sessions/{_session().session_id}/chunks/3",
+            content=b"hello",
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["etag"] == "etag-3"
+        session, chunk_number, data = sessions.store_chunk.call_args.args
+        assert (chunk_number, data) == (3, b"hello")
+
+    def test_session_of_other_user_is_not_found(
+        self, integration_client, authenticated_headers
+    ):
+        """Test sessions started by another principal are hidden"""
+        sessions = integration_client.upload_session_repo_mock
+        sessions.get_session.return_value = _session(owner="someoneelse")
+
+        response = integration_client.get(
+            f"/api/files/test/upload-sessions/{_session().session_id}",
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 404
+
+    def test_get_session_reports_received_chunks(
+        self, integration_client, authenticated_headers
+    ):
+        """Test session status lists the chunks received so far"""
+        sessions = integration_client.upload_session_repo_mock
+        sessions.get_session.return_value = _session()
+        sessions.list_chunks.return_value = [
+            UploadedChunk(chunk_number=1, size=5 * MIB, etag="a"),
+            UploadedChunk(chunk_number=2, size=5 * MIB, etag="b"),
+        ]
+
+        response = integration_client.get(
+            f"/api/files/test/upload-sessions/{_session().session_id}",
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert [c["chunk_number"] for c in result["chunks"]] == [1, 2]
+        assert result["received_bytes"] == 10 * MIB
+
+    def test_complete_session_with_missing_chunk(
+        self, integration_client, authenticated_headers
+    ):
+        """Test completion is refused while chunks are missing"""
+        sessions = integration_client.upload_session_repo_mock
+        sessions.get_session.return_value = _session()
+        sessions.list_chunks.return_value = [
+            UploadedChunk(chunk_number=1, size=5 * MIB, etag="a"),
+            UploadedChunk(chunk_number=3, size=10, etag="c"),
+        ]
+
+        response = integration_client.post(
+            f"/api/files/test/upload-sessions/{_session().session_id}/complete",
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 400
+        assert "Missing chunks: [2]" in response.json()["detail"]
+        sessions.complete_session.assert_not_called()
+
+    def test_complete_session(self, integration_client, authenticated_headers):
+        """Test completion assembles the received chunks"""
+        sessions = integration_client.upload_session_repo_mock
+        session = _session()
+        chunks = [
+            UploadedChunk(chunk_number=1, size=5 * MIB, etag="a"),
+            UploadedChunk(chunk_number=2, size=10, etag="b"),
+        ]
+        sessions.get_session.return_value = session
+        sessions.list_chunks.return_value = chunks
+        sessions.complete_session.return_value = session.file
+
+        response = integration_client.post(
+            f"/api/files/test/upload-sessions/{session.session_id}/complete",
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["object_name"] == session.file.object_name
+        sessions.complete_session.assert_called_once_with(session, chunks)
+
+    def test_abort_session(self, integration_client, authenticated_headers):
+        """Test aborting a session discards it"""
+        sessions = integration_client.upload_session_repo_mock
+        sessions.get_session.return_value = _session()
+        sessions.abort_session.return_value = True
+
+        response = integration_client.delete(
+            f"/api/files/test/upload-sessions/{_session().session_id}",
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        sessions.abort_session.assert_called_once()
+        integration_client.storage_repo_mock.delete_file.assert_not_called()
+
+    def test_create_presigned_upload(self, integration_client, authenticated_headers):
+        """Test a presigned upload returns one storage URL per chunk"""
+        sessions = integration_client.upload_session_repo_mock
+        sessions.create_session.side_effect = lambda file: _session().model_copy(
+            update={"file": file}
+        )
+        sessions.presign_chunk_url.side_effect = (
+            lambda session, chunk_number, expires: f"https://minio/part/{chunk_number}"
+        )
+
+        response = integration_client.post(
+            "/api/files/test/presigned-uploads",
+            data={"filename": "big.bin", "chunk_count": "3", "expires": "600"},
+            headers=authenticated_headers,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["session_id"] == _session().session_id
+        assert result["expires_in"] == 600
+        assert [u["url"] for u in result["urls"]] == [
+            "https://minio/part/1",
+            "https://minio/part/2",
+            "https://minio/part/3",
+        ]
+        integration_client.storage_repo_mock.store_file.assert_not_called()
+
+    def test_create_presigned_upload_wrong_collection(
+        self, integration_client, limited_service_account_headers
+    ):
+        """Test presigned uploads require write access to the collection"""
+        response = integration_client.post(
+            "/api/files/test/presigned-uploads",
+            data={"filename": "big.bin"},
+            headers=limited_service_account_headers,
+        )
+
+        assert response.status_code == 403
+        integration_client.upload_session_repo_mock.presign_chunk_url.assert_not_called()
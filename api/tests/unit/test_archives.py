@@ -0,0 +1,90 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from domain import InvalidArchiveError, iter_archive_members, member_filename
+from domain.streams import DEFAULT_CHUNK_SIZE
+
+FILES = {"a.txt": b"hello " * 1000, "dir/b.bin": os.urandom(100_000), "empty": b""}
+
+
+class _Pipe(io.RawIOBase):
+    """Write-only, non-seekable sink, as zip writers see a network stream"""
+
+    def __init__(self):
+        self.data = b""
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.data += bytes(data)
+        return len(data)
+
+
+def _chunks(data: bytes, size: int = 4096):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def _expand(data: bytes, archive_format: str = "zip"):
+    return {
+        name: b"".join(content)
+        for name, content in iter_archive_members(_chunks(data), archive_format)
+    }
+
+
+@pytest.mark.unit
+class TestStreamingZip:
+    def test_sizes_from_local_headers(self):
+        """Test zips written to a file are read without their central directory"""
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("dir/", b"")
+            for name, content in FILES.items():
+                zip_file.writestr(name, content)
+
+        assert _expand(archive.getvalue()) == FILES
+
+    def test_sizes_from_data_descriptors(self):
+        """Test zips written to a pipe, including ZIP64 entries, are read too"""
+        pipe = _Pipe()
+        with zipfile.ZipFile(pipe, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for name, content in FILES.items():
+                with zip_file.open(name, "w", force_zip64=name == "a.txt") as entry:
+                    entry.write(content)
+
+        assert _expand(pipe.data) == FILES
+
+    def test_highly_compressed_entry_inflated_in_bounded_pieces(self):
+        """Test a small deflate stream is never expanded into one large buffer"""
+        content = bytes(8 * DEFAULT_CHUNK_SIZE)
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("zeros.bin", content)
+
+        members = iter_archive_members(
+            _chunks(archive.getvalue(), DEFAULT_CHUNK_SIZE), "zip"
+        )
+        sizes = [len(piece) for _, pieces in members for piece in pieces]
+
+        assert sum(sizes) == len(content)
+        assert max(sizes) <= DEFAULT_CHUNK_SIZE
+
+    def test_corrupt_entry_rejected(self):
+        """Test entries whose content does not match their CRC are rejected"""
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zip_file:
+            zip_file.writestr("a.txt", b"original")
+        data = archive.getvalue().replace(b"original", b"tampered")
+
+        with pytest.raises(InvalidArchiveError):
+            _expand(data)
+
+
+@pytest.mark.unit
+def test_member_filename_flattens_paths():
+    """Test archive paths become single-segment filenames"""
+    assert member_filename("./exports/2024/../a.csv") == "exports_2024_a.csv"
+    assert member_filename("/") is None
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from auth.jwks import JWKSCache
+
+
+def _jwks(*kids):
+    return {
+        "keys": [
+            {"kid": kid, "kty": "oct", "alg": "HS256", "k": "c2VjcmV0", "use": "sig"}
+            for kid in kids
+        ]
+    }
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestJWKSCache:
+    def test_keys_are_served_from_cache_until_ttl(self):
+        """Test steady-state lookups make no fetches until the TTL expires"""
+        clock = _Clock()
+        fetches = []
+        cache = JWKSCache(
+            lambda: fetches.append(1) or _jwks("a"),
+            ttl=300,
+            min_refresh_interval=30,
+            clock=clock,
+            run_in_background=lambda refresh: refresh(),
+        )
+
+        key = cache.get_key("a")
+        clock.now = 299
+        assert cache.get_key("a") is key
+        assert len(fetches) == 1
+
+        clock.now = 300
+        cache.get_key("a")
+        assert len(fetches) == 2
+
+    def test_unknown_kid_is_negative_cached(self):
+        """Test unknown key IDs trigger at most one refresh per interval"""
+        clock = _Clock()
+        fetches = []
+        cache = JWKSCache(
+            lambda: fetches.append(1) or _jwks("a"),
+            ttl=300,
+            min_refresh_interval=30,
+            clock=clock,
+        )
+        cache.get_key("a")
+
+        clock.now = 31
+        assert cache.get_key("rotated") is None
+        assert cache.get_key("rotated") is None
+        assert len(fetches) == 2
+
+    def test_stale_keys_survive_failed_refresh(self):
+        """Test a Keycloak outage keeps serving the previously fetched keys"""
+        clock = _Clock()
+        responses = [_jwks("a"), None]
+        cache = JWKSCache(
+            lambda: responses.pop(0),
+            ttl=300,
+            min_refresh_interval=30,
+            clock=clock,
+            run_in_background=lambda refresh: refresh(),
+        )
+        key = cache.get_key("a")
+
+        clock.now = 400
+        assert cache.get_key("a") is key
+        # Backing off: no further fetch is attempted within the interval
+        assert cache.get_key("a") is key
+        assert responses == []
+
+    def test_concurrent_refreshes_are_collapsed(self):
+        """Test simultaneous misses share a single fetch"""
+        fetches = []
+
+        def slow_fetch():
+            fetches.append(1)
+            time.sleep(0.05)
+            return _jwks("a")
+
+        cache = JWKSCache(slow_fetch)
+        threads = [
+            threading.Thread(target=cache.get_key, args=("a",)) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(fetches) == 1
+
+    def test_stale_keys_are_served_while_refreshing(self):
+        """Test an expired key set is refreshed without making callers wait"""
+        clock = _Clock()
+        release = threading.Event()
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            if len(fetches) > 1:
+                release.wait(5)
+            return _jwks("a")
+
+        cache = JWKSCache(fetch, ttl=300, min_refresh_interval=30, clock=clock)
+        key = cache.get_key("a")
+
+        clock.now = 400
+        assert cache.get_key("a") is key
+        assert cache.get_key("a") is key
+        release.set()
+        deadline = time.monotonic() + 5
+        while cache.get_key("a") is key and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(fetches) == 2
+        assert cache.get_key("a") is not key
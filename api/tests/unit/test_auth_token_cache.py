@@ -0,0 +1,49 @@
+import pytest
+
+from auth.token_cache import TokenCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestTokenCache:
+    def test_hit_until_token_expiry(self):
+        """Test cached principals are returned until the token's exp"""
+        clock = _Clock()
+        cache = TokenCache(max_entries=10, clock=clock)
+        principal = object()
+
+        cache.put("token", principal, expires_at=1060)
+        assert cache.get("token") is principal
+
+        clock.now = 1060
+        assert cache.get("token") is None
+        assert cache.statistics()["hits"] == 1
+        assert cache.statistics()["misses"] == 1
+        assert cache.statistics()["size"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache stays within its bound by evicting the LRU token"""
+        cache = TokenCache(max_entries=2, clock=_Clock())
+        cache.put("a", "A", expires_at=2000)
+        cache.put("b", "B", expires_at=2000)
+        cache.get("a")
+        cache.put("c", "C", expires_at=2000)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+        assert cache.statistics()["evictions"] == 1
+
+    def test_expired_tokens_are_not_stored(self):
+        """Test already expired tokens never enter the cache"""
+        cache = TokenCache(max_entries=2, clock=_Clock())
+        cache.put("old", "A", expires_at=999)
+
+        assert cache.statistics()["size"] == 0
@@ -0,0 +1,373 @@
+import hashlib
+import io
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import anyio
+import httpx
+import pytest
+from minio.datatypes import Object
+
+from domain.models import ByteRange, File
+from domain.repositories import (
+    StorageFileNotFoundError,
+    StorageRangeNotSatisfiableError,
+)
+from domain.streams import AsyncUploadStream, UploadStream, content_digest
+from infrastructure.collect_blobs import collect_blobs
+from storage.content_addressing import blob_key, blob_ref_key
+from storage.minio_repository import MinioStorageRepository
+from storage.s3_async import AsyncS3Client
+from storage.s3_async_repository import AsyncS3StorageRepository
+
+CONTENT = b"the same archive, uploaded again"
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+OBJECT_NAME = "docs/user/20240101-000000-a.zip"
+
+
+def _file() -> File:
+    return File(
+        object_name=OBJECT_NAME,
+        collection="docs",
+        owner="user",
+        original_filename="a.zip",
+        upload_time="20240101-000000",
+        content_type="application/zip",
+        size=len(CONTENT),
+        sha256=SHA256,
+        metadata={"license": "MIT"},
+    )
+
+
+def _stats(object_name: str, size: int, metadata: dict) -> Object:
+    return Object(
+        "bucket",
+        object_name,
+        etag=f"etag-{object_name}",
+        size=size,
+        content_type="application/zip",
+        metadata=metadata,
+    )
+
+
+REFERENCE_METADATA = {
+    "license": "MIT",
+    "content-sha256": SHA256,
+    "content-size": str(len(CONTENT)),
+}
+
+
+@pytest.mark.unit
+class TestContentDigest:
+    def test_digest_rewinds_source(self):
+        """Test hashing leaves the upload ready to be streamed to storage"""
+        source = io.BytesIO(CONTENT)
+
+        assert content_digest(source, chunk_size=4) == (SHA256, len(CONTENT))
+        assert source.read() == CONTENT
+
+    def test_upload_stream_hashes_chunks_as_they_pass(self):
+        """Test streamed uploads report the checksum of what was streamed"""
+        stream = UploadStream(io.BytesIO(CONTENT), chunk_size=4)
+
+        assert b"".join(stream) == CONTENT
+        assert (stream.sha256, stream.size) == (SHA256, len(CONTENT))
+
+    def test_async_upload_stream_hashes_off_the_loop_in_batches(self):
+        """Test raw-body chunks are hashed through run_sync, a batch at a time"""
+        batches = []
+
+        async def run_sync(func, chunks):
+            batches.append(len(chunks))
+            return func(chunks)
+
+        async def body():
+            for position in range(0, len(CONTENT), 4):
+                yield CONTENT[position : position + 4]
+
+        async def consume():
+            stream = AsyncUploadStream(body(), run_sync, chunk_size=8)
+            return b"".join([chunk async for chunk in stream]), stream
+
+        content, stream = anyio.run(consume)
+
+        assert content == CONTENT
+        assert (stream.sha256, stream.size) == (SHA256, len(CONTENT))
+        assert sum(batches) == -(-len(CONTENT) // 4)
+        assert max(batches) == 2
+
+
+@pytest.mark.unit
+class TestMinioContentAddressing:
+    def test_duplicate_content_is_not_uploaded_again(self):
+        """Test a known digest only writes the marker and the empty reference"""
+        client = MagicMock()
+        client.stat_object.return_value = _stats(blob_key(SHA256), len(CONTENT), {})
+
+        MinioStorageRepository(client).store_file(io.BytesIO(CONTENT), _file())
+
+        uploaded = [call.args[1] for call in client.upload_file.call_args_list]
+        assert uploaded == [blob_ref_key(SHA256, OBJECT_NAME), OBJECT_NAME]
+        reference = client.upload_file.call_args_list[-1]
+        assert reference.args[0].read() == b""
+        assert reference.kwargs["metadata"] == REFERENCE_METADATA
+
+    def test_new_content_is_stored_as_blob(self):
+        """Test unknown content is uploaded once, under its digest"""
+        client = MagicMock()
+        client.stat_object.side_effect = Exception("NoSuchKey: missing")
+        content = io.BytesIO(CONTENT)
+
+        MinioStorageRepository(client).store_file(content, _file())
+
+        blob_upload = client.upload_file.call_args_list[1]
+        assert blob_upload.args[:2] == (content, blob_key(SHA256))
+
+    def test_reference_requires_content_in_collection(self):
+        """Test a digest only registers if the collection already references it"""
+        client = MagicMock()
+        own_marker = blob_ref_key(SHA256, OBJECT_NAME)
+        client.list_objects_page.return_value = ([{"name": own_marker}], False)
+
+        with pytest.raises(StorageFileNotFoundError):
+            MinioStorageRepository(client).store_reference(_file())
+
+        client.delete_object.assert_called_once_with(own_marker)
+        assert [c.args[1] for c in client.upload_file.call_args_list] == [own_marker]
+
+    def test_content_exists_checks_blob_size(self):
+        """Test content counts as stored only if the blob has the expected size"""
+        client = MagicMock()
+        client.list_objects_page.return_value = (
+            [{"name": blob_ref_key(SHA256, "docs/other/x")}],
+            False,
+        )
+        client.stat_object.return_value = _stats(blob_key(SHA256), len(CONTENT), {})
+        repository = MinioStorageRepository(client)
+
+        assert repository.content_exists("docs", SHA256, len(CONTENT))
+        assert not repository.content_exists("docs", SHA256, len(CONTENT) + 1)
+        assert client.list_objects_page.call_args.kwargs["prefix"].endswith(
+            f"{SHA256}/refs/docs/"
+        )
+
+    def test_ranged_retrieve_follows_reference(self):
+        """Test a range refused by a reference is resolved and sent to its blob"""
+        client = MagicMock()
+        blob_stream = MagicMock()
+        client.stat_object.return_value = _stats(OBJECT_NAME, 0, REFERENCE_METADATA)
+        client.open_object.side_effect = [
+            Exception("S3 operation failed; code: InvalidRange"),
+            (blob_stream, _stats(blob_key(SHA256), len(CONTENT), {})),
+        ]
+
+        stream, file = MinioStorageRepository(client).retrieve_file(
+            OBJECT_NAME, ByteRange(start=4, end=7)
+        )
+
+        assert stream is blob_stream
+        assert client.open_object.call_args_list[0].args == (OBJECT_NAME,)
+        assert client.open_object.call_args.args == (blob_key(SHA256),)
+        assert client.open_object.call_args.kwargs == {"offset": 4, "length": 4}
+        assert file.size == len(CONTENT)
+        assert file.etag == f"etag-{blob_key(SHA256)}"
+        assert file.content_type == "application/zip"
+        assert file.metadata == {"license": "MIT"}
+
+    def test_ranged_retrieve_of_plain_object_is_one_request(self):
+        """Test ranges on plain objects go out as one GET, without a stat"""
+        client = MagicMock()
+        client.open_object.return_value = (
+            MagicMock(),
+            _stats(OBJECT_NAME, len(CONTENT), {"license": "MIT"}),
+        )
+
+        _, file = MinioStorageRepository(client).retrieve_file(
+            OBJECT_NAME, ByteRange(start=4, end=7)
+        )
+
+        client.open_object.assert_called_once()
+        client.stat_object.assert_not_called()
+        assert file.size == len(CONTENT)
+
+    def test_unsatisfiable_range_on_plain_object_is_reported(self):
+        """Test a refused range on a plain object is not mistaken for a reference"""
+        client = MagicMock()
+        client.open_object.side_effect = Exception("code: InvalidRange")
+        client.stat_object.return_value = _stats(OBJECT_NAME, 3, {})
+
+        with pytest.raises(StorageRangeNotSatisfiableError):
+            MinioStorageRepository(client).retrieve_file(
+                OBJECT_NAME, ByteRange(start=10, end=20)
+            )
+
+    def test_deleting_reference_removes_its_marker(self):
+        """Test deletes drop the marker that grants the collection the content"""
+        client = MagicMock()
+        client.stat_object.return_value = _stats(OBJECT_NAME, 0, REFERENCE_METADATA)
+
+        assert MinioStorageRepository(client).delete_file(OBJECT_NAME)
+
+        deleted = [c.args[0] for c in client.delete_object.call_args_list]
+        assert deleted == [OBJECT_NAME, blob_ref_key(SHA256, OBJECT_NAME)]
+
+    def test_listing_reports_content_size(self):
+        """Test references list with the size of the content they point to"""
+        client = MagicMock()
+        client.list_objects.return_value = [
+            {
+                "name": OBJECT_NAME,
+                "size": 0,
+                "last_modified": None,
+                "metadata": REFERENCE_METADATA,
+            }
+        ]
+
+        (file,) = MinioStorageRepository(client).list_files_in_collection("docs")
+
+        assert file.size == len(CONTENT)
+
+
+@pytest.mark.unit
+class TestAsyncS3ContentAddressing:
+    def test_duplicate_content_is_not_uploaded_again(self):
+        """Test a known digest costs a marker PUT, a HEAD and an empty PUT"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            headers = {"ETag": '"e"', "Content-Length": str(len(CONTENT))}
+            return httpx.Response(
+                200, headers=headers if request.method == "HEAD" else {"ETag": '"e"'}
+            )
+
+        client = AsyncS3Client(endpoint="minio:9000", bucket_name="bucket")
+        client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        anyio.run(AsyncS3StorageRepository(client).store_file, [CONTENT], _file())
+
+        assert [r.method for r in requests] == ["PUT", "HEAD", "PUT"]
+        assert all(r.content == b"" for r in requests)
+        assert requests[-1].url.path == f"/bucket/{OBJECT_NAME}"
+        assert requests[-1].headers["x-amz-meta-content-sha256"] == SHA256
+
+    def test_deleting_reference_removes_its_marker(self):
+        """Test deletes HEAD the file, then remove it and its blob marker"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if request.method == "HEAD":
+                return httpx.Response(
+                    200,
+                    headers={
+                        f"x-amz-meta-{key}": value
+                        for key, value in REFERENCE_METADATA.items()
+                    },
+                )
+            return httpx.Response(204)
+
+        client = AsyncS3Client(endpoint="minio:9000", bucket_name="bucket")
+        client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        assert anyio.run(AsyncS3StorageRepository(client).delete_file, OBJECT_NAME)
+
+        assert [(r.method, r.url.path) for r in requests] == [
+            ("HEAD", f"/bucket/{OBJECT_NAME}"),
+            ("DELETE", f"/bucket/{OBJECT_NAME}"),
+            ("DELETE", f"/bucket/{blob_ref_key(SHA256, OBJECT_NAME)}"),
+        ]
+
+    def test_ranged_retrieve_follows_reference(self):
+        """Test plain objects answer ranges in one GET and references via a HEAD"""
+        requests = []
+        reference_headers = {
+            f"x-amz-meta-{key}": value for key, value in REFERENCE_METADATA.items()
+        }
+
+        def handler(request):
+            requests.append(request)
+            if request.url.path == f"/bucket/{blob_key(SHA256)}":
+                return httpx.Response(
+                    206,
+                    headers={"Content-Range": f"bytes 4-7/{len(CONTENT)}"},
+                    content=CONTENT[4:8],
+                )
+            if request.url.path.endswith("plain.zip"):
+                return httpx.Response(
+                    206, headers={"Content-Range": "bytes 4-7/9"}, content=b"plai"
+                )
+            if request.method == "HEAD":
+                return httpx.Response(200, headers=reference_headers)
+            return httpx.Response(
+                416, content=b"<Error><Code>InvalidRange</Code></Error>"
+            )
+
+        client = AsyncS3Client(endpoint="minio:9000", bucket_name="bucket")
+        client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        repository = AsyncS3StorageRepository(client)
+
+        async def download(object_name):
+            stream, file = await repository.retrieve_file(
+                object_name, ByteRange(start=4, end=7)
+            )
+            return b"".join([chunk async for chunk in stream]), file
+
+        plain, _ = anyio.run(download, "docs/user/20240101-000000-plain.zip")
+        assert plain == b"plai"
+        assert len(requests) == 1
+
+        content, file = anyio.run(download, OBJECT_NAME)
+
+        assert content == CONTENT[4:8]
+        assert file.size == len(CONTENT)
+        assert [(r.method, r.url.path) for r in requests[1:]] == [
+            ("GET", f"/bucket/{OBJECT_NAME}"),
+            ("HEAD", f"/bucket/{OBJECT_NAME}"),
+            ("GET", f"/bucket/{blob_key(SHA256)}"),
+        ]
+
+
+@pytest.mark.unit
+class TestCollectBlobs:
+    NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+    def _client(self, objects):
+        client = MagicMock()
+        client.list_objects_page.side_effect = [(objects, False), ([], False)]
+        return client
+
+    def test_unreferenced_blob_is_deleted(self):
+        """Test markers of deleted files are dropped along with their blob"""
+        old = self.NOW - timedelta(days=2)
+        client = self._client(
+            [
+                {"name": blob_key(SHA256), "last_modified": old},
+                {"name": blob_ref_key(SHA256, OBJECT_NAME), "last_modified": old},
+            ]
+        )
+        storage = MagicMock()
+        storage.stat_file.side_effect = StorageFileNotFoundError(OBJECT_NAME)
+
+        assert collect_blobs(client, storage, now=self.NOW) == 1
+
+        deleted = [call.args[0] for call in client.delete_object.call_args_list]
+        assert deleted == [blob_ref_key(SHA256, OBJECT_NAME), blob_key(SHA256)]
+
+    def test_recent_and_live_references_keep_blob(self):
+        """Test blobs survive while a live or in-flight upload references them"""
+        old, recent = self.NOW - timedelta(days=2), self.NOW - timedelta(minutes=5)
+        client = self._client(
+            [
+                {"name": blob_key(SHA256), "last_modified": old},
+                {"name": blob_ref_key(SHA256, "docs/u/live"), "last_modified": old},
+                {"name": blob_ref_key(SHA256, "docs/u/new"), "last_modified": recent},
+            ]
+        )
+        storage = MagicMock()
+        storage.stat_file.return_value = _file()
+
+        assert collect_blobs(client, storage, now=self.NOW) == 0
+
+        client.delete_object.assert_not_called()
+        storage.stat_file.assert_called_once_with("docs/u/live")
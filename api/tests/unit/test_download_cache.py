@@ -0,0 +1,197 @@
+import anyio
+import pytest
+
+from domain.models import ByteRange, File
+from domain.repositories import StorageError
+from infrastructure.download_cache import (
+    CachedContent,
+    CachingStorageRepository,
+    DownloadCache,
+)
+
+CONTENT = b"cached content " * 1000
+
+
+def _file(name="docs/user/20240101-000000-a.txt", size=len(CONTENT)) -> File:
+    return File(
+        object_name=name,
+        collection="docs",
+        owner="user",
+        original_filename="a.txt",
+        upload_time="20240101-000000",
+        content_type="text/plain",
+        size=size,
+        etag=f"etag-{name}",
+        metadata={"license": "MIT"},
+    )
+
+
+class FakeStorage:
+    """AsyncStorageRepository serving in-memory objects, counting reads"""
+
+    def __init__(self, objects):
+        self.objects = dict(objects)
+        self.reads = 0
+        self.checks = 0
+        self.unreachable = False
+
+    async def retrieve_file(self, object_name, byte_range=None):
+        self.reads += 1
+        content = self.objects[object_name]
+
+        async def chunks():
+            for position in range(0, len(content), 4096):
+                yield content[position : position + 4096]
+
+        return chunks(), _file(object_name, len(content))
+
+    async def file_exists(self, object_name):
+        self.checks += 1
+        if self.unreachable:
+            raise StorageError("storage unavailable")
+        return object_name in self.objects
+
+    async def delete_file(self, object_name):
+        del self.objects[object_name]
+        return True
+
+
+async def _download(repository, object_name, byte_range=None):
+    stream, _ = await repository.retrieve_file(object_name, byte_range)
+    try:
+        return b"".join([chunk async for chunk in stream]), stream
+    finally:
+        await stream.aclose()
+
+
+@pytest.mark.unit
+class TestCachingStorageRepository:
+    def test_second_download_is_served_from_disk(self, tmp_path):
+        """Test a complete download fills the cache and later reads skip storage"""
+        name = _file().object_name
+        storage = FakeStorage({name: CONTENT})
+        cache = DownloadCache(str(tmp_path), max_bytes=10 * len(CONTENT))
+        repository = CachingStorageRepository(storage, cache)
+
+        async def scenario():
+            first, _ = await _download(repository, name)
+            second, stream = await _download(repository, name)
+            ranged, _ = await _download(repository, name, ByteRange(start=5, end=9))
+            return first, second, stream, ranged
+
+        first, second, stream, ranged = anyio.run(scenario)
+
+        assert first == second == CONTENT
+        assert isinstance(stream, CachedContent)
+        assert ranged == CONTENT[5:10]
+        assert storage.reads == 1
+        assert cache.statistics()["bytes"] == len(CONTENT)
+
+    def test_incomplete_download_is_not_cached(self, tmp_path):
+        """Test a download abandoned halfway leaves nothing behind"""
+        name = _file().object_name
+        storage = FakeStorage({name: CONTENT})
+        cache = DownloadCache(str(tmp_path))
+        repository = CachingStorageRepository(storage, cache)
+
+        async def scenario():
+            stream, _ = await repository.retrieve_file(name)
+            await stream.__anext__()
+            await stream.aclose()
+
+        anyio.run(scenario)
+
+        assert len(cache) == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Test the cache stays within its budget, dropping the oldest entry"""
+        names = [f"docs/user/20240101-000000-{n}.txt" for n in "abc"]
+        storage = FakeStorage({name: CONTENT for name in names})
+        cache = DownloadCache(str(tmp_path), max_bytes=2 * len(CONTENT))
+        repository = CachingStorageRepository(storage, cache)
+
+        async def scenario():
+            for name in (names[0], names[1], names[0], names[2]):
+                await _download(repository, name)
+
+        anyio.run(scenario)
+
+        assert cache.acquire(names[1]) is None
+        assert cache.statistics()["entries"] == 2
+        assert len(list(tmp_path.iterdir())) == 4
+
+    def test_deleted_file_is_no_longer_served(self, tmp_path):
+        """Test deletes, here or seen through revalidation, drop the entry"""
+        names = ["docs/user/20240101-000000-a.txt", "docs/user/20240101-000000-b.txt"]
+        storage = FakeStorage({name: CONTENT for name in names})
+        cache = DownloadCache(str(tmp_path))
+        repository = CachingStorageRepository(storage, cache, revalidate_seconds=0)
+
+        async def scenario():
+            for name in names:
+                await _download(repository, name)
+            await repository.delete_file(names[0])
+            # Deleted elsewhere, e.g. through another replica
+            del storage.objects[names[1]]
+            for name in names:
+                with pytest.raises(KeyError):
+                    await repository.retrieve_file(name)
+
+        anyio.run(scenario)
+
+        assert len(cache) == 0
+
+    def test_hits_are_revalidated_once_per_interval(self, tmp_path):
+        """Test fresh entries skip storage and storage errors keep the entry"""
+        name = _file().object_name
+        storage = FakeStorage({name: CONTENT})
+        cache = DownloadCache(str(tmp_path))
+        repository = CachingStorageRepository(storage, cache)
+
+        async def scenario():
+            await _download(repository, name)
+            await _download(repository, name)
+            fresh_checks = storage.checks
+            entry = cache.acquire(name)
+            entry.validated_at = None
+            cache.release(entry)
+            storage.unreachable = True
+            content, stream = await _download(repository, name)
+            return fresh_checks, content, stream
+
+        fresh_checks, content, stream = anyio.run(scenario)
+
+        assert fresh_checks == 0
+        assert storage.checks == 1
+        assert content == CONTENT
+        assert isinstance(stream, CachedContent)
+        assert len(cache) == 1
+
+    def test_entries_survive_restart(self, tmp_path):
+        """Test a new cache over the same directory serves earlier fills"""
+        name = _file().object_name
+        storage = FakeStorage({name: CONTENT})
+        anyio.run(
+            _download,
+            CachingStorageRepository(storage, DownloadCache(str(tmp_path))),
+            name,
+        )
+
+        cache = DownloadCache(str(tmp_path))
+        content, _ = anyio.run(
+            _download, CachingStorageRepository(storage, cache), name
+        )
+
+        assert content == CONTENT
+        assert storage.reads == 1
+        assert cache.acquire(name).file == _file()
+
+    def test_interrupted_fill_is_dropped_on_restart(self, tmp_path):
+        """Test a data file whose sidecar was never written is removed"""
+        (tmp_path / ("0" * 64)).write_bytes(CONTENT)
+
+        cache = DownloadCache(str(tmp_path))
+
+        assert len(cache) == 0
+        assert list(tmp_path.iterdir()) == []
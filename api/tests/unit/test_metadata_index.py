@@ -0,0 +1,297 @@
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from domain.models import File, FileQuery
+from domain.repositories import StorageFileNotFoundError
+from infrastructure.rebuild_metadata_index import (
+    fill_metadata_index,
+    rebuild_metadata_index,
+)
+from storage.sqlite_metadata_index import SQLiteMetadataIndex
+
+
+def _file(name: str, collection: str = "docs", **metadata) -> File:
+    return File(
+        object_name=f"{collection}/user/20240101-000000-{name}",
+        collection=collection,
+        owner="user",
+        original_filename=name,
+        upload_time="20240101-000000",
+        content_type="text/plain",
+        size=3,
+        metadata=metadata,
+    )
+
+
+@pytest.fixture
+def index():
+    index = SQLiteMetadataIndex(":memory:")
+    yield index
+    index.close()
+
+
+@pytest.mark.unit
+class TestSQLiteMetadataIndex:
+    def test_upsert_replaces_and_normalizes_metadata(self, index):
+        """Test entries are keyed by object name and stored in storage format"""
+        index.upsert_file(_file("a.txt", License="CC-BY", pages=3))
+        index.upsert_file(_file("a.txt", License="MIT"))
+
+        (file,) = index.list_files_in_collection("docs")
+        assert file.content_type == "text/plain"
+        assert file.metadata == {"license": "MIT"}
+
+    def test_pages_follow_object_name_order(self, index):
+        """Test pages continue after start_after and stop within the collection"""
+        for name in ("c.txt", "a.txt", "b.txt"):
+            index.upsert_file(_file(name))
+        index.upsert_file(_file("z.txt", collection="other"))
+
+        first = index.list_files_page("docs", 2)
+        second = index.list_files_page("docs", 2, first.next_start_after)
+
+        assert [f.original_filename for f in first.files] == ["a.txt", "b.txt"]
+        assert [f.original_filename for f in second.files] == ["c.txt"]
+        assert second.next_start_after is None
+
+    def test_remove_file(self, index):
+        """Test removing a file, including one that was never indexed"""
+        index.upsert_file(_file("a.txt"))
+
+        index.remove_file(_file("a.txt").object_name)
+        index.remove_file("docs/user/unknown")
+
+        assert index.list_files_in_collection("docs") == []
+
+    def test_replace_all_rolls_back_on_failure(self, index):
+        """Test a failed rebuild keeps the previous index"""
+        index.upsert_file(_file("a.txt"))
+
+        def files():
+            yield _file("b.txt")
+            raise RuntimeError("storage went away")
+
+        with pytest.raises(RuntimeError):
+            index.replace_all(files())
+
+        assert [
+            f.original_filename for f in index.list_files_in_collection("docs")
+        ] == ["a.txt"]
+
+    def test_fill_keeps_entries_and_marks_complete(self, index):
+        """Test filling a new index keeps entries written meanwhile"""
+        index.upsert_file(_file("a.txt", License="MIT"))
+        assert not index.is_complete()
+
+        count = index.fill([_file("a.txt", License="stale"), _file("b.txt")])
+
+        assert count == 1
+        assert index.is_complete()
+        files = index.list_files_in_collection("docs")
+        assert [f.metadata for f in files] == [{"license": "MIT"}, {}]
+
+    def test_completeness_survives_reopening(self, tmp_path):
+        """Test an index stays complete once it has been filled"""
+        path = str(tmp_path / "index.sqlite3")
+        index = SQLiteMetadataIndex(path)
+        index.replace_all([])
+        index.close()
+
+        reopened = SQLiteMetadataIndex(path)
+        assert reopened.is_complete()
+        reopened.close()
+
+
+@pytest.mark.unit
+class TestRebuildMetadataIndex:
+    def test_rebuild_stats_file_keys_only(self, index):
+        """Test rebuild indexes stat'ed files and skips internal or vanished objects"""
+        client = MagicMock()
+        client.list_objects_page.side_effect = [
+            (
+                [
+                    {"name": ".upload-sessions/abc.json"},
+                    {"name": _file("a.txt").object_name},
+                ],
+                True,
+            ),
+            ([{"name": _file("gone.txt").object_name}], False),
+        ]
+
+        def stat_file(object_name):
+            if object_name.endswith("gone.txt"):
+                raise StorageFileNotFoundError(object_name)
+            return _file("a.txt", License="MIT")
+
+        storage = MagicMock()
+        storage.stat_file.side_effect = stat_file
+        index.upsert_file(_file("stale.txt"))
+
+        count = rebuild_metadata_index(client, storage, index, workers=2)
+
+        assert count == 1
+        (file,) = index.list_files_in_collection("docs")
+        assert file.metadata == {"license": "MIT"}
+        assert client.list_objects_page.call_args_list[1].kwargs["start_after"] == (
+            _file("a.txt").object_name
+        )
+
+    def test_fill_adds_files_missing_from_index(self, index):
+        """Test filling stats every file key and adds it to the index"""
+        client = MagicMock()
+        client.list_objects_page.return_value = (
+            [{"name": _file("a.txt").object_name}],
+            False,
+        )
+        storage = MagicMock()
+        storage.stat_file.return_value = _file("a.txt")
+
+        count = fill_metadata_index(client, storage, index, workers=2)
+
+        assert count == 1
+        assert index.is_complete()
+        assert len(index.list_files_in_collection("docs")) == 1
+
+
+@pytest.mark.unit
+class TestSQLiteMetadataIndexQuery:
+    @pytest.fixture
+    def populated(self, index):
+        for name, owner, size, license in (
+            ("a.txt", "alice", 30, "MIT"),
+            ("b.txt", "bob", 10, "CC-BY"),
+            ("c.txt", "alice", 20, "CC-BY"),
+            ("d.txt", "alice", 20, "CC-BY"),
+        ):
+            file = _file(name, License=license)
+            file.owner = owner
+            file.size = size
+            index.upsert_file(file)
+        index.upsert_file(_file("e.txt", collection="other", license="CC-BY"))
+        return index
+
+    def test_filters_combine(self, populated):
+        """Test field and user metadata filters must all match"""
+        page = populated.query_files(
+            FileQuery(collection="docs", owner="alice", metadata={"License": "CC-BY"}),
+            10,
+        )
+
+        assert [f.original_filename for f in page.files] == ["c.txt", "d.txt"]
+
+    def test_sorted_pages_break_ties_by_object_name(self, populated):
+        """Test keyset pages continue from the last (sort value, object name)"""
+        query = FileQuery(collection="docs", sort="size", descending=True)
+
+        first = populated.query_files(query, 2)
+        last = first.files[-1]
+        second = populated.query_files(
+            query, 2, (query.sort_value(last), last.object_name)
+        )
+
+        assert [f.original_filename for f in first.files] == ["a.txt", "d.txt"]
+        assert [f.original_filename for f in second.files] == ["c.txt", "b.txt"]
+        assert second.next_start_after is None
+
+    def test_size_range(self, populated):
+        """Test size bounds are inclusive"""
+        page = populated.query_files(
+            FileQuery(collection="docs", min_size=15, max_size=20), 10
+        )
+
+        assert [f.size for f in page.files] == [20, 20]
+
+    def test_metadata_rows_follow_updates(self, populated):
+        """Test replacing or removing a file updates its metadata filters"""
+        populated.upsert_file(_file("b.txt", License="MIT"))
+        populated.remove_file(_file("c.txt").object_name)
+
+        page = populated.query_files(
+            FileQuery(collection="docs", metadata={"license": "CC-BY"}), 10
+        )
+
+        assert [f.original_filename for f in page.files] == ["d.txt"]
+
+    def test_upgrade_backfills_metadata(self, tmp_path):
+        """Test opening a version 1 index adds query and search for existing files"""
+        path = str(tmp_path / "index.sqlite3")
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            """
+            CREATE TABLE files (
+                object_name TEXT PRIMARY KEY, collection TEXT NOT NULL,
+                owner TEXT NOT NULL, original_filename TEXT NOT NULL,
+                upload_time TEXT NOT NULL, content_type TEXT NOT NULL,
+                size INTEGER, etag TEXT, metadata TEXT NOT NULL
+            ) WITHOUT ROWID;
+            INSERT INTO files VALUES ('docs/u/t-a.txt', 'docs', 'u', 'a.txt',
+                't', 'text/plain', 1, NULL,
+                '{"license": "MIT", "uploader": "alice"}');
+            PRAGMA user_version = 1;
+            """
+        )
+        connection.close()
+
+        index = SQLiteMetadataIndex(path)
+        page = index.query_files(
+            FileQuery(collection="docs", metadata={"license": "MIT"}), 10
+        )
+        found = index.search_files("mit", ["docs"], 10)
+        by_uploader = index.search_files("alice", ["docs"], 10)
+        index.close()
+
+        assert [f.object_name for f in page.files] == ["docs/u/t-a.txt"]
+        assert [f.object_name for f in found] == ["docs/u/t-a.txt"]
+        assert by_uploader == []
+
+
+@pytest.mark.unit
+class TestSQLiteMetadataIndexSearch:
+    def test_search_ranks_filename_matches_first(self, index):
+        """Test every word must match and file name hits outrank metadata hits"""
+        index.upsert_file(_file("notes.txt", title="Licence agreement draft"))
+        index.upsert_file(_file("licence_agreement_v2.pdf"))
+        index.upsert_file(_file("licence.txt"))
+
+        files = index.search_files("licence agreements", ["docs"], 10)
+
+        assert [f.original_filename for f in files] == [
+            "licence_agreement_v2.pdf",
+            "notes.txt",
+        ]
+
+    def test_search_is_limited_to_given_collections(self, index):
+        """Test files outside the given collections are never returned"""
+        index.upsert_file(_file("report.pdf"))
+        index.upsert_file(_file("report.pdf", collection="secret"))
+
+        files = index.search_files("report", ["docs"], 10)
+
+        assert [f.collection for f in files] == ["docs"]
+        assert index.search_files("report", [], 10) == []
+
+    def test_search_follows_updates_and_ignores_query_syntax(self, index):
+        """Test removed files drop out and FTS operators in input are inert"""
+        index.upsert_file(_file("budget.xlsx"))
+        index.upsert_file(_file("budget-final.xlsx"))
+        index.remove_file(_file("budget.xlsx").object_name)
+
+        files = index.search_files('"budg*(', ["docs"], 10)
+
+        assert [f.original_filename for f in files] == ["budget-final.xlsx"]
+
+    def test_api_written_metadata_is_not_searched(self, index):
+        """Test uploader names and checksums do not match search words"""
+        index.upsert_file(_file("a.txt", uploader="alice", sha256="ab" * 32))
+
+        assert index.search_files("alice", ["docs"], 10) == []
+        assert index.search_files("ab" * 32, ["docs"], 10) == []
+
+    def test_list_collections(self, index):
+        """Test distinct collections are listed in order"""
+        for collection in ("b", "a", "b"):
+            index.upsert_file(_file(f"{collection}.txt", collection=collection))
+
+        assert index.list_collections() == ["a", "b"]
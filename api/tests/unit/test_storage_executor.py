@@ -0,0 +1,69 @@
+import io
+import threading
+
+import anyio
+import pytest
+
+from infrastructure.executor import StorageExecutor
+
+
+@pytest.mark.unit
+class TestStorageExecutor:
+    def test_run_executes_off_event_loop(self):
+        """Test calls run on a worker thread and return their result"""
+        executor = StorageExecutor({"list": 2})
+        loop_thread = threading.get_ident()
+
+        result = anyio.run(executor.run, "list", threading.get_ident)
+
+        assert result != loop_thread
+        assert executor.statistics()["list"]["completed"] == 1
+
+    def test_limit_queues_excess_calls(self):
+        """Test calls beyond the operation limit wait and are reported as queued"""
+        executor = StorageExecutor({"upload": 1, "download": 1})
+        release = threading.Event()
+        snapshots = []
+
+        async def scenario():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(executor.run, "upload", release.wait)
+                tg.start_soon(executor.run, "upload", release.wait)
+                await anyio.sleep(0.1)
+                snapshots.append(executor.statistics())
+                # Other operations are unaffected by the saturated upload limit
+                await executor.run("download", lambda: None)
+                release.set()
+
+        anyio.run(scenario)
+
+        upload = snapshots[0]["upload"]
+        assert (upload["in_flight"], upload["queued"]) == (1, 1)
+        assert snapshots[0]["download"]["completed"] == 0
+        assert executor.statistics()["upload"]["completed"] == 2
+
+    def test_failures_are_counted(self):
+        """Test exceptions propagate and are recorded per operation"""
+        executor = StorageExecutor({"delete": 1})
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            anyio.run(executor.run, "delete", fail)
+
+        assert executor.statistics()["delete"]["failed"] == 1
+
+    def test_iterate_closes_source_when_consumer_stops_early(self):
+        """Test streamed sources are closed even if not read to the end"""
+        executor = StorageExecutor({"download": 1})
+        source = io.BytesIO(b"abcdef")
+
+        async def scenario():
+            chunks = executor.iterate("download", source, chunk_size=2)
+            first = await chunks.__anext__()
+            await chunks.aclose()
+            return first
+
+        assert anyio.run(scenario) == b"ab"
+        assert source.closed
@@ -2,9 +2,19 @@ import io
 from unittest.mock import MagicMock, patch
 
 import pytest
+from minio.datatypes import Object
 from minio.error import S3Error
 
-from api.storage.minio import MINIO_BUCKET_NAME, MinioClient
+from api.domain.streams import UploadStream
+from domain.repositories import StorageFileNotFoundError
+from api.storage.minio import (
+    MINIO_BUCKET_NAME,
+    MINIO_PART_SIZE,
+    MINIO_PUBLIC_ENDPOINT,
+    MinioClient,
+    _iter_parts,
+)
+from api.storage.minio_repository import MinioStorageRepository
 
 
 @pytest.mark.unit
@@ -26,6 +36,115 @@ class TestMinioClient:
             assert result == "test/file.txt"
             mock_client.put_object.assert_called_once()
 
+    def test_upload_file_streams_chunk_iterable(self):
+        """Test chunk iterables are streamed with unknown length"""
+        with patch("api.storage.minio.Minio") as mock_minio_class:
+            mock_client = MagicMock()
+            mock_minio_class.return_value = mock_client
+
+            uploaded = []
+            mock_client.put_object.side_effect = lambda **kwargs: uploaded.append(
+                kwargs["data"].read(kwargs["part_size"] + 1)
+            )
+
+            minio_client = MinioClient(ensure_bucket=False)
+
+            result = minio_client.upload_file(
+                iter([b"chunk-one ", b"chunk-two"]), "test/file.txt", "text/plain"
+            )
+
+            assert result == "test/file.txt"
+            kwargs = mock_client.put_object.call_args.kwargs
+            assert kwargs["length"] == -1
+            assert kwargs["part_size"] == MINIO_PART_SIZE
+            assert kwargs["num_parallel_uploads"] == 1
+            assert uploaded == [b"chunk-one chunk-two"]
+
+    def test_upload_with_known_length_is_not_buffered(self):
+        """Test a given length picks the upload path before any content is read"""
+        with patch("api.storage.minio.Minio") as mock_minio_class:
+            mock_client = MagicMock()
+            mock_minio_class.return_value = mock_client
+            pulled = []
+
+            def chunks():
+                for chunk in (b"chunk-one ", b"chunk-two"):
+                    pulled.append(chunk)
+                    yield chunk
+
+            def put_object(**kwargs):
+                assert pulled == []
+                return kwargs["data"].read(kwargs["length"])
+
+            mock_client.put_object.side_effect = put_object
+
+            minio_client = MinioClient(ensure_bucket=False)
+            minio_client.upload_file(chunks(), "test/file.txt", "text/plain", length=19)
+
+            assert mock_client.put_object.call_args.kwargs["length"] == 19
+            assert pulled == [b"chunk-one ", b"chunk-two"]
+
+    def test_large_upload_sends_parts_concurrently(self):
+        """Test content past the threshold goes up as a parallel multipart upload"""
+        with patch("api.storage.minio.Minio") as mock_minio_class, patch.multiple(
+            "api.storage.minio",
+            MINIO_PART_SIZE=4,
+            MINIO_PARALLEL_UPLOAD_THRESHOLD=8,
+        ):
+            mock_client = MagicMock()
+            mock_minio_class.return_value = mock_client
+            mock_client._create_multipart_upload.return_value = "upload-1"
+            mock_client._upload_part.side_effect = (
+                lambda bucket, name, data, headers, upload_id, number: f"etag-{number}"
+            )
+
+            minio_client = MinioClient(ensure_bucket=False)
+            minio_client.upload_file(
+                iter([b"abcdefghij", b"klm"]), "test/file.bin", "application/zip"
+            )
+
+            mock_client.put_object.assert_not_called()
+            sent = sorted(
+                (call.args[5], call.args[2])
+                for call in mock_client._upload_part.call_args_list
+            )
+            assert sent == [(1, b"abcd"), (2, b"efgh"), (3, b"ijkl"), (4, b"m")]
+            parts = mock_client._complete_multipart_upload.call_args.args[3]
+            assert [(p.part_number, p.etag) for p in parts] == [
+                (n, f"etag-{n}") for n in range(1, 5)
+            ]
+
+    def test_failed_part_aborts_upload(self):
+        """Test a failing part aborts the multipart upload and raises"""
+        with patch("api.storage.minio.Minio") as mock_minio_class, patch.multiple(
+            "api.storage.minio",
+            MINIO_PART_SIZE=4,
+            MINIO_PARALLEL_UPLOAD_THRESHOLD=8,
+        ):
+            mock_client = MagicMock()
+            mock_minio_class.return_value = mock_client
+            mock_client._create_multipart_upload.return_value = "upload-1"
+            mock_client._upload_part.side_effect = Exception("connection reset")
+
+            minio_client = MinioClient(ensure_bucket=False)
+
+            with pytest.raises(Exception, match="connection reset"):
+                minio_client.upload_file(
+                    io.BytesIO(b"x" * 20), "test/file.bin", "application/zip"
+                )
+
+            mock_client._abort_multipart_upload.assert_called_once()
+            mock_client._complete_multipart_upload.assert_not_called()
+
+    def test_upload_stream_counts_bytes(self):
+        """Test UploadStream yields bounded chunks and records the total size"""
+        stream = UploadStream(io.BytesIO(b"x" * 10), chunk_size=4)
+
+        chunks = list(stream)
+
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert stream.size == 10
+
     def test_upload_file_s3_error(self):
         """Test file upload with S3 error"""
         with patch("api.storage.minio.Minio") as mock_minio_class:
@@ -51,7 +170,7 @@ class TestMinioClient:
                 minio_client.upload_file(file_data, "test/file.txt", "text/plain")
 
     def test_download_file_success(self):
-        """Test successful file download"""
+        """Test file download takes metadata from the GET response alone"""
         with patch("api.storage.minio.Minio") as mock_minio_class:
             mock_client = MagicMock()
             mock_minio_class.return_value = mock_client
@@ -61,15 +180,15 @@ class TestMinioClient:
 
             # Mock response object
             mock_response = MagicMock()
-            mock_response.data = b"test content"
+            mock_response.read.return_value = b"test content"
+            mock_response.headers = {
+                "content-type": "text/plain",
+                "content-length": "12",
+                "etag": '"abc"',
+                "X-Amz-Meta-Test": "value",
+            }
             mock_client.get_object.return_value = mock_response
 
-            # Mock stats object
-            mock_stats = MagicMock()
-            mock_stats.metadata = {"test": "value"}
-            mock_stats.content_type = "text/plain"
-            mock_client.stat_object.return_value = mock_stats
-
             minio_client = MinioClient(ensure_bucket=False)
 
             data, metadata, content_type = minio_client.download_file("test/file.txt")
@@ -77,6 +196,34 @@ class TestMinioClient:
             assert data == b"test content"
             assert metadata == {"test": "value"}
             assert content_type == "text/plain"
+            mock_client.stat_object.assert_not_called()
+            assert minio_client.request_counts() == {"get_object": 1}
+
+    def test_open_object_streams_and_releases_connection(self):
+        """Test open_object reads lazily and close() releases the connection"""
+        with patch("api.storage.minio.Minio") as mock_minio_class:
+            mock_client = MagicMock()
+            mock_minio_class.return_value = mock_client
+            mock_response = MagicMock()
+            mock_response.read.side_effect = [b"test ", b"content", b""]
+            mock_response.headers = {
+                "content-range": "bytes 0-11/40",
+                "content-length": "12",
+            }
+            mock_client.get_object.return_value = mock_response
+
+            minio_client = MinioClient(ensure_bucket=False)
+
+            stream, stats = minio_client.open_object(
+                "test/file.txt", offset=0, length=12
+            )
+            with stream:
+                assert stats.size == 40
+                assert stream.read(5) == b"test "
+                mock_response.read.assert_called_once_with(5)
+
+            mock_response.close.assert_called_once()
+            mock_response.release_conn.assert_called_once()
 
     def test_list_objects_success(self):
         """Test successful object listing"""
@@ -103,6 +250,24 @@ class TestMinioClient:
             assert objects[0]["name"] == "test/file.txt"
             assert objects[0]["size"] == 1024
 
+    def test_list_objects_page_reports_more(self):
+        """Test a listing page fetches one extra key to tell if more remain"""
+        with patch("api.storage.minio.Minio") as mock_minio_class:
+            mock_client = MagicMock()
+            mock_minio_class.return_value = mock_client
+            mock_client._list_objects.return_value = iter(
+                Object(MINIO_BUCKET_NAME, f"test/{name}", size=1)
+                for name in ("a", "b", "c")
+            )
+
+            minio_client = MinioClient(ensure_bucket=False)
+
+            objects, has_more = minio_client.list_objects_page("test/", limit=2)
+
+            assert [obj["name"] for obj in objects] == ["test/a", "test/b"]
+            assert has_more
+            assert mock_client._list_objects.call_args.kwargs["max_keys"] == 3
+
     def test_delete_object_success(self):
         """Test successful object deletion"""
         with patch("api.storage.minio.Minio") as mock_minio_class:
@@ -120,3 +285,142 @@ class TestMinioClient:
             mock_client.remove_object.assert_called_once_with(
                 MINIO_BUCKET_NAME, "test/file.txt"
             )
+
+    def test_presigned_part_url_uses_public_endpoint(self):
+        """Test part URLs are signed for the public endpoint with upload params"""
+        with patch("api.storage.minio.Minio") as mock_minio_class:
+            presign_client = MagicMock()
+            mock_minio_class.return_value = presign_client
+            presign_client.get_presigned_url.return_value = "https://public/url"
+
+            minio_client = MinioClient(ensure_bucket=False)
+
+            url = minio_client.get_presigned_part_url(
+                "test/file.txt", "upload-1", 2, expires=600
+            )
+
+            assert url == "https://public/url"
+            assert mock_minio_class.call_args.args[0] == MINIO_PUBLIC_ENDPOINT
+            kwargs = presign_client.get_presigned_url.call_args.kwargs
+            assert kwargs["extra_query_params"] == {
+                "uploadId": "upload-1",
+                "partNumber": "2",
+            }
+
+
+@pytest.mark.unit
+def test_parts_assembled_across_short_reads():
+    """Test streams returning a few bytes per read still yield full parts"""
+
+    class ShortReads(io.RawIOBase):
+        def __init__(self, data):
+            self._data = io.BytesIO(data)
+
+        def read(self, size=-1):
+            return self._data.read(min(size, 3))
+
+    content = bytes(range(256)) * 4
+
+    parts = list(_iter_parts(ShortReads(content), 100))
+
+    assert b"".join(parts) == content
+    assert [len(part) for part in parts] == [100] * 10 + [24]
+
+
+@pytest.mark.unit
+class TestMinioStorageRepository:
+    def test_delete_of_plain_file_is_stat_and_delete(self):
+        """Test deleting a plain file issues a single delete after its stat"""
+        minio_client = MagicMock()
+        minio_client.delete_object.return_value = True
+        minio_client.stat_object.return_value = _object_stats(4)
+
+        assert MinioStorageRepository(minio_client).delete_file("test/file.txt")
+
+        minio_client.delete_object.assert_called_once_with("test/file.txt")
+
+    def test_delete_of_missing_file_is_reported(self):
+        """Test the stat reports missing files, which S3 deletes would not"""
+        minio_client = MagicMock()
+        minio_client.stat_object.side_effect = Exception("code: NoSuchKey")
+
+        with pytest.raises(StorageFileNotFoundError):
+            MinioStorageRepository(minio_client).delete_file("test/file.txt")
+
+        minio_client.delete_object.assert_not_called()
+
+    def test_update_metadata_keeps_content_reference(self):
+        """Test replacing metadata of a reference keeps it pointing at its blob"""
+        minio_client = MagicMock()
+        minio_client.stat_object.return_value = _object_stats(
+            0, metadata={"content-sha256": "a" * 64, "content-size": "3"}
+        )
+        file = MagicMock(object_name="test/u/t-a.txt", content_type="text/plain")
+        file.metadata = {"license": "MIT"}
+
+        assert MinioStorageRepository(minio_client).update_metadata(file)
+
+        name, content_type, metadata = minio_client.replace_metadata.call_args.args
+        assert (name, content_type) == ("test/u/t-a.txt", "text/plain")
+        assert metadata == {
+            "license": "MIT",
+            "content-sha256": "a" * 64,
+            "content-size": "3",
+        }
+
+    def test_large_download_fetches_ranges_in_parallel(self):
+        """Test large objects are reassembled in order from concurrent ranges"""
+        content = bytes(range(256)) * 4
+        minio_client = MagicMock()
+        first_stream = io.BytesIO(content)
+        minio_client.open_object.side_effect = lambda name, **kwargs: (
+            (first_stream, _object_stats(len(content)))
+            if not kwargs
+            else (
+                io.BytesIO(
+                    content[kwargs["offset"] : kwargs["offset"] + kwargs["length"]]
+                ),
+                _object_stats(len(content)),
+            )
+        )
+
+        with patch.multiple(
+            "api.storage.minio",
+            MINIO_DOWNLOAD_SEGMENT_SIZE=100,
+            MINIO_DOWNLOAD_PARALLELISM=3,
+        ), patch("api.storage.minio_repository.MINIO_PARALLEL_DOWNLOAD_THRESHOLD", 500):
+            stream, file = MinioStorageRepository(minio_client).retrieve_file(
+                "test/user/20240101-000000-big.bin"
+            )
+            received = b"".join(iter(lambda: stream.read(64), b""))
+            stream.close()
+
+        assert received == content
+        assert file.size == len(content)
+        ranges = [call.kwargs for call in minio_client.open_object.call_args_list[1:]]
+        assert [r["offset"] for r in ranges] == list(range(100, 1024, 100))
+        assert all(r["request_headers"] == {"If-Match": '"etag-1"'} for r in ranges)
+
+    def test_small_download_uses_single_stream(self):
+        """Test objects below the threshold stream from one GET"""
+        minio_client = MagicMock()
+        first_stream = io.BytesIO(b"small")
+        minio_client.open_object.return_value = (first_stream, _object_stats(5))
+
+        stream, _ = MinioStorageRepository(minio_client).retrieve_file(
+            "test/user/20240101-000000-small.txt"
+        )
+
+        assert stream is first_stream
+        minio_client.open_object.assert_called_once()
+
+
+def _object_stats(size: int, metadata: dict = None) -> Object:
+    return Object(
+        MINIO_BUCKET_NAME,
+        "test/user/20240101-000000-big.bin",
+        etag="etag-1",
+        size=size,
+        content_type="application/octet-stream",
+        metadata=metadata or {},
+    )
@@ -0,0 +1,189 @@
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import anyio
+import httpx
+import pytest
+from minio.credentials import Credentials
+from minio.signer import sign_v4_s3
+
+from domain.models import File
+from domain.repositories import StorageFileNotFoundError
+from storage.s3_async import AsyncS3Client, canonical_query_string, sign_request
+from storage.s3_async_repository import AsyncS3StorageRepository
+
+
+def _mock_client(handler) -> AsyncS3Client:
+    client = AsyncS3Client(endpoint="minio:9000", bucket_name="bucket")
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _file(object_name: str = "docs/user/20240101_000000_a.txt") -> File:
+    return File(
+        object_name=object_name,
+        collection="docs",
+        owner="user",
+        original_filename="a.txt",
+        upload_time="20240101_000000",
+        content_type="text/plain",
+    )
+
+
+@pytest.mark.unit
+class TestAsyncS3Client:
+    def test_signature_matches_reference_signer(self):
+        """Test SigV4 signatures match the minio SDK's signer"""
+        now = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        query = canonical_query_string({"uploadId": "abc~1 2", "partNumber": "3"})
+        path = "/bucket/docs/user/file%20name.txt"
+        payload_hash = "UNSIGNED-PAYLOAD"
+
+        headers = sign_request(
+            "PUT",
+            "minio:9000",
+            path,
+            query,
+            {"Content-Type": "text/plain"},
+            payload_hash,
+            "access",
+            "secret",
+            "us-east-1",
+            now,
+        )
+
+        reference = sign_v4_s3(
+            "PUT",
+            urlsplit(f"http://minio:9000{path}?{query}"),
+            "us-east-1",
+            {
+                "Content-Type": "text/plain",
+                "Host": "minio:9000",
+                "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ"),
+                "x-amz-content-sha256": payload_hash,
+            },
+            Credentials("access", "secret"),
+            payload_hash,
+            now,
+        )
+        assert headers["authorization"] == reference["Authorization"]
+
+    def test_error_response_is_parsed(self):
+        """Test S3 XML error bodies surface their code"""
+
+        def handler(request):
+            return httpx.Response(
+                404,
+                content=b"<Error><Code>NoSuchKey</Code><Message>gone</Message></Error>",
+            )
+
+        repository = AsyncS3StorageRepository(_mock_client(handler))
+
+        with pytest.raises(StorageFileNotFoundError):
+            anyio.run(repository.retrieve_file, "docs/user/missing.txt")
+
+
+@pytest.mark.unit
+class TestAsyncS3StorageRepository:
+    def test_store_file_uses_multipart_beyond_one_part(self):
+        """Test content larger than one part is uploaded as ordered parts"""
+        requests = []
+
+        def handler(request):
+            requests.append(
+                (request.method, request.url.query.decode(), request.content)
+            )
+            if "uploads=" in request.url.query.decode():
+                return httpx.Response(
+                    200,
+                    content=b'<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                    b"<UploadId>up-1</UploadId></InitiateMultipartUploadResult>",
+                )
+            return httpx.Response(200, headers={"ETag": f'"etag-{len(requests)}"'})
+
+        repository = AsyncS3StorageRepository(_mock_client(handler), part_size=4)
+
+        async def chunks():
+            for chunk in (b"abc", b"defgh", b"ij"):
+                yield chunk
+
+        assert anyio.run(repository.store_file, chunks(), _file())
+
+        methods = [method for method, _, _ in requests]
+        bodies = [body for method, query, body in requests if "partNumber" in query]
+        assert methods == ["POST", "PUT", "PUT", "PUT", "POST"]
+        assert bodies == [b"abcd", b"efgh", b"ij"]
+        assert b"<PartNumber>3</PartNumber>" in requests[-1][2]
+
+    def test_store_file_small_content_uses_single_put(self):
+        """Test content within one part is uploaded with a single PUT"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, headers={"ETag": '"e"'})
+
+        repository = AsyncS3StorageRepository(_mock_client(handler), part_size=16)
+
+        anyio.run(repository.store_file, [b"hello"], _file())
+
+        assert len(requests) == 1
+        assert requests[0].method == "PUT"
+        assert requests[0].content == b"hello"
+        assert requests[0].headers["content-type"] == "text/plain"
+
+    def test_list_files_page_fetches_one_page(self):
+        """Test a page is one ListObjectsV2 request continuing after start-after"""
+        requests = []
+        keys = ["docs/user/20240101_000000_b.txt", "docs/user/20240101_000000_c.txt"]
+
+        def handler(request):
+            requests.append(request)
+            contents = "".join(
+                f"<Contents><Key>{key}</Key><Size>1</Size></Contents>" for key in keys
+            )
+            return httpx.Response(
+                200,
+                content=(
+                    '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                    f"{contents}<IsTruncated>true</IsTruncated>"
+                    "<NextContinuationToken>t</NextContinuationToken></ListBucketResult>"
+                ).encode(),
+            )
+
+        repository = AsyncS3StorageRepository(_mock_client(handler))
+
+        page = anyio.run(
+            repository.list_files_page, "docs", 1, "docs/user/20240101_000000_a.txt"
+        )
+
+        assert len(requests) == 1
+        assert (
+            requests[0].url.params["start-after"] == "docs/user/20240101_000000_a.txt"
+        )
+        assert requests[0].url.params["max-keys"] == "2"
+        assert [f.object_name for f in page.files] == keys[:1]
+        assert page.next_start_after == keys[0]
+
+    def test_update_metadata_copies_object_onto_itself(self):
+        """Test metadata is replaced by a server-side copy keeping the content"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if request.method == "HEAD":
+                return httpx.Response(200, headers={"Content-Length": "5"})
+            return httpx.Response(200, content=b"<CopyObjectResult/>")
+
+        repository = AsyncS3StorageRepository(_mock_client(handler))
+        file = _file()
+        file.metadata = {"sha256": "abc"}
+
+        assert anyio.run(repository.update_metadata, file)
+
+        copy = requests[-1]
+        assert [r.method for r in requests] == ["HEAD", "PUT"]
+        assert copy.headers["x-amz-copy-source"] == f"/bucket/{file.object_name}"
+        assert copy.headers["x-amz-metadata-directive"] == "REPLACE"
+        assert copy.headers["x-amz-meta-sha256"] == "abc"
+        assert copy.content == b""
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from domain.models import File, UploadSession
+from domain.repositories import StorageFileNotFoundError
+from storage.minio import MinioClient
+from storage.minio_upload_sessions import (
+    UPLOAD_SESSION_PREFIX,
+    UPLOAD_SESSION_TTL_SECONDS,
+    MinioUploadSessionRepository,
+)
+
+
+def _session(session_id, created_at):
+    return UploadSession(
+        session_id=session_id,
+        upload_id=f"upload-{session_id}",
+        file=File(
+            object_name="test/user/20250101-120000-big.bin",
+            collection="test",
+            owner="user",
+            original_filename="big.bin",
+            upload_time="20250101-120000",
+            content_type="application/octet-stream",
+        ),
+        created_at=created_at.isoformat(),
+    )
+
+
+@pytest.mark.unit
+class TestMinioUploadSessionRepository:
+    def test_get_session_rejects_malformed_id(self):
+        """Test session IDs that could escape the session prefix are rejected"""
+        minio_client = MagicMock(spec=MinioClient)
+        repo = MinioUploadSessionRepository(minio_client)
+
+        with pytest.raises(StorageFileNotFoundError):
+            repo.get_session("../test/user/file")
+
+        minio_client.download_file.assert_not_called()
+
+    def test_collect_expired_sessions(self):
+        """Test only sessions idle for longer than the TTL are aborted"""
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS + 60)
+        sessions = {
+            "a" * 32: _session("a" * 32, stale),  # idle: aborted
+            "b" * 32: _session("b" * 32, stale),  # recent chunk: kept
+            "c" * 32: _session("c" * 32, now),  # recently created: kept
+        }
+
+        minio_client = MagicMock(spec=MinioClient)
+        minio_client.list_objects.return_value = [
+            {"name": f"{UPLOAD_SESSION_PREFIX}{session_id}.json"}
+            for session_id in sessions
+        ]
+        minio_client.download_file.side_effect = lambda key: (
+            sessions[key[len(UPLOAD_SESSION_PREFIX) : -len(".json")]]
+            .model_dump_json()
+            .encode(),
+            {},
+            "application/json",
+        )
+        minio_client.list_parts.side_effect = lambda object_name, upload_id: (
+            [{"part_number": 1, "etag": "x", "size": 1, "last_modified": now}]
+            if upload_id == f"upload-{'b' * 32}"
+            else []
+        )
+
+        repo = MinioUploadSessionRepository(minio_client)
+
+        assert repo.collect_expired_sessions() == 1
+        minio_client.abort_multipart_upload.assert_called_once_with(
+            "test/user/20250101-120000-big.bin", f"upload-{'a' * 32}"
+        )
+        minio_client.delete_object.assert_called_once_with(
+            f"{UPLOAD_SESSION_PREFIX}{'a' * 32}.json"
+        )
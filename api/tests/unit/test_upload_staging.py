@@ -0,0 +1,241 @@
+import hashlib
+import os
+
+import anyio
+import pytest
+
+from domain.models import ByteRange, File, FilePage
+from infrastructure import staging
+from infrastructure.staging import (
+    FAILED_DIR_NAME,
+    JOURNAL_NAME,
+    StagingStorageRepository,
+    UploadJournal,
+)
+
+CONTENT = b"staged content " * 1000
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+def _file(name="docs/user/20240101-000000-a.txt") -> File:
+    return File(
+        object_name=name,
+        collection="docs",
+        owner="user",
+        original_filename="a.txt",
+        upload_time="20240101-000000",
+        content_type="text/plain",
+        metadata={"license": "MIT"},
+    )
+
+
+class FakeStorage:
+    """AsyncStorageRepository keeping objects in memory, failing on demand"""
+
+    def __init__(self, failures=0):
+        self.objects = {}
+        self.files = {}
+        self.failures = failures
+        self.deleted = []
+
+    async def store_file(self, file_content, file):
+        if self.failures:
+            self.failures -= 1
+            raise Exception("storage unavailable")
+        self.objects[file.object_name] = file_content.read()
+        self.files[file.object_name] = file
+        return True
+
+    async def update_metadata(self, file):
+        self.files[file.object_name] = file
+        return True
+
+    async def delete_file(self, object_name):
+        self.deleted.append(object_name)
+        return True
+
+    async def list_files_page(self, collection, limit, start_after=None):
+        names = sorted(n for n in self.objects if not start_after or n > start_after)
+        return FilePage(
+            files=[_file(n) for n in names[:limit]],
+            next_start_after=names[limit - 1] if len(names) > limit else None,
+        )
+
+
+async def _flush_all(repository):
+    """Run the flush workers until nothing is left staged"""
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(repository.run)
+        with anyio.fail_after(5):
+            while repository.staged_count():
+                await anyio.sleep(0.01)
+        tg.cancel_scope.cancel()
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(staging, "STAGING_RETRY_DELAY", 0)
+
+
+@pytest.mark.unit
+class TestStagingStorageRepository:
+    def test_upload_acknowledged_before_storage_and_served_locally(self, tmp_path):
+        """Test staged files are readable, also by range, before any flush"""
+        storage = FakeStorage()
+        repository = StagingStorageRepository(storage, str(tmp_path))
+
+        async def scenario():
+            await repository.store_file([CONTENT[:100], CONTENT[100:]], _file())
+            stream, file = await repository.retrieve_file(
+                _file().object_name, ByteRange(start=5, end=9)
+            )
+            return b"".join([chunk async for chunk in stream]), file
+
+        content, file = anyio.run(scenario)
+
+        assert storage.objects == {}
+        assert content == CONTENT[5:10]
+        assert file.size == len(CONTENT)
+
+    def test_flush_retries_until_storage_accepts(self, tmp_path):
+        """Test storage failures are retried and the staging file removed after"""
+        storage = FakeStorage(failures=2)
+        repository = StagingStorageRepository(storage, str(tmp_path))
+
+        async def scenario():
+            await repository.store_file([CONTENT], _file())
+            await _flush_all(repository)
+
+        anyio.run(scenario)
+
+        assert storage.objects == {_file().object_name: CONTENT}
+        assert os.listdir(tmp_path) == [JOURNAL_NAME]
+
+    def test_rejected_upload_is_set_aside(self, tmp_path, monkeypatch):
+        """Test uploads storage keeps rejecting stop being retried"""
+        monkeypatch.setattr(staging, "STAGING_MAX_ATTEMPTS", 3)
+        storage = FakeStorage(failures=100)
+        repository = StagingStorageRepository(storage, str(tmp_path))
+
+        async def scenario():
+            await repository.store_file([CONTENT], _file())
+            await _flush_all(repository)
+
+        anyio.run(scenario)
+
+        assert storage.failures == 97
+        assert repository.failed_count() == 1
+        failed = tmp_path / FAILED_DIR_NAME
+        assert sorted(p.suffix for p in failed.iterdir()) == [".data", ".json"]
+        restarted = StagingStorageRepository(storage, str(tmp_path))
+        assert (restarted.staged_count(), restarted.failed_count()) == (0, 1)
+
+    def test_pending_uploads_flushed_after_restart(self, tmp_path):
+        """Test the journal brings back uploads acknowledged before a restart"""
+        anyio.run(
+            StagingStorageRepository(FakeStorage(), str(tmp_path)).store_file,
+            [CONTENT],
+            _file(),
+        )
+        storage = FakeStorage()
+        repository = StagingStorageRepository(storage, str(tmp_path))
+
+        anyio.run(_flush_all, repository)
+
+        assert storage.objects == {_file().object_name: CONTENT}
+
+    def test_digest_of_streamed_upload_is_journaled(self, tmp_path):
+        """Test uploads staged without a checksum are flushed with one"""
+        anyio.run(
+            StagingStorageRepository(FakeStorage(), str(tmp_path)).store_file,
+            [CONTENT[:100], CONTENT[100:]],
+            _file(),
+        )
+        storage = FakeStorage()
+
+        anyio.run(_flush_all, StagingStorageRepository(storage, str(tmp_path)))
+
+        file = storage.files[_file().object_name]
+        assert (file.sha256, file.size) == (SHA256, len(CONTENT))
+        assert file.metadata == {"license": "MIT", "sha256": SHA256}
+
+    def test_digest_of_hashing_stream_is_not_recomputed(self, tmp_path):
+        """Test uploads that hash as they stream journal the stream's digest"""
+
+        class HashingStream:
+            sha256 = "digest-from-stream"
+
+            def __iter__(self):
+                return iter([CONTENT])
+
+        repository = StagingStorageRepository(FakeStorage(), str(tmp_path))
+        anyio.run(repository.store_file, HashingStream(), _file())
+        storage = FakeStorage()
+
+        anyio.run(_flush_all, StagingStorageRepository(storage, str(tmp_path)))
+
+        file = storage.files[_file().object_name]
+        assert file.sha256 == "digest-from-stream"
+        assert storage.objects[_file().object_name] == CONTENT
+
+    def test_metadata_of_staged_file_replaced_before_flush(self, tmp_path):
+        """Test metadata updates of staged files are journaled and flushed"""
+        repository = StagingStorageRepository(FakeStorage(), str(tmp_path))
+        anyio.run(repository.store_file, [CONTENT], _file())
+        updated = _file()
+        updated.metadata = {"license": "CC-BY"}
+        anyio.run(repository.update_metadata, updated)
+        storage = FakeStorage()
+
+        anyio.run(_flush_all, StagingStorageRepository(storage, str(tmp_path)))
+
+        assert storage.files[_file().object_name].metadata == {"license": "CC-BY"}
+
+    def test_deleting_staged_file_cancels_flush(self, tmp_path):
+        """Test deleted uploads never reach storage, even after a restart"""
+        storage = FakeStorage()
+        repository = StagingStorageRepository(storage, str(tmp_path))
+
+        async def scenario():
+            await repository.store_file([CONTENT], _file())
+            await repository.delete_file(_file().object_name)
+            await _flush_all(repository)
+
+        anyio.run(scenario)
+
+        assert storage.objects == {}
+        assert StagingStorageRepository(storage, str(tmp_path)).staged_count() == 0
+
+    def test_listing_pages_include_staged_files(self, tmp_path):
+        """Test staged files are listed in name order alongside stored ones"""
+        storage = FakeStorage()
+        storage.objects = {"docs/user/a": b"", "docs/user/c": b""}
+        repository = StagingStorageRepository(storage, str(tmp_path))
+
+        async def scenario():
+            await repository.store_file([CONTENT], _file("docs/user/b"))
+            first = await repository.list_files_page("docs", 2)
+            second = await repository.list_files_page("docs", 2, first.next_start_after)
+            return first, second
+
+        first, second = anyio.run(scenario)
+
+        names = [f.object_name for f in first.files + second.files]
+        assert names == ["docs/user/a", "docs/user/b", "docs/user/c"]
+        assert second.next_start_after is None
+
+
+@pytest.mark.unit
+def test_journal_stays_bounded_while_uploads_are_pending(tmp_path):
+    """Test completed records are compacted away even if the queue never drains"""
+    journal = UploadJournal(str(tmp_path))
+    for n in range(3):
+        journal.record_staged(str(n), _file(f"docs/user/{n}"))
+    for n in range(3, 200):
+        journal.record_staged(str(n), _file(f"docs/user/{n}"))
+        journal.record_done(str(n - 3))
+    journal.close()
+
+    with open(tmp_path / JOURNAL_NAME) as records:
+        assert len(records.readlines()) <= 2 * 3 + 1
+    assert list(UploadJournal(str(tmp_path)).pending()) == ["197", "198", "199"]
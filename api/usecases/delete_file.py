@@ -1,3 +1,6 @@
+from typing import Optional
+import logging
+
 from domain import (
     AuthenticatedPrincipal,
     FileDeleteError,
@@ -5,18 +8,28 @@ from domain import (
     InsufficientPermissionsError,
 )
 from domain.repositories import (
+    AsyncMetadataIndexRepository,
+    AsyncStorageRepository,
     StorageError,
     StorageFileNotFoundError,
-    StorageRepository,
 )
 from public_interfaces import DeleteFileRequest
 
+logger = logging.getLogger(__name__)
+
 
 class DeleteFileUseCase:
-    def __init__(self, storage: StorageRepository):
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        index: Optional[AsyncMetadataIndexRepository] = None,
+    ):
         self.storage = storage
+        self.index = index
 
-    def execute(self, request: DeleteFileRequest, user: AuthenticatedPrincipal) -> bool:
+    async def execute(
+        self, request: DeleteFileRequest, user: AuthenticatedPrincipal
+    ) -> bool:
         if not user.has_collection_permission(request.collection, "delete"):
             raise InsufficientPermissionsError(
                 f"You don't have delete access to collection: {request.collection}"
@@ -31,12 +44,18 @@ class DeleteFileUseCase:
 
         try:
             # Delete using repository protocol
-            success = self.storage.delete_file(full_object_name)
-            return success
-
+            success = await self.storage.delete_file(full_object_name)
         except StorageFileNotFoundError as e:
             raise FileNotFoundError(f"File not found: {str(e)}")
         except StorageError as e:
             raise FileDeleteError(f"Storage error during deletion: {str(e)}")
         except Exception as e:
             raise FileDeleteError(f"Unexpected error during deletion: {str(e)}")
+
+        if self.index is not None:
+            try:
+                await self.index.remove_file(full_object_name)
+            except StorageError as e:
+                # The file is gone; rebuilding the index drops the stale entry
+                logger.warning(f"Failed to unindex {full_object_name}: {e}")
+        return success
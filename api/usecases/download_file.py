@@ -1,28 +1,79 @@
-from io import BytesIO
-from typing import Tuple
+from typing import AsyncIterator, Optional, Tuple
+import hashlib
+import logging
+
+import anyio
 
 from domain import (
     AuthenticatedPrincipal,
+    ByteRange,
     File,
     FileDownloadError,
+    FileIntegrityError,
     FileNotFoundError,
     InsufficientPermissionsError,
+    RangeNotSatisfiableError,
 )
 from domain.repositories import (
+    AsyncStorageRepository,
     StorageError,
     StorageFileNotFoundError,
-    StorageRepository,
+    StorageRangeNotSatisfiableError,
 )
 from public_interfaces import DownloadFileRequest
 
+logger = logging.getLogger(__name__)
+
+
+async def verify_content(
+    chunks: AsyncIterator[bytes], sha256: str, object_name: str
+) -> AsyncIterator[bytes]:
+    """
+    Pass content through, failing if it does not match its recorded checksum.
+
+    The last chunk is held back until the whole content has been hashed, so
+    a corrupted file never reaches the client complete: the response is
+    aborted one chunk short instead.
+    """
+    digest = hashlib.sha256()
+    pending = None
+    try:
+        async for chunk in chunks:
+            # hashlib releases the GIL, so a worker thread hashes in parallel
+            await anyio.to_thread.run_sync(digest.update, chunk)
+            if pending is not None:
+                yield pending
+            pending = chunk
+    finally:
+        await chunks.aclose()
+
+    if digest.hexdigest() != sha256:
+        logger.error(
+            f"Checksum mismatch for {object_name}: "
+            f"recorded {sha256}, read {digest.hexdigest()}"
+        )
+        raise FileIntegrityError(f"Stored content of {object_name} is corrupted")
+    if pending is not None:
+        yield pending
+
 
 class DownloadFileUseCase:
-    def __init__(self, storage: StorageRepository):
+    def __init__(self, storage: AsyncStorageRepository):
         self.storage = storage
 
-    def execute(
-        self, request: DownloadFileRequest, user: AuthenticatedPrincipal
-    ) -> Tuple[BytesIO, File]:
+    async def execute(
+        self,
+        request: DownloadFileRequest,
+        user: AuthenticatedPrincipal,
+        byte_range: Optional[ByteRange] = None,
+        verify: bool = False,
+    ) -> Tuple[AsyncIterator[bytes], File]:
+        """
+        Open a file, or byte_range of it, for streaming.
+
+        With verify, whole-file downloads are checked against the checksum
+        recorded at upload while they stream; ranges cannot be verified.
+        """
         if not user.has_collection_permission(request.collection, "read"):
             raise InsufficientPermissionsError(
                 f"You don't have read access to collection: {request.collection}"
@@ -37,11 +88,19 @@ class DownloadFileUseCase:
 
         try:
             # Use repository protocol to get file content and metadata
-            file_content, file_metadata = self.storage.retrieve_file(full_object_name)
+            file_content, file_metadata = await self.storage.retrieve_file(
+                full_object_name, byte_range
+            )
+            if verify and byte_range is None and file_metadata.sha256:
+                file_content = verify_content(
+                    file_content, file_metadata.sha256, full_object_name
+                )
             return file_content, file_metadata
 
         except StorageFileNotFoundError as e:
             raise FileNotFoundError(f"File not found: {str(e)}")
+        except StorageRangeNotSatisfiableError as e:
+            raise RangeNotSatisfiableError(str(e))
         except StorageError as e:
             raise FileDownloadError(f"Storage error during download: {str(e)}")
         except Exception as e:
@@ -0,0 +1,190 @@
+import mimetypes
+import tempfile
+from typing import AsyncIterable, Iterator, List, Optional, Tuple, Union
+
+import anyio
+import anyio.abc
+import anyio.from_thread
+import anyio.to_thread
+
+from domain import (
+    ARCHIVE_FORMATS,
+    AuthenticatedPrincipal,
+    DomainError,
+    File,
+    FileUploadError,
+    InsufficientPermissionsError,
+    InvalidArchiveError,
+    UnsupportedArchiveError,
+    iter_archive_members,
+    member_filename,
+)
+from domain.repositories import AsyncMetadataIndexRepository, AsyncStorageRepository
+from public_interfaces import ExpandArchiveRequest
+from usecases.upload_file import UploadFileUseCase, parse_user_metadata
+
+# Largest number of files taken from one archive
+MAX_ARCHIVE_MEMBERS = 10000
+# Largest total size of the files taken from one archive, once expanded
+MAX_ARCHIVE_BYTES = 64 * 1024 * 1024 * 1024
+# Members of one archive stored at the same time
+ARCHIVE_UPLOAD_CONCURRENCY = 16
+# Members up to this size are spooled in memory, larger ones to a temp file
+MEMBER_SPOOL_SIZE = 1024 * 1024
+
+
+class ArchiveMemberUpload:
+    """One spooled archive member, as a FileUpload for the upload use case"""
+
+    def __init__(self, filename: str, content: tempfile.SpooledTemporaryFile):
+        self.filename = filename
+        self.content_type = mimetypes.guess_type(filename)[0]
+        self.file = content
+
+    async def read(self, size: int = -1) -> bytes:
+        return await anyio.to_thread.run_sync(self.file.read, size)
+
+    def seek(self, offset: int) -> None:
+        self.file.seek(offset)
+
+
+def _iterate_from_thread(chunks: AsyncIterable[bytes]) -> Iterator[bytes]:
+    """Consume an async iterable from a worker thread, one chunk at a time"""
+    iterator = chunks.__aiter__()
+    while True:
+        try:
+            yield anyio.from_thread.run(iterator.__anext__)
+        except StopAsyncIteration:
+            return
+
+
+def _spool(
+    content: Iterator[bytes], limit: int
+) -> Tuple[tempfile.SpooledTemporaryFile, int]:
+    """Spool a member and return it with its size, stopping past limit bytes"""
+    spool = tempfile.SpooledTemporaryFile(max_size=MEMBER_SPOOL_SIZE)
+    size = 0
+    try:
+        for chunk in content:
+            size += len(chunk)
+            if size > limit:
+                raise InvalidArchiveError(
+                    f"An archive expands to at most {MAX_ARCHIVE_BYTES} bytes"
+                )
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, size
+
+
+class ExpandArchiveUseCase:
+    """
+    Store every file of an uploaded archive in a collection, reporting each.
+
+    The archive is read from the request body in a worker thread, one member
+    at a time; each member is spooled on its own and handed to the event loop,
+    where up to ARCHIVE_UPLOAD_CONCURRENCY of them are stored concurrently
+    through the regular upload path (checksums, deduplication, indexing).
+    The queue between the two is bounded, so only a few dozen members are
+    spooled at once and the archive as a whole is never buffered.
+    """
+
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        index: Optional[AsyncMetadataIndexRepository] = None,
+    ):
+        self.uploads = UploadFileUseCase(storage, index)
+
+    async def execute(
+        self,
+        request: ExpandArchiveRequest,
+        body: AsyncIterable[bytes],
+        user: AuthenticatedPrincipal,
+    ) -> List[Tuple[str, Union[File, DomainError]]]:
+        """Return each member's name with its stored File or what stopped it"""
+        if not user.has_collection_permission(request.collection, "write"):
+            raise InsufficientPermissionsError(
+                f"You don't have write access to collection: {request.collection}"
+            )
+        archive_format = ARCHIVE_FORMATS.get(request.content_type)
+        if archive_format is None:
+            raise UnsupportedArchiveError(
+                f"Unsupported archive type: {request.content_type}"
+            )
+        metadata = parse_user_metadata(request.metadata)
+
+        results: List[Tuple[str, Union[File, DomainError]]] = []
+        send, receive = anyio.create_memory_object_stream(ARCHIVE_UPLOAD_CONCURRENCY)
+        failure: Optional[DomainError] = None
+
+        async def store_members(receive: anyio.abc.ObjectReceiveStream):
+            async with receive:
+                async for position, member in receive:
+                    path = results[position][0]
+                    try:
+                        results[position] = (
+                            path,
+                            await self.uploads.upload(
+                                request.collection, member, metadata, user
+                            ),
+                        )
+                    except FileUploadError as e:
+                        results[position] = (path, e)
+                    finally:
+                        member.file.close()
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(ARCHIVE_UPLOAD_CONCURRENCY):
+                tg.start_soon(store_members, receive.clone())
+            receive.close()
+
+            try:
+                async with send:
+                    await anyio.to_thread.run_sync(
+                        self._read_members, body, archive_format, send, results
+                    )
+            except (InvalidArchiveError, UnsupportedArchiveError) as e:
+                # Members read so far are still stored before reporting
+                failure = e
+
+        if failure is not None:
+            stored = sum(1 for _, result in results if isinstance(result, File))
+            raise type(failure)(f"{failure} ({stored} files stored before it)")
+        return results
+
+    def _read_members(
+        self,
+        body: AsyncIterable[bytes],
+        archive_format: str,
+        send: anyio.abc.ObjectSendStream,
+        results: List[Tuple[str, Union[File, DomainError]]],
+    ):
+        """Worker thread: spool members one by one and queue them for storage"""
+        seen = set()
+        expanded = 0
+        members = iter_archive_members(_iterate_from_thread(body), archive_format)
+        for path, content in members:
+            filename = member_filename(path)
+            if filename is None:
+                continue
+            position = len(results)
+            if position == MAX_ARCHIVE_MEMBERS:
+                raise InvalidArchiveError(
+                    f"An archive holds at most {MAX_ARCHIVE_MEMBERS} files"
+                )
+            results.append((path, None))
+            # Object names only differ by filename within the same second
+            if filename in seen:
+                results[position] = (
+                    path,
+                    FileUploadError(f"Duplicate filename in archive: {filename}"),
+                )
+                continue
+            seen.add(filename)
+            spool, size = _spool(content, MAX_ARCHIVE_BYTES - expanded)
+            expanded += size
+            member = ArchiveMemberUpload(filename, spool)
+            anyio.from_thread.run(send.send, (position, member))
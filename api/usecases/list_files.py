@@ -1,33 +1,139 @@
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 
 from domain import (
     AuthenticatedPrincipal,
     File,
     FileListingError,
     InsufficientPermissionsError,
+    InvalidCursorError,
+    ListingCursorService,
+)
+from domain.models import FilePage
+from domain.repositories import (
+    AsyncMetadataIndexRepository,
+    AsyncStorageRepository,
+    StorageError,
 )
-from domain.repositories import StorageError, StorageRepository
 from public_interfaces import ListFilesRequest
 
+# Largest page a client may request, and the page size used when a cursor
+# is given without an explicit limit
+MAX_PAGE_SIZE = 1000
+
 
 class ListFilesUseCase:
-    def __init__(self, storage: StorageRepository):
+    """
+    List files in a collection.
+
+    With a complete metadata index, listings are served from the index and
+    carry the content type and user metadata of every file; otherwise they
+    come from storage prefix listings, which report names and sizes only.
+    """
+
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        index: Optional[AsyncMetadataIndexRepository] = None,
+    ):
         self.storage = storage
+        self.index = index
 
-    def execute(
+    async def execute(
         self, request: ListFilesRequest, user: AuthenticatedPrincipal
-    ) -> List[File]:
-        if not user.has_collection_permission(request.collection, "read"):
-            raise InsufficientPermissionsError(
-                f"You don't have read access to collection: {request.collection}"
+    ) -> Tuple[List[File], Optional[str]]:
+        """
+        List files in a collection.
+
+        Returns the files and the cursor for the next page; the cursor is
+        None when the request was not paginated or this is the last page.
+        """
+        self._check_permission(request, user)
+
+        start_after = None
+        if request.cursor is not None:
+            start_after = ListingCursorService.decode(
+                request.cursor, request.collection
             )
+            if start_after is None:
+                raise InvalidCursorError("Invalid listing cursor")
 
         try:
-            # Use repository protocol to get domain objects directly
-            domain_files = self.storage.list_files_in_collection(request.collection)
-            return domain_files
+            if request.limit is None and start_after is None:
+                domain_files = await self._list_all(request.collection)
+                return domain_files, None
+
+            page = await self._list_page(
+                request.collection,
+                request.limit or MAX_PAGE_SIZE,
+                start_after,
+            )
+            next_cursor = (
+                ListingCursorService.encode(page.next_start_after)
+                if page.next_start_after
+                else None
+            )
+            return page.files, next_cursor
+
+        except StorageError as e:
+            raise FileListingError(f"Storage error during listing: {str(e)}")
+        except Exception as e:
+            raise FileListingError(f"Unexpected error during listing: {str(e)}")
+
+    async def stream(
+        self, request: ListFilesRequest, user: AuthenticatedPrincipal
+    ) -> AsyncIterator[File]:
+        """
+        Iterate over every file in a collection, one storage page at a time.
 
+        Permissions are checked and the first page is fetched before this
+        returns, so those failures surface as errors rather than as a broken
+        stream. Only one page of entries is held in memory at a time.
+        """
+        self._check_permission(request, user)
+        first_page = await self._fetch_page(request.collection, None)
+        return self._iterate_pages(request.collection, first_page)
+
+    async def _iterate_pages(
+        self, collection: str, page: FilePage
+    ) -> AsyncIterator[File]:
+        while True:
+            for file in page.files:
+                yield file
+            if not page.next_start_after:
+                return
+            page = await self._fetch_page(collection, page.next_start_after)
+
+    async def _fetch_page(
+        self, collection: str, start_after: Optional[str]
+    ) -> FilePage:
+        try:
+            return await self._list_page(collection, MAX_PAGE_SIZE, start_after)
         except StorageError as e:
             raise FileListingError(f"Storage error during listing: {str(e)}")
         except Exception as e:
             raise FileListingError(f"Unexpected error during listing: {str(e)}")
+
+    async def _use_index(self) -> bool:
+        # A new index is filled from storage in the background; until then
+        # it would list nothing, so storage answers instead
+        return self.index is not None and await self.index.is_complete()
+
+    async def _list_all(self, collection: str) -> List[File]:
+        if await self._use_index():
+            return await self.index.list_files_in_collection(collection)
+        # Use repository protocol to get domain objects directly
+        return await self.storage.list_files_in_collection(collection)
+
+    async def _list_page(
+        self, collection: str, limit: int, start_after: Optional[str]
+    ) -> FilePage:
+        if await self._use_index():
+            return await self.index.list_files_page(collection, limit, start_after)
+        return await self.storage.list_files_page(collection, limit, start_after)
+
+    @staticmethod
+    def _check_permission(request: ListFilesRequest, user: AuthenticatedPrincipal):
+        if not user.has_collection_permission(request.collection, "read"):
+            raise InsufficientPermissionsError(
+                f"You don't have read access to collection: {request.collection}"
+            )
@@ -0,0 +1,95 @@
+from typing import List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from domain import (
+    AuthenticatedPrincipal,
+    File,
+    FileListingError,
+    FilePathService,
+    FileQuery,
+    InsufficientPermissionsError,
+    InvalidCursorError,
+    InvalidQueryError,
+    ListingCursorService,
+    MetadataIndexUnavailableError,
+)
+from domain.repositories import MetadataIndexRepository, StorageError
+from public_interfaces import QueryFilesRequest
+
+
+def build_file_query(request: QueryFilesRequest) -> FileQuery:
+    """Translate API query parameters into a domain FileQuery"""
+    metadata = {}
+    for metadata_filter in request.metadata:
+        key, separator, value = metadata_filter.partition(":")
+        if not separator or not key:
+            raise InvalidQueryError(
+                f"Metadata filters must look like key:value, got {metadata_filter!r}"
+            )
+        metadata[key] = value
+
+    if request.order not in ("asc", "desc"):
+        raise InvalidQueryError("order must be asc or desc")
+
+    # upload_time is stored in the path timestamp format, which sorts
+    # chronologically as a string
+    def upload_time(value) -> Optional[str]:
+        return value.strftime(FilePathService.TIMESTAMP_FORMAT) if value else None
+
+    try:
+        return FileQuery(
+            collection=request.collection,
+            owner=request.owner,
+            content_type=request.content_type,
+            uploaded_after=upload_time(request.uploaded_after),
+            uploaded_before=upload_time(request.uploaded_before),
+            min_size=request.min_size,
+            max_size=request.max_size,
+            metadata=metadata,
+            sort=request.sort,
+            descending=request.order == "desc",
+        )
+    except ValidationError:
+        raise InvalidQueryError(f"Cannot sort by {request.sort}")
+
+
+class QueryFilesUseCase:
+    """Filter and sort the files of a collection using the metadata index"""
+
+    def __init__(self, index: Optional[MetadataIndexRepository]):
+        self.index = index
+
+    def execute(
+        self, request: QueryFilesRequest, user: AuthenticatedPrincipal
+    ) -> Tuple[List[File], Optional[str]]:
+        """Return one page of matching files and the cursor for the next page"""
+        if not user.has_collection_permission(request.collection, "read"):
+            raise InsufficientPermissionsError(
+                f"You don't have read access to collection: {request.collection}"
+            )
+        if self.index is None:
+            raise MetadataIndexUnavailableError("Metadata queries are not enabled")
+
+        query = build_file_query(request)
+
+        after = None
+        if request.cursor is not None:
+            after = ListingCursorService.decode_position(
+                request.cursor, request.collection, query.sort
+            )
+            if after is None:
+                raise InvalidCursorError("Invalid query cursor")
+
+        try:
+            page = self.index.query_files(query, request.limit, after)
+        except StorageError as e:
+            raise FileListingError(f"Metadata index error during query: {str(e)}")
+
+        next_cursor = None
+        if page.next_start_after:
+            last = page.files[-1]
+            next_cursor = ListingCursorService.encode_position(
+                query.sort, query.sort_value(last), last.object_name
+            )
+        return page.files, next_cursor
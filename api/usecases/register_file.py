@@ -0,0 +1,117 @@
+from typing import List, Optional, Tuple
+
+import anyio
+
+from domain import (
+    AuthenticatedPrincipal,
+    ContentNotFoundError,
+    File,
+    FileUploadError,
+    InsufficientPermissionsError,
+)
+from domain.repositories import (
+    AsyncMetadataIndexRepository,
+    AsyncStorageRepository,
+    StorageError,
+    StorageFileNotFoundError,
+)
+from public_interfaces import CheckContentRequest, ContentDigest, RegisterFileRequest
+from usecases.upload_file import (
+    build_upload_file,
+    index_stored_file_async,
+    parse_user_metadata,
+)
+
+# Largest number of contents checked in one request
+MAX_CONTENT_CHECKS = 1000
+# Storage lookups in flight at once while checking a batch
+CONTENT_CHECK_CONCURRENCY = 16
+
+
+def _check_write_permission(collection: str, user: AuthenticatedPrincipal):
+    if not user.has_collection_permission(collection, "write"):
+        raise InsufficientPermissionsError(
+            f"You don't have write access to collection: {collection}"
+        )
+
+
+class CheckContentUseCase:
+    """Tell which contents a collection already holds, so uploads can skip them"""
+
+    def __init__(self, storage: AsyncStorageRepository):
+        self.storage = storage
+
+    async def execute(
+        self, request: CheckContentRequest, user: AuthenticatedPrincipal
+    ) -> Tuple[List[ContentDigest], List[ContentDigest]]:
+        """Return the (existing, missing) contents, each in request order"""
+        _check_write_permission(request.collection, user)
+
+        found = [False] * len(request.files)
+        errors: List[StorageError] = []
+        limiter = anyio.CapacityLimiter(CONTENT_CHECK_CONCURRENCY)
+
+        async with anyio.create_task_group() as tg:
+
+            async def check(position: int, content: ContentDigest):
+                async with limiter:
+                    try:
+                        found[position] = await self.storage.content_exists(
+                            request.collection, content.sha256, content.size
+                        )
+                    except StorageError as e:
+                        errors.append(e)
+                        tg.cancel_scope.cancel()
+
+            for position, content in enumerate(request.files):
+                tg.start_soon(check, position, content)
+
+        if errors:
+            raise FileUploadError(
+                f"Storage error during content check: {str(errors[0])}"
+            )
+
+        existing = [c for c, stored in zip(request.files, found) if stored]
+        missing = [c for c, stored in zip(request.files, found) if not stored]
+        return existing, missing
+
+
+class RegisterFileUseCase:
+    """Add a file whose content its collection already holds, without uploading it"""
+
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        index: Optional[AsyncMetadataIndexRepository] = None,
+    ):
+        self.storage = storage
+        self.index = index
+
+    async def execute(
+        self, request: RegisterFileRequest, user: AuthenticatedPrincipal
+    ) -> File:
+        _check_write_permission(request.collection, user)
+
+        metadata_dict = parse_user_metadata(request.metadata)
+        domain_file = build_upload_file(
+            request.collection,
+            request.filename,
+            request.content_type,
+            metadata_dict,
+            user,
+            sha256=request.sha256,
+        )
+        domain_file.size = request.size
+
+        try:
+            await self.storage.store_reference(domain_file)
+        except StorageFileNotFoundError:
+            raise ContentNotFoundError(
+                f"Collection {request.collection} holds no content {request.sha256}"
+                f" of {request.size} bytes; upload the file instead"
+            )
+        except StorageError as e:
+            raise FileUploadError(f"Storage error during registration: {str(e)}")
+
+        await index_stored_file_async(self.index, domain_file)
+        return domain_file
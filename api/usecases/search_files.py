@@ -0,0 +1,36 @@
+from typing import List, Optional
+
+from domain import (
+    AuthenticatedPrincipal,
+    File,
+    FileListingError,
+    MetadataIndexUnavailableError,
+)
+from domain.repositories import MetadataIndexRepository, StorageError
+from public_interfaces import SearchFilesRequest
+
+
+class SearchFilesUseCase:
+    """Full-text search over file names and metadata in readable collections"""
+
+    def __init__(self, index: Optional[MetadataIndexRepository]):
+        self.index = index
+
+    def execute(
+        self, request: SearchFilesRequest, user: AuthenticatedPrincipal
+    ) -> List[File]:
+        if self.index is None:
+            raise MetadataIndexUnavailableError("Search is not enabled")
+
+        try:
+            # Restrict the search to collections the principal may read
+            collections = [
+                collection
+                for collection in self.index.list_collections()
+                if user.has_collection_permission(collection, "read")
+            ]
+            return self.index.search_files(
+                request.query, collections, request.limit, request.offset
+            )
+        except StorageError as e:
+            raise FileListingError(f"Metadata index error during search: {str(e)}")
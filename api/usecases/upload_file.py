@@ -1,8 +1,14 @@
-import io
 from datetime import datetime
+from typing import Any, AsyncIterable, Dict, List, Optional, Sequence, Union
+import json
+import logging
+
+import anyio
 
 from domain import (
+    AsyncUploadStream,
     AuthenticatedPrincipal,
+    DomainError,
     File,
     FileMetadataService,
     FilePathService,
@@ -10,14 +16,111 @@ from domain import (
     FileUploadError,
     InsufficientPermissionsError,
     InvalidMetadataError,
+    UploadStream,
+    content_digest,
+)
+from domain.repositories import (
+    AsyncMetadataIndexRepository,
+    AsyncStorageRepository,
+    MetadataIndexRepository,
+    StorageError,
+)
+from public_interfaces import (
+    BatchUploadFileRequest,
+    StreamUploadFileRequest,
+    UploadFileRequest,
 )
-from domain.repositories import StorageError, StorageRepository
-from public_interfaces import UploadFileRequest
+
+logger = logging.getLogger(__name__)
+
+
+def parse_user_metadata(metadata_json: str) -> Dict[str, Any]:
+    """Parse and validate user-supplied metadata JSON"""
+    metadata_dict = FileMetadataService.parse_metadata_json(metadata_json)
+    if not metadata_dict and metadata_json != "{}":
+        raise InvalidMetadataError("Invalid metadata JSON format")
+    return metadata_dict
+
+
+def build_upload_file(
+    collection: str,
+    filename: Optional[str],
+    content_type: Optional[str],
+    user_metadata: Dict[str, Any],
+    user: AuthenticatedPrincipal,
+    sha256: Optional[str] = None,
+) -> File:
+    """Create the File domain object for a new upload by the given principal"""
+    # Generate timestamp and storage path using domain services
+    timestamp = datetime.now()
+    timestamp_str = timestamp.strftime(FilePathService.TIMESTAMP_FORMAT)
+    storage_path = FilePathService.generate_storage_path(
+        collection,
+        user.get_identifier(),
+        filename or "unknown",
+        timestamp,
+    )
+
+    # Create upload metadata using domain service
+    upload_metadata = FileMetadataService.create_upload_metadata(
+        uploader=user.get_identifier(),
+        upload_time=timestamp_str,
+        collection=collection,
+        original_filename=filename or "unknown",
+        user_metadata=user_metadata,
+        sha256=sha256,
+    )
+
+    # Create File domain object
+    return File(
+        object_name=storage_path,
+        collection=collection,
+        owner=user.get_identifier(),
+        original_filename=filename or "unknown",
+        upload_time=timestamp_str,
+        content_type=content_type or "application/octet-stream",
+        sha256=sha256,
+        metadata=upload_metadata,
+    )
+
+
+def index_stored_file(index: Optional[MetadataIndexRepository], file: File):
+    """Record a newly stored file in the metadata index, if one is configured"""
+    if index is None:
+        return
+    try:
+        index.upsert_file(file)
+    except StorageError as e:
+        # The upload itself succeeded; rebuilding the index recovers the entry
+        logger.warning(f"Failed to index {file.object_name}: {e}")
+
+
+async def index_stored_file_async(
+    index: Optional[AsyncMetadataIndexRepository], file: File
+):
+    """Record a newly stored file in the metadata index, off the event loop"""
+    if index is None:
+        return
+    try:
+        await index.upsert_file(file)
+    except StorageError as e:
+        logger.warning(f"Failed to index {file.object_name}: {e}")
+
+
+def _is_seekable(source) -> bool:
+    """True if the upload can be read twice (hashed, then stored)"""
+    seekable = getattr(source, "seekable", None)
+    return bool(seekable and seekable())
 
 
 class UploadFileUseCase:
-    def __init__(self, storage: StorageRepository):
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        index: Optional[AsyncMetadataIndexRepository] = None,
+    ):
         self.storage = storage
+        self.index = index
 
     async def execute(
         self, request: UploadFileRequest, file: FileUpload, user: AuthenticatedPrincipal
@@ -27,57 +130,210 @@ class UploadFileUseCase:
                 f"You don't have write access to collection: {request.collection}"
             )
 
-        # Parse and validate metadata using domain service
-        metadata_dict = FileMetadataService.parse_metadata_json(request.metadata)
-        if not metadata_dict and request.metadata != "{}":
-            raise InvalidMetadataError("Invalid metadata JSON format")
-
-        # Generate timestamp and storage path using domain services
-        timestamp = datetime.now()
-        timestamp_str = timestamp.strftime(FilePathService.TIMESTAMP_FORMAT)
-        storage_path = FilePathService.generate_storage_path(
-            request.collection,
-            user.get_identifier(),
-            file.filename or "unknown",
-            timestamp,
-        )
-
-        # Create upload metadata using domain service
-        upload_metadata = FileMetadataService.create_upload_metadata(
-            uploader=user.get_identifier(),
-            upload_time=timestamp_str,
-            collection=request.collection,
-            original_filename=file.filename or "unknown",
-            user_metadata=metadata_dict,
-        )
-
-        # Create File domain object
-        domain_file = File(
-            object_name=storage_path,
-            collection=request.collection,
-            owner=user.get_identifier(),
-            original_filename=file.filename or "unknown",
-            upload_time=timestamp_str,
-            content_type=file.content_type or "application/octet-stream",
-            metadata=upload_metadata,
-        )
-
-        # Read file content
-        file_content = await file.read()
+        metadata_dict = parse_user_metadata(request.metadata)
+        return await self.upload(request.collection, file, metadata_dict, user)
 
+    async def upload(
+        self,
+        collection: str,
+        file: FileUpload,
+        user_metadata: Dict[str, Any],
+        user: AuthenticatedPrincipal,
+    ) -> File:
+        """Store one upload for a principal whose write access was checked"""
         try:
-            # Set file size from actual content
-            domain_file.size = len(file_content)
+            # Hash spooled uploads first, off the event loop, so the checksum
+            # is stored with the object and storage can skip content it
+            # already holds; the spool is local, so this costs a disk read.
+            # The rewound spool is then stored as is, without hashing again.
+            sha256 = size = None
+            if _is_seekable(file.file):
+                sha256, size = await anyio.to_thread.run_sync(content_digest, file.file)
+                file_content = file.file
+            else:
+                # Stream in fixed-size chunks, hashing them as they pass
+                file_content = UploadStream(file.file)
+
+            domain_file = build_upload_file(
+                collection,
+                file.filename,
+                file.content_type,
+                user_metadata,
+                user,
+                sha256=sha256,
+            )
+            domain_file.size = size
 
             # Upload using repository protocol
-            success = self.storage.store_file(io.BytesIO(file_content), domain_file)
+            success = await self.storage.store_file(file_content, domain_file)
 
             if not success:
                 raise FileUploadError("File upload operation failed")
 
+            # Otherwise take size and checksum from the bytes actually
+            # streamed to storage, and add the checksum to the stored object
+            if domain_file.sha256 is None:
+                await store_streamed_checksum(self.storage, domain_file, file_content)
+
+            await index_stored_file_async(self.index, domain_file)
             return domain_file
 
         except StorageError as e:
             raise FileUploadError(f"Storage error during upload: {str(e)}")
         except Exception as e:
             raise FileUploadError(f"Unexpected error during upload: {str(e)}")
+
+
+async def store_streamed_checksum(
+    storage: AsyncStorageRepository,
+    domain_file: File,
+    stream: Union[UploadStream, AsyncUploadStream],
+):
+    """
+    Record size and checksum of content hashed while it streamed to storage,
+    and add the checksum to the stored object's metadata
+    """
+    domain_file.size = stream.size
+    domain_file.sha256 = stream.sha256
+    domain_file.metadata[FileMetadataService.CHECKSUM_KEY] = domain_file.sha256
+    try:
+        await storage.update_metadata(domain_file)
+    except StorageError as e:
+        # The content is stored; only the Digest of its downloads is lost
+        logger.warning(f"Failed to store checksum of {domain_file.object_name}: {e}")
+
+
+class StreamUploadFileUseCase:
+    """
+    Upload a file sent as the raw request body.
+
+    The body goes straight to storage as it arrives, with no multipart
+    parsing and no spool file in between. Since the checksum is only known
+    once the body has been streamed, these uploads are stored as plain
+    objects rather than deduplicated, and the checksum is added to the
+    stored metadata afterwards.
+    """
+
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        index: Optional[AsyncMetadataIndexRepository] = None,
+    ):
+        self.storage = storage
+        self.index = index
+
+    async def execute(
+        self,
+        request: StreamUploadFileRequest,
+        body: AsyncIterable[bytes],
+        user: AuthenticatedPrincipal,
+    ) -> File:
+        if not user.has_collection_permission(request.collection, "write"):
+            raise InsufficientPermissionsError(
+                f"You don't have write access to collection: {request.collection}"
+            )
+
+        metadata_dict = parse_user_metadata(request.metadata)
+        domain_file = build_upload_file(
+            request.collection,
+            request.filename,
+            request.content_type,
+            metadata_dict,
+            user,
+        )
+        file_content = AsyncUploadStream(body, anyio.to_thread.run_sync)
+
+        try:
+            success = await self.storage.store_file(file_content, domain_file)
+        except StorageError as e:
+            raise FileUploadError(f"Storage error during upload: {str(e)}")
+        except Exception as e:
+            raise FileUploadError(f"Unexpected error during upload: {str(e)}")
+        if not success:
+            raise FileUploadError("File upload operation failed")
+
+        await store_streamed_checksum(self.storage, domain_file, file_content)
+        await index_stored_file_async(self.index, domain_file)
+        return domain_file
+
+
+# Largest number of files accepted in one batch upload (also the multipart
+# parser's default limit on files per request)
+MAX_BATCH_FILES = 1000
+# Files of one batch stored at the same time
+BATCH_UPLOAD_CONCURRENCY = 16
+
+
+def parse_batch_metadata(metadata_json: str, count: int) -> List[Dict[str, Any]]:
+    """
+    Parse the metadata of a batch: one JSON object shared by every file, or
+    a JSON array with one object per file, in upload order.
+    """
+    try:
+        parsed = json.loads(metadata_json)
+    except json.JSONDecodeError:
+        raise InvalidMetadataError("Invalid metadata JSON format")
+
+    if isinstance(parsed, dict):
+        return [parsed] * count
+    if not isinstance(parsed, list) or not all(isinstance(m, dict) for m in parsed):
+        raise InvalidMetadataError("Batch metadata must be an object or an array")
+    if len(parsed) != count:
+        raise InvalidMetadataError(
+            f"Batch metadata has {len(parsed)} entries for {count} files"
+        )
+    return parsed
+
+
+class BatchUploadFileUseCase:
+    """Store many uploads to one collection concurrently, reporting each result"""
+
+    def __init__(
+        self,
+        storage: AsyncStorageRepository,
+        index: Optional[AsyncMetadataIndexRepository] = None,
+    ):
+        self.uploads = UploadFileUseCase(storage, index)
+
+    async def execute(
+        self,
+        request: BatchUploadFileRequest,
+        files: Sequence[FileUpload],
+        user: AuthenticatedPrincipal,
+    ) -> List[Union[File, DomainError]]:
+        """Return the stored File, or the error that stopped it, for each upload"""
+        if not user.has_collection_permission(request.collection, "write"):
+            raise InsufficientPermissionsError(
+                f"You don't have write access to collection: {request.collection}"
+            )
+        if len(files) > MAX_BATCH_FILES:
+            raise InvalidMetadataError(
+                f"A batch holds at most {MAX_BATCH_FILES} files, got {len(files)}"
+            )
+        metadata = parse_batch_metadata(request.metadata, len(files))
+
+        results: List[Union[File, DomainError]] = [None] * len(files)
+        limiter = anyio.CapacityLimiter(BATCH_UPLOAD_CONCURRENCY)
+        seen = set()
+
+        async def upload(position: int, file: FileUpload):
+            async with limiter:
+                try:
+                    results[position] = await self.uploads.upload(
+                        request.collection, file, metadata[position], user
+                    )
+                except FileUploadError as e:
+                    results[position] = e
+
+        async with anyio.create_task_group() as tg:
+            for position, file in enumerate(files):
+                # Object names only differ by filename within the same second
+                if file.filename in seen:
+                    results[position] = FileUploadError(
+                        f"Duplicate filename in batch: {file.filename}"
+                    )
+                    continue
+                seen.add(file.filename)
+                tg.start_soon(upload, position, file)
+
+        return results
@@ -0,0 +1,234 @@
+from typing import List, Optional, Tuple
+
+from domain import (
+    AuthenticatedPrincipal,
+    File,
+    FileUploadError,
+    InsufficientPermissionsError,
+    InvalidUploadSessionError,
+    UploadedChunk,
+    UploadSession,
+    UploadSessionNotFoundError,
+    UploadSessionRepository,
+)
+from domain.repositories import (
+    MetadataIndexRepository,
+    StorageError,
+    StorageFileNotFoundError,
+)
+from public_interfaces import (
+    CreatePresignedUploadRequest,
+    CreateUploadSessionRequest,
+    PresignChunkRequest,
+    UploadChunkRequest,
+    UploadSessionRequest,
+)
+from usecases.upload_file import (
+    build_upload_file,
+    index_stored_file,
+    parse_user_metadata,
+)
+
+# Every chunk except the last must be at least this large (S3 multipart limit)
+MIN_CHUNK_SIZE = 5 * 1024 * 1024
+# Largest chunk accepted in a single request
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def _check_write_permission(collection: str, user: AuthenticatedPrincipal):
+    if not user.has_collection_permission(collection, "write"):
+        raise InsufficientPermissionsError(
+            f"You don't have write access to collection: {collection}"
+        )
+
+
+def _load_session(
+    sessions: UploadSessionRepository,
+    request: UploadSessionRequest,
+    user: AuthenticatedPrincipal,
+) -> UploadSession:
+    """Load a session the principal started in the requested collection"""
+    _check_write_permission(request.collection, user)
+
+    try:
+        session = sessions.get_session(request.session_id)
+    except StorageFileNotFoundError:
+        raise UploadSessionNotFoundError(
+            f"Upload session not found: {request.session_id}"
+        )
+    except StorageError as e:
+        raise FileUploadError(f"Storage error loading upload session: {str(e)}")
+
+    # Sessions of other principals or collections are reported as missing
+    if session.file.collection != request.collection or not session.is_owned_by(user):
+        raise UploadSessionNotFoundError(
+            f"Upload session not found: {request.session_id}"
+        )
+
+    return session
+
+
+class CreateUploadSessionUseCase:
+    def __init__(self, sessions: UploadSessionRepository):
+        self.sessions = sessions
+
+    def execute(
+        self, request: CreateUploadSessionRequest, user: AuthenticatedPrincipal
+    ) -> UploadSession:
+        _check_write_permission(request.collection, user)
+
+        metadata_dict = parse_user_metadata(request.metadata)
+        domain_file = build_upload_file(
+            request.collection,
+            request.filename,
+            request.content_type,
+            metadata_dict,
+            user,
+        )
+
+        try:
+            return self.sessions.create_session(domain_file)
+        except StorageError as e:
+            raise FileUploadError(f"Storage error creating upload session: {str(e)}")
+
+
+class UploadChunkUseCase:
+    def __init__(self, sessions: UploadSessionRepository):
+        self.sessions = sessions
+
+    def execute(
+        self, request: UploadChunkRequest, data: bytes, user: AuthenticatedPrincipal
+    ) -> UploadedChunk:
+        session = _load_session(self.sessions, request, user)
+
+        if not data:
+            raise InvalidUploadSessionError("Chunk is empty")
+
+        try:
+            return self.sessions.store_chunk(session, request.chunk_number, data)
+        except StorageError as e:
+            raise FileUploadError(f"Storage error storing chunk: {str(e)}")
+
+
+class CreatePresignedUploadUseCase:
+    """
+    Start an upload session whose chunks go straight to storage.
+
+    The client PUTs each chunk to its presigned URL and then completes the
+    session as usual; file bytes never pass through the API.
+    """
+
+    def __init__(self, sessions: UploadSessionRepository):
+        self.sessions = sessions
+
+    def execute(
+        self, request: CreatePresignedUploadRequest, user: AuthenticatedPrincipal
+    ) -> Tuple[UploadSession, List[Tuple[int, str]]]:
+        session = CreateUploadSessionUseCase(self.sessions).execute(request, user)
+
+        try:
+            urls = [
+                (
+                    chunk_number,
+                    self.sessions.presign_chunk_url(
+                        session, chunk_number, request.expires
+                    ),
+                )
+                for chunk_number in range(1, request.chunk_count + 1)
+            ]
+        except StorageError as e:
+            raise FileUploadError(f"Storage error presigning upload: {str(e)}")
+
+        return session, urls
+
+
+class PresignChunkUseCase:
+    def __init__(self, sessions: UploadSessionRepository):
+        self.sessions = sessions
+
+    def execute(
+        self, request: PresignChunkRequest, user: AuthenticatedPrincipal
+    ) -> str:
+        session = _load_session(self.sessions, request, user)
+
+        try:
+            return self.sessions.presign_chunk_url(
+                session, request.chunk_number, request.expires
+            )
+        except StorageError as e:
+            raise FileUploadError(f"Storage error presigning chunk: {str(e)}")
+
+
+class GetUploadSessionUseCase:
+    def __init__(self, sessions: UploadSessionRepository):
+        self.sessions = sessions
+
+    def execute(
+        self, request: UploadSessionRequest, user: AuthenticatedPrincipal
+    ) -> Tuple[UploadSession, List[UploadedChunk]]:
+        session = _load_session(self.sessions, request, user)
+
+        try:
+            return session, self.sessions.list_chunks(session)
+        except StorageError as e:
+            raise FileUploadError(f"Storage error listing chunks: {str(e)}")
+
+
+class CompleteUploadSessionUseCase:
+    def __init__(
+        self,
+        sessions: UploadSessionRepository,
+        index: Optional[MetadataIndexRepository] = None,
+    ):
+        self.sessions = sessions
+        self.index = index
+
+    def execute(
+        self, request: UploadSessionRequest, user: AuthenticatedPrincipal
+    ) -> File:
+        session = _load_session(self.sessions, request, user)
+
+        try:
+            chunks = self.sessions.list_chunks(session)
+        except StorageError as e:
+            raise FileUploadError(f"Storage error listing chunks: {str(e)}")
+
+        if not chunks:
+            raise InvalidUploadSessionError("No chunks have been uploaded")
+
+        received = [chunk.chunk_number for chunk in chunks]
+        missing = sorted(set(range(1, received[-1] + 1)) - set(received))
+        if missing:
+            raise InvalidUploadSessionError(f"Missing chunks: {missing}")
+
+        undersized = [
+            chunk.chunk_number for chunk in chunks[:-1] if chunk.size < MIN_CHUNK_SIZE
+        ]
+        if undersized:
+            raise InvalidUploadSessionError(
+                f"Chunks smaller than {MIN_CHUNK_SIZE} bytes before the last "
+                f"chunk: {undersized}"
+            )
+
+        try:
+            file = self.sessions.complete_session(session, chunks)
+        except StorageError as e:
+            raise FileUploadError(f"Storage error completing upload: {str(e)}")
+
+        index_stored_file(self.index, file)
+        return file
+
+
+class AbortUploadSessionUseCase:
+    def __init__(self, sessions: UploadSessionRepository):
+        self.sessions = sessions
+
+    def execute(
+        self, request: UploadSessionRequest, user: AuthenticatedPrincipal
+    ) -> bool:
+        session = _load_session(self.sessions, request, user)
+
+        try:
+            return self.sessions.abort_session(session)
+        except StorageError as e:
+            raise FileUploadError(f"Storage error aborting upload: {str(e)}")